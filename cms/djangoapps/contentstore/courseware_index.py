@@ -7,11 +7,12 @@ from abc import ABCMeta, abstractmethod
 from datetime import timedelta
 
 from django.conf import settings
+from django.core.cache import cache
 from django.urls import resolve
 from django.utils.translation import ugettext as _
 from django.utils.translation import ugettext_lazy
 from search.search_engine_base import SearchEngine
-from six import add_metaclass, string_types, text_type
+from six import add_metaclass, iteritems, string_types, text_type
 
 from contentstore.course_group_config import GroupConfiguration
 from course_modes.models import CourseMode
@@ -50,6 +51,111 @@ def indexing_is_enabled():
     return settings.FEATURES.get('ENABLE_COURSEWARE_INDEX', False)
 
 
+def _get_item_location(item):
+    """
+    Gets the version agnostic item location
+    """
+    return item.location.version_agnostic().replace(branch=None)
+
+
+def _get_split_modulestore(modulestore, structure_key):
+    """
+    Gets the split modulestore of the structure, out of the mixed modulestore if that's what is given
+    """
+    if hasattr(modulestore, '_get_modulestore_for_courselike'):
+        return modulestore._get_modulestore_for_courselike(structure_key)  # pylint: disable=protected-access
+    return modulestore
+
+
+def _get_block_parents(structure):
+    """
+    Returns the {block_key: parent_key} map of the blocks of the split structure
+    which are reachable from its root, whose parent is None
+    """
+    blocks = structure['blocks']
+    parents = {structure['root']: None}
+    block_keys = [structure['root']]
+    while block_keys:
+        block_key = block_keys.pop()
+        for child_key in blocks[block_key].fields.get('children', []):
+            if child_key not in parents and child_key in blocks:
+                parents[child_key] = block_key
+                block_keys.append(child_key)
+    return parents
+
+
+def _settings_changed(old_block, new_block):
+    """
+    Whether any field of the block other than its content and children
+    changed, which may change the index documents of its descendants too
+    """
+    def settings_fields(block):
+        """ The fields of the block, without its children """
+        return {name: value for name, value in iteritems(block.fields) if name != 'children'}
+
+    return (
+        settings_fields(old_block) != settings_fields(new_block) or
+        old_block.defaults != new_block.defaults or
+        old_block.get_asides() != new_block.get_asides()
+    )
+
+
+def _diff_structures(old_structure, new_structure):
+    """
+    Compares the blocks reachable from the roots of two versions of a split
+    structure.
+
+    Returns a (changed, removed) tuple of the sets of the keys of the blocks
+    whose index documents are affected by the changes, and of those no longer
+    in the structure, or None if the root itself changed, since every
+    document is affected then.
+
+    A block is changed if it was added, moved, or if its content or children
+    changed. Changes to any of its other fields (display name, start date,
+    group access, ...) are passed down to its descendants in their documents,
+    which are changed too. The content groups of a document depend on its
+    children, so the ancestors of the changed blocks are also changed.
+    """
+    old_blocks, new_blocks = old_structure['blocks'], new_structure['blocks']
+    root_key = new_structure['root']
+    if old_structure['root'] != root_key:
+        return None
+    old_root, new_root = old_blocks[root_key], new_blocks[root_key]
+    if old_root.definition != new_root.definition or _settings_changed(old_root, new_root):
+        return None
+
+    old_parents = _get_block_parents(old_structure)
+    new_parents = _get_block_parents(new_structure)
+
+    changed = set()
+    # (block_key, whether an ancestor of the block changed its descendants' documents)
+    block_keys = [(root_key, False)]
+    while block_keys:
+        block_key, ancestor_changed = block_keys.pop()
+        new_block = new_blocks[block_key]
+        if block_key != root_key:
+            old_block = old_blocks[block_key] if block_key in old_parents else None
+            if ancestor_changed or old_block is None or old_parents[block_key] != new_parents[block_key] or \
+                    _settings_changed(old_block, new_block):
+                ancestor_changed = True
+                changed.add(block_key)
+            elif old_block.definition != new_block.definition or \
+                    old_block.fields.get('children') != new_block.fields.get('children'):
+                changed.add(block_key)
+        for child_key in new_block.fields.get('children', []):
+            if new_parents.get(child_key) == block_key:
+                block_keys.append((child_key, ancestor_changed))
+
+    for block_key in list(changed):
+        parent_key = new_parents[block_key]
+        while parent_key != root_key and parent_key not in changed:
+            changed.add(parent_key)
+            parent_key = new_parents[parent_key]
+
+    removed = set(old_parents) - set(new_parents)
+    return changed, removed
+
+
 class SearchIndexingError(Exception):
     """ Indicates some error(s) occured during indexing """
 
@@ -68,6 +174,8 @@ class SearchIndexerBase(object):
     INDEX_NAME = None
     DOCUMENT_TYPE = None
     ENABLE_INDEXING_KEY = None
+    # The split branch whose structure versions are compared by `index_changes`, None to always use `index`
+    INDEXED_BRANCH = None
 
     INDEX_EVENT = {
         'name': None,
@@ -88,7 +196,7 @@ class SearchIndexerBase(object):
 
     @classmethod
     @abstractmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
 
     @classmethod
@@ -159,12 +267,6 @@ class SearchIndexerBase(object):
         # instead of per item index API call.
         items_index = []
 
-        def get_item_location(item):
-            """
-            Gets the version agnostic item location
-            """
-            return item.location.version_agnostic().replace(branch=None)
-
         def prepare_item_index(item, skip_index=False, groups_usage_info=None):
             """
             Add this item to the items_index and indexed_items list
@@ -189,23 +291,10 @@ class SearchIndexerBase(object):
             item_content_groups = None
 
             if item.category == "split_test":
-                split_partition = item.get_selected_partition()
-                for split_test_child in item.get_children():
-                    if split_partition:
-                        for group in split_partition.groups:
-                            group_id = text_type(group.id)
-                            child_location = item.group_id_to_child.get(group_id, None)
-                            if child_location == split_test_child.location:
-                                groups_usage_info.update({
-                                    text_type(get_item_location(split_test_child)): [group_id],
-                                })
-                                for component in split_test_child.get_children():
-                                    groups_usage_info.update({
-                                        text_type(get_item_location(component)): [group_id]
-                                    })
+                cls._update_split_test_groups_usage(item, groups_usage_info)
 
             if groups_usage_info:
-                item_location = get_item_location(item)
+                item_location = _get_item_location(item)
                 item_content_groups = groups_usage_info.get(text_type(item_location), None)
 
             item_id = text_type(cls._id_modifier(item.scope_ids.usage_id))
@@ -230,17 +319,11 @@ class SearchIndexerBase(object):
             if skip_index or not item_index_dictionary:
                 return
 
-            item_index = {}
             # if it has something to add to the index, then add it
             try:
-                item_index.update(location_info)
-                item_index.update(item_index_dictionary)
-                item_index['id'] = item_id
-                if item.start:
-                    item_index['start_date'] = item.start
-                item_index['content_groups'] = item_content_groups if item_content_groups else None
-                item_index.update(cls.supplemental_fields(item))
-                items_index.append(item_index)
+                items_index.append(
+                    cls._build_item_index(item, item_id, item_index_dictionary, location_info, item_content_groups)
+                )
                 indexed_count["count"] += 1
                 return item_content_groups
             except Exception as err:  # pylint: disable=broad-except
@@ -249,6 +332,8 @@ class SearchIndexerBase(object):
                 error_list.append(_(u'Could not index item: {}').format(item.location))
 
         try:
+            # The version is read before the content, so that changes published meanwhile are indexed again next time
+            version = cls._get_version(modulestore, structure_key)
             with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
                 structure = cls._fetch_top_level(modulestore, structure_key)
                 groups_usage_info = cls.fetch_group_usage(modulestore, structure)
@@ -273,8 +358,214 @@ class SearchIndexerBase(object):
         if error_list:
             raise SearchIndexingError('Error(s) present during indexing', error_list)
 
+        cls._set_indexed_version(structure_key, version)
         return indexed_count["count"]
 
+    @classmethod
+    def index_changes(cls, modulestore, structure_key, triggered_at=None):
+        """
+        Process the changes to the course since it was last indexed
+
+        The blocks added, changed and removed since then are found by comparing
+        the version of the structure that was last indexed with the current
+        one, and only their index documents, and those of their ancestors whose
+        content groups depend on them, are updated. If the version that was last
+        indexed isn't known, or the structure isn't versioned in split, then
+        `index` is used instead.
+
+        Arguments:
+        modulestore - modulestore object to use for operations
+
+        structure_key (CourseKey|LibraryKey) - course or library identifier
+
+        triggered_at (datetime) - provides time at which indexing was triggered,
+            passed on to `index` when the changes can't be found
+
+        Returns:
+        Number of items that have been added to the index
+        """
+        searcher = SearchEngine.get_search_engine(cls.INDEX_NAME)
+        if not searcher:
+            return
+
+        structure_key = cls.normalize_structure_key(structure_key)
+        try:
+            version = cls._get_version(modulestore, structure_key)
+            changes = cls._get_changes(modulestore, structure_key, version)
+        except Exception as err:  # pylint: disable=broad-except
+            log.warning(u'Could not find the changes to %s, indexing it all - %r', structure_key, err)
+            changes = None
+        if changes is None:
+            return cls.index(modulestore, structure_key, triggered_at=triggered_at)
+
+        changed_block_keys, removed_block_keys = changes
+        error_list = []
+        location_info = cls._get_location_info(structure_key)
+        items_index = []
+        removed_items = set(
+            text_type(cls._id_modifier(structure_key.make_usage_key(block_key.type, block_key.id)))
+            for block_key in removed_block_keys
+        )
+
+        # content_groups holds the content groups of the items, as `index` would
+        # give them to the items' documents, keyed by item location
+        content_groups = {}
+
+        def get_content_groups(item, groups_usage_info):
+            """
+            Returns the content groups the item is assigned to, provided that
+            all of its published children are indexed with content groups too
+            """
+            item_location = text_type(_get_item_location(item))
+            if item_location not in content_groups:
+                item_content_groups = groups_usage_info.get(item_location, None) if groups_usage_info else None
+                if item_content_groups and item.has_children:
+                    for child_item in item.get_children():
+                        if not modulestore.has_published_version(child_item):
+                            continue
+                        child_content_groups = get_content_groups(child_item, groups_usage_info)
+                        if not (child_content_groups and hasattr(child_item, "index_dictionary") and
+                                child_item.index_dictionary()):
+                            item_content_groups = None
+                            break
+                content_groups[item_location] = item_content_groups
+            return content_groups[item_location]
+
+        try:
+            with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
+                with modulestore.bulk_operations(structure_key, emit_signals=False):
+                    structure = cls._fetch_top_level(modulestore, structure_key, depth=0)
+                    groups_usage_info = cls.fetch_group_usage(modulestore, structure)
+                    if groups_usage_info is not None:
+                        for split_test in modulestore.get_items(
+                                structure_key, qualifiers={'category': 'split_test'}, include_orphans=False
+                        ):
+                            cls._update_split_test_groups_usage(split_test, groups_usage_info)
+
+                    cls.supplemental_index_information(modulestore, structure)
+
+                    for block_key in sorted(changed_block_keys):
+                        usage_key = structure_key.make_usage_key(block_key.type, block_key.id)
+                        try:
+                            item = modulestore.get_item(usage_key)
+                            item_id = text_type(cls._id_modifier(item.scope_ids.usage_id))
+                            item_index_dictionary = item.index_dictionary() if hasattr(item, "index_dictionary") \
+                                else None
+                            if not item_index_dictionary:
+                                # `index` would leave out such an item, but still walk through its children
+                                if not item.has_children:
+                                    removed_items.add(item_id)
+                                continue
+                            items_index.append(cls._build_item_index(
+                                item,
+                                item_id,
+                                item_index_dictionary,
+                                location_info,
+                                get_content_groups(item, groups_usage_info),
+                            ))
+                        except Exception as err:  # pylint: disable=broad-except
+                            # broad exception so that index operation does not fail on one item of many
+                            log.warning(u'Could not index item: %s - %r', usage_key, err)
+                            error_list.append(_(u'Could not index item: {}').format(usage_key))
+
+                if items_index:
+                    searcher.index(cls.DOCUMENT_TYPE, items_index)
+                if removed_items:
+                    searcher.remove(cls.DOCUMENT_TYPE, sorted(removed_items))
+        except Exception as err:  # pylint: disable=broad-except
+            # broad exception so that index operation does not prevent the rest of the application from working
+            log.exception(
+                u"Indexing error encountered, courseware index may be out of date %s - %r",
+                structure_key,
+                err
+            )
+            error_list.append(_('General indexing error occurred'))
+
+        if error_list:
+            raise SearchIndexingError('Error(s) present during indexing', error_list)
+
+        cls._set_indexed_version(structure_key, version)
+        return len(items_index)
+
+    @classmethod
+    def _get_version(cls, modulestore, structure_key):
+        """
+        Returns the current version of the INDEXED_BRANCH of the structure, or
+        None if the structure isn't versioned in split
+        """
+        if cls.INDEXED_BRANCH is None or modulestore.get_modulestore_type(structure_key) != ModuleStoreEnum.Type.split:
+            return None
+        index_entry = _get_split_modulestore(modulestore, structure_key).get_course_index(structure_key)
+        if index_entry is None:
+            return None
+        return index_entry['versions'].get(cls.INDEXED_BRANCH)
+
+    @classmethod
+    def _get_changes(cls, modulestore, structure_key, version):
+        """
+        Returns the (changed, removed) sets of the keys of the blocks whose index
+        documents differ between the version of the structure that was last
+        indexed and the given one, or None if they can't be found
+        """
+        indexed_version = cache.get(cls._indexed_version_cache_key(structure_key))
+        if version is None or indexed_version is None:
+            return None
+        if indexed_version == version:
+            return set(), set()
+
+        split_store = _get_split_modulestore(modulestore, structure_key)
+        indexed_structure = split_store.get_structure(structure_key, indexed_version)
+        if indexed_structure is None:
+            return None
+        return _diff_structures(indexed_structure, split_store.get_structure(structure_key, version))
+
+    @classmethod
+    def _indexed_version_cache_key(cls, structure_key):
+        """ Key of the version of the structure that was last indexed, in the cache """
+        return u'{}.indexed_version.{}'.format(cls.INDEX_NAME, structure_key)
+
+    @classmethod
+    def _set_indexed_version(cls, structure_key, version):
+        """ Records the version of the structure that was last indexed """
+        if version is not None:
+            cache.set(cls._indexed_version_cache_key(structure_key), version, None)
+
+    @classmethod
+    def _update_split_test_groups_usage(cls, item, groups_usage_info):
+        """
+        Adds the children of the split_test item, and their own children, to
+        groups_usage_info as used by the group they are shown to
+        """
+        split_partition = item.get_selected_partition()
+        for split_test_child in item.get_children():
+            if split_partition:
+                for group in split_partition.groups:
+                    group_id = text_type(group.id)
+                    child_location = item.group_id_to_child.get(group_id, None)
+                    if child_location == split_test_child.location:
+                        groups_usage_info.update({
+                            text_type(_get_item_location(split_test_child)): [group_id],
+                        })
+                        for component in split_test_child.get_children():
+                            groups_usage_info.update({
+                                text_type(_get_item_location(component)): [group_id]
+                            })
+
+    @classmethod
+    def _build_item_index(cls, item, item_id, item_index_dictionary, location_info, item_content_groups):
+        """
+        Builds the index document of the item
+        """
+        item_index = {}
+        item_index.update(location_info)
+        item_index.update(item_index_dictionary)
+        item_index['id'] = item_id
+        if item.start:
+            item_index['start_date'] = item.start
+        item_index['content_groups'] = item_content_groups if item_content_groups else None
+        item_index.update(cls.supplemental_fields(item))
+        return item_index
+
     @classmethod
     def _do_reindex(cls, modulestore, structure_key):
         """
@@ -346,6 +637,7 @@ class CoursewareSearchIndexer(SearchIndexerBase):
     INDEX_NAME = "courseware_index"
     DOCUMENT_TYPE = "courseware_content"
     ENABLE_INDEXING_KEY = 'ENABLE_COURSEWARE_INDEX'
+    INDEXED_BRANCH = ModuleStoreEnum.BranchName.published
 
     INDEX_EVENT = {
         'name': 'edx.course.index.reindexed',
@@ -360,9 +652,9 @@ class CoursewareSearchIndexer(SearchIndexerBase):
         return structure_key
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_course(structure_key, depth=None)
+        return modulestore.get_course(structure_key, depth=depth)
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
@@ -447,9 +739,9 @@ class LibrarySearchIndexer(SearchIndexerBase):
         return normalize_key_for_search(structure_key)
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_library(structure_key, depth=None)
+        return modulestore.get_library(structure_key, depth=depth)
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
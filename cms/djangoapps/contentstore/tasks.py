@@ -54,7 +54,7 @@ from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
 from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
-from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
+from xmodule.modulestore.xml_importer import CourseImportManager, LibraryImportManager
 from xmodule.video_module.transcripts_utils import (
     Transcript,
     clean_video_id,
@@ -533,7 +533,9 @@ def update_search_index(course_id, triggered_time_isoformat):
     """ Updates course search index. """
     try:
         course_key = CourseKey.from_string(course_id)
-        CoursewareSearchIndexer.index(modulestore(), course_key, triggered_at=(_parse_time(triggered_time_isoformat)))
+        CoursewareSearchIndexer.index_changes(
+            modulestore(), course_key, triggered_at=(_parse_time(triggered_time_isoformat))
+        )
 
     except SearchIndexingError as exc:
         LOGGER.error(u'Search indexing error for complete course %s - %s', course_id, text_type(exc))
@@ -740,11 +742,11 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
     if is_library:
         root_name = LIBRARY_ROOT
         courselike_module = modulestore().get_library(courselike_key)
-        import_func = import_library_from_xml
+        import_manager_class = LibraryImportManager
     else:
         root_name = COURSE_ROOT
         courselike_module = modulestore().get_course(courselike_key)
-        import_func = import_course_from_xml
+        import_manager_class = CourseImportManager
 
     # Locate the uploaded OLX archive (and download it from S3 if necessary)
     # Do everything in a try-except block to make sure everything is properly cleaned up.
@@ -858,13 +860,21 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
         self.status.set_state(u'Updating')
         self.status.increment_completed_steps()
 
-        courselike_items = import_func(
+        import_manager = import_manager_class(
             modulestore(), user.id,
             settings.GITHUB_REPO_ROOT, [dirpath],
             load_error_modules=False,
             static_content_store=contentstore(),
             target_id=courselike_key
         )
+        courselike_items = list(import_manager.run_imports())
+
+        # Report how long each phase of the import took, in seconds.
+        UserTaskArtifact.objects.create(
+            status=self.status,
+            name=u'Timings',
+            text=json.dumps(import_manager.timings),
+        )
 
         new_location = courselike_items[0].location
         LOGGER.debug(u'new course at %s', new_location)
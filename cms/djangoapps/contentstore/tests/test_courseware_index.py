@@ -444,6 +444,60 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         indexed_count = self.reindex_course(store)
         self.assertEqual(indexed_count, 7)
 
+    def _test_index_changes(self, store):
+        """ Make sure that only the documents of the changed items are updated, when the course is in split """
+        is_split = store.get_modulestore_type(self.course.id) == ModuleStoreEnum.Type.split
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+        self.assertEqual(CoursewareSearchIndexer.index_changes(store, self.course.id), 0 if is_split else 4)
+
+        # Add a new sequential, with a vertical and some content
+        sequential2 = ItemFactory.create(
+            parent_location=self.chapter.location,
+            category='sequential',
+            display_name='Section 2',
+            modulestore=store,
+            publish_item=True,
+        )
+        vertical2 = ItemFactory.create(
+            parent_location=sequential2.location,
+            category='vertical',
+            display_name='Subsection 2',
+            modulestore=store,
+            publish_item=True,
+        )
+        html_unit2 = ItemFactory.create(
+            parent_location=vertical2.location,
+            category="html",
+            display_name="Some other content",
+            publish_item=False,
+            modulestore=store,
+        )
+        self.publish_item(store, vertical2.location)
+        # the new items, along with their chapter whose content groups depend on them
+        indexed_count = CoursewareSearchIndexer.index_changes(store, self.course.id)
+        self.assertEqual(indexed_count, 4 if is_split else 7)
+        self.assertEqual(self.search()["total"], 7)
+
+        # Delete an item
+        self.delete_item(store, self.html_unit.location)
+        self.publish_item(store, self.vertical.location)
+        indexed_count = CoursewareSearchIndexer.index_changes(store, self.course.id)
+        self.assertEqual(indexed_count, 3 if is_split else 6)
+        self.assertEqual(self.search()["total"], 6)
+
+        # Rename a sequential, which changes the location of its descendants
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            sequential2 = store.get_item(sequential2.location)
+        sequential2.display_name = 'Section 2 renamed'
+        self.update_item(store, sequential2)
+        self.publish_item(store, sequential2.location)
+        indexed_count = CoursewareSearchIndexer.index_changes(store, self.course.id)
+        self.assertEqual(indexed_count, 4 if is_split else 6)
+        response = self.search(field_dictionary={"id": six.text_type(html_unit2.location)})
+        self.assertEqual(response["results"][0]["data"]["location"], ["Week 1", "Section 2 renamed", "Subsection 2"])
+
     def _test_course_about_property_index(self, store):
         """ Test that informational properties in the course object end up in the course_info index """
         display_name = "Help, I need somebody!"
@@ -575,6 +629,10 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_time_based_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_time_based_index)
 
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_index_changes(self, store_type):
+        self._perform_test_using_store(store_type, self._test_index_changes)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_exception(self, store_type):
         self._perform_test_using_store(store_type, self._test_exception)
@@ -142,6 +142,10 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Timeout, in seconds, of cached transformed block structures, when
+    # the block_structure.cache_transformed waffle switch is enabled.
+    TRANSFORMED_CACHE_TIMEOUT=300,
 )
 
 ############################ FEATURE CONFIGURATION #############################
@@ -570,6 +574,7 @@ MIDDLEWARE_CLASSES = [
     'django.middleware.locale.LocaleMiddleware',
 
     'codejail.django_integration.ConfigureCodeJailMiddleware',
+    'openedx.core.djangoapps.util.safe_exec_config.ConfigureSafeExecMiddleware',
 
     # catches any uncaught RateLimitExceptions and returns a 403 instead of a 500
     'ratelimitbackend.middleware.RateLimitMiddleware',
@@ -759,6 +764,16 @@ CODE_JAIL = {
         # Needs to be non-zero so that jailed code can use it as their temp directory.(1MiB in bytes)
         'FSIZE': 1048576,
     },
+
+    # Pool of pre-warmed sandbox workers used instead of starting a new
+    # sandbox for every execution.  A size of 0 disables the pool.
+    'worker_pool': {
+        'size': 0,
+        # Number of executions after which a worker is replaced.
+        'max_jobs': 500,
+        # Memory use of a worker (in bytes) above which it is replaced.
+        'max_memory': 268435456,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -772,6 +787,16 @@ CODE_JAIL = {
 
 COURSES_WITH_UNSAFE_CODE = []
 
+# Caching of the results of sandboxed code execution, on top of the cache given
+# by the caller (usually the default cache).
+SAFE_EXEC_CACHE = {
+    # Maximum total size (in bytes) of the results kept in each process, in
+    # front of the shared cache.  0 disables the local cache.
+    'local_max_size': 0,
+    # Results larger than this (in bytes) aren't cached.  None means no limit.
+    'max_result_size': None,
+}
+
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1741,6 +1766,19 @@ CACHES = {
     },
 }
 
+# Maximum total size, in bytes, of the course structures kept in each process'
+# local cache, in front of the shared 'course_structure_cache'. Structures are
+# immutable, so this cache never needs invalidating. 0 disables the local cache.
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES = 0
+
+# Directory of the local disk cache of course assets served by the contentserver.
+# Files are named after the digest of their content and never modified, so the
+# directory can safely be pruned by access time. When set, the 'course_assets'
+# cache only keeps the metadata of assets. None disables the disk cache.
+COURSE_ASSETS_DISK_CACHE_DIR = None
+# Largest asset, in bytes, kept in the disk cache; larger ones are streamed from the contentstore.
+COURSE_ASSETS_DISK_CACHE_MAX_FILE_SIZE = 100 * 1024 * 1024
+
 ############################ OAUTH2 Provider ###################################
 
 # OpenID Connect issuer ID. Normally the URL of the authentication endpoint.
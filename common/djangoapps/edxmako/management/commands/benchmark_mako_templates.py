@@ -0,0 +1,114 @@
+"""
+Management command measuring the cost of mako template lookups.
+"""
+from __future__ import absolute_import, division
+
+import os
+import posixpath
+import shutil
+import tempfile
+import timeit
+from textwrap import dedent
+
+from django.core.management import BaseCommand, CommandError
+from mako.exceptions import TopLevelLookupException
+from mako.lookup import TemplateLookup
+from six.moves import range
+
+from edxmako import LOOKUP
+from edxmako.paths import compile_templates, create_lookup, get_template_uris
+
+
+def scan_directories(templates, uri):
+    """
+    Returns the file of the template of the given uri by checking each lookup
+    directory for it, as mako does, or None if there is no such template.
+    """
+    path = posixpath.normpath(uri.lstrip('/'))
+    for directory in templates.directories:
+        filename = posixpath.normpath(posixpath.join(directory.replace(os.path.sep, posixpath.sep), path))
+        if os.path.isfile(filename):
+            return filename
+    return None
+
+
+def get_missing(get_template, uris):
+    """
+    Looks up the templates of the given uris, which are all missing.
+    """
+    for uri in uris:
+        try:
+            get_template(uri)
+        except TopLevelLookupException:
+            pass
+
+
+def best_time(function, iterations):
+    """
+    Returns the best time, in ms, of the given function.
+    """
+    return min(timeit.repeat(function, number=1, repeat=iterations)) * 1000
+
+
+class Command(BaseCommand):
+    """
+    Measures the warm-up of a worker compiling all the mako templates of a
+    namespace against that of a worker loading them precompiled, along with
+    the cost of finding templates by checking each template directory, as
+    mako does, against finding them in the template index.
+
+    Example usage:
+        $ ./manage.py lms benchmark_mako_templates --namespace main --lookups 1000
+    """
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument('--namespace', default='main', help='Namespace of the templates')
+        parser.add_argument('--lookups', type=int, default=1000, help='Number of lookups of each kind')
+        parser.add_argument('--iterations', type=int, default=3, help='Number of runs of each measure')
+
+    def handle(self, *args, **options):
+        namespace = options['namespace']
+        if namespace not in LOOKUP:
+            raise CommandError(u'Unknown template namespace: {}'.format(namespace))
+        directories = LOOKUP[namespace].directories
+        uris = get_template_uris(LOOKUP[namespace])
+        self.stdout.write(u'{} templates in {} directories'.format(len(uris), len(directories)))
+
+        module_directory = tempfile.mkdtemp()
+        try:
+            # The first worker compiles the templates, the next ones load them.
+            cold_time = best_time(lambda: compile_templates(create_lookup(module_directory, directories), uris), 1)
+            warm_time = best_time(
+                lambda: compile_templates(create_lookup(module_directory, directories), uris), options['iterations'],
+            )
+        finally:
+            shutil.rmtree(module_directory)
+        self.stdout.write(u'{:>30} {:>12.1f}'.format('cold worker warm-up (ms)', cold_time))
+        self.stdout.write(u'{:>30} {:>12.1f}'.format('precompiled warm-up (ms)', warm_time))
+
+        templates = create_lookup(module_directory, directories)
+        index_time = best_time(templates.get_template_index, 1)
+        self.stdout.write(u'{:>30} {:>12.1f}'.format('template index (ms)', index_time))
+
+        found = [uris[index % len(uris)] for index in range(options['lookups'])] if uris else []
+        missing = [u'missing/template_{}.html'.format(index) for index in range(options['lookups'])]
+        comparisons = (
+            (
+                'find templates',
+                lambda: [scan_directories(templates, uri) for uri in found],
+                lambda: [templates.get_template_index().get(uri) for uri in found],
+            ),
+            (
+                'missing templates',
+                lambda: get_missing(lambda uri: TemplateLookup.get_template(templates, uri), missing),
+                lambda: get_missing(templates.get_template, missing),
+            ),
+        )
+        self.stdout.write(u'{:>30} {:>12} {:>12} {:>10}'.format('lookups', 'scan (ms)', 'index (ms)', 'speedup'))
+        for name, scan, lookup in comparisons:
+            scan_time = best_time(scan, options['iterations'])
+            lookup_time = best_time(lookup, options['iterations'])
+            self.stdout.write(u'{:>30} {:>12.1f} {:>12.1f} {:>9.0f}x'.format(
+                name, scan_time, lookup_time, scan_time / lookup_time,
+            ))
@@ -0,0 +1,52 @@
+"""
+Management command for compiling the mako templates ahead of time.
+"""
+from __future__ import absolute_import
+
+import logging
+from textwrap import dedent
+
+from django.core.management import BaseCommand, CommandError
+
+from edxmako import LOOKUP
+from edxmako.paths import compile_templates, get_template_uris
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class Command(BaseCommand):
+    """
+    Compiles the mako templates of every namespace, including the templates of
+    every theme, into the module directory of their lookup, so that workers
+    started afterwards load the compiled modules rather than compiling each
+    template the first time it is rendered.
+
+    The module directory of a lookup depends on its template directories, so
+    this command must be run with the same settings as the workers.
+    """
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--namespace',
+            action='append',
+            dest='namespaces',
+            default=[],
+            help='Namespace of the templates to compile, all of them by default. May be repeated.'
+        )
+
+    def handle(self, *args, **options):
+        namespaces = options['namespaces'] or sorted(LOOKUP)
+        unknown_namespaces = set(namespaces) - set(LOOKUP)
+        if unknown_namespaces:
+            raise CommandError(u'Unknown template namespaces: {}'.format(u', '.join(sorted(unknown_namespaces))))
+
+        for namespace in namespaces:
+            templates = LOOKUP[namespace]
+            uris = get_template_uris(templates)
+            failed = compile_templates(templates, uris)
+            for uri in failed:
+                logger.warning(u'Unable to compile the template %s of the %s namespace.', uri, namespace)
+            self.stdout.write(u'Compiled {} of the {} templates of the {} namespace into {}.'.format(
+                len(uris) - len(failed), len(uris), namespace, templates.template_args['module_directory'],
+            ))
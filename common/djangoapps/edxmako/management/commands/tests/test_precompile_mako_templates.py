@@ -0,0 +1,44 @@
+"""
+Tests for the precompile_mako_templates management command.
+"""
+from __future__ import absolute_import
+
+import os
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from mock import patch
+from six import StringIO
+
+from edxmako import LOOKUP
+from edxmako.paths import create_lookup
+from openedx.core.lib.tempdir import mkdtemp_clean
+
+
+class TestPrecompileMakoTemplates(TestCase):
+    """
+    Tests for the precompile_mako_templates management command.
+    """
+    def setUp(self):
+        super(TestPrecompileMakoTemplates, self).setUp()
+        directory = mkdtemp_clean()
+        for uri in ('main.html', 'broken.html'):
+            with open(os.path.join(directory, uri), 'w') as template_file:
+                template_file.write(u'<%def broken' if uri == 'broken.html' else u'main')
+        self.templates = create_lookup(mkdtemp_clean(), [directory])
+        patcher = patch.dict(LOOKUP, {'test': self.templates}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_precompile(self):
+        out = StringIO()
+        call_command('precompile_mako_templates', stdout=out)
+        self.assertIn(u'Compiled 1 of the 2 templates of the test namespace', out.getvalue())
+        module_files = os.listdir(self.templates.template_args['module_directory'])
+        self.assertIn('main.html.py', module_files)
+        self.assertNotIn('broken.html.py', module_files)
+
+    def test_unknown_namespace(self):
+        with self.assertRaises(CommandError):
+            call_command('precompile_mako_templates', '--namespace', 'missing')
@@ -6,7 +6,11 @@ from __future__ import absolute_import
 
 import contextlib
 import hashlib
+import logging
 import os
+import posixpath
+import re
+
 import six
 
 import pkg_resources
@@ -14,11 +18,18 @@ from django.conf import settings
 from mako.exceptions import TopLevelLookupException
 from mako.lookup import TemplateLookup
 
-from openedx.core.djangoapps.theming.helpers import get_template_path_with_theme, strip_site_theme_templates_path
+from openedx.core.djangoapps.theming.helpers import get_current_theme, strip_site_theme_templates_path
 from openedx.core.lib.cache_utils import request_cached
 
 from . import LOOKUP
 
+log = logging.getLogger(__name__)
+
+# Only the files of the template directories with these extensions are
+# compiled ahead of time, others, such as underscore templates, not being
+# mako templates.
+PRECOMPILED_TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml', '.js')
+
 
 class TopLevelTemplateURI(six.text_type):
     """
@@ -29,14 +40,29 @@ class TopLevelTemplateURI(six.text_type):
     pass
 
 
+def _normalize_uri(uri):
+    """
+    Returns the path of the template of the given uri relative to the lookup
+    directories, as mako resolves it.
+    """
+    return posixpath.normpath(re.sub(r'^/+', '', uri))
+
+
 class DynamicTemplateLookup(TemplateLookup):
     """
     A specialization of the standard mako `TemplateLookup` class which allows
     for adding directories progressively.
+
+    The templates of all the directories are indexed by uri the first time a
+    template is looked up, so that templates, themed or not, are found without
+    checking each directory for them, and missing templates without touching
+    the filesystem at all.  When `filesystem_checks` is on, templates added or
+    removed since are looked up in the directories, as `TemplateLookup` does.
     """
     def __init__(self, *args, **kwargs):
         super(DynamicTemplateLookup, self).__init__(*args, **kwargs)
         self.__original_module_directory = self.template_args['module_directory']
+        self._template_index = None
 
     def __repr__(self):
         return "<{0.__class__.__name__} {0.directories}>".format(self)
@@ -61,6 +87,69 @@ class DynamicTemplateLookup(TemplateLookup):
         # Also clear the internal caches. Ick.
         self._collection.clear()
         self._uri_cache.clear()
+        self._template_index = None
+
+    def get_template_index(self):
+        """
+        Returns a dict mapping the uris of all the templates of the lookup
+        directories to their files, the first directory holding a template
+        taking precedence, as for mako lookups.
+        """
+        template_index = self._template_index
+        if template_index is None:
+            template_index = {}
+            for directory in self.directories:
+                directory = directory.replace(os.path.sep, posixpath.sep)
+                # The real paths of the ancestors of each directory to walk, so
+                # that symlinks looping back to one of them aren't followed.
+                ancestors = {directory: frozenset()}
+                for dirpath, dirnames, filenames in os.walk(directory, followlinks=True):
+                    dirpath_ancestors = ancestors.pop(dirpath) | {os.path.realpath(dirpath)}
+                    dirnames[:] = [
+                        dirname for dirname in dirnames
+                        if os.path.realpath(os.path.join(dirpath, dirname)) not in dirpath_ancestors
+                    ]
+                    for dirname in dirnames:
+                        ancestors[os.path.join(dirpath, dirname)] = dirpath_ancestors
+                    relative_dirpath = os.path.relpath(dirpath, directory).replace(os.path.sep, posixpath.sep)
+                    for filename in filenames:
+                        uri = posixpath.normpath(posixpath.join(relative_dirpath, filename))
+                        if uri not in template_index:
+                            template_index[uri] = posixpath.normpath(posixpath.join(directory, uri))
+            self._template_index = template_index
+        return template_index
+
+    def _is_indexed(self, uri):
+        """
+        Returns whether there is a template for the given uri in the lookup directories.
+        """
+        path = _normalize_uri(uri)
+        if path in self.get_template_index():
+            return True
+        return self.filesystem_checks and any(
+            os.path.isfile(os.path.join(directory, path)) for directory in self.directories
+        )
+
+    def _get_indexed_template(self, uri):
+        """
+        Looks up the template of the given uri in the template index, rather
+        than in each of the lookup directories, as `TemplateLookup.get_template` does.
+        """
+        if uri in self._collection:
+            return super(DynamicTemplateLookup, self).get_template(uri)
+
+        path = _normalize_uri(uri)
+        if path.startswith('..'):
+            # The template is outside of the lookup directories, so it can't be indexed.
+            return super(DynamicTemplateLookup, self).get_template(uri)
+
+        filename = self.get_template_index().get(path)
+        if self.filesystem_checks and (filename is None or not os.path.isfile(filename)):
+            # The template may have been added or removed after the index was built.
+            return super(DynamicTemplateLookup, self).get_template(uri)
+        if filename is None:
+            raise TopLevelLookupException(u"Cant locate template for uri {!r}".format(uri))
+        return self._load(filename, uri)
 
     def adjust_uri(self, uri, relativeto):
         """
@@ -80,7 +169,7 @@ class DynamicTemplateLookup(TemplateLookup):
         # located inside a theme?
         if relativeto != strip_site_theme_templates_path(relativeto):
             # Is the calling template trying to include/inherit itself?
-            if relativeto == get_template_path_with_theme(relative_uri):
+            if relativeto == self._get_themed_uri(relative_uri):
                 return TopLevelTemplateURI(relative_uri)
         return relative_uri
 
@@ -95,23 +184,31 @@ class DynamicTemplateLookup(TemplateLookup):
         If still unable to find a template, it will fallback to the default template directories after stripping off
         the prefix path to theme.
         """
-        if isinstance(uri, TopLevelTemplateURI):
-            template = self._get_toplevel_template(uri)
-        else:
-            try:
-                # Try to find themed template, i.e. see if current theme overrides the template
-                template = super(DynamicTemplateLookup, self).get_template(get_template_path_with_theme(uri))
-            except TopLevelLookupException:
-                template = self._get_toplevel_template(uri)
+        if not isinstance(uri, TopLevelTemplateURI):
+            # Find out from the index whether the current theme overrides the template
+            themed_uri = self._get_themed_uri(uri)
+            if themed_uri is not None:
+                return self._get_indexed_template(themed_uri)
 
-        return template
+        return self._get_toplevel_template(uri)
+
+    def _get_themed_uri(self, uri):
+        """
+        Returns the uri of the template of the current theme overriding the
+        template of the given uri, or None if there is no such template.
+        """
+        theme = get_current_theme()
+        if not theme:
+            return None
+        themed_uri = six.text_type(theme.template_path / re.sub(r'^/+', '', os.path.normpath(uri)))
+        return themed_uri if self._is_indexed(themed_uri) else None
 
     def _get_toplevel_template(self, uri):
         """
         Lookup a default/toplevel template, ignoring current theme.
         """
         # Strip off the prefix path to theme and look in default template dirs.
-        return super(DynamicTemplateLookup, self).get_template(strip_site_theme_templates_path(uri))
+        return self._get_indexed_template(strip_site_theme_templates_path(uri))
 
 
 def clear_lookups(namespace):
@@ -122,6 +219,23 @@ def clear_lookups(namespace):
         del LOOKUP[namespace]
 
 
+def create_lookup(module_directory, directories=()):
+    """
+    Returns a new mako template lookup of the given directories, whose
+    templates are compiled into `module_directory`.
+    """
+    templates = DynamicTemplateLookup(
+        module_directory=module_directory,
+        output_encoding='utf-8',
+        input_encoding='utf-8',
+        default_filters=['decode.utf8'],
+        encoding_errors='replace',
+    )
+    for directory in directories:
+        templates.add_directory(directory)
+    return templates
+
+
 def add_lookup(namespace, directory, package=None, prepend=False):
     """
     Adds a new mako template lookup directory to the given namespace.
@@ -132,18 +246,42 @@ def add_lookup(namespace, directory, package=None, prepend=False):
     """
     templates = LOOKUP.get(namespace)
     if not templates:
-        LOOKUP[namespace] = templates = DynamicTemplateLookup(
-            module_directory=settings.MAKO_MODULE_DIR,
-            output_encoding='utf-8',
-            input_encoding='utf-8',
-            default_filters=['decode.utf8'],
-            encoding_errors='replace',
-        )
+        LOOKUP[namespace] = templates = create_lookup(settings.MAKO_MODULE_DIR)
     if package:
         directory = pkg_resources.resource_filename(package, directory)
     templates.add_directory(directory, prepend=prepend)
 
 
+def get_template_uris(templates):
+    """
+    Returns the uris of the mako templates of the given lookup, themed or not,
+    leaving out the static files of the themes.
+    """
+    return sorted(
+        uri for uri in templates.get_template_index()
+        if uri.endswith(PRECOMPILED_TEMPLATE_EXTENSIONS) and 'static' not in uri.split(posixpath.sep)
+    )
+
+
+def compile_templates(templates, uris=None):
+    """
+    Compiles the templates of the given uris, all the templates of the given
+    lookup by default, into its module directory, unless they already are.
+
+    Returns the uris of the templates which failed to compile.
+    """
+    if uris is None:
+        uris = get_template_uris(templates)
+    failed = []
+    for uri in uris:
+        try:
+            templates.get_template(TopLevelTemplateURI(uri))
+        except Exception:  # pylint: disable=broad-except
+            log.debug(u'Unable to compile the template %s', uri, exc_info=True)
+            failed.append(uri)
+    return failed
+
+
 @request_cached()
 def lookup_template(namespace, name):
     """
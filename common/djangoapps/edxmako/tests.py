@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import os
 import unittest
 
 import ddt
@@ -13,9 +14,11 @@ from edx_django_utils.cache import RequestCache
 from mock import Mock, patch
 
 from edxmako import LOOKUP, add_lookup
+from edxmako.paths import TopLevelLookupException, compile_templates, create_lookup, get_template_uris
 from edxmako.request_context import get_template_request_context
 from edxmako.shortcuts import is_any_marketing_link_set, is_marketing_link_set, marketing_link, render_to_string
 from student.tests.factories import UserFactory
+from openedx.core.lib.tempdir import mkdtemp_clean
 from util.testing import UrlResetMixin
 
 
@@ -78,6 +81,85 @@ class AddLookupTests(TestCase):
         self.assertTrue(dirs[0].endswith('management'))
 
 
+class DynamicTemplateLookupTests(TestCase):
+    """
+    Test the lookups of templates through the template index.
+    """
+    def setUp(self):
+        super(DynamicTemplateLookupTests, self).setUp()
+        self.directories = [mkdtemp_clean(), mkdtemp_clean()]
+        self.write_template(self.directories[0], 'main.html', u'first ${value}')
+        self.write_template(self.directories[1], 'main.html', u'second ${value}')
+        self.write_template(self.directories[1], 'sub/other.html', u'other')
+        self.write_template(self.directories[1], 'sub/broken.html', u'<%def broken')
+        self.write_template(self.directories[1], 'sub/other.underscore', u'<%= other %>')
+        self.templates = create_lookup(mkdtemp_clean(), self.directories)
+
+    def write_template(self, directory, uri, text):
+        """
+        Writes the template of the given uri in the given directory.
+        """
+        filename = os.path.join(directory, uri)
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        with open(filename, 'w') as template_file:
+            template_file.write(text)
+
+    def test_get_template(self):
+        self.assertEqual(self.templates.get_template('main.html').render(value=1), b'first 1')
+        self.assertEqual(self.templates.get_template('/sub/other.html').render(), b'other')
+        self.assertEqual(
+            self.templates.get_template_index()['main.html'],
+            os.path.join(self.directories[0], 'main.html'),
+        )
+
+    def test_missing_template(self):
+        self.templates.filesystem_checks = False
+        self.templates.get_template_index()
+        self.write_template(self.directories[0], 'new.html', u'new')
+        with patch('os.path.isfile') as mock_isfile:
+            with self.assertRaises(TopLevelLookupException):
+                self.templates.get_template('missing.html')
+            # Templates are indexed once for all.
+            with self.assertRaises(TopLevelLookupException):
+                self.templates.get_template('new.html')
+        mock_isfile.assert_not_called()
+
+        # Adding a directory indexes the templates again.
+        self.templates.add_directory(mkdtemp_clean())
+        self.assertEqual(self.templates.get_template('new.html').render(), b'new')
+
+    def test_filesystem_checks(self):
+        self.templates.get_template_index()
+        self.write_template(self.directories[1], 'new.html', u'new')
+        os.remove(os.path.join(self.directories[0], 'main.html'))
+        # Templates added or removed since the templates were indexed are looked up in the directories.
+        self.assertEqual(self.templates.get_template('new.html').render(), b'new')
+        self.assertEqual(self.templates.get_template('main.html').render(value=1), b'second 1')
+        with self.assertRaises(TopLevelLookupException):
+            self.templates.get_template('missing.html')
+
+    def test_symlink_loop(self):
+        os.symlink(self.directories[1], os.path.join(self.directories[1], 'sub', 'loop'))
+        # Symlinks looping back to a parent directory are not followed.
+        self.assertIn('sub/other.html', self.templates.get_template_index())
+        self.assertNotIn('sub/loop/main.html', self.templates.get_template_index())
+        self.assertEqual(self.templates.get_template('sub/loop/sub/other.html').render(), b'other')
+
+    def test_compile_templates(self):
+        self.assertEqual(get_template_uris(self.templates), ['main.html', 'sub/broken.html', 'sub/other.html'])
+        self.assertEqual(compile_templates(self.templates), ['sub/broken.html'])
+        module_directory = self.templates.template_args['module_directory']
+        self.assertTrue(os.path.isfile(os.path.join(module_directory, 'main.html.py')))
+
+        # Other workers load the compiled templates.
+        other_templates = create_lookup(os.path.dirname(module_directory), self.directories)
+        self.assertEqual(other_templates.template_args['module_directory'], module_directory)
+        with patch('mako.template._compile_module_file') as mock_compile:
+            self.assertEqual(other_templates.get_template('main.html').render(value=2), b'first 2')
+        mock_compile.assert_not_called()
+
+
 class MakoRequestContextTest(TestCase):
     """
     Test MakoMiddleware.
@@ -2,13 +2,16 @@ from __future__ import absolute_import
 
 import logging
 import re
+
 import six
 from six import text_type
 
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
 from django.conf import settings
+from edx_django_utils.cache import RequestCache
 
+from openedx.core.lib.cache_utils import LRUCache
 from xmodule.contentstore.content import StaticContent
 
 from opaque_keys.edx.locator import AssetLocator
@@ -16,6 +19,16 @@ from opaque_keys.edx.locator import AssetLocator
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# Maximum number of entries of each of the caches used by replace_urls.
+URL_REPLACE_CACHE_SIZE = 1000
+
+# Namespace of the request cache of the asset paths resolved by replace_urls.
+ASSET_PATHS_CACHE_NAMESPACE = 'static_replace.asset_paths'
+
+_URL_REPLACE_REGEXES = LRUCache(URL_REPLACE_CACHE_SIZE)
+_URL_REPLACERS = LRUCache(URL_REPLACE_CACHE_SIZE)
+_STATICFILES_EXISTS = LRUCache(URL_REPLACE_CACHE_SIZE)
+
 
 def _url_replace_regex(prefix):
     """
@@ -33,6 +46,39 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _compiled_url_replace_regex(prefix):
+    """
+    Returns the compiled _url_replace_regex for `prefix`, compiling it only
+    once per prefix.
+    """
+    regex = _URL_REPLACE_REGEXES.get(prefix)
+    if regex is None:
+        regex = re.compile(_url_replace_regex(prefix))
+        _URL_REPLACE_REGEXES.set(prefix, regex)
+    return regex
+
+
+def _static_url_prefix(data_dir):
+    """
+    Returns the regex matching the prefix of the static urls that don't point
+    inside the `data_dir` directory.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
+def _is_xblock_resource_url(full_url):
+    """
+    Returns whether the given static url is an XBlock resource link.
+    """
+    starts_with_static_url = full_url.startswith(six.text_type(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    return starts_with_prefix or (starts_with_static_url and contains_prefix)
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -74,7 +120,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -94,7 +140,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex('/course/').sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -114,24 +160,12 @@ def process_static_urls(text, replacement_function, data_dir=None):
 
         # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
         # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
-
-        starts_with_static_url = full_url.startswith(six.text_type(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        if _is_xblock_resource_url(prefix + rest):
             return original
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compiled_url_replace_regex(_static_url_prefix(data_dir)).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -170,63 +204,238 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     if static_paths_out is None:
         static_paths_out = []
 
-    def replace_static_url(original, prefix, quote, rest):
+    def replace_static_url(original, prefix, quote, rest):  # pylint: disable=unused-argument
         """
         Replace a single matched url.
         """
-        original_uri = "".join([prefix, rest])
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
-            static_paths_out.append((original_uri, original_uri))
-            return original
+        url = _get_static_url(
+            prefix, rest, data_directory, course_id, static_asset_path,
+            _staticfiles_exists, _get_canonicalized_asset_path,
+        )
+        static_paths_out.append(("".join([prefix, rest]), url))
+        return "".join([quote, url, quote])
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            static_paths_out.append((original_uri, original_uri))
-            return original
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
 
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
 
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
+def _get_static_url(prefix, rest, data_directory, course_id, static_asset_path, staticfiles_exists,
+                    get_canonicalized_asset_path):
+    """
+    Returns the url replacing the static url `prefix` + `rest`, as described
+    in replace_static_urls, which is that same url if it isn't rewritten.
 
-            if exists_in_staticfiles_storage:
+    staticfiles_exists and get_canonicalized_asset_path are the functions
+    used to look up paths in staticfiles_storage and in the contentstore.
+    """
+    original_uri = "".join([prefix, rest])
+    # Don't mess with things that end in '?raw'
+    if rest.endswith('?raw'):
+        return original_uri
+
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        return original_uri
+
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    elif (not static_asset_path) and course_id:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_exists(rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_storage.url(rest)
+        else:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            url = get_canonicalized_asset_path(course_id, rest)
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_exists(rest):
                 url = staticfiles_storage.url(rest)
             else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
-
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
-
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
-        else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
+                url = staticfiles_storage.url(course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
+
+    return url
+
+
+def _staticfiles_exists(path):
+    """
+    Returns whether `path` exists in staticfiles_storage.
+    """
+    return staticfiles_storage.exists(path)
+
+
+def _cached_staticfiles_exists(path):
+    """
+    Returns whether `path` exists in staticfiles_storage, remembering the
+    answers as the collected static files don't change while the process
+    runs.  They are not remembered in debug mode, where they may.
+    """
+    if settings.DEBUG:
+        return staticfiles_storage.exists(path)
+    exists = _STATICFILES_EXISTS.get(path)
+    if exists is None:
+        exists = staticfiles_storage.exists(path)
+        _STATICFILES_EXISTS.set(path, exists)
+    return exists
+
+
+def _get_canonicalized_asset_path(course_id, path):
+    """
+    Returns the canonicalized path of the asset of the course at `path`.
+    """
+    # Import is placed here to avoid model import at project startup.
+    from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+    base_url = AssetBaseUrlConfig.get_base_url()
+    excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+    return StaticContent.get_canonicalized_asset_path(course_id, path, base_url, excluded_exts)
+
+
+def _cached_get_canonicalized_asset_path(course_id, path):
+    """
+    Returns the canonicalized path of the asset of the course at `path`,
+    remembering it for the rest of the request.  Asset paths depend on
+    whether the assets are locked and on their digests, so they aren't kept
+    any longer.
+    """
+    # Import is placed here to avoid model import at project startup.
+    from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+    base_url = AssetBaseUrlConfig.get_base_url()
+    excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+    cache = RequestCache(ASSET_PATHS_CACHE_NAMESPACE).data
+    key = (text_type(course_id), path, base_url, tuple(excluded_exts))
+    asset_path = cache.get(key)
+    if asset_path is None:
+        asset_path = StaticContent.get_canonicalized_asset_path(course_id, path, base_url, excluded_exts)
+        if len(cache) < URL_REPLACE_CACHE_SIZE:
+            cache[key] = asset_path
+    return asset_path
+
+
+def replace_urls(text, data_directory=None, course_id=None, static_asset_path='', jump_to_id_base_url=None,
+                 static_paths_out=None):
+    """
+    Replace the urls of text as replace_static_urls, then replace_course_urls
+    if course_id is given, then replace_jump_to_id_urls if jump_to_id_base_url
+    is given, would, but in a single pass over text.
+
+    The regex matching the urls is compiled once per set of arguments, and the
+    lookups of static urls in staticfiles_storage and in the contentstore are
+    cached.
+
+    text: The source text to do the substitution in
+    data_directory, course_id, static_asset_path, static_paths_out: see replace_static_urls
+    jump_to_id_base_url: see replace_jump_to_id_urls
+    """
+    if static_paths_out is None:
+        static_paths_out = []
+
+    key = (six.text_type(settings.STATIC_URL), data_directory, course_id, static_asset_path, jump_to_id_base_url)
+    replacer = _URL_REPLACERS.get(key)
+    if replacer is None:
+        replacer = _UrlReplacer(data_directory, course_id, static_asset_path, jump_to_id_base_url)
+        _URL_REPLACERS.set(key, replacer)
+    return replacer.replace(text, static_paths_out)
 
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
+
+class _UrlReplacer(object):
+    """
+    Replaces the static, course and jump_to_id urls of texts in a single pass,
+    for replace_urls.
+
+    Running the substitutions one after the other differs from running them
+    at once only when urls overlap: when a url contains quotes, when the
+    closing quote of a url is the opening quote of the next one, or when a
+    rewritten static url is itself a course or jump_to_id url.  These texts
+    are rare, and replaced by running the substitutions one after the other.
+    """
+    QUOTES_REGEX = re.compile(u'[\'"]')
+    # The prefixes of the urls replaced after the static urls.
+    LATER_PREFIXES_REGEX = re.compile(u'/course/|/jump_to_id/')
+
+    def __init__(self, data_directory, course_id, static_asset_path, jump_to_id_base_url):
+        self.data_directory = data_directory
+        self.course_id = course_id
+        self.static_asset_path = static_asset_path
+        self.jump_to_id_base_url = jump_to_id_base_url
+
+        prefixes = [u'(?P<static>{})'.format(_static_url_prefix(static_asset_path or data_directory))]
+        if course_id is not None:
+            prefixes.append(u'(?P<course>/course/)')
+            self.course_url_base = '/courses/' + text_type(course_id) + '/'
+        if jump_to_id_base_url is not None:
+            prefixes.append(u'(?P<jump_to_id>/jump_to_id/)')
+        prefix = u'|'.join(prefixes)
+        self.regex = re.compile(_url_replace_regex(prefix))
+        self.prefix_regex = re.compile(prefix, re.VERBOSE)
+
+    def replace(self, text, static_paths_out):
+        """
+        Returns text with its urls replaced, collecting its static urls in
+        static_paths_out.
+        """
+        parts = []
+        static_paths = []
+        position = 0
+        for match in self.regex.finditer(text):
+            quote = match.group('quote')
+            rest = match.group('rest')
+            if self.QUOTES_REGEX.search(rest) or self.prefix_regex.match(text, match.end()):
+                return self._replace_sequentially(text, static_paths_out)
+
+            prefix = match.group('static')
+            if prefix is not None:
+                full_url = prefix + rest
+                if _is_xblock_resource_url(full_url):
+                    url = full_url
                 else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
-
-        static_paths_out.append((original_uri, url))
-        return "".join([quote, url, quote])
+                    url = _get_static_url(
+                        prefix, rest, self.data_directory, self.course_id, self.static_asset_path,
+                        _cached_staticfiles_exists, _cached_get_canonicalized_asset_path,
+                    )
+                    if self.QUOTES_REGEX.search(url) or self.LATER_PREFIXES_REGEX.match(url):
+                        return self._replace_sequentially(text, static_paths_out)
+                    static_paths.append((full_url, url))
+            elif match.group('course') is not None:
+                url = self.course_url_base + rest
+            else:
+                url = self.jump_to_id_base_url + rest
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+            parts.append(text[position:match.start()])
+            parts.append("".join([quote, url, quote]))
+            position = match.end()
+
+        parts.append(text[position:])
+        static_paths_out.extend(static_paths)
+        return "".join(parts)
+
+    def _replace_sequentially(self, text, static_paths_out):
+        """
+        Returns text with its urls replaced by each substitution in turn.
+        """
+        text = replace_static_urls(
+            text, self.data_directory, self.course_id, self.static_asset_path, static_paths_out=static_paths_out,
+        )
+        if self.course_id is not None:
+            text = replace_course_urls(text, self.course_id)
+        if self.jump_to_id_base_url is not None:
+            text = replace_jump_to_id_urls(text, self.course_id, self.jump_to_id_base_url)
+        return text
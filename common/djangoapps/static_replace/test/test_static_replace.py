@@ -10,16 +10,21 @@ import ddt
 import pytest
 from django.test import override_settings
 from django.utils.http import urlencode, urlquote
+from edx_django_utils.cache import RequestCache
 from mock import Mock, patch
 from opaque_keys.edx.keys import CourseKey
 from PIL import Image
 
 from static_replace import (
+    _STATICFILES_EXISTS,
+    ASSET_PATHS_CACHE_NAMESPACE,
     _url_replace_regex,
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
-    replace_static_urls
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls
 )
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
@@ -35,6 +40,28 @@ from xmodule.modulestore.xml import XMLModuleStore
 DATA_DIRECTORY = 'data_dir'
 COURSE_KEY = CourseKey.from_string('org/course/run')
 STATIC_SOURCE = '"/static/file.png"'
+JUMP_TO_ID_BASE_URL = '/courses/org/course/run/jump_to_id/'
+
+# Texts whose urls are replaced the same by replace_urls and by the successive
+# substitutions, including texts where the urls overlap.
+URL_REPLACE_CORPUS = (
+    '',
+    'no urls here',
+    STATIC_SOURCE,
+    # xss-lint: disable=python-wrap-html
+    '<img src="/static/file.png"/><a href=\'/course/info\'>info</a><a href="/jump_to_id/abc">jump</a>',
+    '<script src="/static/js/vendor.js"></script><img src="/static/{}/image.png">'.format(DATA_DIRECTORY),
+    '"/static/foo.png?raw" "/static/xblock/resources/babys_first.lil_xblock/public/images/pacifier.png"',
+    '"/static/LAlec04_controller.swf?csConfigFile=/static/LAlec04_config.xml&name1=value1"',
+    '\\"/static/escaped.png\\" \\\'/course/escaped\\\'',
+    '"/static/unclosed.png',
+    # Urls within urls.
+    '"/course/a \'/static/b.png\' c" \'/jump_to_id/d "/course/e"\'',
+    # The closing quote of each url is the opening quote of the next one.
+    '"/static/a.png"/course/b"/jump_to_id/c"/static/d.png"',
+    '"/course/a"/static/b.png" "/jump_to_id/c"/course/d"',
+    u'<p>ünicode "/static/ünlöck.png" \'/course/ünlöck\'</p>\n"/jump_to_id/ünlöck"',
+)
 
 
 def encode_unicode_characters_in_url(url):
@@ -201,6 +228,69 @@ def test_static_paths_out(mock_modulestore, mock_storage):
     assert static_paths == [(static_url, static_course_url), (raw_url, raw_url)]
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize('text', URL_REPLACE_CORPUS)
+@pytest.mark.parametrize('data_directory, course_id, static_asset_path, jump_to_id_base_url', [
+    (DATA_DIRECTORY, None, '', None),
+    (DATA_DIRECTORY, COURSE_KEY, '', None),
+    (DATA_DIRECTORY, COURSE_KEY, '', JUMP_TO_ID_BASE_URL),
+    (None, COURSE_KEY, 'static_asset_path', JUMP_TO_ID_BASE_URL),
+])
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('xmodule.modulestore.django.modulestore', autospec=True)
+def test_replace_urls(
+        mock_modulestore, mock_storage, text, data_directory, course_id, static_asset_path, jump_to_id_base_url
+):
+    """
+    Make sure that replace_urls replaces the urls of texts like the successive
+    substitutions do.
+    """
+    mock_storage.exists.side_effect = lambda path: path.startswith('js/')
+    mock_storage.url.side_effect = lambda path: '/static/hashed/' + path
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    _STATICFILES_EXISTS.clear()
+    RequestCache(ASSET_PATHS_CACHE_NAMESPACE).clear()
+
+    expected_static_paths = []
+    expected = replace_static_urls(
+        text, data_directory, course_id, static_asset_path, static_paths_out=expected_static_paths
+    )
+    if course_id is not None:
+        expected = replace_course_urls(expected, course_id)
+    if jump_to_id_base_url is not None:
+        expected = replace_jump_to_id_urls(expected, course_id, jump_to_id_base_url)
+
+    static_paths = []
+    assert replace_urls(
+        text, data_directory, course_id, static_asset_path, jump_to_id_base_url, static_paths_out=static_paths
+    ) == expected
+    assert static_paths == expected_static_paths
+
+
+@patch('static_replace.StaticContent', autospec=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('static_replace.models.AssetBaseUrlConfig.get_base_url')
+@patch('static_replace.models.AssetExcludedExtensionsConfig.get_excluded_extensions')
+def test_replace_urls_caches_lookups(
+        mock_get_excluded_extensions, mock_get_base_url, mock_storage, mock_static_content
+):
+    """
+    Make sure that replace_urls looks up each static url only once.
+    """
+    mock_storage.exists.return_value = False
+    mock_static_content.get_canonicalized_asset_path.return_value = '/asset-v1:org+course+run+type@asset+block/file.png'
+    mock_get_base_url.return_value = u''
+    mock_get_excluded_extensions.return_value = ['foobar']
+    _STATICFILES_EXISTS.clear()
+    RequestCache(ASSET_PATHS_CACHE_NAMESPACE).clear()
+
+    for __ in range(2):
+        assert replace_urls(STATIC_SOURCE + ' ' + STATIC_SOURCE, DATA_DIRECTORY, COURSE_KEY) == \
+            '"/asset-v1:org+course+run+type@asset+block/file.png" "/asset-v1:org+course+run+type@asset+block/file.png"'
+    mock_storage.exists.assert_called_once_with('file.png')
+    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(COURSE_KEY, 'file.png', u'', ['foobar'])
+
+
 def test_regex():
     yes = ('"/static/foo.png"',
            '"/static/foo.png"',
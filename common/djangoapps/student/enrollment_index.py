@@ -0,0 +1,329 @@
+"""
+A compact index of the enrollments in a course.
+
+The index answers whether users are enrolled in a course, and in which mode,
+without a query per user.  The users of a course are split into NUM_SHARDS
+shards by user id.  For each enrollment mode, each shard keeps the sorted ids
+of its users enrolled in that mode in an array, along with a bitset of the
+positions of the active enrollments in the array.
+
+Indexes are built with a single query streaming the enrollments of a course,
+and are cached in the request cache, and shard by shard in the shared cache,
+so that each cached value stays well below the size limit of the cache
+(shards which are still too large aren't cached).  When an enrollment is
+saved or deleted, the shard of its user is updated in place in the shared
+cache.  Each update of a shard is counted in the shared cache, and the shard
+records the count it includes, so that a shard which missed an update (if
+two processes update it concurrently, for instance) is rebuilt, without
+affecting the other shards.
+"""
+from __future__ import absolute_import
+
+import binascii
+import heapq
+import logging
+from array import array
+from bisect import bisect_left
+
+import six
+from django.core.cache import cache
+from django.db import transaction
+from edx_django_utils.cache import RequestCache
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+log = logging.getLogger(__name__)
+
+REQUEST_CACHE_NAMESPACE = u'student.enrollment_index'
+
+# Number of seconds that indexes are kept in the shared cache.
+INDEX_CACHE_TIMEOUT = 60 * 60
+
+# Number of shards of the users of each course.
+NUM_SHARDS = 16
+
+# Shards whose compressed pickle is larger than this many bytes aren't kept
+# in the shared cache, whose values are limited to 1MB by memcached.
+MAX_CACHED_SHARD_SIZE = 900 * 1024
+
+
+class CourseEnrollmentIndex(object):
+    """
+    The modes and active states of the enrollments in a course, keyed by user
+    id.
+    """
+    def __init__(self, course_key, shards=None):
+        self.course_key = course_key
+        self.shards = shards or [_EnrollmentIndexShard() for __ in range(NUM_SHARDS)]
+
+    @classmethod
+    def build(cls, course_key, enrollments):
+        """
+        Returns the index of the given (user_id, mode, is_active) tuples, which
+        must be sorted by user id.
+        """
+        return cls(course_key, _build_shards(enrollments, range(NUM_SHARDS)))
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def get_state(self, user_id):
+        """
+        Returns the (mode, is_active) tuple of the enrollment of the given user,
+        or (None, None) if the user has no enrollment in the course.
+        """
+        return self.shards[_shard_number(user_id)].get_state(user_id)
+
+    def get_states(self, user_ids):
+        """
+        Returns the (mode, is_active) tuples of the enrollments of the given
+        users, as get_state does, keyed by user id.
+        """
+        return {user_id: self.get_state(user_id) for user_id in user_ids}
+
+    def is_enrolled(self, user_id):
+        """
+        Returns whether the given user is actively enrolled in the course.
+        """
+        return self.get_state(user_id)[1] or False
+
+    def user_ids(self, mode=None, active_only=True):
+        """
+        Returns an iterator over the sorted ids of the users enrolled in the
+        course, only in the given mode if there's one, and only actively if
+        `active_only` is set.
+        """
+        return heapq.merge(*[shard.user_ids(mode, active_only) for shard in self.shards])
+
+    def set_state(self, user_id, mode, is_active):
+        """
+        Records the enrollment of the given user in the given mode, or removes
+        it if `mode` is None.
+        """
+        self.shards[_shard_number(user_id)].set_state(user_id, mode, is_active)
+
+
+class _EnrollmentIndexShard(object):
+    """
+    The modes and active states of the enrollments of a shard of the users of
+    a course, keyed by user id.
+    """
+    def __init__(self):
+        # The count of the updates of the shard included in it.
+        self.version = None
+        self._user_ids = {}
+        self._active_bits = {}
+
+    @classmethod
+    def build(cls, enrollments):
+        """
+        Returns the shard of the given (user_id, mode, is_active) tuples, which
+        must be sorted by user id.
+        """
+        shard = cls()
+        active_positions = {}
+        for user_id, mode, is_active in enrollments:
+            user_ids = shard._user_ids.setdefault(mode, array('l'))
+            if is_active:
+                active_positions.setdefault(mode, []).append(len(user_ids))
+            user_ids.append(user_id)
+        for mode, user_ids in six.iteritems(shard._user_ids):
+            shard._active_bits[mode] = _to_bitset(active_positions.get(mode, []), len(user_ids))
+        return shard
+
+    def __len__(self):
+        return sum(len(user_ids) for user_ids in six.itervalues(self._user_ids))
+
+    def get_state(self, user_id):
+        """
+        Returns the (mode, is_active) tuple of the enrollment of the given user,
+        or (None, None) if the user has no enrollment in the course.
+        """
+        for mode, user_ids in six.iteritems(self._user_ids):
+            position = bisect_left(user_ids, user_id)
+            if position < len(user_ids) and user_ids[position] == user_id:
+                return mode, bool(self._active_bits[mode] >> position & 1)
+        return None, None
+
+    def user_ids(self, mode=None, active_only=True):
+        """
+        Returns an iterator over the sorted ids of the users of the shard, as
+        CourseEnrollmentIndex.user_ids does.
+        """
+        modes = [mode] if mode is not None else list(self._user_ids)
+        return heapq.merge(*[self._mode_user_ids(mode, active_only) for mode in modes if mode in self._user_ids])
+
+    def set_state(self, user_id, mode, is_active):
+        """
+        Records the enrollment of the given user in the given mode, or removes
+        it if `mode` is None.
+        """
+        self._remove(user_id)
+        if mode is None:
+            return
+        user_ids = self._user_ids.setdefault(mode, array('l'))
+        bits = self._active_bits.get(mode, 0)
+        position = bisect_left(user_ids, user_id)
+        user_ids.insert(position, user_id)
+        low_bits = bits & ((1 << position) - 1)
+        self._active_bits[mode] = (bits >> position << (position + 1)) | (int(bool(is_active)) << position) | low_bits
+
+    def _remove(self, user_id):
+        """
+        Removes the enrollment of the given user, if there's one.
+        """
+        for mode, user_ids in six.iteritems(self._user_ids):
+            position = bisect_left(user_ids, user_id)
+            if position < len(user_ids) and user_ids[position] == user_id:
+                user_ids.pop(position)
+                bits = self._active_bits[mode]
+                self._active_bits[mode] = (bits >> (position + 1) << position) | (bits & ((1 << position) - 1))
+                return
+
+    def _mode_user_ids(self, mode, active_only):
+        """
+        Yields the sorted ids of the users enrolled in the given mode.
+        """
+        bits = self._active_bits[mode]
+        for position, user_id in enumerate(self._user_ids[mode]):
+            if not active_only or bits >> position & 1:
+                yield user_id
+
+
+def _to_bitset(positions, size):
+    """
+    Returns the integer whose bits at the given positions are set.
+    """
+    bitmap = bytearray((size + 7) // 8)
+    for position in positions:
+        bitmap[position // 8] |= 1 << (position % 8)
+    bitmap.reverse()
+    return int(binascii.hexlify(bytes(bitmap)) or b'0', 16)
+
+
+def get_enrollment_index(course_key, load_enrollments):
+    """
+    Returns the CourseEnrollmentIndex of the given course, from the request
+    cache or the shared cache, or else built from the (user_id, mode,
+    is_active) tuples, sorted by user id, returned by `load_enrollments()`.
+    Only the shards missing from the shared cache are built.
+    """
+    request_cache = RequestCache(REQUEST_CACHE_NAMESPACE).data
+    if course_key in request_cache:
+        return request_cache[course_key]
+
+    cache_keys = [_cache_keys(course_key, shard_number) for shard_number in range(NUM_SHARDS)]
+    cached = cache.get_many([key for shard_keys in cache_keys for key in shard_keys])
+    shards = []
+    versions = []
+    for shard_key, version_key in cache_keys:
+        version = cached.get(version_key)
+        if version is None:
+            cache.add(version_key, 0, None)
+            version = cache.get(version_key)
+        shard = None
+        if shard_key in cached and version is not None:
+            shard = zunpickle(cached[shard_key])
+            if shard.version != version:
+                shard = None
+        shards.append(shard)
+        versions.append(version)
+
+    missing_shard_numbers = [shard_number for shard_number, shard in enumerate(shards) if shard is None]
+    if missing_shard_numbers:
+        built_shards = _build_shards(load_enrollments(), missing_shard_numbers)
+        for shard_number, shard in zip(missing_shard_numbers, built_shards):
+            shard.version = versions[shard_number]
+            shards[shard_number] = shard
+            if shard.version is not None:
+                _cache_shard(course_key, shard_number, shard)
+
+    index = CourseEnrollmentIndex(course_key, shards)
+    request_cache[course_key] = index
+    return index
+
+
+def update_enrollment_index(course_key, user_id, mode, is_active):
+    """
+    Records a change to the enrollment of the given user in the indexes of
+    the course: in the one cached for the request right away, and in the
+    shared one once the current transaction is committed.  `mode` is None
+    if the enrollment was deleted.
+    """
+    request_cache = RequestCache(REQUEST_CACHE_NAMESPACE).data
+    if course_key in request_cache:
+        request_cache[course_key].set_state(user_id, mode, is_active)
+    transaction.on_commit(lambda: _update_cached_shard(course_key, user_id, mode, is_active))
+
+
+def _update_cached_shard(course_key, user_id, mode, is_active):
+    """
+    Records a change to the enrollment of the given user in the shard of the
+    index of the course kept in the shared cache.
+    """
+    shard_number = _shard_number(user_id)
+    shard_key, version_key = _cache_keys(course_key, shard_number)
+    try:
+        version = cache.incr(version_key)
+    except ValueError:
+        # The count of updates was evicted, so the cached shard can't be trusted.
+        cache.delete(shard_key)
+        return
+
+    zshard = cache.get(shard_key)
+    if zshard is None:
+        return
+    shard = zunpickle(zshard)
+    if shard.version != version - 1:
+        # The shard missed other updates.
+        cache.delete(shard_key)
+        return
+    shard.set_state(user_id, mode, is_active)
+    shard.version = version
+    _cache_shard(course_key, shard_number, shard)
+
+
+def _build_shards(enrollments, shard_numbers):
+    """
+    Returns the shards with the given numbers of the given (user_id, mode,
+    is_active) tuples, which must be sorted by user id.
+    """
+    shard_enrollments = {shard_number: [] for shard_number in shard_numbers}
+    for enrollment in enrollments:
+        enrollments_of_shard = shard_enrollments.get(_shard_number(enrollment[0]))
+        if enrollments_of_shard is not None:
+            enrollments_of_shard.append(enrollment)
+    return [_EnrollmentIndexShard.build(shard_enrollments[shard_number]) for shard_number in shard_numbers]
+
+
+def _cache_shard(course_key, shard_number, shard):
+    """
+    Keeps the given shard of the index of the course in the shared cache,
+    unless it is too large.
+    """
+    shard_key, __ = _cache_keys(course_key, shard_number)
+    zshard = zpickle(shard)
+    if len(zshard) > MAX_CACHED_SHARD_SIZE:
+        log.warning(
+            u'Shard %d of the enrollment index of %s is too large to be cached (%d bytes).',
+            shard_number, course_key, len(zshard),
+        )
+        cache.delete(shard_key)
+        return
+    cache.set(shard_key, zshard, INDEX_CACHE_TIMEOUT)
+
+
+def _shard_number(user_id):
+    """
+    Returns the number of the shard of the given user.
+    """
+    return user_id % NUM_SHARDS
+
+
+def _cache_keys(course_key, shard_number):
+    """
+    Returns the shared cache keys of a shard of the index of the course and
+    of the count of its updates.
+    """
+    shard_key = u'student.enrollment_index.{}.{}'.format(course_key, shard_number)
+    return shard_key, shard_key + u'.version'
@@ -68,6 +68,7 @@ from openedx.core.djangoapps.enrollments.api import _default_course_mode
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.djangoapps.xmodule_django.models import NoneToEmptyManager
 from openedx.core.djangolib.model_mixins import DeletableByUserValue
+from student.enrollment_index import get_enrollment_index, update_enrollment_index
 from student.signals import ENROLL_STATUS_CHANGE, ENROLLMENT_TRACK_UPDATED, UNENROLL_DONE
 from track import contexts, segment
 from util.milestones_helpers import is_entrance_exams_enabled
@@ -1147,6 +1148,10 @@ class CourseEnrollment(models.Model):
 
     MODE_CACHE_NAMESPACE = u'CourseEnrollment.mode_and_active'
 
+    # bulk_fetch_enrollment_states reads the states of at least this many users
+    # from the enrollment index of their course, rather than with a query.
+    BULK_FETCH_INDEX_MIN_USERS = 1000
+
     class Meta(object):
         unique_together = (('user', 'course'), )
         indexes = [Index(fields=['user', '-created'])]
@@ -1615,13 +1620,12 @@ class CourseEnrollment(models.Model):
         """
         List of user's CourseEnrollments, CourseOverviews preloaded if possible.
 
-        We try to preload all CourseOverviews, which are usually lazily loaded
-        as the .course_overview property. This is to avoid making an extra
-        query for every enrollment when displaying something like the student
-        dashboard. If some of the CourseOverviews are not found, we make no
-        attempt to initialize them -- we just fall back to existing lazy-load
-        behavior. The goal is to optimize the most common case as simply as
-        possible, without changing any of the existing contracts.
+        We preload all CourseOverviews, which are usually lazily loaded as the
+        .course_overview property, with CourseOverview.get_many. This is to
+        avoid making an extra query for every enrollment when displaying
+        something like the student dashboard. The missing CourseOverviews are
+        generated by get_many; the ones that fail to load are left to the
+        existing lazy-load behavior.
 
         The name of this method is long, but was the end result of hashing out a
         number of alternatives, so pylint can stuff it (disable=invalid-name)
@@ -1632,7 +1636,7 @@ class CourseEnrollment(models.Model):
         else:
             enrollments = cls.enrollments_for_user(user)
 
-        overviews = CourseOverview.get_from_ids_if_exists(
+        overviews = CourseOverview.get_many(
             enrollment.course_id for enrollment in enrollments
         )
         for enrollment in enrollments:
@@ -2002,16 +2006,49 @@ class CourseEnrollment(models.Model):
         """
         Bulk pre-fetches the enrollment states for the given users
         for the given course.
+
+        The states of short lists of users are read with a single query, and
+        those of longer lists from the enrollment index of the course.
         """
         # before populating the cache with another bulk set of data,
         # remove previously cached entries to keep memory usage low.
         RequestCache(cls.MODE_CACHE_NAMESPACE).clear()
 
-        records = cls.objects.filter(user__in=users, course_id=course_key).select_related('user')
+        users = list(users)
         cache = cls._get_mode_active_request_cache()
-        for record in records:
-            enrollment_state = CourseEnrollmentState(record.mode, record.is_active)
-            cls._update_enrollment(cache, record.user.id, course_key, enrollment_state)
+        if len(users) < cls.BULK_FETCH_INDEX_MIN_USERS:
+            enrollment_states = {
+                user_id: CourseEnrollmentState(mode, is_active)
+                for user_id, mode, is_active in cls.objects.filter(user__in=users, course_id=course_key).values_list(
+                    'user_id', 'mode', 'is_active',
+                )
+            }
+            for user in users:
+                enrollment_state = enrollment_states.get(user.id, CourseEnrollmentState(None, None))
+                cls._update_enrollment(cache, user.id, course_key, enrollment_state)
+            return
+
+        enrollment_index = cls.get_enrollment_index(course_key)
+        for user in users:
+            enrollment_state = CourseEnrollmentState(*enrollment_index.get_state(user.id))
+            cls._update_enrollment(cache, user.id, course_key, enrollment_state)
+
+    @classmethod
+    def get_enrollment_index(cls, course_key):
+        """
+        Returns the CourseEnrollmentIndex of the given course, which answers
+        whether users are enrolled in the course, and in which mode, without
+        a query per user.
+        """
+        def load_enrollments():
+            """
+            Streams the (user_id, mode, is_active) tuples of the enrollments in the course.
+            """
+            return cls.objects.filter(course_id=course_key).order_by('user_id').values_list(
+                'user_id', 'mode', 'is_active',
+            ).iterator()
+
+        return get_enrollment_index(course_key, load_enrollments)
 
     @classmethod
     def _get_mode_active_request_cache(cls):
@@ -2059,6 +2096,18 @@ def invalidate_enrollment_mode_cache(sender, instance, **kwargs):  # pylint: dis
     cache.delete(cache_key)
 
 
+@receiver(models.signals.post_save, sender=CourseEnrollment)
+@receiver(models.signals.post_delete, sender=CourseEnrollment)
+def update_enrollment_index_on_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Record the change to the enrollment in the index of its course.
+    """
+    if kwargs.get('signal') is models.signals.post_delete:
+        update_enrollment_index(instance.course_id, instance.user_id, None, None)
+    else:
+        update_enrollment_index(instance.course_id, instance.user_id, instance.mode, instance.is_active)
+
+
 @receiver(models.signals.post_save, sender=CourseEnrollment)
 def update_expiry_email_date(sender, instance, **kwargs):  # pylint: disable=unused-argument
     """
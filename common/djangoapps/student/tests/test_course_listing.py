@@ -102,6 +102,18 @@ class TestCourseListing(ModuleStoreTestCase, MilestonesTestCaseMixin):
             courses_list = list(get_course_enrollments(self.student, None, [], course_limit))
             self.assertEqual(len(courses_list), 1)
 
+    @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+    def test_course_overviews_read_at_once(self):
+        for run in ('Run1', 'Run2', 'Run3'):
+            self._create_course_with_access_groups(self.store.make_course_key('Org1', 'Course1', run))
+        # The first listing generates the missing overviews.
+        list(get_course_enrollments(self.student, None, []))
+
+        # One query for the enrollments, and one for their overviews.
+        with self.assertNumQueries(2):
+            courses_list = list(get_course_enrollments(self.student, None, []))
+        self.assertEqual(len(courses_list), 3)
+
     def test_errored_course_regular_access(self):
         """
         Test the course list for regular staff when get_course returns an ErrorDescriptor
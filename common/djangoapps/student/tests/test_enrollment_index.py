@@ -0,0 +1,153 @@
+"""
+Tests for the index of the enrollments in a course.
+"""
+from __future__ import absolute_import
+
+from django.core.cache import cache
+from django.test import TestCase
+from edx_django_utils.cache import RequestCache
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from openedx.core.djangoapps.content.course_overviews.tests.factories import CourseOverviewFactory
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from student.enrollment_index import NUM_SHARDS, REQUEST_CACHE_NAMESPACE, CourseEnrollmentIndex, _cache_keys
+from student.models import CourseEnrollment
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+
+
+class CourseEnrollmentIndexTest(TestCase):
+    """
+    Tests for CourseEnrollmentIndex.
+    """
+    def setUp(self):
+        super(CourseEnrollmentIndexTest, self).setUp()
+        self.index = CourseEnrollmentIndex.build(CourseLocator('org', 'course', 'run'), [
+            (1, 'audit', True),
+            (3, 'verified', True),
+            (4, 'audit', False),
+            (7, 'verified', False),
+            (9, 'audit', True),
+            (NUM_SHARDS + 1, 'honor', True),
+        ])
+
+    def test_get_state(self):
+        self.assertEqual(self.index.get_state(1), ('audit', True))
+        self.assertEqual(self.index.get_state(4), ('audit', False))
+        self.assertEqual(self.index.get_state(7), ('verified', False))
+        self.assertEqual(self.index.get_state(2), (None, None))
+        self.assertTrue(self.index.is_enrolled(3))
+        self.assertFalse(self.index.is_enrolled(4))
+        self.assertFalse(self.index.is_enrolled(5))
+        self.assertEqual(self.index.get_state(NUM_SHARDS + 1), ('honor', True))
+        self.assertEqual(len(self.index), 6)
+
+    def test_user_ids(self):
+        self.assertEqual(list(self.index.user_ids()), [1, 3, 9, NUM_SHARDS + 1])
+        self.assertEqual(list(self.index.user_ids(active_only=False)), [1, 3, 4, 7, 9, NUM_SHARDS + 1])
+        self.assertEqual(list(self.index.user_ids(mode='audit')), [1, 9])
+        self.assertEqual(list(self.index.user_ids(mode='honor')), [])
+
+    def test_set_state(self):
+        self.index.set_state(4, 'verified', True)
+        self.index.set_state(5, 'honor', False)
+        self.index.set_state(9, None, None)
+        self.assertEqual(
+            self.index.get_states([1, 3, 4, 5, 7, 9]),
+            {
+                1: ('audit', True),
+                3: ('verified', True),
+                4: ('verified', True),
+                5: ('honor', False),
+                7: ('verified', False),
+                9: (None, None),
+            }
+        )
+        self.assertEqual(list(self.index.user_ids(mode='verified', active_only=False)), [3, 4, 7])
+
+
+class CourseEnrollmentGetIndexTest(CacheIsolationTestCase):
+    """
+    Tests for CourseEnrollment.get_enrollment_index.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(CourseEnrollmentGetIndexTest, self).setUp()
+        self.course = CourseOverviewFactory.create()
+        self.enrollments = [
+            CourseEnrollmentFactory.create(course_id=self.course.id, mode='audit') for __ in range(3)
+        ]
+        self.enrollments[1].update_enrollment(is_active=False)
+        self.other_user = UserFactory.create()
+
+    def _assert_index_matches_enrollments(self):
+        """
+        Asserts that the index of the course agrees with the enrollments.
+        """
+        index = CourseEnrollment.get_enrollment_index(self.course.id)
+        for user in [enrollment.user for enrollment in self.enrollments] + [self.other_user]:
+            self.assertEqual(index.get_state(user.id), CourseEnrollment.enrollment_mode_for_user(user, self.course.id))
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            index = CourseEnrollment.get_enrollment_index(self.course.id)
+        self.assertEqual(len(index), 3)
+
+        # The index is cached for the request, and then in the shared cache.
+        with self.assertNumQueries(0):
+            CourseEnrollment.get_enrollment_index(self.course.id)
+        RequestCache(REQUEST_CACHE_NAMESPACE).clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(CourseEnrollment.get_enrollment_index(self.course.id)), 3)
+
+    def test_stale_shard_rebuilt(self):
+        CourseEnrollment.get_enrollment_index(self.course.id)
+        # Another process updated the shard of the first user, but not its cached copy.
+        user_id = self.enrollments[0].user.id
+        CourseEnrollment.objects.filter(id=self.enrollments[0].id).update(mode='verified')
+        cache.incr(_cache_keys(self.course.id, user_id % NUM_SHARDS)[1])
+
+        RequestCache(REQUEST_CACHE_NAMESPACE).clear()
+        with self.assertNumQueries(1):
+            index = CourseEnrollment.get_enrollment_index(self.course.id)
+        self.assertEqual(index.get_state(user_id), ('verified', True))
+
+    @patch('student.enrollment_index.MAX_CACHED_SHARD_SIZE', 0)
+    def test_large_shards_not_cached(self):
+        CourseEnrollment.get_enrollment_index(self.course.id)
+        RequestCache(REQUEST_CACHE_NAMESPACE).clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(len(CourseEnrollment.get_enrollment_index(self.course.id)), 3)
+
+    def test_updated_on_change(self):
+        self._assert_index_matches_enrollments()
+        self.enrollments[0].update_enrollment(mode='verified')
+        self.enrollments[1].update_enrollment(is_active=True)
+        self.enrollments.append(CourseEnrollment.enroll(self.other_user, self.course.id, mode='honor'))
+        self._assert_index_matches_enrollments()
+
+        deleted_enrollment = self.enrollments.pop(2)
+        deleted_enrollment.delete()
+        self._assert_index_matches_enrollments()
+        index = CourseEnrollment.get_enrollment_index(self.course.id)
+        self.assertEqual(index.get_state(deleted_enrollment.user.id), (None, None))
+
+    def test_bulk_fetch_enrollment_states(self):
+        users = [enrollment.user for enrollment in self.enrollments] + [self.other_user]
+        for min_users in (1, len(users) + 1):
+            with patch.object(CourseEnrollment, 'BULK_FETCH_INDEX_MIN_USERS', min_users):
+                RequestCache(REQUEST_CACHE_NAMESPACE).clear()
+                CourseEnrollment.bulk_fetch_enrollment_states(users, self.course.id)
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    [CourseEnrollment.is_enrolled(user, self.course.id) for user in users],
+                    [True, False, True, False]
+                )
+
+    def test_bulk_fetch_few_users_without_index(self):
+        users = [enrollment.user for enrollment in self.enrollments]
+        with patch('student.models.get_enrollment_index') as mock_get_index:
+            with self.assertNumQueries(1):
+                CourseEnrollment.bulk_fetch_enrollment_states(users, self.course.id)
+        self.assertFalse(mock_get_index.called)
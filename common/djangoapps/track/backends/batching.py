@@ -0,0 +1,190 @@
+"""
+Event tracker backend that sends events to another backend in batches,
+from a background thread.
+
+The backend to wrap is configured like the backends of TRACKING_BACKENDS::
+
+  TRACKING_BACKENDS = {
+      'logger': {
+          'ENGINE': 'track.backends.batching.BatchingBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.logger.LoggerBackend',
+                  'OPTIONS': {'name': 'tracking'},
+              },
+              'max_queue_size': 10000,
+              'batch_size': 100,
+              'flush_interval': 1.0,
+              'overflow': 'drop',
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from six.moves import queue
+
+from track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+OVERFLOW_DROP = 'drop'
+OVERFLOW_BLOCK = 'block'
+
+# Marks the end of the events of the queue.
+_STOP = object()
+
+
+class BatchingBackend(BaseBackend):
+    """
+    Event tracker backend that queues events in a bounded in-process queue,
+    drained in batches by a background thread which sends them to the
+    wrapped backend with `send_many`.
+
+    The events are sent once `batch_size` events are queued, or
+    `flush_interval` seconds after the first event of the batch was queued.
+    Once `max_queue_size` events are queued, further events are dropped if
+    `overflow` is 'drop', or wait for room in the queue if it is 'block'.
+    The remaining events are sent when the process exits.
+
+    The numbers of events queued, dropped and flushed are counted in the
+    `queued`, `dropped` and `flushed` attributes.
+    """
+
+    def __init__(self, backend, max_queue_size=10000, batch_size=100, flush_interval=1.0,
+                 overflow=OVERFLOW_DROP, shutdown_timeout=5.0, **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: configuration of the wrapped backend, a dict with
+            the `ENGINE` and optional `OPTIONS` keys.
+          - `max_queue_size`: maximum number of events waiting to be sent
+          - `batch_size`: maximum number of events sent at once
+          - `flush_interval`: maximum number of seconds an event waits
+            for its batch to fill up
+          - `overflow`: 'drop' or 'block'
+          - `shutdown_timeout`: maximum number of seconds waited for the
+            remaining events to be sent when the process exits
+
+        """
+        super(BatchingBackend, self).__init__(**kwargs)
+
+        if overflow not in (OVERFLOW_DROP, OVERFLOW_BLOCK):
+            raise ValueError('Invalid overflow policy %s' % overflow)
+
+        # Imported here as the tracker instantiates the backends on import.
+        from track.tracker import _instantiate_backend_from_name
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.shutdown_timeout = shutdown_timeout
+
+        self.queued = 0
+        self.dropped = 0
+        self.flushed = 0
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._dropping = False
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event to be sent by the background thread."""
+        self._ensure_started()
+        try:
+            self._queue.put(event, block=(self.overflow == OVERFLOW_BLOCK))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropping, self._dropping = self._dropping, True
+            if not dropping:
+                log.warning('Event tracker queue is full, dropping events')
+        else:
+            with self._lock:
+                self.queued += 1
+                self._dropping = False
+
+    def flush(self):
+        """Wait until all the queued events are sent."""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        """Send the remaining events and stop the background thread."""
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=self.shutdown_timeout)
+            except queue.Full:
+                log.warning('Event tracker queue is still full on shutdown, dropping the remaining events')
+                return
+            thread.join(self.shutdown_timeout)
+
+    def _ensure_started(self):
+        """
+        Start the background thread, in this process: threads don't survive
+        forking, and backends may be created before the workers are forked.
+        """
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None:
+                self._pid = os.getpid()
+                self._queue = queue.Queue(self.max_queue_size)
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue,), name='BatchingBackend',
+                )
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _run(self, events_queue):
+        """Send the events of the queue in batches, until stopped."""
+        stopped = False
+        while not stopped:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = self.flush_interval if deadline is None else deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    event = events_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    events_queue.task_done()
+                    stopped = True
+                    break
+                batch.append(event)
+                if deadline is None:
+                    deadline = time.time() + self.flush_interval
+
+            if batch:
+                self._send_batch(batch)
+                for __ in batch:
+                    events_queue.task_done()
+
+    def _send_batch(self, batch):
+        """Send a batch of events to the wrapped backend."""
+        try:
+            self.backend.send_many(batch)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Error sending %d events to event tracker backend', len(batch))
+        else:
+            with self._lock:
+                self.flushed += len(batch)
@@ -0,0 +1,91 @@
+"""Tests for the batching event tracker backend."""
+
+from __future__ import absolute_import
+
+import threading
+
+from django.test import TestCase
+
+from track.backends import BaseBackend
+from track.backends.batching import BatchingBackend
+
+
+class InMemoryBackend(BaseBackend):
+    """Backend that keeps the batches of events it receives."""
+
+    def __init__(self, **kwargs):
+        super(InMemoryBackend, self).__init__(**kwargs)
+        self.batches = []
+        self.can_send = threading.Event()
+        self.can_send.set()
+
+    def send(self, event):
+        self.send_many([event])
+
+    def send_many(self, events):
+        self.can_send.wait()
+        self.batches.append(list(events))
+
+
+class TestBatchingBackend(TestCase):
+    """Tests for BatchingBackend."""
+
+    def create_backend(self, **options):
+        """Create a BatchingBackend wrapping an InMemoryBackend."""
+        backend = BatchingBackend(
+            backend={'ENGINE': 'track.backends.tests.test_batching.InMemoryBackend'},
+            **options
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_send_in_batches(self):
+        backend = self.create_backend(batch_size=2, flush_interval=60)
+        backend.backend.can_send.clear()
+        for index in range(5):
+            backend.send({'test': index})
+        backend.backend.can_send.set()
+        backend.close()
+
+        # The background thread may pick the first events before the others are queued.
+        self.assertTrue(all(1 <= len(batch) <= 2 for batch in backend.backend.batches))
+        self.assertEqual(
+            [event for batch in backend.backend.batches for event in batch],
+            [{'test': index} for index in range(5)],
+        )
+        self.assertEqual((backend.queued, backend.dropped, backend.flushed), (5, 0, 5))
+
+    def test_flush_interval(self):
+        backend = self.create_backend(batch_size=100, flush_interval=0.01)
+        backend.send({'test': 0})
+        backend.flush()
+
+        self.assertEqual(backend.backend.batches, [[{'test': 0}]])
+        self.assertEqual(backend.flushed, 1)
+
+    def test_drop_on_overflow(self):
+        backend = self.create_backend(max_queue_size=2, batch_size=1)
+        backend.backend.can_send.clear()
+        for index in range(5):
+            backend.send({'test': index})
+        backend.backend.can_send.set()
+        backend.flush()
+
+        # The first event is held by the background thread, the next two are queued.
+        self.assertEqual(backend.queued + backend.dropped, 5)
+        self.assertGreaterEqual(backend.dropped, 2)
+        self.assertEqual(backend.flushed, backend.queued)
+        self.assertEqual(sum(len(batch) for batch in backend.backend.batches), backend.queued)
+
+    def test_block_on_overflow(self):
+        backend = self.create_backend(max_queue_size=1, batch_size=1, overflow='block')
+        for index in range(5):
+            backend.send({'test': index})
+        backend.flush()
+
+        self.assertEqual(backend.backend.batches, [[{'test': index}] for index in range(5)])
+        self.assertEqual((backend.queued, backend.dropped, backend.flushed), (5, 0, 5))
+
+    def test_invalid_overflow(self):
+        with self.assertRaises(ValueError):
+            self.create_backend(overflow='explode')
@@ -36,3 +36,18 @@ def test_logger_backend(caplog):
 
     assert saved_events[0] == unpacked_event
     assert saved_events[1] == unpacked_event
+
+
+def test_logger_backend_send_many(caplog):
+    """
+    Send a batch of events and check if they were recorded
+    by the logger, one by one.
+    """
+    caplog.set_level(logging.INFO)
+    logger_name = 'track.backends.logger.test'
+    backend = LoggerBackend(name=logger_name)
+
+    backend.send_many([{'test': 1}, {'test': 2}])
+
+    saved_events = [json.loads(e[2]) for e in caplog.record_tuples if e[0] == logger_name]
+    assert saved_events == [{'test': 1}, {'test': 2}]
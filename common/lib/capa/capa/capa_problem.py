@@ -15,6 +15,7 @@ This is used by capa_module.
 
 from __future__ import absolute_import
 
+import hashlib
 import logging
 import os.path
 import re
@@ -35,6 +36,7 @@ from capa.correctmap import CorrectMap
 from capa.safe_exec import safe_exec
 from capa.util import contextualize_text, convert_files_to_filenames
 from openedx.core.djangolib.markup import HTML, Text
+from openedx.core.lib.cache_utils import LRUCache
 from xmodule.stringify import stringify_children
 
 # extra things displayed after "show answers" is pressed
@@ -74,6 +76,36 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# Maximum total length of the problem definitions whose templates are cached
+PROBLEM_TEMPLATE_CACHE_SIZE = 16 * 1024 * 1024
+
+#-----------------------------------------------------------------------------
+
+
+class ProblemTemplate(object):
+    """
+    The parsed and translated XML of a problem definition.
+
+    Parsing doesn't depend on the learner, so a template is shared by all the
+    LoncapaProblems built from the same definition, each of which works on
+    its own copy of `tree`.  The template itself must never be modified.
+    """
+    def __init__(self, tree, size):
+        self.tree = tree
+        self.size = size
+        self.has_includes = tree.find('.//include') is not None
+
+    def copy_tree(self):
+        """
+        Return a copy of the template's tree, free to be modified.
+        """
+        return deepcopy(self.tree)
+
+
+# The templates of the problems, keyed by the hash of their problem definition
+# and sized by the length of the definitions.
+PROBLEM_TEMPLATES = LRUCache(PROBLEM_TEMPLATE_CACHE_SIZE)
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -181,13 +213,14 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        self.make_xml_compatible(self.tree)
+        # parse problem XML file into an element tree, or copy the tree
+        # already parsed for the same problem definition
+        template = self._get_template(problem_text)
+        self.tree = template.copy_tree()
 
         # handle any <include file="foo"> tags
-        self._process_includes()
+        if template.has_includes:
+            self._process_includes()
 
         # construct script processor context (eg for customresponse problems)
         if minimal_init:
@@ -220,6 +253,24 @@ class LoncapaProblem(object):
             if extract_tree:
                 self.extracted_tree = self._extract_html(self.tree)
 
+    def _get_template(self, problem_text):
+        """
+        Return the ProblemTemplate of `problem_text`, parsing it only if it
+        isn't cached yet.
+        """
+        if isinstance(problem_text, six.text_type):
+            key = hashlib.sha1(problem_text.encode('utf-8')).hexdigest()
+        else:
+            key = hashlib.sha1(problem_text).hexdigest()
+
+        template = PROBLEM_TEMPLATES.get(key)
+        if template is None:
+            tree = etree.XML(problem_text)
+            self.make_xml_compatible(tree)
+            template = ProblemTemplate(tree, len(problem_text))
+            PROBLEM_TEMPLATES.set(key, template, template.size)
+        return template
+
     def make_xml_compatible(self, tree):
         """
         Adjust tree xml in-place for compatibility before creating
@@ -464,6 +515,19 @@ class LoncapaProblem(object):
 
         return newcmap
 
+    def prefill_check_function_cache(self, student_answers_list):
+        """
+        Evaluates the check functions of this problem for each of the
+        `student_answers_list`, saved by learners with this problem's seed,
+        in batches, and caches the results so that grading those answers
+        afterwards doesn't run them one at a time.
+
+        See CustomResponse.prefill_check_function_cache.
+        """
+        for responder in self.responders.values():
+            if isinstance(responder, responsetypes.CustomResponse):
+                responder.prefill_check_function_cache(student_answers_list)
+
     def get_question_answers(self):
         """
         Returns a dict of answer_ids to answer values. If we cannot generate
@@ -2093,6 +2093,7 @@ class CustomResponse(LoncapaResponse):
                            'designprotein2dinput', 'editageneinput',
                            'annotationinput', 'jsinput', 'formulaequationinput']
     code = None
+    cfn = None
     expect = None
 
     # Standard amount for partial credit if not otherwise specified:
@@ -2130,19 +2131,12 @@ class CustomResponse(LoncapaResponse):
                 # and invoke the function with the data needed.
                 def make_check_function(script_code, cfn):
                     def check_function(expect, ans, **kwargs):
-                        extra_args = "".join(", {0}={0}".format(k) for k in kwargs)
-                        code = (
-                            script_code + "\n" +
-                            "cfn_return = %s(expect, ans%s)\n" % (cfn, extra_args)
-                        )
-                        globals_dict = {
-                            'expect': expect,
-                            'ans': ans,
-                        }
-                        globals_dict.update(kwargs)
+                        code = script_code + "\n" + self._get_cfn_call_code(cfn, kwargs)
+                        globals_dict = self._get_cfn_globals(expect, ans, kwargs)
                         safe_exec.safe_exec(
                             code,
                             globals_dict,
+                            cache=self.capa_system.cache,
                             python_path=self.context['python_path'],
                             extra_files=self.context['extra_files'],
                             slug=self.id,
@@ -2153,6 +2147,7 @@ class CustomResponse(LoncapaResponse):
                     return check_function
 
                 self.code = make_check_function(self.context['script_code'], cfn)
+                self.cfn = cfn
 
         if not self.code:
             if answer is None:
@@ -2176,11 +2171,7 @@ class CustomResponse(LoncapaResponse):
 
         log.debug('%s: student_answers=%s', six.text_type(self), student_answers)
 
-        # ordered list of answer id's
-        # sort the responses on the bases of the problem's position number
-        # which can be found in the last place in the problem id. Then convert
-        # this number into an int, so that we sort on ints instead of strings
-        idset = sorted(self.answer_ids, key=lambda x: int(x.split("_")[-1]))
+        idset = self._get_idset()
         try:
             # ordered list of answers
             submission = [student_answers[k] for k in idset]
@@ -2201,10 +2192,6 @@ class CustomResponse(LoncapaResponse):
             )
             raise Exception(msg)
 
-        # global variable in context which holds the Presentation MathML from dynamic math input
-        # ordered list of dynamath responses
-        dynamath = [student_answers.get(k + '_dynamath', None) for k in idset]
-
         # if there is only one box, and it's empty, then don't evaluate
         if len(idset) == 1 and not submission[0]:
             # default to no error message on empty answer (to be consistent with other
@@ -2214,6 +2201,122 @@ class CustomResponse(LoncapaResponse):
                    if self.xml.get('empty_answer_err') else '')
             return CorrectMap(idset[0], 'incorrect', msg=msg)
 
+        self._update_check_context(student_answers, idset, submission)
+
+        # Run the check function
+        self.execute_check_function(idset, submission)
+
+        # build map giving "correct"ness of the answer(s)
+        correct = self.context['correct']
+        messages = self.context['messages']
+        overall_message = self.clean_message_html(self.context['overall_message'])
+        grade_decimals = self.context.get('grade_decimals')
+
+        correct_map = CorrectMap()
+        correct_map.set_overall_message(overall_message)
+
+        for k in range(len(idset)):
+            max_points = self.maxpoints[idset[k]]
+            if grade_decimals:
+                npoints = max_points * grade_decimals[k]
+            else:
+                if correct[k] == 'correct':
+                    npoints = max_points
+                elif correct[k] == 'partially-correct':
+                    npoints = max_points * self.default_pc
+                else:
+                    npoints = 0
+            correct_map.set(idset[k], correct[k], msg=messages[k],
+                            npoints=npoints)
+        return correct_map
+
+    def prefill_check_function_cache(self, student_answers_list):
+        """
+        Evaluate the check function for each of `student_answers_list`, in
+        batched sandbox executions, and cache the results.
+
+        Grading any of those answers afterwards, for instance when rescoring
+        many learners who share this problem's seed, then finds the result of
+        its check function in the cache instead of executing it again.  Only
+        check functions given by a "cfn" attribute can be batched this way.
+        """
+        if self.cfn is None or not self.capa_system.cache:
+            return
+
+        idset = self._get_idset()
+        globals_dicts = []
+        kwargs = {}
+        for student_answers in student_answers_list:
+            if not all(answer_id in student_answers for answer_id in idset):
+                continue
+            submission = [student_answers[k] for k in idset]
+            if len(idset) == 1 and not submission[0]:
+                continue
+            self._update_check_context(student_answers, idset, submission)
+            answer_given, kwargs = self._get_cfn_args(idset, submission)
+            globals_dicts.append(self._get_cfn_globals(self.expect, answer_given, kwargs))
+
+        safe_exec.safe_exec_batch(
+            self.context['script_code'] + "\n",
+            self._get_cfn_call_code(self.cfn, kwargs),
+            globals_dicts,
+            ['cfn_return'],
+            self.capa_system.cache,
+            python_path=self.context['python_path'],
+            extra_files=self.context['extra_files'],
+            slug=self.id,
+            random_seed=self.context['seed'],
+            unsafely=self.capa_system.can_execute_unsafe_code(),
+        )
+
+    def _get_idset(self):
+        """
+        Returns the ordered list of answer ids of this response.
+        """
+        # sort the responses on the bases of the problem's position number
+        # which can be found in the last place in the problem id. Then convert
+        # this number into an int, so that we sort on ints instead of strings
+        return sorted(self.answer_ids, key=lambda x: int(x.split("_")[-1]))
+
+    def _get_cfn_args(self, idset, submission):
+        """
+        Returns the answer and the extra keyword arguments the "cfn" check
+        function is called with.
+        """
+        answer_given = submission[0] if (len(idset) == 1) else submission
+        kwnames = self.xml.get("cfn_extra_args", "").split()
+        kwargs = {n: self.context.get(n) for n in kwnames}
+        return answer_given, kwargs
+
+    @staticmethod
+    def _get_cfn_call_code(cfn, kwargs):
+        """
+        Returns the code calling the check function `cfn`, which is run
+        after the problem's script.
+        """
+        extra_args = "".join(", {0}={0}".format(k) for k in sorted(kwargs))
+        return "cfn_return = %s(expect, ans%s)\n" % (cfn, extra_args)
+
+    @staticmethod
+    def _get_cfn_globals(expect, ans, kwargs):
+        """
+        Returns the globals the code calling the check function is run with.
+        """
+        globals_dict = {
+            'expect': expect,
+            'ans': ans,
+        }
+        globals_dict.update(kwargs)
+        return globals_dict
+
+    def _update_check_context(self, student_answers, idset, submission):
+        """
+        Puts the submission in the context the check function is evaluated in.
+        """
+        # global variable in context which holds the Presentation MathML from dynamic math input
+        # ordered list of dynamath responses
+        dynamath = [student_answers.get(k + '_dynamath', None) for k in idset]
+
         # NOTE: correct = 'unknown' could be dangerous. Inputtypes such as textline are
         # not expecting 'unknown's
         correct = ['unknown'] * len(idset)
@@ -2259,33 +2362,6 @@ class CustomResponse(LoncapaResponse):
         # Pass DEBUG to the check function.
         self.context['debug'] = self.capa_system.DEBUG
 
-        # Run the check function
-        self.execute_check_function(idset, submission)
-
-        # build map giving "correct"ness of the answer(s)
-        correct = self.context['correct']
-        messages = self.context['messages']
-        overall_message = self.clean_message_html(self.context['overall_message'])
-        grade_decimals = self.context.get('grade_decimals')
-
-        correct_map = CorrectMap()
-        correct_map.set_overall_message(overall_message)
-
-        for k in range(len(idset)):
-            max_points = self.maxpoints[idset[k]]
-            if grade_decimals:
-                npoints = max_points * grade_decimals[k]
-            else:
-                if correct[k] == 'correct':
-                    npoints = max_points
-                elif correct[k] == 'partially-correct':
-                    npoints = max_points * self.default_pc
-                else:
-                    npoints = 0
-            correct_map.set(idset[k], correct[k], msg=messages[k],
-                            npoints=npoints)
-        return correct_map
-
     def execute_check_function(self, idset, submission):
         # exec the check function
         if isinstance(self.code, six.string_types):
@@ -2308,9 +2384,7 @@ class CustomResponse(LoncapaResponse):
 
             # this is an interface to the Tutor2 check functions
             tutor_cfn = self.code
-            answer_given = submission[0] if (len(idset) == 1) else submission
-            kwnames = self.xml.get("cfn_extra_args", "").split()
-            kwargs = {n: self.context.get(n) for n in kwnames}
+            answer_given, kwargs = self._get_cfn_args(idset, submission)
             log.debug(" submission = %s", submission)
             try:
                 ret = tutor_cfn(self.expect, answer_given, **kwargs)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Commandline tool comparing the throughput of Capa's sandboxed execution with
+and without the pre-warmed sandbox worker pool.
+
+Example usage:
+    $ python -m capa.safe_exec.benchmark --python-bin /edx/app/edxapp/venvs/edxapp-sandbox/bin/python \\
+        --user sandbox --jobs 200 --concurrency 4 --pool-size 4
+"""
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import threading
+import time
+
+from codejail import jail_code
+from six.moves import range
+
+from capa.safe_exec import safe_exec, worker_pool
+from capa.safe_exec.safe_exec import ASSUMED_IMPORTS
+
+# Typical problem code: uses one of the assumed imports and sets a few globals.
+BENCHMARK_CODE = """\
+expected = numpy.round(numpy.sqrt(x * x + y * y), 3)
+correct = abs(expected - float(answer)) < 0.01
+"""
+
+
+def run_jobs(num_jobs, concurrency):
+    """
+    Runs num_jobs executions of BENCHMARK_CODE from concurrency threads,
+    and returns the number of jobs per second.
+    """
+    job_numbers = iter(range(num_jobs))
+    lock = threading.Lock()
+
+    def run():
+        """
+        Runs jobs until there are none left.
+        """
+        while True:
+            with lock:
+                job_number = next(job_numbers, None)
+            if job_number is None:
+                return
+            globals_dict = {'x': job_number, 'y': 4, 'answer': '5'}
+            safe_exec(BENCHMARK_CODE, globals_dict, random_seed=job_number)
+
+    threads = [threading.Thread(target=run) for __ in range(concurrency)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return num_jobs / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sandboxed execution of Capa code')
+    parser.add_argument("--python-bin", required=True, help="Python of the sandbox")
+    parser.add_argument("--user", required=False, help="User to run the sandbox as")
+    parser.add_argument("--jobs", required=False, type=int, default=100)
+    parser.add_argument("--concurrency", required=False, type=int, default=1)
+    parser.add_argument("--pool-size", required=False, type=int, default=1)
+    parser.add_argument("--max-jobs", required=False, type=int, default=500)
+    args = parser.parse_args()
+
+    jail_code.configure('python', args.python_bin, user=args.user)
+
+    worker_pool.configure(size=0)
+    codejail_rate = run_jobs(args.jobs, args.concurrency)
+    print("codejail:    {:8.1f} jobs/s".format(codejail_rate))
+
+    worker_pool.configure(
+        size=args.pool_size,
+        warm_imports=[module_name for __, module_name in ASSUMED_IMPORTS],
+        max_jobs=args.max_jobs,
+    )
+    worker_pool.get_pool().warm()
+    pool_rate = run_jobs(args.jobs, args.concurrency)
+    print("worker pool: {:8.1f} jobs/s ({:.1f}x)".format(pool_rate, pool_rate / codejail_rate))
+    worker_pool.configure(size=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Caching of safe_exec results.
+
+safe_exec caches its results in the cache given by its caller, usually a
+cache shared by all processes.  The process-wide SafeExecResultCache adds:
+
+    * a local tier: a least recently used cache of results in front of the
+      shared cache, bounded by the total size of its entries, so that the
+      results of the scripts of popular problems are found without a trip
+      to the shared cache;
+
+    * the hashes of the code executed, computed once per distinct code
+      rather than on every execution;
+
+    * a limit on the size of the results that are cached at all;
+
+    * per-slug counts of hits and misses, logged periodically.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+import logging
+import threading
+
+from openedx.core.lib.cache_utils import LRUCache
+
+log = logging.getLogger(__name__)
+
+# Maximum number of distinct code strings whose hashes are kept.
+MAX_CODE_HASHES = 1000
+
+# Maximum number of slugs whose hits and misses are counted.
+MAX_SLUG_STATS = 1000
+
+# The stats are logged every this many lookups.
+STATS_LOG_INTERVAL = 10000
+
+# Number of slugs, those with the most misses, whose stats are logged.
+STATS_LOG_SLUGS = 10
+
+
+class SafeExecResultCache(object):
+    """
+    The local tier and instrumentation of the safe_exec result cache.
+
+    `local_max_size` is the maximum total size, in bytes, of the results kept
+    in the local tier; 0 disables it.  Results larger than `max_result_size`
+    bytes aren't cached at all; None means no limit.
+    """
+    def __init__(self, local_max_size=0, max_result_size=None):
+        self.max_result_size = max_result_size
+        self.local_results = LRUCache(local_max_size)
+        self._code_hashes = LRUCache(MAX_CODE_HASHES)
+        self._slug_stats = LRUCache(MAX_SLUG_STATS)
+        self._lookups = 0
+        self._lock = threading.Lock()
+
+    @property
+    def local_size(self):
+        """
+        The total size, in bytes, of the results kept in the local tier.
+        """
+        return self.local_results.size
+
+    def get(self, shared_cache, key, slug=None):
+        """
+        Returns the result cached for `key`, from the local tier or else from
+        `shared_cache`, or None if not found.
+        """
+        serialized_result = self.local_results.get(key)
+        if serialized_result is not None:
+            self._count(slug, 'local_hits')
+            return json.loads(serialized_result)
+
+        result = _get_successful_result(shared_cache, key)
+        if result is None:
+            self._count(slug, 'misses')
+            return None
+
+        self._count(slug, 'shared_hits')
+        self._set_local(key, json.dumps(result))
+        return result
+
+    def is_cached(self, shared_cache, key):
+        """
+        Returns whether a result is cached for `key`, without counting a hit
+        or miss: only the lookups of the results actually used are counted.
+        """
+        return key in self.local_results or _get_successful_result(shared_cache, key) is not None
+
+    def set(self, shared_cache, key, result):
+        """
+        Caches `result` for `key` in both tiers, unless it is too large.
+        """
+        serialized_result = json.dumps(result)
+        if self.max_result_size is not None and len(serialized_result) > self.max_result_size:
+            return
+        shared_cache.set(key, result)
+        self._set_local(key, serialized_result)
+
+    def get_code_hasher(self, code):
+        """
+        Returns a new md5 hasher updated with `code`, hashing each distinct
+        code only once.
+        """
+        hasher = self._code_hashes.get(code)
+        if hasher is None:
+            hasher = hashlib.md5()
+            hasher.update(repr(code))
+            self._code_hashes.set(code, hasher)
+        return hasher.copy()
+
+    def get_stats(self):
+        """
+        Returns a dict of the local hits, shared hits, misses and hit rate of
+        the most recently used slugs.
+        """
+        with self._lock:
+            stats = {slug: dict(counts) for slug, counts in self._slug_stats.items()}
+        for counts in stats.values():
+            hits = counts['local_hits'] + counts['shared_hits']
+            counts['hit_rate'] = float(hits) / (hits + counts['misses'])
+        return stats
+
+    def log_stats(self):
+        """
+        Logs the overall hit rate of the cache and the stats of the slugs with
+        the most misses.
+        """
+        stats = self.get_stats()
+        totals = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+        for counts in stats.values():
+            for name in totals:
+                totals[name] += counts[name]
+        lookups = sum(totals.values())
+        if not lookups:
+            return
+        worst_slugs = sorted(stats.items(), key=lambda item: item[1]['misses'], reverse=True)[:STATS_LOG_SLUGS]
+        log.info(
+            "safe_exec result cache: %d local hits, %d shared hits, %d misses (hit rate %.2f), "
+            "%d bytes in the local tier; slugs with the most misses: %s",
+            totals['local_hits'], totals['shared_hits'], totals['misses'],
+            float(lookups - totals['misses']) / lookups, self.local_size, worst_slugs,
+        )
+
+    def clear(self):
+        """
+        Removes all the local entries, code hashes and counts.
+        """
+        with self._lock:
+            self.local_results.clear()
+            self._code_hashes.clear()
+            self._slug_stats.clear()
+            self._lookups = 0
+
+    def _set_local(self, key, serialized_result):
+        """
+        Keeps `serialized_result` in the local tier, evicting the least
+        recently used entries as needed.
+        """
+        self.local_results.set(key, serialized_result, len(serialized_result))
+
+    def _count(self, slug, name):
+        """
+        Counts a hit or miss for `slug`, logging the stats periodically.
+        """
+        with self._lock:
+            counts = self._slug_stats.get(slug)
+            if counts is None:
+                counts = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+                self._slug_stats.set(slug, counts)
+            counts[name] += 1
+            self._lookups += 1
+            log_stats = self._lookups % STATS_LOG_INTERVAL == 0
+        if log_stats:
+            self.log_stats()
+
+
+# The process-wide cache used by safe_exec.
+RESULT_CACHE = SafeExecResultCache()
+
+
+def configure(local_max_size=0, max_result_size=None):
+    """
+    Configures the process-wide cache used by safe_exec.
+    """
+    RESULT_CACHE.clear()
+    RESULT_CACHE.local_results.resize(local_max_size)
+    RESULT_CACHE.max_result_size = max_result_size
+
+
+def _get_successful_result(shared_cache, key):
+    """
+    Returns the result cached for `key` in `shared_cache`, or None if not
+    found or if it is the result of an execution that raised an exception,
+    as cached by previous releases, so that the execution is run again.
+    """
+    result = shared_cache.get(key)
+    if result is None or result[0]:
+        return None
+    return result
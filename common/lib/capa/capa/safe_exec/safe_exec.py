@@ -2,14 +2,14 @@
 
 from __future__ import absolute_import
 
-import hashlib
-
 from codejail.safe_exec import SafeExecException, json_safe
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import safe_exec as codejail_safe_exec
 from six import text_type
+from six.moves import range
 
-from . import lazymod
+from . import lazymod, worker_pool
+from .result_cache import RESULT_CACHE
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -52,6 +52,28 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# How many executions safe_exec_batch runs in a single sandbox.  They share
+# the CPU and real time limits of that sandbox, so batches are kept small
+# enough for the usual check functions to fit in them.
+BATCH_SIZE = 10
+
+# Runs the batched code once for each of the globals dicts in batch_globals.
+# The batched code includes the prolog and the setup code, so that each job
+# starts from its own globals and random state, as if it had been run on its
+# own: only the sandbox and the modules it imported are shared by a batch.
+BATCH_LOOP = """
+import json as batch_json_module
+batch_results = []
+for batch_job_globals in batch_globals:
+    try:
+        exec(batch_code, batch_job_globals)
+        batch_result = dict((name, batch_job_globals[name]) for name in batch_output_names)
+        batch_json_module.dumps(batch_result)
+    except Exception:
+        batch_result = None
+    batch_results.append(batch_result)
+"""
+
 
 def update_hash(hasher, obj):
     """
@@ -76,6 +98,29 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def _get_cache_key(code, globals_dict, random_seed):
+    """
+    Returns the key under which the result of executing `code` with
+    `globals_dict` and `random_seed` is cached.
+    """
+    safe_globals = json_safe(globals_dict)
+    md5er = RESULT_CACHE.get_code_hasher(code)
+    update_hash(md5er, safe_globals)
+    return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+
+def _get_exec_fn(unsafely):
+    """
+    Returns the code executor to use.
+    """
+    if unsafely:
+        return codejail_not_safe_exec
+    elif worker_pool.is_enabled():
+        return worker_pool.pool_safe_exec
+    else:
+        return codejail_safe_exec
+
+
 def safe_exec(
     code,
     globals_dict,
@@ -104,43 +149,35 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  Results are also kept in a local cache in front of it (see
+    result_cache.py).  Executions that raise an exception aren't cached, since the
+    exception may be due to a transient failure, such as exceeding a time limit.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
 
     If `unsafely` is true, then the code will actually be executed without sandboxing.
+    Otherwise, it is executed by the pre-warmed sandbox worker pool when that is
+    enabled, and by a new codejail sandbox if not.
 
     """
     # Check the cache for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
+        key = _get_cache_key(code, globals_dict, random_seed)
+        cached = RESULT_CACHE.get(cache, key, slug)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
-            # message, if any, else None; and the resulting globals dictionary.
-            emsg, cleaned_results = cached
+            # message, which is always None, and the resulting globals dictionary.
+            __, cleaned_results = cached
             globals_dict.update(cleaned_results)
-            if emsg:
-                raise SafeExecException(emsg)
             return
 
     # Create the complete code we'll run.
     code_prolog = CODE_PROLOG % random_seed
 
-    # Decide which code executor to use.
-    if unsafely:
-        exec_fn = codejail_not_safe_exec
-    else:
-        exec_fn = codejail_safe_exec
-
     # Run the code!  Results are side effects in globals_dict.
     try:
-        exec_fn(
+        _get_exec_fn(unsafely)(
             code_prolog + LAZY_IMPORTS + code, globals_dict,
             python_path=python_path, extra_files=extra_files, slug=slug,
         )
@@ -151,10 +188,72 @@ def safe_exec(
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
-    if cache:
+    if cache and not emsg:
         cleaned_results = json_safe(globals_dict)
-        cache.set(key, (emsg, cleaned_results))
+        RESULT_CACHE.set(cache, key, (None, cleaned_results))
 
     # If an exception happened, raise it now.
     if emsg:
         raise e
+
+
+def safe_exec_batch(
+    setup_code,
+    code,
+    globals_dicts,
+    output_names,
+    cache,
+    random_seed=None,
+    python_path=None,
+    extra_files=None,
+    slug=None,
+    unsafely=False,
+    batch_size=BATCH_SIZE,
+):
+    """
+    Execute `setup_code` followed by `code` for each of `globals_dicts`, using
+    one sandbox execution per `batch_size` globals dicts, and put the results
+    in `cache`.
+
+    Afterwards, `safe_exec(setup_code + code, globals_dict, cache=cache, ...)`
+    returns from the cache for any of `globals_dicts` whose execution succeeded,
+    updating `globals_dict` with the `output_names` globals set by `code`.
+    Executions that fail aren't cached, so that they are run (and report their
+    errors) individually.
+
+    `setup_code` is run before `code` for each of `globals_dicts`, with its own
+    globals and random state, as if it had been run on its own: functions and
+    mutable globals defined by `setup_code` aren't shared between executions.
+    Only the sandbox, and the modules imported in it, are shared by a batch.
+
+    The other arguments are as for `safe_exec`.
+
+    """
+    if not cache:
+        return
+
+    jobs = []
+    for globals_dict in globals_dicts:
+        key = _get_cache_key(setup_code + code, globals_dict, random_seed)
+        if not RESULT_CACHE.is_cached(cache, key):
+            jobs.append((key, json_safe(globals_dict)))
+
+    batch_code = CODE_PROLOG % random_seed + LAZY_IMPORTS + setup_code + code
+    for start in range(0, len(jobs), batch_size):
+        batch_jobs = jobs[start:start + batch_size]
+        batch_globals_dict = {
+            'batch_code': batch_code,
+            'batch_globals': [job_globals for __, job_globals in batch_jobs],
+            'batch_output_names': list(output_names),
+        }
+        try:
+            _get_exec_fn(unsafely)(
+                BATCH_LOOP, batch_globals_dict,
+                python_path=python_path, extra_files=extra_files, slug=slug,
+            )
+        except SafeExecException:
+            continue
+
+        for (key, __), result in zip(batch_jobs, batch_globals_dict.get('batch_results', [])):
+            if result is not None:
+                RESULT_CACHE.set(cache, key, (None, result))
@@ -0,0 +1,123 @@
+"""Test result_cache.py"""
+
+from __future__ import absolute_import
+
+import hashlib
+import unittest
+
+from mock import patch
+
+from capa.safe_exec import result_cache, safe_exec, safe_exec_batch
+from capa.safe_exec.result_cache import SafeExecResultCache
+from capa.safe_exec.tests.test_safe_exec import DictCache
+
+
+class TestSafeExecResultCache(unittest.TestCase):
+    """Test the two tiers of the cache."""
+
+    def setUp(self):
+        super(TestSafeExecResultCache, self).setUp()
+        self.shared = {}
+        self.cache = SafeExecResultCache(local_max_size=100)
+
+    def test_local_hit(self):
+        self.cache.set(DictCache(self.shared), 'key', (None, {'a': 1}))
+        self.shared.clear()
+        self.assertEqual(self.cache.get(DictCache(self.shared), 'key', 'slug'), [None, {'a': 1}])
+        self.assertEqual(self.cache.get_stats()['slug']['local_hits'], 1)
+
+    def test_shared_hit(self):
+        self.shared['key'] = (None, {'a': 1})
+        self.assertEqual(self.cache.get(DictCache(self.shared), 'key', 'slug'), (None, {'a': 1}))
+        self.shared.clear()
+        # The result is now kept locally.
+        self.assertEqual(self.cache.get(DictCache(self.shared), 'key', 'slug'), [None, {'a': 1}])
+        stats = self.cache.get_stats()['slug']
+        self.assertEqual((stats['local_hits'], stats['shared_hits'], stats['misses']), (1, 1, 0))
+
+    def test_local_results_are_copies(self):
+        self.cache.set(DictCache(self.shared), 'key', (None, {'a': [1]}))
+        self.cache.get(DictCache(self.shared), 'key')[1]['a'].append(2)
+        self.assertEqual(self.cache.get(DictCache(self.shared), 'key'), [None, {'a': [1]}])
+
+    def test_size_bound(self):
+        for index in range(10):
+            self.cache.set(DictCache(self.shared), 'key{}'.format(index), (None, {'a': index}))
+        self.assertLessEqual(self.cache.local_size, 100)
+        self.shared.clear()
+        # The least recently used results were evicted.
+        self.assertIsNone(self.cache.get(DictCache(self.shared), 'key0'))
+        self.assertIsNotNone(self.cache.get(DictCache(self.shared), 'key9'))
+
+    def test_disabled_local_tier(self):
+        cache = SafeExecResultCache(local_max_size=0)
+        cache.set(DictCache(self.shared), 'key', (None, {'a': 1}))
+        self.assertEqual(cache.local_size, 0)
+        self.assertEqual(self.shared, {'key': (None, {'a': 1})})
+
+    def test_max_result_size(self):
+        self.cache.max_result_size = 20
+        self.cache.set(DictCache(self.shared), 'small', (None, {'a': 1}))
+        self.cache.set(DictCache(self.shared), 'large', (None, {'a': 'x' * 20}))
+        self.assertEqual(list(self.shared), ['small'])
+        self.assertIsNone(self.cache.get(DictCache(self.shared), 'large', 'slug'))
+        self.assertEqual(self.cache.get_stats()['slug'], {
+            'local_hits': 0, 'shared_hits': 0, 'misses': 1, 'hit_rate': 0.0,
+        })
+
+    def test_is_cached_is_not_counted(self):
+        self.shared['key'] = (None, {'a': 1})
+        self.assertTrue(self.cache.is_cached(DictCache(self.shared), 'key'))
+        self.assertFalse(self.cache.is_cached(DictCache(self.shared), 'other'))
+        self.assertEqual(self.cache.get_stats(), {})
+
+    @patch('capa.safe_exec.result_cache.STATS_LOG_INTERVAL', 2)
+    @patch('capa.safe_exec.result_cache.log')
+    def test_stats_are_logged(self, mock_log):
+        self.cache.get(DictCache(self.shared), 'key', 'slug')
+        self.assertFalse(mock_log.info.called)
+        self.cache.get(DictCache(self.shared), 'key', 'slug')
+        self.assertEqual(mock_log.info.call_count, 1)
+        self.assertEqual(mock_log.info.call_args[0][1:4], (0, 0, 2))
+
+    def test_code_hasher(self):
+        md5er = hashlib.md5()
+        md5er.update(repr("a = 1"))
+        for __ in range(2):
+            hasher = self.cache.get_code_hasher("a = 1")
+            self.assertEqual(hasher.hexdigest(), md5er.hexdigest())
+            # Updating the returned hasher doesn't change the next ones.
+            hasher.update("more")
+
+
+class TestSafeExecLocalCache(unittest.TestCase):
+    """Test safe_exec with the local cache enabled."""
+
+    def setUp(self):
+        super(TestSafeExecLocalCache, self).setUp()
+        result_cache.configure(local_max_size=1000)
+        self.addCleanup(result_cache.configure)
+
+    def test_local_hit(self):
+        shared = {}
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=DictCache(shared), slug='pi')
+        self.assertEqual(len(shared), 1)
+
+        shared.clear()
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=DictCache(shared), slug='pi')
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(shared, {})
+        self.assertEqual(result_cache.RESULT_CACHE.get_stats()['pi']['hit_rate'], 0.5)
+
+    def test_batch_results_are_counted_as_hits(self):
+        shared = {}
+        globals_dicts = [{'a': a} for a in range(3)]
+        safe_exec_batch("", "b = a + 1\n", globals_dicts, ['b'], DictCache(shared), slug='batch')
+        self.assertNotIn('batch', result_cache.RESULT_CACHE.get_stats())
+
+        for a in range(3):
+            safe_exec("b = a + 1\n", {'a': a}, cache=DictCache(shared), slug='batch')
+        stats = result_cache.RESULT_CACHE.get_stats()['batch']
+        self.assertEqual((stats['local_hits'], stats['misses']), (3, 0))
@@ -16,7 +16,7 @@ from codejail.safe_exec import SafeExecException
 from six import text_type, unichr
 from six.moves import range
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import safe_exec, safe_exec_batch, update_hash
 
 
 class TestSafeExec(unittest.TestCase):
@@ -142,34 +142,24 @@ class TestSafeExecCaching(unittest.TestCase):
         safe_exec(code, g, cache=DictCache(cache))
         self.assertEqual(g['a'], 12345)
 
-    def test_cache_exceptions(self):
-        # Used to be that running code that raised an exception didn't cache
-        # the result.  Check that now it does.
+    def test_exceptions_not_cached(self):
+        # The exception may be due to a transient failure, such as exceeding
+        # a time limit, so it isn't cached.
         code = "1/0"
         g = {}
         cache = {}
         with self.assertRaises(SafeExecException):
             safe_exec(code, g, cache=DictCache(cache))
+        self.assertEqual(cache, {})
 
-        # The exception should be in the cache now.
-        self.assertEqual(len(cache), 1)
-        cache_exc_msg, cache_globals = list(cache.values())[0]
-        self.assertIn("ZeroDivisionError", cache_exc_msg)
-
-        # Change the value stored in the cache, the result should change.
-        cache[list(cache.keys())[0]] = ("Hey there!", {})
-
-        with self.assertRaises(SafeExecException):
-            safe_exec(code, g, cache=DictCache(cache))
-
-        self.assertEqual(len(cache), 1)
-        cache_exc_msg, cache_globals = list(cache.values())[0]
-        self.assertEqual("Hey there!", cache_exc_msg)
-
-        # Change it again, now no exception!
-        cache[list(cache.keys())[0]] = (None, {'a': 17})
-        safe_exec(code, g, cache=DictCache(cache))
-        self.assertEqual(g['a'], 17)
+        # Exceptions cached by previous releases are ignored.
+        safe_exec("a = 1", g, cache=DictCache(cache))
+        key = list(cache.keys())[0]
+        cache[key] = ("Hey there!", {})
+        g = {}
+        safe_exec("a = 1", g, cache=DictCache(cache))
+        self.assertEqual(g['a'], 1)
+        self.assertEqual(cache[key], (None, {'a': 1}))
 
     def test_unicode_submission(self):
         # Check that using non-ASCII unicode does not raise an encoding error.
@@ -182,6 +172,53 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class TestSafeExecBatch(unittest.TestCase):
+    """Test that safe_exec_batch fills the cache used by safe_exec."""
+
+    setup_code = "def double(x):\n    return 2 * x\n"
+    code = "b = double(a)\nr = random.randint(0, 999)\n"
+
+    def test_batch_fills_cache(self):
+        cache = {}
+        globals_dicts = [{'a': a} for a in range(5)]
+        safe_exec_batch(
+            self.setup_code, self.code, globals_dicts, ['b', 'r'], DictCache(cache), random_seed=17, batch_size=2,
+        )
+        self.assertEqual(len(cache), 5)
+
+        for a in range(5):
+            # The batched results match those of a run on its own.
+            g = {'a': a}
+            safe_exec(self.setup_code + self.code, g, random_seed=17)
+            cached_g = {'a': a}
+            safe_exec(self.setup_code + self.code, cached_g, random_seed=17, cache=DictCache(cache))
+            self.assertEqual(cached_g, {'a': a, 'b': 2 * a, 'r': g['r']})
+
+        # Fiddle with the cache, to check that safe_exec uses it.
+        for key in cache:
+            cache[key] = (None, {'b': 17})
+        g = {'a': 1}
+        safe_exec(self.setup_code + self.code, g, random_seed=17, cache=DictCache(cache))
+        self.assertEqual(g['b'], 17)
+
+    def test_setup_state_not_shared(self):
+        cache = {}
+        setup_code = "seen = []\ndef count(x):\n    seen.append(x)\n    return len(seen)\n"
+        globals_dicts = [{'a': a} for a in range(3)]
+        safe_exec_batch(setup_code, "b = count(a)\n", globals_dicts, ['b'], DictCache(cache), random_seed=17)
+        self.assertEqual(sorted(cache.values()), [(None, {'b': 1})] * 3)
+
+    def test_errors_not_cached(self):
+        cache = {}
+        safe_exec_batch(self.setup_code, "b = 2 // a\n", [{'a': 0}, {'a': 1}], ['b'], DictCache(cache))
+        self.assertEqual(list(cache.values()), [(None, {'b': 2})])
+
+    def test_without_cache(self):
+        globals_dicts = [{'a': 1}]
+        safe_exec_batch(self.setup_code, self.code, globals_dicts, ['b'], None)
+        self.assertEqual(globals_dicts, [{'a': 1}])
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
@@ -0,0 +1,164 @@
+"""Test worker_pool.py"""
+
+from __future__ import absolute_import
+
+import os.path
+import sys
+import unittest
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException
+from mock import patch
+from six import text_type
+
+from capa.safe_exec import safe_exec, worker_pool
+from capa.safe_exec.safe_exec import ASSUMED_IMPORTS
+
+
+class TestSandboxWorkerPool(unittest.TestCase):
+    """
+    Test the pool, running its workers with the current Python and user.
+    """
+    def setUp(self):
+        super(TestSandboxWorkerPool, self).setUp()
+        self.pool = worker_pool.SandboxWorkerPool(size=2, max_jobs=3, python_bin=sys.executable)
+        self.addCleanup(self.pool.close)
+
+    def test_set_values(self):
+        g = {'a': 17, 'b': [1, 2]}
+        self.pool.safe_exec("a += 1; b.append(3); c = {'d': 'e'}", g)
+        self.assertEqual(g, {'a': 18, 'b': [1, 2, 3], 'c': {'d': 'e'}})
+
+    def test_raising_exceptions(self):
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("1/0", {})
+        self.assertIn("ZeroDivisionError", text_type(cm.exception))
+
+    def test_printing(self):
+        g = {}
+        self.pool.safe_exec("print('hello'); a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    def test_state_not_shared(self):
+        self.pool.safe_exec("import sys; sys.shared = 1", {})
+        g = {}
+        self.pool.safe_exec("import sys; a = hasattr(sys, 'shared')", g)
+        self.assertEqual(g['a'], False)
+
+    def test_python_lib(self):
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        g = {}
+        self.pool.safe_exec("import constant; a = constant.THE_CONST", g, python_path=[pylib])
+        self.assertEqual(g['a'], 23)
+
+    def test_extra_files(self):
+        g = {}
+        self.pool.safe_exec(
+            "a = open('data.txt').read()", g, extra_files=[('data.txt', b'some data')],
+        )
+        self.assertEqual(g['a'], 'some data')
+
+    def test_worker_reused_and_recycled(self):
+        worker = self.pool._acquire()  # pylint: disable=protected-access
+        self.pool._release(worker)  # pylint: disable=protected-access
+        for __ in range(3):
+            self.pool.safe_exec("a = 1", {})
+            self.assertEqual(worker.is_alive(), worker.jobs < 3)
+        self.assertEqual(worker.jobs, 3)
+        self.assertFalse(worker.is_alive())
+
+    def test_recycled_on_memory(self):
+        self.pool.max_memory = 1
+        worker = self.pool._acquire()  # pylint: disable=protected-access
+        self.pool._release(worker)  # pylint: disable=protected-access
+        self.pool.safe_exec("a = 1", {})
+        self.assertFalse(worker.is_alive())
+
+    @patch.dict(jail_code.LIMITS, {'REALTIME': 1})
+    def test_realtime_limit(self):
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("import time; time.sleep(5)", {})
+        self.assertIn("real time limit", text_type(cm.exception))
+        g = {}
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    @unittest.skipUnless(os.path.isdir('/proc'), 'Requires /proc')
+    def test_forged_response(self):
+        worker = self.pool._acquire()  # pylint: disable=protected-access
+        self.pool._release(worker)  # pylint: disable=protected-access
+        # The worker's protocol stream is the first file descriptor after stderr.
+        code = (
+            "import json, os\n"
+            "with open('/proc/%d/fd/3' % os.getppid(), 'w') as protocol:\n"
+            "    protocol.write(json.dumps({'globals': {'a': 2}}) + '\\n')\n"
+            "a = 1\n"
+        )
+        g = {}
+        with self.assertRaises(SafeExecException):
+            self.pool.safe_exec(code, g)
+        self.assertEqual(g, {})
+        # The worker isn't dumpable, so only root can open its protocol
+        # stream, in which case the forged response kills the worker.
+        self.assertEqual(worker.is_alive(), os.geteuid() != 0)
+
+    @unittest.skipUnless(os.path.isdir('/proc'), 'Requires /proc')
+    def test_job_processes_killed(self):
+        # One process stays in the process group of the job, the other one
+        # leaves it.
+        code = (
+            "import os, time\n"
+            "pids = []\n"
+            "for new_session in (False, True):\n"
+            "    pid = os.fork()\n"
+            "    if pid == 0:\n"
+            "        if new_session:\n"
+            "            os.setsid()\n"
+            "        time.sleep(60)\n"
+            "        os._exit(0)\n"
+            "    pids.append(pid)\n"
+        )
+        g = {}
+        self.pool.safe_exec(code, g)
+        self.assertEqual(len(g['pids']), 2)
+        for pid in g['pids']:
+            self.assertFalse(os.path.exists('/proc/{}'.format(pid)))
+
+    def test_tmpdir(self):
+        g = {}
+        self.pool.safe_exec("import os, tempfile; a = tempfile.gettempdir() == os.path.abspath('tmp')", g)
+        self.assertEqual(g['a'], True)
+
+    def test_warm(self):
+        self.pool.warm()
+        self.assertEqual(len(self.pool._idle_workers), 2)  # pylint: disable=protected-access
+
+
+class TestPoolSafeExec(unittest.TestCase):
+    """
+    Test that safe_exec uses the pool when it is enabled.
+    """
+    def setUp(self):
+        super(TestPoolSafeExec, self).setUp()
+        jail_patch = patch.dict(jail_code.COMMANDS, {
+            'python': {'cmdline_start': [sys.executable, '-E', '-B'], 'user': None},
+        })
+        jail_patch.start()
+        self.addCleanup(jail_patch.stop)
+        worker_pool.configure(size=1, warm_imports=[module_name for __, module_name in ASSUMED_IMPORTS])
+        self.addCleanup(worker_pool.configure, size=0)
+
+    def test_enabled(self):
+        self.assertTrue(worker_pool.is_enabled())
+        with patch.object(worker_pool, 'pool_safe_exec', wraps=worker_pool.pool_safe_exec) as mock_exec:
+            g = {}
+            safe_exec("a = int(math.pi)", g, random_seed=17)
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(mock_exec.call_count, 1)
+
+    def test_not_used_unsafely(self):
+        with patch.object(worker_pool, 'pool_safe_exec') as mock_exec:
+            g = {}
+            safe_exec("a = 1", g, unsafely=True)
+        self.assertEqual(g['a'], 1)
+        self.assertFalse(mock_exec.called)
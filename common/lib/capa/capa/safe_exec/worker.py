@@ -0,0 +1,298 @@
+"""
+Main loop of a pre-warmed sandbox worker, used by worker_pool.py.
+
+This file is not imported by Capa: its source is read by worker_pool.py
+and run by the sandboxed Python.  It must therefore only depend on the
+standard library, and must run under both Python 2 and Python 3.
+
+The worker first imports the modules named on its command line, so that
+they are already loaded when jobs use them.  It then reads jobs, one
+JSON object per line, from stdin.  Each job is run in a forked child of
+the worker, so that nothing a job does to the interpreter's state is
+seen by later jobs, and the child's CPU, process and file size limits
+are set before running the job's code.  The result of each job is
+written to the worker's original stdout as one JSON object per line,
+along with the nonce of the job, so that the pool can tell a result from
+a line forged by the job's code.
+
+Each job runs in a process group of its own, which is killed once the job
+is done, along with any other process the job left behind: the worker is
+the subreaper of its jobs' orphans, so that even the processes which left
+the job's process group end up its children.  The worker is also made
+non-dumpable, so that the processes of its jobs, which run as the same
+user, can neither trace it nor open its file descriptors through /proc.
+"""
+import errno
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+try:
+    _TEXT_TYPES = (str, unicode)  # pylint: disable=undefined-variable
+    _INTEGER_TYPES = (int, long)  # pylint: disable=undefined-variable
+except NameError:
+    _TEXT_TYPES = (str,)
+    _INTEGER_TYPES = (int,)
+
+_JSON_TYPES = (type(None), bool, float, list, tuple, dict) + _TEXT_TYPES + _INTEGER_TYPES
+
+# Options of prctl(2).
+_PR_SET_DUMPABLE = 4
+_PR_SET_CHILD_SUBREAPER = 36
+
+
+class _DevNull(object):
+    """
+    Stand-in for sys.stdout, so that jobs printing can't reach the
+    protocol stream.
+    """
+    def write(self, *args, **kwargs):
+        pass
+
+    def flush(self, *args, **kwargs):
+        pass
+
+
+def _json_safe(globals_dict):
+    """
+    Returns the JSON-safe part of the given globals.
+    """
+    safe_dict = {}
+    for key, value in globals_dict.items():
+        if key == '__builtins__' or not isinstance(value, _JSON_TYPES):
+            continue
+        try:
+            safe_dict[key] = json.loads(json.dumps(value))
+        except Exception:  # pylint: disable=broad-except
+            pass
+    return safe_dict
+
+
+def _set_limits(limits):
+    """
+    Sets the resource limits of the current process, as codejail does.
+    """
+    cpu = limits.get('CPU')
+    if cpu:
+        # A soft limit below the hard one sends a distinctive SIGXCPU.
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    nproc = limits.get('NPROC')
+    if nproc:
+        resource.setrlimit(resource.RLIMIT_NPROC, (nproc, nproc))
+    fsize = limits.get('FSIZE', 0)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+
+
+def _prctl(option, value):
+    """
+    Calls prctl(2) with the given option and value, if available.
+    """
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.prctl(option, value, 0, 0, 0)
+    except (ImportError, AttributeError, OSError):
+        pass
+
+
+def _child_pids():
+    """
+    Returns the ids of the child processes of the worker.
+    """
+    try:
+        with open('/proc/self/task/{}/children'.format(os.getpid())) as children:
+            return [int(pid) for pid in children.read().split()]
+    except (IOError, OSError):
+        pass
+    # Kernels without the children file: look for the children in /proc.
+    pids = []
+    try:
+        names = os.listdir('/proc')
+    except OSError:
+        names = []
+    for name in names:
+        try:
+            with open('/proc/{}/stat'.format(name)) as stat:
+                # The parent id follows the state, after the parenthesized name.
+                if int(stat.read().rsplit(')', 1)[1].split()[1]) == os.getpid():
+                    pids.append(int(name))
+        except (IOError, OSError, ValueError, IndexError):
+            pass
+    return pids
+
+
+def _kill_job_processes(pid):
+    """
+    Kills the process group of the job run by the child `pid`, and any
+    other process left behind by the job, and returns the exit status of
+    the child, which is killed as well if it is still running.
+    """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+    _, status = os.waitpid(pid, 0)
+
+    # The processes which left the group of the job are reparented to the
+    # worker once their parent is killed.
+    while True:
+        try:
+            reaped_pid, _ = os.waitpid(-1, os.WNOHANG)
+        except OSError as error:
+            if error.errno == errno.ECHILD:
+                return status
+            raise
+        if not reaped_pid:
+            for child_pid in _child_pids():
+                try:
+                    os.kill(child_pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            time.sleep(0.001)
+
+
+def _run_job(job):
+    """
+    Runs the given job in the current (child) process and returns its
+    result.
+    """
+    os.chdir(job['dir'])
+    # The warm imports may have already computed the temporary directory
+    # of the tempfile module, so it is replaced as well as TMPDIR.
+    os.environ['TMPDIR'] = tempfile.tempdir = os.path.join(job['dir'], 'tmp')
+    for path in job['python_path']:
+        sys.path.append(path)
+    _set_limits(job['limits'])
+
+    globals_dict = job['globals']
+    try:
+        exec(job['code'], globals_dict)  # pylint: disable=exec-used
+    except BaseException:  # pylint: disable=broad-except
+        return {'error': traceback.format_exc()}
+    return {'globals': _json_safe(globals_dict)}
+
+
+def _read_result(read_fd, realtime):
+    """
+    Returns the line written by the child process to read_fd, which is
+    empty if the child exited without writing it, or None if the child did
+    not write it within realtime seconds.
+
+    The processes started by the job may hold read_fd open, so the result
+    ends with a newline rather than with the end of the file.
+    """
+    chunks = []
+    deadline = time.time() + realtime if realtime else None
+    while True:
+        timeout = max(0, deadline - time.time()) if deadline else None
+        ready, _, _ = select.select([read_fd], [], [], timeout)
+        if not ready:
+            return None
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            return b''
+        chunks.append(chunk)
+        if chunk.endswith(b'\n'):
+            return b''.join(chunks)
+
+
+def _handle_job(job, protocol_fd):
+    """
+    Runs the given job in a forked child and returns its result.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.setpgid(0, 0)
+        # The child must not be able to read later jobs nor write to the
+        # protocol stream.
+        os.close(read_fd)
+        os.close(protocol_fd)
+        devnull_fd = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull_fd, 0)
+        sys.stdout = _DevNull()
+        try:
+            result = _run_job(job)
+            data = (json.dumps(result) + '\n').encode('utf-8')
+            while data:
+                data = data[os.write(write_fd, data):]
+        finally:
+            os._exit(0)  # pylint: disable=protected-access
+
+    os.close(write_fd)
+    try:
+        # Also set by the child, whichever runs first.
+        os.setpgid(pid, pid)
+    except OSError:
+        pass
+    try:
+        data = _read_result(read_fd, job['limits'].get('REALTIME'))
+    finally:
+        os.close(read_fd)
+        status = _kill_job_processes(pid)
+
+    if data is None:
+        return {'error': 'Jailed code exceeded its real time limit.'}
+    if not data:
+        return {'error': 'Jailed code exited with status {}.'.format(status)}
+    # The job's code can write to the result pipe as well.
+    try:
+        result = json.loads(data.decode('utf-8'))
+    except ValueError:
+        result = None
+    if not isinstance(result, dict):
+        return {'error': 'Jailed code sent an invalid result.'}
+    return result
+
+
+def main(warm_imports):
+    """
+    Runs the worker's main loop until stdin is closed.
+    """
+    # Keep the original stdout for the protocol, and point file
+    # descriptor 1 at stderr so that stray output can't corrupt it.
+    protocol_fd = os.dup(1)
+    os.dup2(2, 1)
+    _prctl(_PR_SET_DUMPABLE, 0)
+    _prctl(_PR_SET_CHILD_SUBREAPER, 1)
+
+    for module_name in warm_imports:
+        try:
+            __import__(module_name)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def respond(response):
+        """
+        Writes the given response to the protocol stream.
+        """
+        # Jobs run in forked children, so the memory they use is reported
+        # along with the worker's own.
+        response['rss'] = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        ) * 1024
+        data = (json.dumps(response) + '\n').encode('utf-8')
+        while data:
+            data = data[os.write(protocol_fd, data):]
+
+    respond({'ready': True})
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        job = json.loads(line)
+        nonce = job.pop('nonce', None)
+        response = _handle_job(job, protocol_fd)
+        response['nonce'] = nonce
+        respond(response)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,447 @@
+"""
+A pool of long-lived, pre-warmed sandboxed Python processes.
+
+Running code through codejail.safe_exec starts a new sandboxed Python for
+every execution, which then has to import numpy, scipy and the other
+modules Capa's code assumes.  That start-up cost usually dominates the run
+time of problem code.  The workers in this pool are started once, in the
+same sandbox codejail would use, import those modules up front, and then
+run each job in a forked child of themselves (see worker.py).  Forking
+gives every job a fresh copy of the warm interpreter, so no state is
+shared between jobs, while the parent worker stays clean and is reused.
+
+Workers are recycled after `max_jobs` executions, once their memory use, or
+that of one of their jobs, exceeds `max_memory` bytes, or as soon as they
+misbehave.  Each job is sent with a random nonce which the worker returns
+with its result: a response with another nonce was forged by the code of
+the job, and its worker is killed along with its whole session.
+"""
+
+from __future__ import absolute_import
+
+import binascii
+import json
+import logging
+import os
+import resource
+import select
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+import six
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+
+log = logging.getLogger(__name__)
+
+# The source of the worker's main loop, passed to the sandboxed Python.
+worker_py_file = os.path.join(os.path.dirname(__file__), 'worker.py')
+with open(worker_py_file) as worker_file:
+    worker_py = worker_file.read()
+
+# Extra time given to a worker, on top of the REALTIME limit of its job,
+# before it is considered hung.
+REALTIME_GRACE = 5
+
+# Time given to a new worker to import its modules and report ready.
+STARTUP_TIMEOUT = 60
+
+# The NPROC limit of jobs when codejail's is disabled, since the processes
+# of a job can't be told apart from those of the other jobs of the user.
+DEFAULT_NPROC_LIMIT = 15
+
+
+class WorkerError(Exception):
+    """
+    A sandbox worker failed, as opposed to the code it was running.
+    """
+
+
+class SandboxWorker(object):
+    """
+    A single pre-warmed sandboxed Python process.
+
+    `python_bin` and `user` default to the configuration of codejail's
+    "python" command.
+    """
+    def __init__(self, warm_imports=(), python_bin=None, user=None):
+        if python_bin is None:
+            command = jail_code.COMMANDS['python']
+            cmdline_start = list(command['cmdline_start'])
+            user = command['user']
+        else:
+            cmdline_start = [python_bin, '-E', '-B']
+
+        cmd = []
+        if user:
+            cmd.extend(['sudo', '-u', user])
+        cmd.extend(cmdline_start)
+        cmd.extend(['-c', worker_py])
+        cmd.extend(warm_imports)
+
+        self.jobs = 0
+        self.rss = 0
+        self._user = user
+        self._buffer = b''
+        self._devnull = open(os.devnull, 'wb')
+        self._process = subprocess.Popen(  # pylint: disable=subprocess-popen-preexec-fn
+            cmd, env={}, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=self._devnull, preexec_fn=_set_worker_limits, close_fds=True,
+        )
+        try:
+            self._read_response(time.time() + STARTUP_TIMEOUT)
+        except WorkerError:
+            self.close()
+            raise
+
+    def is_alive(self):
+        """
+        Returns whether the worker process is still running.
+        """
+        return self._process.poll() is None
+
+    def run(self, code, globals_dict, python_path=None, extra_files=None):
+        """
+        Runs `code` with `globals_dict` in the worker, and returns the
+        resulting JSON-safe globals.
+
+        Raises SafeExecException if the code raised an exception or
+        exceeded its limits, and WorkerError if the worker itself failed.
+        """
+        limits = dict(jail_code.LIMITS)
+        limits['NPROC'] = limits.get('NPROC') or DEFAULT_NPROC_LIMIT
+        job_dir = _create_job_dir(python_path or [], extra_files or [])
+        try:
+            nonce = binascii.hexlify(os.urandom(16)).decode('ascii')
+            job = {
+                'nonce': nonce,
+                'code': code,
+                'globals': json_safe(globals_dict),
+                'dir': job_dir,
+                'python_path': [
+                    os.path.join(job_dir, os.path.basename(name)) for name in python_path or []
+                ],
+                'limits': limits,
+            }
+            self._write_job(job)
+            realtime = limits.get('REALTIME') or 0
+            response = self._read_response(time.time() + realtime + REALTIME_GRACE)
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+        if response.pop('nonce', None) != nonce:
+            self.kill()
+            raise WorkerError(u'Worker response did not match its job.')
+        self.jobs += 1
+        if 'error' in response:
+            raise SafeExecException(u"Couldn't execute jailed code: {}".format(response['error']))
+        return response['globals']
+
+    def kill(self):
+        """
+        Kills the worker process, along with the processes of its jobs.
+        """
+        # The worker leads its own session (see _set_worker_limits), which
+        # the process groups of its jobs belong to.
+        cmd = ['pkill', '-9', '-s', str(self._process.pid)]
+        if self._user:
+            cmd = ['sudo', '-u', self._user] + cmd
+        try:
+            subprocess.call(cmd, stdout=self._devnull, stderr=self._devnull)
+        except OSError:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        if self.is_alive():
+            self._process.kill()
+
+    def close(self):
+        """
+        Stops the worker process.
+        """
+        if self.is_alive():
+            try:
+                self._process.stdin.close()
+                _wait_for_exit(self._process, REALTIME_GRACE)
+            except (IOError, OSError):
+                pass
+            if self.is_alive():
+                self.kill()
+        self._process.wait()
+        self._process.stdout.close()
+        self._devnull.close()
+
+    def _write_job(self, job):
+        """
+        Sends a job to the worker process.
+        """
+        try:
+            self._process.stdin.write((json.dumps(job) + '\n').encode('utf-8'))
+            self._process.stdin.flush()
+        except (IOError, OSError) as error:
+            raise WorkerError(u'Could not send job to worker: {}'.format(error))
+
+    def _read_response(self, deadline):
+        """
+        Returns the next response from the worker process, waiting until
+        `deadline` at most.
+        """
+        stdout_fd = self._process.stdout.fileno()
+        while b'\n' not in self._buffer:
+            timeout = deadline - time.time()
+            if timeout <= 0 or not select.select([stdout_fd], [], [], timeout)[0]:
+                raise WorkerError(u'Worker did not respond in time.')
+            chunk = os.read(stdout_fd, 65536)
+            if not chunk:
+                raise WorkerError(u'Worker exited unexpectedly.')
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        try:
+            response = json.loads(line.decode('utf-8'))
+        except ValueError:
+            self.kill()
+            raise WorkerError(u'Worker sent an invalid response.')
+        self.rss = response.pop('rss', 0)
+        return response
+
+
+class SandboxWorkerPool(object):
+    """
+    A pool of up to `size` SandboxWorkers.
+
+    Workers are started on demand, or ahead of time by `warm`, and
+    replaced in the background when they are recycled.
+    """
+    def __init__(self, size, warm_imports=(), max_jobs=None, max_memory=None, python_bin=None, user=None):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_memory = max_memory
+        self._worker_kwargs = {'warm_imports': list(warm_imports), 'python_bin': python_bin, 'user': user}
+        self._condition = threading.Condition()
+        self._idle_workers = []
+        self._num_workers = 0
+        self._closed = False
+
+    def warm(self):
+        """
+        Starts all the workers of the pool that aren't yet running.
+        """
+        with self._condition:
+            num_missing = self.size - self._num_workers
+            self._num_workers += num_missing
+        for __ in range(num_missing):
+            self._start_worker()
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Executes `code` in one of the pool's workers, updating
+        `globals_dict` as codejail.safe_exec.safe_exec does.
+        """
+        worker = self._acquire()
+        recycle = True
+        try:
+            globals_dict.update(worker.run(code, globals_dict, python_path, extra_files))
+            recycle = False
+        except SafeExecException:
+            recycle = False
+            raise
+        except WorkerError as error:
+            log.warning(u'Sandbox worker failed running %s: %s', slug, error)
+            raise SafeExecException(u"Couldn't execute jailed code: {}".format(error))
+        finally:
+            self._release(worker, recycle)
+
+    def close(self):
+        """
+        Stops all the idle workers of the pool, and any busy worker as
+        soon as it is released.
+        """
+        with self._condition:
+            self._closed = True
+            idle_workers, self._idle_workers = self._idle_workers, []
+            self._num_workers -= len(idle_workers)
+            self._condition.notify_all()
+        for worker in idle_workers:
+            worker.close()
+
+    def _acquire(self):
+        """
+        Returns an idle worker, starting a new one if the pool isn't full,
+        and waiting for one to be released otherwise.
+        """
+        with self._condition:
+            while not self._idle_workers:
+                if self._closed:
+                    raise SafeExecException(u'The sandbox worker pool is closed.')
+                if self._num_workers < self.size:
+                    self._num_workers += 1
+                    break
+                self._condition.wait()
+            else:
+                return self._idle_workers.pop()
+
+        try:
+            return SandboxWorker(**self._worker_kwargs)
+        except Exception:
+            with self._condition:
+                self._num_workers -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker, recycle=False):
+        """
+        Returns `worker` to the pool, or replaces it if it must be
+        recycled.
+        """
+        recycle = (
+            recycle or
+            self._closed or
+            not worker.is_alive() or
+            (self.max_jobs and worker.jobs >= self.max_jobs) or
+            (self.max_memory and worker.rss >= self.max_memory)
+        )
+        if not recycle:
+            with self._condition:
+                self._idle_workers.append(worker)
+                self._condition.notify()
+            return
+
+        worker.close()
+        if self._closed:
+            with self._condition:
+                self._num_workers -= 1
+            return
+        replacement = threading.Thread(target=self._start_worker, name='sandbox-worker-replacement')
+        replacement.daemon = True
+        replacement.start()
+
+    def _start_worker(self):
+        """
+        Starts a worker in a slot already counted in _num_workers, and adds
+        it to the idle workers.
+        """
+        try:
+            worker = SandboxWorker(**self._worker_kwargs)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u'Could not start sandbox worker.')
+            worker = None
+
+        with self._condition:
+            if worker is None or self._closed:
+                self._num_workers -= 1
+            else:
+                self._idle_workers.append(worker)
+            self._condition.notify()
+        if worker is not None and self._closed:
+            worker.close()
+
+
+def _set_worker_limits():
+    """
+    Makes a new worker process the leader of a new session and process
+    group, and sets its VMEM limit, which its jobs inherit.
+    """
+    os.setsid()
+    vmem = jail_code.LIMITS.get('VMEM')
+    if vmem:
+        resource.setrlimit(resource.RLIMIT_AS, (vmem, vmem))
+
+
+def _create_job_dir(python_path, extra_files):
+    """
+    Creates the directory a job runs in, as codejail would create the home
+    directory of the sandboxed process, and returns its path.
+    """
+    job_dir = tempfile.mkdtemp(prefix='codejail-')
+    # Make the directory readable and writable by the sandbox user.
+    os.chmod(job_dir, 0o775)
+    tmp_dir = os.path.join(job_dir, 'tmp')
+    os.mkdir(tmp_dir)
+    os.chmod(tmp_dir, 0o777)
+
+    extra_names = set(name for name, __ in extra_files)
+    for name in python_path:
+        if name in extra_names:
+            continue
+        destination = os.path.join(job_dir, os.path.basename(name))
+        if os.path.isdir(name):
+            shutil.copytree(name, destination)
+        else:
+            shutil.copyfile(name, destination)
+    for name, content in extra_files:
+        if isinstance(content, six.text_type):
+            content = content.encode('utf-8')
+        with open(os.path.join(job_dir, name), 'wb') as extra_file:
+            extra_file.write(content)
+    return job_dir
+
+
+def _wait_for_exit(process, timeout):
+    """
+    Waits up to `timeout` seconds for `process` to exit.
+    """
+    deadline = time.time() + timeout
+    while process.poll() is None and time.time() < deadline:
+        time.sleep(0.01)
+
+
+# The process-wide pool, as configured by `configure`.
+POOL_SETTINGS = {}
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+
+def configure(size, warm_imports=(), max_jobs=None, max_memory=None):
+    """
+    Configures the process-wide pool used by `pool_safe_exec`.  A `size`
+    of 0 disables the pool.
+    """
+    global _POOL  # pylint: disable=global-statement
+    with _POOL_LOCK:
+        POOL_SETTINGS.clear()
+        POOL_SETTINGS.update({
+            'size': size,
+            'warm_imports': list(warm_imports),
+            'max_jobs': max_jobs,
+            'max_memory': max_memory,
+        })
+        if _POOL is not None and _POOL_PID == os.getpid():
+            _POOL.close()
+        _POOL = None
+
+
+def is_enabled():
+    """
+    Returns whether the process-wide pool is configured and codejail can
+    run sandboxed Python.
+    """
+    return POOL_SETTINGS.get('size', 0) > 0 and jail_code.is_configured('python')
+
+
+def get_pool():
+    """
+    Returns the process-wide pool, creating it if needed.
+
+    Forked processes, such as the workers of a pre-forking web server,
+    don't share the pool of their parent but create their own.
+    """
+    global _POOL, _POOL_PID  # pylint: disable=global-statement
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = SandboxWorkerPool(**POOL_SETTINGS)
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+def pool_safe_exec(code, globals_dict, python_path=None, extra_files=None, slug=None):
+    """
+    Executes `code` in the process-wide pool.  Has the same signature as
+    the codejail.safe_exec functions.
+    """
+    get_pool().safe_exec(code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug)
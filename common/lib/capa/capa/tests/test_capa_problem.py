@@ -12,6 +12,7 @@ from lxml import etree
 from markupsafe import Markup
 from mock import patch
 
+from capa.capa_problem import PROBLEM_TEMPLATES
 from capa.tests.helpers import new_loncapa_problem
 from openedx.core.djangolib.markup import HTML
 
@@ -719,3 +720,42 @@ class CAPAProblemReportHelpersTest(unittest.TestCase):
             """
         )
         self.assertEquals(problem.find_answer_text('1_2_1', 'hide'), 'hide')
+
+
+class ProblemTemplateTest(unittest.TestCase):
+    """
+    Test that problems built from the same definition share its parsed template.
+    """
+    xml = textwrap.dedent("""
+        <problem>
+            <optionresponse>
+                <optioninput label="Color">
+                    <option correct="True">blue</option>
+                    <option correct="False">green</option>
+                </optioninput>
+            </optionresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(ProblemTemplateTest, self).setUp()
+        PROBLEM_TEMPLATES.clear()
+        self.addCleanup(PROBLEM_TEMPLATES.clear)
+
+    def test_template_reused(self):
+        first = new_loncapa_problem(self.xml, seed=1)
+        second = new_loncapa_problem(self.xml, seed=2)
+        self.assertEqual((PROBLEM_TEMPLATES.misses, PROBLEM_TEMPLATES.hits), (1, 1))
+        self.assertEqual(first.get_html(), second.get_html())
+
+        new_loncapa_problem(self.xml.replace('blue', 'red'))
+        self.assertEqual((PROBLEM_TEMPLATES.misses, PROBLEM_TEMPLATES.hits), (2, 1))
+
+    def test_trees_not_shared(self):
+        first = new_loncapa_problem(self.xml)
+        # The compatibility translation is part of the template.
+        self.assertEqual(first.tree.find('.//optioninput').get('correct'), 'blue')
+        first.tree.find('.//optionresponse').set('modified', 'true')
+
+        second = new_loncapa_problem(self.xml)
+        self.assertIsNone(second.tree.find('.//optionresponse').get('modified'))
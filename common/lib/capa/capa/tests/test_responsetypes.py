@@ -23,6 +23,7 @@ from six import text_type
 
 import calc
 from capa.correctmap import CorrectMap
+from capa.safe_exec.tests.test_safe_exec import DictCache
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from capa.tests.helpers import load_fixture, new_loncapa_problem, test_capa_system
 from capa.tests.response_xml_factory import (
@@ -2059,6 +2060,43 @@ class CustomResponseTest(ResponseTest):  # pylint: disable=missing-docstring
         self.assertEqual(correctness, 'incorrect')
         self.assertEqual(msg, "Message text")
 
+    def test_prefill_check_function_cache(self):
+        script = textwrap.dedent("""\
+                    def check_func(expect, answer_given, options):
+                        return {'ok': answer_given == expect, 'msg': options}
+                    """)
+        capa_system = test_capa_system()
+        capa_system.cache = DictCache({})
+        problem = self.build_problem(
+            script=script,
+            cfn="check_func",
+            expect="42",
+            options="xyzzy",
+            cfn_extra_args="options",
+            capa_system=capa_system,
+        )
+
+        cache = capa_system.cache.cache
+        script_keys = set(cache)
+        problem.prefill_check_function_cache([{'1_2_1': '42'}, {'1_2_1': '0'}, {'1_2_1': ''}, {}])
+        # One result per non-empty answer.
+        check_keys = set(cache) - script_keys
+        self.assertEqual(len(check_keys), 2)
+
+        correct_map = problem.grade_answers({'1_2_1': '42'})
+        self.assertEqual(correct_map.get_correctness('1_2_1'), 'correct')
+        self.assertEqual(correct_map.get_msg('1_2_1'), 'xyzzy')
+        correct_map = problem.grade_answers({'1_2_1': '0'})
+        self.assertEqual(correct_map.get_correctness('1_2_1'), 'incorrect')
+        self.assertEqual(set(cache) - script_keys, check_keys)
+
+        # Fiddle with the cache, to check that grading uses it.
+        for key in check_keys:
+            cache[key] = (None, {'cfn_return': {'ok': True, 'msg': 'cached'}})
+        correct_map = problem.grade_answers({'1_2_1': '0'})
+        self.assertEqual(correct_map.get_correctness('1_2_1'), 'correct')
+        self.assertEqual(correct_map.get_msg('1_2_1'), 'cached')
+
     def test_function_code_with_attempt_number(self):
         script = textwrap.dedent("""\
                     def gradeit(expect, ans, **kwargs):
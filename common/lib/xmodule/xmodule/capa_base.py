@@ -1592,6 +1592,14 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
 
     # ScorableXBlockMixin methods
 
+    def prefill_check_function_cache(self, student_answers_list):
+        """
+        Evaluates the check functions of this problem, in batches, for the
+        answers saved by other learners sharing this problem's seed, so that
+        rescoring them doesn't run their check functions one at a time.
+        """
+        self.lcp.prefill_check_function_cache(student_answers_list)
+
     def rescore(self, only_if_higher=False):
         """
         Checks whether the existing answers to a problem are correct.
@@ -21,7 +21,8 @@ STATIC_CONTENT_VERSION = 1
 XASSET_LOCATION_TAG = 'c4x'
 XASSET_SRCREF_PREFIX = 'xasset:'
 XASSET_THUMBNAIL_TAIL_NAME = '.jpg'
-STREAM_DATA_CHUNK_SIZE = 1024
+# The default chunk size of GridFS, so that each read of a stream maps to a single chunk
+STREAM_DATA_CHUNK_SIZE = 255 * 1024
 VERSIONED_ASSETS_PREFIX = '/assets/courseware'
 VERSIONED_ASSETS_PATTERN = r'/assets/courseware/(v[\d]/)?([a-f0-9]{32})'
 
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Commandline tool comparing the split modulestore queries about the tree of a
+structure answered by scanning all of its blocks, as they used to be, with
+the same queries answered by its StructureIndex.
+
+Example usage:
+    $ python -m xmodule.modulestore.perf_tests.benchmark_structure_index --num-blocks 10000 --queries 100
+"""
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import timeit
+from collections import defaultdict
+
+import six
+from bson.objectid import ObjectId
+from six.moves import range
+
+from xmodule.modulestore.split_mongo.mongo_connection import structure_from_mongo
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, get_structure_index
+
+
+def create_synthetic_structure(num_blocks):
+    """
+    Returns a structure, as read from mongo, with approximately num_blocks
+    blocks, shaped like a course of chapters, sequentials, verticals and
+    problems, along with a few orphans.
+    """
+    blocks = []
+
+    def add_block(block_type, position, children=()):
+        """
+        Adds a block of the given type and children, and returns its [block_type, block_id].
+        """
+        block_id = u'{}_{}'.format(block_type, u'_'.join(six.text_type(index) for index in position))
+        blocks.append({
+            'block_type': block_type,
+            'block_id': block_id,
+            'definition': ObjectId(),
+            'fields': {'children': list(children), 'display_name': block_id},
+            'edit_info': {},
+        })
+        return [block_type, block_id]
+
+    # Each chapter holds 10 sequentials of 4 verticals of 5 problems.
+    blocks_per_chapter = 1 + 10 * (1 + 4 * (1 + 5))
+    chapters = []
+    for chapter in range(max(1, num_blocks // blocks_per_chapter)):
+        sequentials = []
+        for sequential in range(10):
+            verticals = []
+            for vertical in range(4):
+                problems = [add_block(u'problem', [chapter, sequential, vertical, problem]) for problem in range(5)]
+                verticals.append(add_block(u'vertical', [chapter, sequential, vertical], problems))
+            sequentials.append(add_block(u'sequential', [chapter, sequential], verticals))
+        chapters.append(add_block(u'chapter', [chapter], sequentials))
+    for orphan in range(10):
+        add_block(u'html', [u'orphan', orphan])
+    root = add_block(u'course', [u'course'], chapters)
+
+    return {
+        '_id': ObjectId(),
+        'root': root,
+        'blocks': blocks,
+    }
+
+
+def scan_parents(structure, block_key):
+    """
+    Finds the parents of the block by scanning all the blocks of the structure.
+    """
+    return [
+        parent_key
+        for parent_key, block in six.iteritems(structure['blocks'])
+        if block_key in block.fields.get('children', [])
+    ]
+
+
+def scan_block_type(structure, block_type):
+    """
+    Finds the blocks of the given type by scanning all the blocks of the structure.
+    """
+    return [block_key for block_key, block in six.iteritems(structure['blocks']) if block.block_type == block_type]
+
+
+def scan_has_path_to_root(structure, block_key):
+    """
+    Checks whether the block has a path to the root by mapping all the blocks
+    of the structure to their parents first.
+    """
+    parents = defaultdict(list)
+    for parent_key, block in six.iteritems(structure['blocks']):
+        for child_key in block.fields.get('children', []):
+            parents[child_key].append(parent_key)
+
+    def has_path(block_key):
+        """
+        Checks recursively whether the block has a path to the root.
+        """
+        if not parents[block_key]:
+            return block_key.type == 'course'
+        return any(has_path(parent_key) for parent_key in parents[block_key])
+
+    return has_path(block_key)
+
+
+def scan_orphans(structure):
+    """
+    Finds the orphans of the structure by scanning all of its blocks.
+    """
+    orphans = set(structure['blocks'].keys())
+    orphans.remove(structure['root'])
+    for block in six.itervalues(structure['blocks']):
+        orphans.difference_update(block.fields.get('children', []))
+    return orphans
+
+
+def _comparable(results):
+    """
+    Returns the results of a query, with the lists of block keys sorted.
+    """
+    return [sorted(result) if isinstance(result, (list, set, tuple)) else result for result in results]
+
+
+def best_time(function, iterations):
+    """
+    Returns the best time, in ms, of the given function.
+    """
+    return min(timeit.repeat(function, number=1, repeat=iterations)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the queries about the tree of split structures')
+    parser.add_argument("--num-blocks", required=False, type=int, default=10000)
+    parser.add_argument("--queries", required=False, type=int, default=100)
+    parser.add_argument("--iterations", required=False, type=int, default=3)
+    args = parser.parse_args()
+
+    structure = structure_from_mongo(create_synthetic_structure(args.num_blocks))
+    index = get_structure_index(structure)
+    problem_keys = index.get_block_keys(block_type=u'problem')[:args.queries]
+    print("{} blocks, {} queries of each kind".format(len(index), len(problem_keys)))
+
+    print("{:>20} {:>12} {:>12} {:>10}".format("query", "scan (ms)", "index (ms)", "speedup"))
+    print("{:>20} {:>12} {:>12.1f}".format(
+        "build index", "", best_time(lambda: StructureIndex(structure), args.iterations),
+    ))
+    comparisons = (
+        (
+            "get_parent_location",
+            lambda: [scan_parents(structure, block_key) for block_key in problem_keys],
+            lambda: [index.get_parents(block_key) for block_key in problem_keys],
+        ),
+        (
+            "get_items(category)",
+            lambda: [scan_block_type(structure, u'vertical') for __ in problem_keys],
+            lambda: [index.get_block_keys(block_type=u'vertical') for __ in problem_keys],
+        ),
+        (
+            "has_path_to_root",
+            lambda: [scan_has_path_to_root(structure, block_key) for block_key in problem_keys],
+            lambda: [index.has_path_to_root(block_key) for block_key in problem_keys],
+        ),
+        (
+            "get_orphans",
+            lambda: [scan_orphans(structure) for __ in problem_keys],
+            lambda: [index.get_orphans() for __ in problem_keys],
+        ),
+    )
+    for name, scan, lookup in comparisons:
+        assert _comparable(scan()) == _comparable(lookup()), name
+        scan_time = best_time(scan, args.iterations)
+        index_time = best_time(lookup, args.iterations)
+        print("{:>20} {:>12.1f} {:>12.1f} {:>9.0f}x".format(name, scan_time, index_time, scan_time / index_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,7 @@ from xmodule.modulestore.inheritance import InheritanceMixin, inheriting_field_d
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.split_mongo.definition_lazy_loader import DefinitionLazyLoader
 from xmodule.modulestore.split_mongo.id_manager import SplitMongoIdManager
+from xmodule.modulestore.split_mongo.mongo_connection import LazyBlockMap
 from xmodule.modulestore.split_mongo.split_mongo_kvs import SplitMongoKVS
 from xmodule.x_module import XModuleMixin
 
@@ -91,8 +92,16 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
     @contract(returns="dict(BlockKey: BlockKey)")
     def _parent_map(self):
         parent_map = {}
-        for block_key, block in six.iteritems(self.course_entry.structure['blocks']):
-            for child in block.fields.get('children', []):
+        blocks = self.course_entry.structure['blocks']
+        if isinstance(blocks, LazyBlockMap):
+            # Avoid decoding every block of the structure just to find parents.
+            block_children = blocks.iter_children()
+        else:
+            block_children = (
+                (block_key, block.fields.get('children', [])) for block_key, block in six.iteritems(blocks)
+            )
+        for block_key, children in block_children:
+            for child in children:
                 parent_map[child] = block_key
         return parent_map
 
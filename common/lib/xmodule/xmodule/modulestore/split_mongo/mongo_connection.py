@@ -3,11 +3,13 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 """
 from __future__ import absolute_import
 
+import copy
 import datetime
 import logging
 import math
 import re
 import zlib
+from collections import MutableMapping
 from contextlib import contextmanager
 from time import time
 
@@ -20,12 +22,14 @@ from mongodb_proxy import autoretry_read
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
+from openedx.core.lib.cache_utils import LRUCache
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -142,6 +146,167 @@ class QueryTimer(object):
 TIMER = QueryTimer(__name__, 0.01)
 
 
+def block_from_mongo(block):
+    """
+    Converts a single block document (without its 'block_id') to a BlockData,
+    converting 'fields.children' from [[block_type, block_id]] to [BlockKey].
+    """
+    if 'children' in block['fields']:
+        block['fields']['children'] = [BlockKey(*child) for child in block['fields']['children']]
+    return BlockData(**block)
+
+
+class LazyBlockMap(MutableMapping):
+    """
+    A map {BlockKey: BlockData} of the blocks of a structure, which keeps
+    the raw block documents read from mongo and only converts a block to
+    a BlockData when that block is accessed.
+
+    Looking up, adding or removing single blocks leaves the other blocks
+    undecoded, so a request which touches a handful of blocks doesn't pay
+    for converting the whole structure. Any operation over all the blocks
+    (iteration, comparison, copying into a plain dict, ...) decodes all of
+    them first.
+
+    This is not a dict subclass, so that no C fast path of dict can read
+    the decoded blocks while skipping the undecoded ones.
+    """
+    __slots__ = ('_blocks', '_raw_blocks')
+
+    def __init__(self, raw_blocks=()):
+        """
+        Arguments:
+            raw_blocks: an iterable of block documents, as stored in mongo.
+        """
+        # Decoded blocks, keyed by BlockKey.
+        self._blocks = {}
+        # Undecoded block documents, keyed by (block_type, block_id). Plain
+        # tuples hash and compare equal to the equivalent BlockKeys.
+        self._raw_blocks = {
+            (block['block_type'], block.pop('block_id')): block
+            for block in raw_blocks
+        }
+
+    @property
+    def num_undecoded(self):
+        """
+        The number of blocks which haven't been converted to BlockData yet.
+        """
+        return len(self._raw_blocks)
+
+    def __getitem__(self, key):
+        try:
+            return self._blocks[key]
+        except KeyError:
+            return self._decode(key)
+
+    def __contains__(self, key):
+        return key in self._blocks or key in self._raw_blocks
+
+    def __len__(self):
+        return len(self._blocks) + len(self._raw_blocks)
+
+    def __iter__(self):
+        self.decode_all()
+        return iter(self._blocks)
+
+    def __setitem__(self, key, value):
+        self._raw_blocks.pop(key, None)
+        self._blocks[key] = value
+
+    def __delitem__(self, key):
+        if self._raw_blocks.pop(key, None) is None:
+            del self._blocks[key]
+
+    def clear(self):
+        self._raw_blocks.clear()
+        self._blocks.clear()
+
+    def copy(self):
+        """
+        Returns a plain dict of all the blocks.
+        """
+        self.decode_all()
+        return self._blocks.copy()
+
+    if six.PY2:
+        has_key = __contains__
+
+    def __eq__(self, other):
+        if isinstance(other, LazyBlockMap):
+            other = other.copy()
+        return self.copy() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def iter_children(self):
+        """
+        Yields (BlockKey, [child BlockKey]) pairs for all the blocks, without
+        converting the undecoded blocks to BlockData.
+        """
+        # Blocks decoded by other threads are stored before their documents are
+        # dropped, so copying the documents first misses none of the blocks.
+        raw_blocks = self._raw_blocks.copy()
+        decoded_blocks = self._blocks.copy()
+        for key, block_data in six.iteritems(decoded_blocks):
+            yield key, block_data.fields.get('children', [])
+        for key, raw_block in six.iteritems(raw_blocks):
+            if key not in decoded_blocks:
+                yield BlockKey(*key), [BlockKey(*child) for child in raw_block['fields'].get('children', [])]
+
+    def decode_all(self):
+        """
+        Converts all the remaining block documents to BlockData.
+        """
+        for key in list(self._raw_blocks):
+            self._decode(key)
+
+    def _decode(self, key):
+        """
+        Converts the block document for ``key`` to BlockData, and returns it.
+        """
+        try:
+            raw_block = self._raw_blocks[key]
+        except KeyError:
+            # The block may have just been decoded by another thread, which
+            # always stores the decoded block before dropping the raw one.
+            return self._blocks[key]
+        block_data = block_from_mongo(raw_block)
+        self._blocks[BlockKey(*key)] = block_data
+        self._raw_blocks.pop(key, None)
+        return block_data
+
+    def __reduce__(self):
+        # Keep the undecoded blocks undecoded when pickled (e.g. by CourseStructureCache).
+        return (_unpickle_lazy_block_map, (self._blocks, self._raw_blocks))
+
+    def __copy__(self):
+        return _unpickle_lazy_block_map(self._blocks.copy(), self._raw_blocks.copy())
+
+    def __deepcopy__(self, memo):
+        new_map = LazyBlockMap()
+        memo[id(self)] = new_map
+        new_map._blocks = copy.deepcopy(self._blocks, memo)  # pylint: disable=protected-access
+        new_map._raw_blocks = copy.deepcopy(self._raw_blocks, memo)  # pylint: disable=protected-access
+        return new_map
+
+
+def _unpickle_lazy_block_map(decoded_blocks, raw_blocks):
+    """
+    Rebuilds a pickled LazyBlockMap.
+    """
+    block_map = LazyBlockMap()
+    block_map._blocks = decoded_blocks  # pylint: disable=protected-access
+    block_map._raw_blocks = raw_blocks  # pylint: disable=protected-access
+    return block_map
+
+
 def structure_from_mongo(structure, course_context=None):
     """
     Converts the 'blocks' key from a list [block_data] to a map
@@ -150,6 +315,9 @@ def structure_from_mongo(structure, course_context=None):
     Converts 'blocks.*.fields.children' from [[block_type, block_id]] to [BlockKey].
     N.B. Does not convert any other ReferenceFields (because we don't know which fields they are at this level).
 
+    The blocks map is a :class:`LazyBlockMap`, so each block is only converted
+    when it is first accessed.
+
     Arguments:
         structure: The document structure to convert
         course_context (CourseKey): For metrics gathering, the CourseKey
@@ -165,12 +333,7 @@ def structure_from_mongo(structure, course_context=None):
                 check('list(list[2])', block['fields']['children'])
 
         structure['root'] = BlockKey(*structure['root'])
-        new_blocks = {}
-        for block in structure['blocks']:
-            if 'children' in block['fields']:
-                block['fields']['children'] = [BlockKey(*child) for child in block['fields']['children']]
-            new_blocks[BlockKey(block['block_type'], block.pop('block_id'))] = BlockData(**block)
-        structure['blocks'] = new_blocks
+        structure['blocks'] = LazyBlockMap(structure['blocks'])
 
         return structure
 
@@ -187,7 +350,7 @@ def structure_to_mongo(structure, course_context=None):
         tagger.measure('blocks', len(structure['blocks']))
 
         check('BlockKey', structure['root'])
-        check('dict(BlockKey: BlockData)', structure['blocks'])
+        check('map(BlockKey: BlockData)', structure['blocks'])
         for block in six.itervalues(structure['blocks']):
             if 'children' in block.fields:
                 check('list(BlockKey)', block.fields['children'])
@@ -204,11 +367,30 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+# Since structures are immutable by their id, the cached structures are shared
+# by all callers. They are sized in bytes.
+_LOCAL_STRUCTURE_CACHE = LRUCache(0)
+
+
+def get_local_structure_cache():
+    """
+    Return the process-local structure cache, sized per the
+    COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES setting.
+    """
+    max_size = getattr(settings, 'COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES', 0) if DJANGO_AVAILABLE else 0
+    if max_size != _LOCAL_STRUCTURE_CACHE.max_size:
+        _LOCAL_STRUCTURE_CACHE.resize(max_size)
+    return _LOCAL_STRUCTURE_CACHE
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    A process-local LRU tier (see :class:`openedx.core.lib.cache_utils.LRUCache`) sits in front
+    of the django cache, which remains the tier shared between processes.
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
@@ -219,6 +401,7 @@ class CourseStructureCache(object):
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+        self.local_cache = get_local_structure_cache()
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
@@ -226,6 +409,12 @@ class CourseStructureCache(object):
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            structure = self.local_cache.get(key) if self.local_cache.max_size else None
+            tagger.tag(from_local_cache=str(structure is not None).lower())
+            if structure is not None:
+                self._measure_local_cache(tagger)
+                return structure
+
             compressed_pickled_data = self.cache.get(key)
             tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
@@ -239,7 +428,9 @@ class CourseStructureCache(object):
             pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            return pickle.loads(pickled_data)
+            structure = pickle.loads(pickled_data)
+            self._set_local(key, structure, len(pickled_data), tagger)
+            return structure
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
@@ -256,6 +447,24 @@ class CourseStructureCache(object):
 
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
+            self._set_local(key, structure, len(pickled_data), tagger)
+
+    def _set_local(self, key, structure, size, tagger):
+        """
+        Add the structure to the process-local cache, if it is enabled.
+        """
+        if self.local_cache.max_size:
+            self.local_cache.set(key, structure, size)
+            self._measure_local_cache(tagger)
+
+    def _measure_local_cache(self, tagger):
+        """
+        Record the process-local cache's counters on the given tagger.
+        """
+        tagger.measure('local_cache_size', self.local_cache.size)
+        tagger.measure('local_cache_hits', self.local_cache.hits)
+        tagger.measure('local_cache_misses', self.local_cache.misses)
+        tagger.measure('local_cache_evictions', self.local_cache.evictions)
 
 
 class MongoConnection(object):
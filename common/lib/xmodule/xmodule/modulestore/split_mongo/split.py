@@ -104,6 +104,7 @@ from xmodule.modulestore.exceptions import (
 )
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.split_mongo.mongo_connection import DuplicateKeyError, MongoConnection
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, get_structure_index
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.partitions.partitions_service import PartitionService
 
@@ -811,12 +812,17 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 definitions = {definition['_id']: definition
                                for definition in descendent_definitions}
 
-                for block in six.itervalues(new_module_data):
+                for block_key, block in list(new_module_data.items()):
                     if block.definition in definitions:
                         definition = definitions[block.definition]
+                        # The blocks of structures are shared by all the readers of the structure caches,
+                        # so the definition is loaded into a copy of the block rather than the block itself.
+                        block = copy.copy(block)
+                        block.fields = dict(block.fields)
                         # convert_fields gets done later in the runtime's xblock_from_json
                         block.fields.update(definition.get('fields'))
                         block.definition_loaded = True
+                        new_module_data[block_key] = block
 
             system.module_data.update(new_module_data)
             return system.module_data
@@ -1272,6 +1278,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return []
 
         course = self._lookup_course(course_locator)
+        structure_index = self._get_structure_index(course)
+        blocks = course.structure['blocks']
         items = []
         qualifiers = qualifiers.copy() if qualifiers else {}  # copy the qualifiers (destructively manipulated here)
 
@@ -1295,20 +1303,19 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'name' in qualifiers:
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
-            block_ids = []
-            for block_id, block in six.iteritems(course.structure['blocks']):
-                # Don't do an in comparison blindly; first check to make sure
-                # that the name qualifier we're looking at isn't a plain string;
-                # if it is a string, then it should match exactly. If it's other
-                # than a string, we check whether it contains the block ID; this
-                # is so a list or other iterable can be passed with multiple
-                # valid qualifiers.
-                if isinstance(block_name, six.string_types):
-                    name_matches = block_id.id == block_name
-                else:
-                    name_matches = block_id.id in block_name
-                if name_matches and _block_matches_all(block):
-                    block_ids.append(block_id)
+            # Don't do an in comparison blindly; first check to make sure
+            # that the name qualifier we're looking at isn't a plain string;
+            # if it is a string, then it should match exactly. If it's other
+            # than a string, we check whether it contains the block ID; this
+            # is so a list or other iterable can be passed with multiple
+            # valid qualifiers.
+            if isinstance(block_name, six.string_types):
+                named_block_ids = structure_index.get_block_keys(block_id=block_name)
+            else:
+                named_block_ids = [
+                    block_id for block_id in structure_index.get_block_keys() if block_id.id in block_name
+                ]
+            block_ids = [block_id for block_id in named_block_ids if _block_matches_all(blocks[block_id])]
 
             return self._load_items(course, block_ids, **kwargs)
 
@@ -1319,20 +1326,19 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
-        path_cache = None
-        parents_cache = None
-
-        if not include_orphans:
-            path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+        # Only look at the blocks of the right type, when there's a single one
+        block_type = qualifiers.get('block_type')
+        if isinstance(block_type, six.string_types):
+            block_ids = structure_index.get_block_keys(block_type=block_type)
+        else:
+            block_ids = structure_index.get_block_keys()
 
-        for block_id, value in six.iteritems(course.structure['blocks']):
-            if _block_matches_all(value):
+        for block_id in block_ids:
+            if _block_matches_all(blocks[block_id]):
                 if not include_orphans:
                     if (  # pylint: disable=bad-continuation
                         block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
+                        structure_index.has_path_to_root(block_id)
                     ):
                         items.append(block_id)
                 else:
@@ -1343,60 +1349,27 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         else:
             return []
 
-    def build_block_key_to_parents_mapping(self, structure):
-        """
-        Given a structure, builds block_key to parents mapping for all block keys in structure
-        and returns it
-
-        :param structure: db json of course structure
-
-        :return dict: a dictionary containing mapping of block_keys against their parents.
-        """
-        children_to_parents = defaultdict(list)
-        for parent_key, value in six.iteritems(structure['blocks']):
-            for child_key in value.fields.get('children', []):
-                children_to_parents[child_key].append(parent_key)
-
-        return children_to_parents
-
-    def has_path_to_root(self, block_key, course, path_cache=None, parents_cache=None):
+    def has_path_to_root(self, block_key, course):
         """
-        Check recursively if an xblock has a path to the course root
+        Check if an xblock has a path to the course root
 
         :param block_key: BlockKey of the component whose path is to be checked
         :param course: actual db json of course from structures
-        :param path_cache: a dictionary that records which modules have a path to the root so that we don't have to
-        double count modules if we're computing this for a list of modules in a course.
-        :param parents_cache: a dictionary containing mapping of block_key to list of its parents. Optionally, this
-        should be built for course structure to make this method faster.
 
         :return Bool: whether or not component has path to the root
         """
+        return self._get_structure_index(course).has_path_to_root(block_key)
 
-        if path_cache and block_key in path_cache:
-            return path_cache[block_key]
-
-        if parents_cache is None:
-            xblock_parents = self._get_parents_from_structure(block_key, course.structure)
-        else:
-            xblock_parents = parents_cache[block_key]
-
-        if len(xblock_parents) == 0 and block_key.type in ["course", "library"]:
-            # Found, xblock has the path to the root
-            if path_cache is not None:
-                path_cache[block_key] = True
-
-            return True
-
-        has_path = any(
-            self.has_path_to_root(xblock_parent, course, path_cache, parents_cache)
-            for xblock_parent in xblock_parents
-        )
-
-        if path_cache is not None:
-            path_cache[block_key] = has_path
-
-        return has_path
+    def _get_structure_index(self, course):
+        """
+        Returns the StructureIndex of the structure of the given course envelope.
+        Indexes are cached per structure, except those of the structures being
+        edited in a bulk operation, since they may still change.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course.course_key)
+        if bulk_write_record.active and course.structure['_id'] not in bulk_write_record.structures_in_db:
+            return StructureIndex(course.structure)
+        return get_structure_index(course.structure)
 
     def get_parent_location(self, locator, **kwargs):
         """
@@ -1411,14 +1384,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        structure_index = self._get_structure_index(course)
+        all_parent_ids = structure_index.get_parents(BlockKey.from_usage_key(locator))
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
         parent_ids = [
             valid_parent
             for valid_parent in all_parent_ids
-            if self.has_path_to_root(valid_parent, course)
+            if structure_index.has_path_to_root(valid_parent)
         ]
 
         if len(parent_ids) == 0:
@@ -1442,16 +1416,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
         course = self._lookup_course(course_key)
-        items = set(course.structure['blocks'].keys())
-        items.remove(course.structure['root'])
-        blocks = course.structure['blocks']
-        for block_id, block_data in six.iteritems(blocks):
-            items.difference_update(BlockKey(*child) for child in block_data.fields.get('children', []))
-            if block_data.block_type in detached_categories:
-                items.discard(block_id)
         return [
             course_key.make_usage_key(block_type=block_id.type, block_id=block_id.id)
-            for block_id in items
+            for block_id in self._get_structure_index(course).get_orphans()
+            if block_id.type not in detached_categories
         ]
 
     def get_course_index_info(self, course_key):
@@ -2717,7 +2685,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
             return result
 
-    @contract(root_block_key=BlockKey, blocks='dict(BlockKey: BlockData)')
+    @contract(root_block_key=BlockKey, blocks='map(BlockKey: BlockData)')
     def _remove_subtree(self, root_block_key, blocks):
         """
         Remove the subtree rooted at root_block_key
@@ -3243,8 +3211,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
     @contract(
         block_key=BlockKey,
-        source_blocks="dict(BlockKey: *)",
-        destination_blocks="dict(BlockKey: *)",
+        source_blocks="map(BlockKey: *)",
+        destination_blocks="map(BlockKey: *)",
         blacklist="list(BlockKey) | str",
     )
     def _copy_subdag(self, user_id, destination_version, block_key, source_blocks, destination_blocks, blacklist):
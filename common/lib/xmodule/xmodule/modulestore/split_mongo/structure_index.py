@@ -0,0 +1,147 @@
+"""
+Indexes of the blocks of split structures, to answer queries about the tree
+of a structure (parents, blocks of a type, orphans, ...) without scanning all
+of its blocks each time.
+
+Structures are immutable once saved, so their indexes are computed once per
+structure id and kept in a process-local LRU cache.
+"""
+from __future__ import absolute_import
+
+from collections import defaultdict
+
+import six
+
+from openedx.core.lib.cache_utils import LRUCache
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import LazyBlockMap
+
+# The maximum total number of blocks of the structures whose indexes are cached.
+STRUCTURE_INDEX_CACHE_MAX_BLOCKS = 500000
+
+# The types of the blocks which are roots when they have no parent.
+ROOT_BLOCK_TYPES = ('course', 'library')
+
+# Cached indexes are sized by their number of blocks, rather than in bytes.
+_STRUCTURE_INDEX_CACHE = LRUCache(STRUCTURE_INDEX_CACHE_MAX_BLOCKS)
+
+
+class StructureIndex(object):
+    """
+    The blocks of a structure, by parent, block type and block id, along with
+    the blocks which have a path to the root.
+
+    An index must not be used once its structure is changed.
+    """
+    __slots__ = ('root', 'block_keys', 'parents', 'block_keys_by_type', 'block_keys_by_id', 'reachable', 'orphans')
+
+    def __init__(self, structure):
+        blocks = structure['blocks']
+        if isinstance(blocks, LazyBlockMap):
+            # Avoid decoding every block of the structure just to index it.
+            block_children = blocks.iter_children()
+        else:
+            block_children = (
+                (block_key, block.fields.get('children', [])) for block_key, block in six.iteritems(blocks)
+            )
+
+        block_keys = []
+        children = {}
+        parents = defaultdict(list)
+        block_keys_by_type = defaultdict(list)
+        block_keys_by_id = defaultdict(list)
+        for block_key, child_keys in block_children:
+            block_keys.append(block_key)
+            children[block_key] = child_keys
+            block_keys_by_type[block_key.type].append(block_key)
+            block_keys_by_id[block_key.id].append(block_key)
+            for child_key in child_keys:
+                parents[BlockKey(*child_key)].append(block_key)
+
+        # The blocks reachable from a root without parents are those with a path to the root.
+        reachable = set()
+        pending = [
+            block_key
+            for block_type in ROOT_BLOCK_TYPES
+            for block_key in block_keys_by_type.get(block_type, [])
+            if block_key not in parents
+        ]
+        while pending:
+            block_key = pending.pop()
+            if block_key not in reachable:
+                reachable.add(block_key)
+                pending.extend(BlockKey(*child_key) for child_key in children.get(block_key, []))
+
+        self.root = structure['root']
+        self.block_keys = tuple(block_keys)
+        self.parents = _freeze(parents)
+        self.block_keys_by_type = _freeze(block_keys_by_type)
+        self.block_keys_by_id = _freeze(block_keys_by_id)
+        self.reachable = frozenset(reachable)
+        self.orphans = tuple(
+            block_key for block_key in block_keys if block_key != self.root and block_key not in parents
+        )
+
+    def __len__(self):
+        return len(self.block_keys)
+
+    def get_parents(self, block_key):
+        """
+        Returns the keys of the blocks which have the given block as a child.
+        """
+        return self.parents.get(block_key, ())
+
+    def get_block_keys(self, block_type=None, block_id=None):
+        """
+        Returns the keys of the blocks of the given type and id, if specified.
+        """
+        if block_id is not None:
+            block_keys = self.block_keys_by_id.get(block_id, ())
+            if block_type is not None:
+                block_keys = tuple(block_key for block_key in block_keys if block_key.type == block_type)
+            return block_keys
+        if block_type is not None:
+            return self.block_keys_by_type.get(block_type, ())
+        return self.block_keys
+
+    def has_path_to_root(self, block_key):
+        """
+        Returns whether the block is a root without parents, or one of its descendants.
+        """
+        return block_key in self.reachable
+
+    def get_orphans(self):
+        """
+        Returns the keys of the blocks, other than the root of the structure, which have no parent.
+        """
+        return self.orphans
+
+
+def _freeze(block_keys_map):
+    """
+    Returns a dict of tuples out of the given dict of lists.
+    """
+    return {key: tuple(block_keys) for key, block_keys in six.iteritems(block_keys_map)}
+
+
+def get_structure_index(structure):
+    """
+    Returns the StructureIndex of the given saved structure, from the cache if
+    it was already computed.
+
+    The structure must not be changed afterwards, so the indexes of structures
+    being edited must be built with StructureIndex(structure) instead.
+    """
+    structure_id = structure['_id']
+    index = _STRUCTURE_INDEX_CACHE.get(structure_id)
+    if index is None:
+        index = StructureIndex(structure)
+        _STRUCTURE_INDEX_CACHE.set(structure_id, index, len(index))
+    return index
+
+
+def clear_structure_index_cache():
+    """
+    Removes all the indexes from the cache.
+    """
+    _STRUCTURE_INDEX_CACHE.clear()
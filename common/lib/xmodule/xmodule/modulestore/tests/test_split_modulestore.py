@@ -15,6 +15,7 @@ import six
 from ccx_keys.locator import CCXBlockUsageLocator
 from contracts import contract
 from django.core.cache import InvalidCacheBackendError, caches
+from django.test.utils import override_settings
 from mock import patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseKey, CourseLocator, LocalId, VersionTree
 from path import Path as path
@@ -36,6 +37,7 @@ from xmodule.modulestore.exceptions import (
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import get_local_structure_cache
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
@@ -1004,6 +1006,42 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @override_settings(COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_course_structure_cache(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        local_cache = get_local_structure_cache()
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the shared cache is no longer consulted once the local cache is warm
+        self.cache.clear()
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        self.assertIs(cached_structure, not_cached_structure)
+        self.assertEqual(local_cache.hits, 1)
+
+    @override_settings(COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_structure_not_mutated(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        local_cache = get_local_structure_cache()
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+        structure = self._get_structure(self.new_course)
+        root_block = structure['blocks'][BlockKey('course', 'course')]
+        root_fields = dict(root_block.fields)
+
+        # loading the definitions of the blocks leaves the shared structure untouched
+        modulestore().get_course(self.new_course.id, depth=None, lazy=False)
+        self.assertEqual(root_block.fields, root_fields)
+        self.assertFalse(root_block.definition_loaded)
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -1432,6 +1470,28 @@ class TestItemCrud(SplitModuleTest):
         chapter = modulestore().get_item(chapter_locator)
         self.assertIn(problem_locator, version_agnostic(chapter.children))
 
+    def test_queries_in_bulk_operations(self):
+        """
+        Test that the structure queries see the changes made earlier in a bulk operation
+        """
+        user = random.getrandbits(32)
+        course_key = CourseLocator('test_org', 'test_queries', 'test_run', branch=BRANCH_NAME_DRAFT)
+        with modulestore().bulk_operations(course_key):
+            new_course = modulestore().create_course('test_org', 'test_queries', 'test_run', user, BRANCH_NAME_DRAFT)
+            self.assertEqual(modulestore().get_items(course_key, qualifiers={'category': 'chapter'}), [])
+            chapter = modulestore().create_child(user, new_course.location, 'chapter')
+            html = modulestore().create_item(user, course_key, 'html')
+            self.assertEqual(len(modulestore().get_items(course_key, qualifiers={'category': 'chapter'})), 1)
+            self.assertEqual(len(modulestore().get_items(course_key, include_orphans=False)), 2)
+            parent_location = modulestore().get_parent_location(chapter.location.version_agnostic())
+            self.assertEqual(parent_location.block_id, new_course.location.block_id)
+            self.assertIn(html.location.block_id, [orphan.block_id for orphan in modulestore().get_orphans(course_key)])
+
+        self.assertEqual(len(modulestore().get_items(course_key, qualifiers={'category': 'chapter'})), 1)
+        self.assertEqual(len(modulestore().get_items(course_key, include_orphans=False)), 2)
+        parent_location = modulestore().get_parent_location(chapter.location.version_agnostic())
+        self.assertEqual(parent_location.block_id, new_course.location.block_id)
+
     def test_create_bulk_operations(self):
         """
         Test create_item using bulk_operations
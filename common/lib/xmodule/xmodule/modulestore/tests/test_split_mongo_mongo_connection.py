@@ -1,12 +1,16 @@
 """ Test the behavior of split_mongo/MongoConnection """
 from __future__ import absolute_import
 
+import copy
 import unittest
 
+import six.moves.cPickle as pickle
 from mock import patch
 
 from xmodule.exceptions import HeartbeatFailure
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import LazyBlockMap, MongoConnection, structure_from_mongo
 
 
 class TestHeartbeatFailureException(unittest.TestCase):
@@ -22,3 +26,129 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class _DecodingRawBlocks(dict):
+    """
+    Block documents which get one of the blocks decoded once they are copied.
+    """
+    def __init__(self, blocks, key):
+        super(_DecodingRawBlocks, self).__init__(blocks._raw_blocks)  # pylint: disable=protected-access
+        self.blocks = blocks
+        self.key = key
+
+    def copy(self):
+        copied = dict(self)
+        self.blocks._decode(self.key)  # pylint: disable=protected-access
+        return copied
+
+
+class TestLazyBlockMap(unittest.TestCase):
+    """ Test that structure blocks are only decoded when accessed """
+
+    COURSE_KEY = BlockKey('course', 'course')
+    CHAPTER_KEY = BlockKey('chapter', 'chapter')
+    HTML_KEY = BlockKey('html', 'html')
+
+    def _structure(self):
+        """
+        Return a freshly converted structure, as read from mongo.
+        """
+        return structure_from_mongo({
+            '_id': 'structure_id',
+            'root': ['course', 'course'],
+            'blocks': [
+                {
+                    'block_type': 'course',
+                    'block_id': 'course',
+                    'fields': {'children': [['chapter', 'chapter']]},
+                    'edit_info': {},
+                },
+                {
+                    'block_type': 'chapter',
+                    'block_id': 'chapter',
+                    'fields': {'children': [['html', 'html']], 'display_name': 'Chapter'},
+                    'edit_info': {},
+                },
+                {'block_type': 'html', 'block_id': 'html', 'fields': {}, 'edit_info': {}},
+            ],
+        })
+
+    def test_lookup_decodes_single_block(self):
+        blocks = self._structure()['blocks']
+        self.assertIsInstance(blocks, LazyBlockMap)
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(blocks.num_undecoded, 3)
+
+        chapter = blocks[self.CHAPTER_KEY]
+        self.assertIsInstance(chapter, BlockData)
+        self.assertEqual(chapter.fields['children'], [self.HTML_KEY])
+        self.assertIs(blocks.get(self.CHAPTER_KEY), chapter)
+        self.assertIn(self.HTML_KEY, blocks)
+        self.assertIsNone(blocks.get(BlockKey('html', 'missing')))
+        self.assertEqual(blocks.num_undecoded, 2)
+
+    def test_iteration_decodes_all_blocks(self):
+        blocks = self._structure()['blocks']
+        self.assertEqual(set(blocks), {self.COURSE_KEY, self.CHAPTER_KEY, self.HTML_KEY})
+        self.assertEqual(blocks.num_undecoded, 0)
+        for block_key, block in blocks.items():
+            self.assertIsInstance(block_key, BlockKey)
+            self.assertIsInstance(block, BlockData)
+
+    def test_iter_children(self):
+        blocks = self._structure()['blocks']
+        self.assertEqual(dict(blocks.iter_children())[self.COURSE_KEY], [self.CHAPTER_KEY])
+        self.assertEqual(blocks.num_undecoded, 3)
+
+    def test_iter_children_with_concurrent_decoding(self):
+        blocks = self._structure()['blocks']
+        # Decode a block, as another thread would, right after the documents are copied.
+        blocks._raw_blocks = _DecodingRawBlocks(blocks, self.CHAPTER_KEY)  # pylint: disable=protected-access
+        children = list(blocks.iter_children())
+        self.assertEqual(sorted(key for key, _ in children), sorted([self.COURSE_KEY, self.CHAPTER_KEY, self.HTML_KEY]))
+        self.assertEqual(dict(children)[self.CHAPTER_KEY], [self.HTML_KEY])
+
+    def test_bulk_copies_include_undecoded_blocks(self):
+        all_keys = {self.COURSE_KEY, self.CHAPTER_KEY, self.HTML_KEY}
+        blocks = self._structure()['blocks']
+        blocks[self.COURSE_KEY]  # pylint: disable=pointless-statement
+        self.assertEqual(set(dict(blocks)), all_keys)
+
+        blocks = self._structure()['blocks']
+        blocks[self.COURSE_KEY]  # pylint: disable=pointless-statement
+        other_blocks = {}
+        other_blocks.update(blocks)
+        self.assertEqual(set(other_blocks), all_keys)
+        self.assertEqual(set(self._structure()['blocks'].copy()), all_keys)
+
+        blocks = self._structure()['blocks']
+        blocks[self.COURSE_KEY]  # pylint: disable=pointless-statement
+        shallow_copy = copy.copy(blocks)
+        self.assertEqual(shallow_copy.num_undecoded, 2)
+        del shallow_copy[self.HTML_KEY]
+        self.assertIn(self.HTML_KEY, blocks)
+
+    def test_mutation(self):
+        blocks = self._structure()['blocks']
+        new_block = BlockData(block_type='html', fields={})
+        blocks[BlockKey('html', 'new')] = new_block
+        del blocks[self.HTML_KEY]
+        self.assertEqual(len(blocks), 3)
+        self.assertNotIn(self.HTML_KEY, blocks)
+        self.assertIs(blocks.pop(BlockKey('html', 'new')), new_block)
+        self.assertEqual(blocks.num_undecoded, 2)
+
+    def test_copies_stay_lazy_and_equal(self):
+        structure = self._structure()
+        structure['blocks'][self.COURSE_KEY]  # pylint: disable=pointless-statement
+
+        for new_structure in (
+                copy.deepcopy(structure),
+                pickle.loads(pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)),
+        ):
+            self.assertIsInstance(new_structure['blocks'], LazyBlockMap)
+            self.assertEqual(new_structure['blocks'].num_undecoded, 2)
+            self.assertEqual(new_structure, structure)
+
+        self.assertEqual(dict(structure['blocks']), self._structure()['blocks'])
@@ -0,0 +1,97 @@
+""" Test the indexes of split structures """
+from __future__ import absolute_import
+
+import unittest
+
+from xmodule.modulestore.perf_tests.benchmark_structure_index import create_synthetic_structure
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import structure_from_mongo
+from xmodule.modulestore.split_mongo.structure_index import (
+    StructureIndex,
+    clear_structure_index_cache,
+    get_structure_index
+)
+
+
+class TestStructureIndex(unittest.TestCase):
+    """ Test StructureIndex """
+
+    COURSE_KEY = BlockKey('course', 'course')
+    CHAPTER_KEY = BlockKey('chapter', 'chapter')
+    HTML_KEY = BlockKey('html', 'html')
+    SHARED_KEY = BlockKey('html', 'shared')
+    ORPHAN_KEY = BlockKey('vertical', 'orphan')
+    ORPHAN_CHILD_KEY = BlockKey('problem', 'chapter')
+    ABOUT_KEY = BlockKey('about', 'overview')
+
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        clear_structure_index_cache()
+        self.addCleanup(clear_structure_index_cache)
+
+    def _block(self, block_key, children=()):
+        """
+        Return the mongo document of a block.
+        """
+        return {
+            'block_type': block_key.type,
+            'block_id': block_key.id,
+            'fields': {'children': [list(child) for child in children]},
+            'edit_info': {},
+        }
+
+    def _structure(self):
+        """
+        Return a freshly converted structure, as read from mongo.
+        """
+        return structure_from_mongo({
+            '_id': 'structure_id',
+            'root': list(self.COURSE_KEY),
+            'blocks': [
+                self._block(self.COURSE_KEY, [self.CHAPTER_KEY]),
+                self._block(self.CHAPTER_KEY, [self.HTML_KEY, self.SHARED_KEY]),
+                self._block(self.HTML_KEY),
+                self._block(self.SHARED_KEY),
+                self._block(self.ORPHAN_KEY, [self.SHARED_KEY, self.ORPHAN_CHILD_KEY]),
+                self._block(self.ORPHAN_CHILD_KEY),
+                self._block(self.ABOUT_KEY),
+            ],
+        })
+
+    def test_index(self):
+        structure = self._structure()
+        index = StructureIndex(structure)
+        # The index is built without decoding the blocks
+        self.assertEqual(structure['blocks'].num_undecoded, 7)
+
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.get_parents(self.COURSE_KEY), ())
+        self.assertEqual(index.get_parents(self.HTML_KEY), (self.CHAPTER_KEY,))
+        self.assertEqual(sorted(index.get_parents(self.SHARED_KEY)), [self.CHAPTER_KEY, self.ORPHAN_KEY])
+
+        self.assertEqual(sorted(index.get_block_keys(block_type='html')), [self.HTML_KEY, self.SHARED_KEY])
+        self.assertEqual(index.get_block_keys(block_type='sequential'), ())
+        self.assertEqual(sorted(index.get_block_keys(block_id='chapter')), [self.CHAPTER_KEY, self.ORPHAN_CHILD_KEY])
+        self.assertEqual(index.get_block_keys(block_type='problem', block_id='chapter'), (self.ORPHAN_CHILD_KEY,))
+        self.assertEqual(len(index.get_block_keys()), 7)
+
+        for block_key in (self.COURSE_KEY, self.CHAPTER_KEY, self.HTML_KEY, self.SHARED_KEY):
+            self.assertTrue(index.has_path_to_root(block_key))
+        for block_key in (self.ORPHAN_KEY, self.ORPHAN_CHILD_KEY, self.ABOUT_KEY):
+            self.assertFalse(index.has_path_to_root(block_key))
+
+        self.assertEqual(sorted(index.get_orphans()), [self.ABOUT_KEY, self.ORPHAN_KEY])
+
+    def test_cached_per_structure(self):
+        index = get_structure_index(self._structure())
+        self.assertIs(get_structure_index(self._structure()), index)
+
+        other_structure = self._structure()
+        other_structure['_id'] = 'other_structure_id'
+        self.assertIsNot(get_structure_index(other_structure), index)
+
+    def test_synthetic_structure(self):
+        index = StructureIndex(structure_from_mongo(create_synthetic_structure(1000)))
+        self.assertEqual(len(index), 3 * 251 + 10 + 1)
+        self.assertEqual(len(index.get_block_keys(block_type='problem')), 3 * 200)
+        self.assertEqual(len(index.get_orphans()), 10)
@@ -7,15 +7,16 @@ from __future__ import absolute_import
 import os.path
 from glob import glob
 
+import six
 from django.test import TestCase
-from mock import Mock, patch
+from mock import ANY, Mock, patch
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import CourseLocator
 
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.tests.utils import TILDA_FILES_DICT, add_temp_files_from_dict, remove_temp_files_from_list
-from xmodule.modulestore.xml import XMLModuleStore
+from xmodule.modulestore.xml import ImportSystem, XMLModuleStore, parse_block_files
 from xmodule.tests import DATA_DIR
 from xmodule.x_module import XModuleMixin
 
@@ -59,6 +60,36 @@ class TestXMLModuleStore(TestCase):
         errors = modulestore.get_course_errors(CourseKey.from_string("edX/toy/2012_Fall"))
         assert errors == []
 
+    def test_parse_block_files(self):
+        """
+        Test that the OLX files of the blocks of a course are parsed ahead of time.
+        """
+        parsed_files = parse_block_files(DATA_DIR / 'toy', 4)
+        self.assertEqual(parsed_files['chapter/secret/magic.xml'].tag, 'chapter')
+        self.assertEqual(parsed_files['video/separate_file_video.xml'].tag, 'video')
+        self.assertNotIn('course.xml', parsed_files)
+        self.assertFalse([filepath for filepath in parsed_files if filepath.startswith(('static/', 'roots/'))])
+
+    def test_load_parsed_block_files(self):
+        """
+        Test that courses whose OLX files are parsed ahead of time load the same blocks.
+        """
+        course_key = CourseKey.from_string('edX/toy/2012_Fall')
+        store = XMLModuleStore(DATA_DIR, source_dirs=['toy'], xblock_mixins=(XModuleMixin,))
+        with patch.object(
+            ImportSystem, 'pop_parsed_file', autospec=True, side_effect=ImportSystem.pop_parsed_file
+        ) as mock_pop_parsed_file:
+            parsed_store = XMLModuleStore(
+                DATA_DIR, source_dirs=['toy'], xblock_mixins=(XModuleMixin,), num_parse_workers=4
+            )
+        mock_pop_parsed_file.assert_any_call(ANY, u'video/separate_file_video.xml')
+
+        self.assertEqual(set(parsed_store.modules[course_key]), set(store.modules[course_key]))
+        for location, block in six.iteritems(store.modules[course_key]):
+            parsed_block = parsed_store.modules[course_key][location]
+            self.assertEqual(parsed_block.display_name, block.display_name)
+            self.assertEqual(parsed_block.children, block.children)
+
     def test_get_courses_for_wiki(self):
         """
         Test the get_courses_for_wiki method
@@ -5,7 +5,9 @@ from __future__ import absolute_import
 
 import importlib
 import os
+import shutil
 import unittest
+from tempfile import mkdtemp
 from uuid import uuid4
 
 import mock
@@ -386,3 +388,18 @@ class StaticContentImporterTest(unittest.TestCase):
             )
             mock_file.assert_called_with(full_file_path, 'rb')
             self.mocked_content_store.assert_called_once()
+
+    @mock.patch('xmodule.modulestore.xml_importer.STATIC_FILE_CHUNK_SIZE', 4)
+    def test_import_static_file_in_chunks(self):
+        base_dir = path(mkdtemp())
+        self.addCleanup(shutil.rmtree, base_dir)
+        full_file_path = base_dir / 'some_file.txt'
+        with open(full_file_path, 'wb') as static_file:
+            static_file.write(b'streamed data')
+        saved_chunks = []
+        self.mocked_content_store.generate_thumbnail.return_value = (None, None)
+        self.mocked_content_store.save.side_effect = lambda content: saved_chunks.extend(content.data)
+
+        self.static_content_importer.import_static_file(full_file_path=full_file_path, base_dir=base_dir)
+        self.assertEqual(saved_chunks, [b'stre', b'amed', b' dat', b'a'])
+        self.mocked_content_store.generate_thumbnail.assert_called_once_with(mock.ANY, tempfile_path=full_file_path)
@@ -15,6 +15,7 @@ from contextlib import contextmanager
 from importlib import import_module
 
 import six
+from concurrent.futures import ThreadPoolExecutor
 from fs.osfs import OSFS
 from lazy import lazy
 from lxml import etree
@@ -38,6 +39,7 @@ from xmodule.x_module import (
     XMLParsingSystem,
     policy_key
 )
+from xmodule.xml_module import EDX_XML_PARSER
 
 from .exceptions import ItemNotFoundError
 from .inheritance import InheritanceKeyValueStore, compute_inherited_metadata, inheriting_field_data
@@ -49,17 +51,58 @@ etree.set_default_parser(edx_xml_parser)
 
 log = logging.getLogger(__name__)
 
+# The directories of a courselike which hold no OLX files of its blocks.
+NON_BLOCK_DIRS = ('about', 'drafts', 'info', 'policies', 'roots', 'static', 'static_import', 'tabs')
+
+
+def parse_block_files(course_path, num_workers):
+    """
+    Parses the OLX files of the blocks of the courselike with a pool of
+    num_workers threads, and returns their root elements by path relative to
+    the courselike directory.
+
+    lxml parses files without holding the GIL, with a parser of its own per
+    file since parsers are locked while parsing. Files which fail to parse are
+    left out, to be parsed and reported when their blocks are loaded.
+    """
+    file_paths = []
+    for dirname in sorted(os.listdir(course_path)):
+        if dirname in NON_BLOCK_DIRS or not os.path.isdir(course_path / dirname):
+            continue
+        for dirpath, __, filenames in os.walk(course_path / dirname):
+            file_paths.extend(os.path.join(dirpath, filename) for filename in filenames if filename.endswith('.xml'))
+
+    def parse(file_path):
+        """
+        Returns the root element of the file, or None if it can't be parsed.
+        """
+        try:
+            return etree.parse(file_path, parser=EDX_XML_PARSER.copy()).getroot()
+        except (IOError, etree.XMLSyntaxError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return {
+            os.path.relpath(file_path, course_path): root
+            for file_path, root in zip(file_paths, executor.map(parse, file_paths))
+            if root is not None
+        }
+
 
 class ImportSystem(XMLParsingSystem, MakoDescriptorSystem):
     def __init__(self, xmlstore, course_id, course_dir,
                  error_tracker,
-                 load_error_modules=True, target_course_id=None, **kwargs):
+                 load_error_modules=True, target_course_id=None, parsed_block_files=None, **kwargs):
         """
         A class that handles loading from xml.  Does some munging to ensure that
         all elements have unique slugs.
 
         xmlstore: the XMLModuleStore to store the loaded modules in
+
+        parsed_block_files: the root elements of the OLX files of the course parsed
+            ahead of time, by path relative to the course directory
         """
+        self.parsed_block_files = parsed_block_files or {}
         self.unnamed = defaultdict(int)  # category -> num of new url_names for that category
         self.used_names = defaultdict(set)  # category -> set of used url_names
 
@@ -245,6 +288,13 @@ class ImportSystem(XMLParsingSystem, MakoDescriptorSystem):
             **kwargs
         )
 
+    def pop_parsed_file(self, filepath):
+        """
+        Returns the root element of the file if it was parsed ahead of time,
+        and not returned yet, or None otherwise.
+        """
+        return self.parsed_block_files.pop(filepath, None)
+
     # id_generator is ignored, because each ImportSystem is already local to
     # a course, and has it's own id_generator already in place
     def add_node_as_child(self, block, node, id_generator):
@@ -311,7 +361,8 @@ class XMLModuleStore(ModuleStoreReadBase):
     def __init__(
             self, data_dir, default_class=None, source_dirs=None, course_ids=None,
             load_error_modules=True, i18n_service=None, fs_service=None, user_service=None,
-            signal_handler=None, target_course_id=None, **kwargs   # pylint: disable=unused-argument
+            signal_handler=None, target_course_id=None, num_parse_workers=0,
+            **kwargs   # pylint: disable=unused-argument
     ):
         """
         Initialize an XMLModuleStore from data_dir
@@ -324,6 +375,9 @@ class XMLModuleStore(ModuleStoreReadBase):
 
             source_dirs or course_ids (list of str): If specified, the list of source_dirs or course_ids to load.
                 Otherwise, load all courses. Note, providing both
+
+            num_parse_workers (int): If specified, the number of threads parsing the OLX files of
+                each course ahead of loading its blocks.
         """
         super(XMLModuleStore, self).__init__(**kwargs)
 
@@ -336,6 +390,7 @@ class XMLModuleStore(ModuleStoreReadBase):
             course_ids = [CourseKey.from_string(course_id) for course_id in course_ids]
 
         self.load_error_modules = load_error_modules
+        self.num_parse_workers = num_parse_workers
 
         if default_class is None:
             self.default_class = None
@@ -509,6 +564,10 @@ class XMLModuleStore(ModuleStoreReadBase):
             if self.user_service:
                 services['user'] = self.user_service
 
+            parsed_block_files = None
+            if self.num_parse_workers:
+                parsed_block_files = parse_block_files(self.data_dir / course_dir, self.num_parse_workers)
+
             system = ImportSystem(
                 xmlstore=self,
                 course_id=course_id,
@@ -522,8 +581,11 @@ class XMLModuleStore(ModuleStoreReadBase):
                 field_data=self.field_data,
                 services=services,
                 target_course_id=target_course_id,
+                parsed_block_files=parsed_block_files,
             )
             course_descriptor = system.process_xml(etree.tostring(course_data, encoding='unicode'))
+            # The files of blocks which weren't loaded are no longer needed.
+            system.parsed_block_files.clear()
             # If we fail to load the course, then skip the rest of the loading steps
             if isinstance(course_descriptor, ErrorDescriptor):
                 return course_descriptor
@@ -28,10 +28,15 @@ import logging
 import mimetypes
 import os
 import re
+import time
 from abc import abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
 
 import six
 import xblock
+from concurrent.futures import ThreadPoolExecutor
 from lxml import etree
 from opaque_keys.edx.keys import UsageKey
 from opaque_keys.edx.locator import LibraryLocator
@@ -61,6 +66,12 @@ log = logging.getLogger(__name__)
 
 DEFAULT_STATIC_CONTENT_SUBDIR = 'static'
 
+# The number of threads parsing the OLX files of a courselike, and importing its static files.
+DEFAULT_IMPORT_WORKERS = 4
+
+# Static files are read, and streamed to the content store, in chunks of this many bytes.
+STATIC_FILE_CHUNK_SIZE = 1024 * 1024
+
 
 class LocationMixin(XBlockMixin):
     """
@@ -84,10 +95,11 @@ class LocationMixin(XBlockMixin):
 
 
 class StaticContentImporter:
-    def __init__(self, static_content_store, course_data_path, target_id):
+    def __init__(self, static_content_store, course_data_path, target_id, num_workers=1):
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        self.num_workers = num_workers
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -101,9 +113,13 @@ class StaticContentImporter:
         self.mimetypes_list = list(mimetypes.types_map.values())
 
     def import_static_content_directory(self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):
+        """
+        Imports the static files of the directory, num_workers at a time.
+        """
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
+        file_paths = []
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -117,8 +133,11 @@ class StaticContentImporter:
                 if verbose:
                     log.debug('importing static content %s...', file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+                file_paths.append(file_path)
 
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            import_static_file = partial(self.import_static_file, base_dir=static_dir)
+            for imported_file_attrs in executor.map(import_static_file, file_paths):
                 if imported_file_attrs:
                     # store the remapping information which will be needed
                     # to subsitute in the module data
@@ -127,10 +146,13 @@ class StaticContentImporter:
         return remap_dict
 
     def import_static_file(self, full_file_path, base_dir):
+        """
+        Imports the static file into the content store, streaming it in chunks
+        of STATIC_FILE_CHUNK_SIZE bytes unless it fits in a single chunk.
+        """
         filename = os.path.basename(full_file_path)
         try:
-            with open(full_file_path, 'rb') as f:
-                data = f.read()
+            static_file = open(full_file_path, 'rb')
         except IOError:
             # OS X "companion files". See
             # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
@@ -139,6 +161,18 @@ class StaticContentImporter:
             # Not a 'hidden file', then re-raise exception
             raise
 
+        with static_file:
+            data = static_file.read(STATIC_FILE_CHUNK_SIZE)
+            is_streamed = len(data) >= STATIC_FILE_CHUNK_SIZE
+            if is_streamed:
+                data = _read_chunks(static_file, data)
+            return self._import_static_content(full_file_path, base_dir, data, is_streamed)
+
+    def _import_static_content(self, full_file_path, base_dir, data, is_streamed):
+        """
+        Saves the data of the static file, and its thumbnail, into the content store.
+        """
+        filename = os.path.basename(full_file_path)
         # strip away leading path from the name
         file_subpath = full_file_path.replace(base_dir, '')
         if file_subpath.startswith('/'):
@@ -164,7 +198,13 @@ class StaticContentImporter:
         )
 
         # first let's save a thumbnail so we can get back a thumbnail location
-        thumbnail_content, thumbnail_location = self.static_content_store.generate_thumbnail(content)
+        if is_streamed:
+            # The data of streamed files can only be read once, so thumbnails are made out of the file itself.
+            thumbnail_content, thumbnail_location = self.static_content_store.generate_thumbnail(
+                content, tempfile_path=full_file_path
+            )
+        else:
+            thumbnail_content, thumbnail_location = self.static_content_store.generate_thumbnail(content)
 
         if thumbnail_content is not None:
             content.thumbnail_location = thumbnail_location
@@ -180,6 +220,17 @@ class StaticContentImporter:
         return file_subpath, asset_key
 
 
+def _read_chunks(static_file, first_chunk):
+    """
+    Yields the first chunk read out of the file, then the rest of the file in
+    chunks of STATIC_FILE_CHUNK_SIZE bytes.
+    """
+    chunk = first_chunk
+    while chunk:
+        yield chunk
+        chunk = static_file.read(STATIC_FILE_CHUNK_SIZE)
+
+
 class ImportManager(object):
     """
     Import xml-based courselikes from data_dir into modulestore.
@@ -221,6 +272,9 @@ class ImportManager(object):
         python_lib_filename: The filename of the courselike's python library. Course authors can optionally
             create this file to implement custom logic in their course.
 
+        num_workers: The number of threads parsing the OLX files of a courselike, and importing its
+            static files. Static files are imported concurrently with the blocks of the courselike.
+
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
     """
     store_class = XMLModuleStore
@@ -234,6 +288,7 @@ class ImportManager(object):
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            num_workers=DEFAULT_IMPORT_WORKERS,
     ):
         self.store = store
         self.user_id = user_id
@@ -249,17 +304,40 @@ class ImportManager(object):
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
-        self.xml_module_store = self.store_class(
-            data_dir,
-            default_class=default_class,
-            source_dirs=source_dirs,
-            load_error_modules=load_error_modules,
-            xblock_mixins=store.xblock_mixins,
-            xblock_select=store.xblock_select,
-            target_course_id=target_id,
-        )
+        self.num_workers = num_workers
+        # The number of seconds spent in each phase of the imports, phases running concurrently.
+        self.timings = OrderedDict()
+        with self._timed('parse'):
+            self.xml_module_store = self.store_class(
+                data_dir,
+                default_class=default_class,
+                source_dirs=source_dirs,
+                load_error_modules=load_error_modules,
+                xblock_mixins=store.xblock_mixins,
+                xblock_select=store.xblock_select,
+                target_course_id=target_id,
+                num_parse_workers=num_workers,
+            )
         self.logger, self.errors = make_error_tracker()
 
+    @contextmanager
+    def _timed(self, phase):
+        """
+        Adds the time spent in the context to the timing of the phase.
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0) + time.time() - start
+
+    def _run_timed(self, phase, func, *args):
+        """
+        Calls the function, adding the time it takes to the timing of the phase.
+        """
+        with self._timed(phase):
+            return func(*args)
+
     def preflight(self):
         """
         Perform any pre-import sanity checks.
@@ -280,7 +358,8 @@ class ImportManager(object):
         static_content_importer = StaticContentImporter(
             self.static_content_store,
             course_data_path=data_path,
-            target_id=dest_id
+            target_id=dest_id,
+            num_workers=self.num_workers,
         )
         if self.do_import_static:
             if self.verbose:
@@ -499,29 +578,39 @@ class ImportManager(object):
             except DuplicateCourseError:
                 continue
 
-            # This bulk operation wraps all the operations to populate the published branch.
-            with self.store.bulk_operations(dest_id):
-                # Retrieve the course itself.
-                source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
+            # This bulk operation wraps all the operations to populate the published branch,
+            # which are written to the store at its end.
+            with ThreadPoolExecutor(max_workers=1) as static_executor:
+                with self._timed('blocks'), self.store.bulk_operations(dest_id):
+                    # Retrieve the course itself.
+                    source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                    # Import all static pieces, which only go to the content store, while the blocks are imported.
+                    static_import = static_executor.submit(
+                        self._run_timed, 'static', self.import_static, data_path, dest_id
+                    )
+
+                    # Import asset metadata stored in XML.
+                    self.import_asset_metadata(data_path, dest_id)
 
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                    # Import all children
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                    static_import.result()
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
             # Drafts must be imported in a separate bulk operation from published items to import properly,
             # due to the recursive_build() above creating a draft item for each course block
             # and then publishing it.
-            with self.store.bulk_operations(dest_id):
+            with self._timed('drafts'), self.store.bulk_operations(dest_id):
                 # Import all draft items into the courselike.
                 courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
 
+            log.info(
+                u'Imported %s in phases of %s seconds',
+                dest_id, u', '.join(u'{}: {:.1f}'.format(phase, seconds) for phase, seconds in self.timings.items()),
+            )
             yield courselike
 
 
@@ -15,7 +15,7 @@ from xmodule.contentstore.content import ContentStore, StaticContent, StaticCont
 from xmodule.static_content import _list_descriptors, _write_js
 
 SAMPLE_STRING = """
-This is a sample string with more than 1024 bytes, the default STREAM_DATA_CHUNK_SIZE
+This is a sample string with more than 1024 bytes, the STREAM_DATA_CHUNK_SIZE of the stream tests
 
 Lorem Ipsum is simply dummy text of the printing and typesetting industry.
 Lorem Ipsum has been the industry's standard dummy text ever since the 1500s,
@@ -181,27 +181,28 @@ class ContentTest(unittest.TestCase):
             asset_location
         )
 
+    @patch('xmodule.contentstore.content.STREAM_DATA_CHUNK_SIZE', 1024)
     def test_static_content_stream_stream_data(self):
         """
         Test StaticContentStream stream_data function, asserts that we get all the bytes
+        across several chunks
         """
         data = SAMPLE_STRING
         item = FakeGridFsItem(data)
         static_content_stream = StaticContentStream('loc', 'name', 'type', item, length=item.length)
 
-        total_length = 0
-        stream = static_content_stream.stream_data()
-        for chunck in stream:
-            total_length += len(chunck)
+        chunks = list(static_content_stream.stream_data())
 
-        self.assertEqual(total_length, static_content_stream.length)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), static_content_stream.length)
 
+    @patch('xmodule.contentstore.content.STREAM_DATA_CHUNK_SIZE', 1024)
     def test_static_content_stream_stream_data_in_range(self):
         """
         Test StaticContentStream stream_data_in_range function,
         asserts that we get the requested number of bytes
         first_byte and last_byte are chosen to be simple but non trivial values
-        and to have total_length > STREAM_DATA_CHUNK_SIZE (1024)
+        and to have total_length > STREAM_DATA_CHUNK_SIZE, patched to 1024
         """
         data = SAMPLE_STRING
         item = FakeGridFsItem(data)
@@ -210,12 +211,10 @@ class ContentTest(unittest.TestCase):
         first_byte = 100
         last_byte = 1500
 
-        total_length = 0
-        stream = static_content_stream.stream_data_in_range(first_byte, last_byte)
-        for chunck in stream:
-            total_length += len(chunck)
+        chunks = list(static_content_stream.stream_data_in_range(first_byte, last_byte))
 
-        self.assertEqual(total_length, last_byte - first_byte + 1)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), last_byte - first_byte + 1)
 
     def test_static_content_write_js(self):
         """
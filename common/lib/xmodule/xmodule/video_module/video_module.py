@@ -633,7 +633,7 @@ class VideoBlock(
         usage_id = id_generator.create_usage(definition_id)
         if is_pointer_tag(xml_object):
             filepath = cls._format_filepath(xml_object.tag, name_to_pathname(url_name))
-            xml_object = cls.load_file(filepath, system.resources_fs, usage_id)
+            xml_object = cls.load_file(filepath, system.resources_fs, usage_id, runtime=system)
             system.parse_asides(xml_object, definition_id, usage_id, id_generator)
         field_data = cls.parse_video_xml(xml_object, id_generator)
         kvs = InheritanceKeyValueStore(initial_values=field_data)
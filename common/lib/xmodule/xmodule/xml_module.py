@@ -196,13 +196,21 @@ class XmlParserMixin(object):
         return etree.parse(file_object, parser=EDX_XML_PARSER).getroot()
 
     @classmethod
-    def load_file(cls, filepath, fs, def_id):  # pylint: disable=invalid-name
+    def load_file(cls, filepath, fs, def_id, runtime=None):  # pylint: disable=invalid-name
         """
         Open the specified file in fs, and call cls.file_to_xml on it,
         returning the lxml object.
 
+        If the runtime parsed the file ahead of time, as file_to_xml would
+        have, the parsed lxml object is returned instead.
+
         Add details and reraise on error.
         """
+        pop_parsed_file = getattr(runtime, 'pop_parsed_file', None)
+        if pop_parsed_file is not None and cls.file_to_xml.__func__ is XmlParserMixin.file_to_xml.__func__:
+            xml_object = pop_parsed_file(filepath)
+            if xml_object is not None:
+                return xml_object
         try:
             with fs.open(filepath) as xml_file:
                 return cls.file_to_xml(xml_file)
@@ -248,7 +256,7 @@ class XmlParserMixin(object):
                         filepath = candidate
                         break
 
-            definition_xml = cls.load_file(filepath, system.resources_fs, def_id)
+            definition_xml = cls.load_file(filepath, system.resources_fs, def_id, runtime=system)
             usage_id = id_generator.create_usage(def_id)
             aside_children = system.parse_asides(definition_xml, def_id, usage_id, id_generator)
 
@@ -418,7 +426,7 @@ class XmlParserMixin(object):
         """
         url_name = cls._get_url_name(node)
         filepath = cls._format_filepath(node.tag, name_to_pathname(url_name))
-        definition_xml = cls.load_file(filepath, runtime.resources_fs, def_id)
+        definition_xml = cls.load_file(filepath, runtime.resources_fs, def_id, runtime=runtime)
         return definition_xml, filepath
 
     @classmethod
@@ -4,6 +4,8 @@ Models for bulk email
 from __future__ import absolute_import
 
 import logging
+import re
+import string
 
 import markupsafe
 import six
@@ -374,7 +376,7 @@ class CourseEmailTemplate(models.Model):
             raise
 
     @staticmethod
-    def _render(format_string, message_body, context):
+    def _render(format_string, message_body, context, wrap=True):
         """
         Create a text message using a template, message body and context.
 
@@ -404,7 +406,7 @@ class CourseEmailTemplate(models.Model):
         result = result.replace(message_body_tag, message_body, 1)
 
         # finally, return the result, after wrapping long lines and without converting to an encoded byte array.
-        return wrap_message(result)
+        return wrap_message(result) if wrap else result
 
     def render_plaintext(self, plaintext, context):
         """
@@ -422,11 +424,146 @@ class CourseEmailTemplate(models.Model):
         Convert HTML text body (`htmltext`) into HTML email message using the
         stored HTML template and the provided `context` dict.
         """
-        # HTML-escape string values in the context (used for keyword substitution).
+        CourseEmailTemplate._escape_html_context(context)
+        return CourseEmailTemplate._render(self.html_template, htmltext, context)
+
+    @staticmethod
+    def _escape_html_context(context):
+        """
+        HTML-escape string values in the context (used for keyword substitution).
+        """
         for key, value in six.iteritems(context):
             if isinstance(value, six.string_types):
                 context[key] = markupsafe.escape(value)
-        return CourseEmailTemplate._render(self.html_template, htmltext, context)
+
+    def compile(self, plaintext, htmltext, context):
+        """
+        Returns a CompiledCourseEmailTemplate rendering the given plain text and
+        HTML text bodies of an email, with the given context shared by all its
+        recipients.
+        """
+        return CompiledCourseEmailTemplate(self, plaintext, htmltext, context)
+
+
+class CompiledCourseEmailTemplate(object):
+    """
+    A CourseEmailTemplate prepared to render the messages of one email to
+    many recipients.
+
+    The template is rendered once with the values shared by all recipients,
+    leaving placeholders for the values of each recipient, and the lines
+    without placeholders are wrapped once.  Rendering the message of a
+    recipient then only fills in and wraps the lines with placeholders.
+
+    Messages whose bodies contain %%KEYWORDS%%, or whose templates format
+    the values of recipients in other ways than {name}, are rendered in full
+    for each recipient.
+    """
+    # Keys of the email context that differ between recipients.
+    RECIPIENT_KEYS = ('name', 'email', 'user_id')
+
+    PLACEHOLDER_START = u'\ue000'
+    PLACEHOLDER_END = u'\ue001'
+    PLACEHOLDER_REGEX = re.compile(u'\ue000(name|email|user_id)\ue001')
+
+    def __init__(self, template, plaintext, htmltext, context):
+        self.template = template
+        self.plaintext = plaintext
+        self.htmltext = htmltext
+        self.context = dict(context)
+        self._compiled = False
+        self._plaintext_lines = None
+        self._html_lines = None
+
+    def render(self, recipient_context):
+        """
+        Returns the plain text and HTML messages for the recipient whose values
+        are in `recipient_context`, as render_plaintext and render_htmltext
+        would with the email context updated with `recipient_context`.
+        """
+        if not self._compiled:
+            self._plaintext_lines = self._compile(self.template.plain_template, self.plaintext, html=False)
+            self._html_lines = self._compile(self.template.html_template, self.htmltext, html=True)
+            self._compiled = True
+
+        values = {key: recipient_context[key] for key in self.RECIPIENT_KEYS}
+        can_fill_in = not any(
+            isinstance(value, six.string_types) and (
+                '\n' in value or self.PLACEHOLDER_START in value or self.PLACEHOLDER_END in value
+            )
+            for value in six.itervalues(values)
+        )
+
+        if can_fill_in and self._plaintext_lines is not None:
+            plaintext_msg = self._fill_in(self._plaintext_lines, values)
+        else:
+            plaintext_msg = self.template.render_plaintext(self.plaintext, dict(self.context, **recipient_context))
+
+        if can_fill_in and self._html_lines is not None:
+            CourseEmailTemplate._escape_html_context(values)
+            html_msg = self._fill_in(self._html_lines, values)
+        else:
+            html_msg = self.template.render_htmltext(self.htmltext, dict(self.context, **recipient_context))
+
+        return plaintext_msg, html_msg
+
+    def _compile(self, format_string, message_body, html):
+        """
+        Returns the lines of the message rendered with placeholders for the
+        values of recipients: wrapped strings for the lines without
+        placeholders, and lists holding the line for the others.  Returns
+        None if the message can't be rendered that way.
+        """
+        if '%%' in (message_body or '') or not self._formats_recipient_values_plainly(format_string):
+            return None
+        shared_strings = [message_body or ''] + [
+            value for value in six.itervalues(self.context) if isinstance(value, six.string_types)
+        ]
+        if any(self.PLACEHOLDER_START in value or self.PLACEHOLDER_END in value for value in shared_strings):
+            return None
+
+        context = dict(self.context)
+        context.update({
+            key: self.PLACEHOLDER_START + key + self.PLACEHOLDER_END for key in self.RECIPIENT_KEYS
+        })
+        if html:
+            CourseEmailTemplate._escape_html_context(context)
+        message = CourseEmailTemplate._render(format_string, message_body, context, wrap=False)
+
+        return [
+            [line] if self.PLACEHOLDER_START in line else wrap_message(line)
+            for line in message.split('\n')
+        ]
+
+    def _formats_recipient_values_plainly(self, format_string):
+        """
+        Returns whether the format string only formats the values of
+        recipients as {name}, without attributes, conversions or specs.
+        """
+        try:
+            fields = list(string.Formatter().parse(format_string or ''))
+        except ValueError:
+            return False
+        for __, field_name, format_spec, conversion in fields:
+            if field_name is None:
+                continue
+            key = re.match(r'[^.\[]*', field_name).group(0)
+            if key in self.RECIPIENT_KEYS and (field_name != key or format_spec or conversion):
+                return False
+        return True
+
+    def _fill_in(self, lines, values):
+        """
+        Returns the message made of the given compiled lines, with the
+        placeholders filled in with the given values.
+        """
+        def replace_placeholder(match):
+            return u'{}'.format(values[match.group(1)])
+
+        return u'\n'.join(
+            wrap_message(self.PLACEHOLDER_REGEX.sub(replace_placeholder, line[0])) if isinstance(line, list) else line
+            for line in lines
+        )
 
 
 class CourseAuthorization(models.Model):
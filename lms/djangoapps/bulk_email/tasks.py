@@ -9,11 +9,11 @@ import json
 import logging
 import random
 import re
+import socket
 import time
 from collections import Counter
 from datetime import datetime
 from smtplib import SMTPConnectError, SMTPDataError, SMTPException, SMTPServerDisconnected
-from time import sleep
 
 from boto.exception import AWSConnectionError
 from boto.ses.exceptions import (
@@ -46,6 +46,7 @@ from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.subtasks import (
     SubtaskStatus,
     check_subtask_is_valid,
+    checkpoint_subtask_status,
     queue_subtasks_for_query,
     update_subtask_status
 )
@@ -506,15 +507,28 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+    connection = None
+    connection_reusable = False
     try:
-        connection = get_connection()
-        connection.open()
+        connection, connection_reused = _get_open_connection()
 
         # Define context values to use in all course emails:
         email_context = {'name': '', 'email': ''}
         email_context.update(global_email_context)
+        email_context['course_id'] = course_email.course_id
+        # The messages are rendered once for all the recipients sharing the values they use.
+        compiled_template = course_email_template.compile(
+            course_email.text_message, course_email.html_message, email_context
+        )
+
+        # Throttle if we have gotten the rate limiter.  If a task has been retried
+        # for rate-limiting reasons, then we limit the rate of the emails within this task.
+        # Choice of the value depends on the number of workers that might be sending email
+        # in parallel, and what the SES throttle rate is.
+        rate_limiter = _get_rate_limiter(subtask_status)
 
         start_time = time.time()
+        last_checkpoint_time = start_time
         while to_list:
             # Update context with user-specific values from the user at the end of the list.
             # At the end of processing this user, they will be popped off of the to_list.
@@ -537,14 +551,12 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                 subtask_status.increment(failed=1)
                 continue
 
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
             # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
+            plaintext_msg, html_msg = compiled_template.render({
+                'email': email,
+                'name': current_recipient['profile__name'],
+                'user_id': current_recipient['pk'],
+            })
 
             # Create email:
             email_msg = EmailMultiAlternatives(
@@ -556,13 +568,8 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             )
             email_msg.attach_alternative(html_msg, 'text/html')
 
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+            if rate_limiter is not None:
+                rate_limiter.consume()
 
             try:
                 log.info(
@@ -576,7 +583,19 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     current_recipient['profile__name'],
                     email
                 )
-                connection.send_messages([email_msg])
+                try:
+                    connection.send_messages([email_msg])
+                except SMTPServerDisconnected:
+                    if not connection_reused:
+                        raise
+                    # The server dropped the connection kept by a previous subtask since it was checked.
+                    log.info(u"BulkEmail ==> Task: %s, SubTask: %s, Reopening dropped email connection",
+                             parent_task_id, task_id)
+                    connection.close()
+                    connection.open()
+                    connection.send_messages([email_msg])
+                finally:
+                    connection_reused = False
 
             except SMTPDataError as exc:
                 # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
@@ -649,6 +668,12 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             recipients_info[email] += 1
             to_list.pop()
 
+            # Record the progress so far, so that it shows while large subtasks run.
+            if time.time() - last_checkpoint_time >= settings.BULK_EMAIL_CHECKPOINT_INTERVAL:
+                checkpoint_subtask_status(entry_id, task_id, subtask_status)
+                last_checkpoint_time = time.time()
+
+        connection_reusable = True
         log.info(
             u"BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
             Failed Recipients: %s/%s, Time Taken: %s",
@@ -725,6 +750,102 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         return subtask_status, None
     finally:
         # Clean up at the end.
+        if connection is not None:
+            _release_connection(connection, connection_reusable)
+
+
+class TokenBucket(object):
+    """
+    Rate limiter allowing `rate` operations per second on average, in bursts
+    of up to `capacity` operations.
+
+    Unlike sleeping for a fixed delay before each operation, the time spent
+    performing the operations counts towards the delay between them.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.time()
+
+    def consume(self):
+        """
+        Waits until an operation is allowed, and counts it.
+        """
+        now = time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            self.tokens = 1
+            self.updated_at = now + delay
+        self.tokens -= 1
+
+
+def _get_rate_limiter(subtask_status):
+    """
+    Returns the TokenBucket limiting the rate of the emails of the subtask,
+    or None if it isn't limited.
+    """
+    rates = []
+    if settings.BULK_EMAIL_MAX_SENDS_PER_SECOND:
+        rates.append(settings.BULK_EMAIL_MAX_SENDS_PER_SECOND)
+    if subtask_status.retried_nomax > 0 and settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS:
+        rates.append(1.0 / settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+    return TokenBucket(min(rates)) if rates else None
+
+
+# The connection to the email backend kept open between subtasks, and the time it was last used.
+_KEPT_CONNECTION = {}
+
+
+def _get_open_connection():
+    """
+    Returns an open connection to the email backend, and whether it is the
+    one kept open by the previous subtask of this process.  That connection
+    is reused if it is still alive, unless it has been idle for more than
+    settings.BULK_EMAIL_CONNECTION_MAX_IDLE seconds.
+    """
+    connection = _KEPT_CONNECTION.pop('connection', None)
+    last_used_at = _KEPT_CONNECTION.pop('last_used_at', 0)
+    if connection is not None:
+        if time.time() - last_used_at <= settings.BULK_EMAIL_CONNECTION_MAX_IDLE and _is_connection_alive(connection):
+            return connection, True
+        try:
+            connection.close()
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u"BulkEmail ==> Could not close idle email connection")
+
+    connection = get_connection()
+    connection.open()
+    return connection, False
+
+
+def _is_connection_alive(connection):
+    """
+    Returns whether the server of the given connection to the email backend
+    still answers, for SMTP backends, whose servers drop idle connections.
+    """
+    smtp_connection = getattr(connection, 'connection', None)
+    if smtp_connection is None:
+        return True
+    try:
+        smtp_connection.noop()
+    except (SMTPException, socket.error):
+        log.info(u"BulkEmail ==> Email connection was dropped by the server")
+        return False
+    return True
+
+
+def _release_connection(connection, reusable):
+    """
+    Keeps the connection open for the next subtask if it is reusable and
+    settings.BULK_EMAIL_CONNECTION_MAX_IDLE allows it, or else closes it.
+    """
+    if reusable and settings.BULK_EMAIL_CONNECTION_MAX_IDLE > 0:
+        _KEPT_CONNECTION.update(connection=connection, last_used_at=time.time())
+    else:
         connection.close()
 
 
@@ -268,6 +268,48 @@ class CourseEmailTemplateTest(TestCase):
         self.assertIn(context['course_title'], message)
         self.assertIn(context['name'], message)
 
+    def _assert_compiled_render(self, context, message, recipient_contexts):
+        """
+        Assert that the compiled template renders the same messages as the
+        template for each of the given recipients.
+        """
+        template = CourseEmailTemplate.get_template()
+        compiled_template = template.compile(message, message, context)
+        for recipient_context in recipient_contexts:
+            recipient_context = dict(recipient_context, user_id=12345, course_id="course-v1:edx+100+1")
+            self.assertEqual(
+                compiled_template.render(recipient_context),
+                (
+                    template.render_plaintext(message, dict(context, **recipient_context)),
+                    template.render_htmltext(message, dict(context, **recipient_context)),
+                )
+            )
+
+    def test_compiled_render(self):
+        self._assert_compiled_render(
+            self._get_sample_html_context(),
+            u"My new text.\n" + u"A long line " * 100,
+            [
+                {'name': u"Bob", 'email': u"bob@test.com"},
+                {'name': u"\u00c5lice \u00dc", 'email': u"alice@test.com"},
+                {'name': u"Eve\nNewline", 'email': u"eve@test.com"},
+                {'name': u"Long " * 200, 'email': u"long@test.com"},
+            ]
+        )
+
+    def test_compiled_render_xss(self):
+        context = self._add_xss_fields(self._get_sample_html_context())
+        self._assert_compiled_render(
+            context,
+            u"Thanks for enrolling in %%COURSE_DISPLAY_NAME%%.",
+            [{'name': context['name'], 'email': u"your-email@test.com"}]
+        )
+        self._assert_compiled_render(
+            context,
+            u"Dear <b>you</b>, welcome.",
+            [{'name': context['name'], 'email': u"<script>@test.com"}]
+        )
+
 
 class CourseAuthorizationTest(TestCase):
     """Test the CourseAuthorization model."""
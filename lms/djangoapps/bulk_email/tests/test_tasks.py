@@ -28,12 +28,14 @@ from boto.ses.exceptions import (
 from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
 from mock import Mock, patch
 from opaque_keys.edx.locator import CourseLocator
 from six.moves import range
 
 from bulk_email.models import SEND_TO_LEARNERS, SEND_TO_MYSELF, SEND_TO_STAFF, CourseEmail, Optout
-from bulk_email.tasks import _get_course_email_context
+from bulk_email.tasks import _KEPT_CONNECTION, TokenBucket, _get_course_email_context
 from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, update_subtask_status
 from lms.djangoapps.instructor_task.tasks import send_bulk_course_email
@@ -462,6 +464,64 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
             get_conn.return_value.send_messages.side_effect = cycle([None])
             self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
 
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_IDLE=60)
+    def test_connection_reused_between_tasks(self):
+        num_emails = 2
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        self.addCleanup(_KEPT_CONNECTION.clear)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEqual(get_conn.call_count, 1)
+        self.assertFalse(get_conn.return_value.close.called)
+
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_IDLE=60)
+    def test_dead_kept_connection_replaced(self):
+        num_emails = 2
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        self.addCleanup(_KEPT_CONNECTION.clear)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+            # The server dropped the connection while it was kept.
+            get_conn.return_value.connection.noop.side_effect = SMTPServerDisconnected(421, "Idle timeout")
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEqual(get_conn.call_count, 2)
+        self.assertEqual(get_conn.return_value.close.call_count, 1)
+
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_IDLE=60)
+    def test_dropped_kept_connection_reopened(self):
+        num_emails = 2
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        self.addCleanup(_KEPT_CONNECTION.clear)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+            # The server drops the connection right after it is checked.
+            get_conn.return_value.send_messages.side_effect = chain(
+                [SMTPServerDisconnected(421, "Idle timeout")], cycle([None])
+            )
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEqual(get_conn.call_count, 1)
+        self.assertEqual(get_conn.return_value.open.call_count, 2)
+
+    @override_settings(BULK_EMAIL_CHECKPOINT_INTERVAL=0)
+    def test_progress_checkpoints(self):
+        num_emails = 3
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            checkpointed_counts = []
+            with patch('bulk_email.tasks.checkpoint_subtask_status', autospec=True) as checkpoint:
+                checkpoint.side_effect = lambda _entry_id, _task_id, status: checkpointed_counts.append(status.succeeded)
+                self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEqual(checkpointed_counts, [1, 2, 3])
+
     def test_get_course_email_context_has_correct_keys(self):
         result = _get_course_email_context(self.course)
         self.assertIn('course_title', result)
@@ -473,3 +533,28 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         self.assertIn('account_settings_url', result)
         self.assertIn('email_settings_url', result)
         self.assertIn('platform_name', result)
+
+
+class TokenBucketTest(TestCase):
+    """Tests the rate limiter of bulk email tasks."""
+
+    @patch('bulk_email.tasks.time')
+    def test_consume(self, mock_time):
+        mock_time.time.return_value = 100.0
+        bucket = TokenBucket(rate=10)
+
+        # The first operation is allowed right away.
+        bucket.consume()
+        self.assertFalse(mock_time.sleep.called)
+
+        # The next one waits for the rest of its tenth of a second.
+        mock_time.time.return_value = 100.04
+        bucket.consume()
+        self.assertEqual(mock_time.sleep.call_count, 1)
+        self.assertAlmostEqual(mock_time.sleep.call_args[0][0], 0.06)
+
+        # Time spent since then counts towards the delay.
+        mock_time.sleep.reset_mock()
+        mock_time.time.return_value = 100.3
+        bucket.consume()
+        self.assertFalse(mock_time.sleep.called)
@@ -7,12 +7,17 @@ from __future__ import absolute_import
 import json
 import logging
 
+import six
 from ccx_keys.locator import CCXBlockUsageLocator, CCXLocator
 from django.db import transaction
 from opaque_keys.edx.keys import CourseKey, UsageKey
 
 from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
-from lms.djangoapps.courseware.field_overrides import FieldOverrideProvider
+from lms.djangoapps.courseware.field_overrides import (
+    FieldOverrideProvider,
+    OverrideSnapshot,
+    clear_override_snapshots
+)
 from openedx.core.lib.cache_utils import get_cache
 
 log = logging.getLogger(__name__)
@@ -24,6 +29,9 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
     :class:`~courseware.field_overrides.FieldOverrideProvider` which allows for
     overrides to be made on a per user basis.
     """
+    # The overrides of a ccx apply to all of its learners.
+    snapshots_are_shared = True
+
     def get(self, block, name, default):
         """
         Just call the get_override_for_ccx method if there is a ccx
@@ -48,6 +56,26 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
             return get_override_for_ccx(ccx, block, name, default)
         return default
 
+    def get_snapshot(self, course_key):
+        """
+        Returns all the overrides of the ccx active for the course.
+        """
+        ccx = get_current_ccx(course_key)
+        if not ccx:
+            return OverrideSnapshot({})
+
+        values = {}
+        for location, block_overrides in six.iteritems(_get_overrides_for_ccx(ccx)):
+            for field, value in six.iteritems(block_overrides):
+                # Leave out the ids and instances of the overrides kept along with their values.
+                if field + "_instance" in block_overrides:
+                    values[(location, field)] = value
+        # The LMS never links back to Studio for CCX courses, see get_override_for_ccx.
+        return OverrideSnapshot(values, all_blocks={'course_edit_method': None})
+
+    def get_snapshot_location(self, block):
+        return _clean_ccx_key(block.location)
+
     @classmethod
     def enabled_for(cls, block):
         """
@@ -176,6 +204,14 @@ def override_field_for_ccx(ccx, block, name, value):
 
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name] = value_json
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_instance"] = override
+    _clear_ccx_override_snapshots(ccx)
+
+
+def _clear_ccx_override_snapshots(ccx):
+    """
+    Discards the snapshots of the overrides of the ccx, once they changed.
+    """
+    clear_override_snapshots(CustomCoursesForEdxOverrideProvider, ccx.locator)
 
 
 def clear_override_for_ccx(ccx, block, name):
@@ -209,6 +245,7 @@ def clear_ccx_field_info_from_ccx_map(ccx, block, name):
         ccx_override_map.pop(name + "_instance")
     except KeyError:
         pass
+    _clear_ccx_override_snapshots(ccx)
 
 
 def bulk_delete_ccx_override_fields(ccx, ids):
@@ -219,3 +256,4 @@ def bulk_delete_ccx_override_fields(ccx, ids):
     ids = list(set(ids))
     if ids:
         CcxFieldOverride.objects.filter(ccx=ccx, id__in=ids).delete()
+        _clear_ccx_override_snapshots(ccx)
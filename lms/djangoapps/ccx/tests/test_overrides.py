@@ -12,11 +12,12 @@ from ccx_keys.locator import CCXLocator
 from django.test.utils import override_settings
 from edx_django_utils.cache import RequestCache
 from six.moves import range
+from xblock.field_data import DictFieldData
 
 from courseware.courses import get_course_by_id
 from courseware.testutils import FieldOverrideTestMixin
 from lms.djangoapps.ccx.models import CustomCourseForEdX
-from lms.djangoapps.ccx.overrides import override_field_for_ccx
+from lms.djangoapps.ccx.overrides import CustomCoursesForEdxOverrideProvider, override_field_for_ccx
 from lms.djangoapps.ccx.tests.utils import flatten, iter_blocks
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
 from lms.djangoapps.courseware.tests.test_field_overrides import inject_field_overrides
@@ -100,6 +101,42 @@ class TestFieldOverrides(FieldOverrideTestMixin, SharedModuleStoreTestCase):
         override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
         self.assertEquals(chapter.start, ccx_start)
 
+    @override_settings(
+        FIELD_OVERRIDE_SNAPSHOT_CACHE_TIMEOUT=60,
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'ccx_override_snapshots',
+            }
+        },
+    )
+    def test_snapshot_shared_by_learners(self):
+        """
+        Test that the snapshot of the ccx overrides is cached once for all the
+        learners, and discarded when the overrides change.
+        """
+        def get_start(user):
+            """
+            Returns the start of the chapter overridden for `user` in a new request.
+            """
+            RequestCache.clear_all_namespaces()
+            data = OverrideFieldData(
+                user, DictFieldData({}), (CustomCoursesForEdxOverrideProvider,), course_key=self.ccx_key
+            )
+            return data.get_override(chapter, 'start')
+
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        new_ccx_start = datetime.datetime(2015, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        learner, other_learner = AdminFactory.create(), AdminFactory.create()
+        self.assertEqual(get_start(learner), ccx_start)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_start(other_learner), ccx_start)
+
+        override_field_for_ccx(self.ccx, chapter, 'start', new_ccx_start)
+        self.assertEqual(get_start(learner), new_ccx_start)
+
     def test_override_num_queries_new_field(self):
         """
         Test that for creating new field executed only create query
@@ -31,6 +31,10 @@ class AccessDeniedMessageFilterTransformer(BlockStructureTransformer):
         """
         block_structure.request_xblock_fields('authorization_denial_reason', 'authorization_denial_message')
 
+    def get_transform_inputs(self, usage_info, block_structure):
+        # Only the (otherwise transformed) structure is used.
+        return ()
+
     def transform(self, usage_info, block_structure):
         def _filter(block_key):
             reason = block_structure.get_xblock_field(block_key, 'authorization_denial_reason')
@@ -0,0 +1,27 @@
+"""
+Date Override Transformer
+"""
+from __future__ import absolute_import
+
+import six
+from edx_when import field_data
+from edx_when.api import get_dates_for_course
+
+
+class DateOverrideTransformer(field_data.DateOverrideTransformer):
+    """
+    edx-when's DateOverrideTransformer, declaring the inputs of its
+    transform so that transformed block structures can be cached.
+    """
+    def get_transform_inputs(self, usage_info, block_structure):
+        """
+        The user's dates for the course, as loaded by the transform.
+        """
+        dates = get_dates_for_course(usage_info.course_key, usage_info.user)
+        return (
+            usage_info.user.id,
+            tuple(sorted(
+                (six.text_type(block_key), date_type, date)
+                for (block_key, date_type), date in six.iteritems(dates)
+            )),
+        )
@@ -31,6 +31,10 @@ class HideEmptyTransformer(BlockStructureTransformer):
         """
         block_structure.request_xblock_fields('children', 'has_children')
 
+    def get_transform_inputs(self, usage_info, block_structure):
+        # Only the (otherwise transformed) structure is used.
+        return ()
+
     def transform(self, usage_info, block_structure):
         def _filter(block_key):
             has_children = block_structure.get_xblock_field(block_key, 'has_children')
@@ -71,6 +71,68 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
                 summary = summarize_block(child_key)
                 block_structure.set_transformer_block_field(child_key, cls, 'block_analytics_summary', summary)
 
+    def get_transform_inputs(self, usage_info, block_structure):
+        """
+        The selected children of library_content blocks are stored in
+        the user's state for those blocks.  Selections for anonymous
+        users are not stored, so are not cacheable, and neither are
+        the transforms which select children, since they save the new
+        selections, and so change these inputs.
+        """
+        if not usage_info.user.is_authenticated:
+            return None
+
+        library_block_keys = [
+            block_key for block_key in block_structure
+            if block_key.block_type == 'library_content'
+        ]
+        if not library_block_keys:
+            return ()
+
+        states = {
+            block_key.map_into_course(usage_info.course_key): state
+            for block_key, state in StudentModule.objects.filter(
+                student_id=usage_info.user.id,
+                course_id=usage_info.course_key,
+                module_state_key__in=library_block_keys,
+            ).values_list('module_state_key', 'state')
+        }
+        for block_key in library_block_keys:
+            library_children = block_structure.get_children(block_key)
+            if library_children:
+                state_dict = json.loads(states[block_key]) if block_key in states else {}
+                block_keys = LibraryContentModule.make_selection(
+                    self._get_selected(usage_info, state_dict, library_children),
+                    library_children,
+                    block_structure.get_xblock_field(block_key, 'max_count'),
+                    block_structure.get_xblock_field(block_key, 'mode'),
+                )
+                if self._selection_changed(block_keys):
+                    return None
+        return (
+            usage_info.user.id,
+            tuple(sorted((six.text_type(block_key), state) for block_key, state in six.iteritems(states))),
+        )
+
+    @staticmethod
+    def _get_selected(usage_info, state_dict, library_children):
+        """
+        Returns the entries selected for the user in the given state of a
+        library_content block which are still children of the block.
+        """
+        return [
+            selected_block for selected_block in state_dict.get('selected', [])
+            if usage_info.course_key.make_usage_key(*selected_block) in library_children
+        ]
+
+    @staticmethod
+    def _selection_changed(block_keys):
+        """
+        Returns whether the selection made by LibraryContentModule.make_selection
+        differs from the previous one, and so has to be saved.
+        """
+        return any(block_keys[changed] for changed in ('invalid', 'overlimit', 'added'))
+
     def transform_block_filters(self, usage_info, block_structure):
         all_library_children = set()
         all_selected_children = set()
@@ -80,19 +142,12 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
             library_children = block_structure.get_children(block_key)
             if library_children:
                 all_library_children.update(library_children)
-                selected = []
                 mode = block_structure.get_xblock_field(block_key, 'mode')
                 max_count = block_structure.get_xblock_field(block_key, 'max_count')
 
                 # Retrieve "selected" json from LMS MySQL database.
                 state_dict = get_student_module_as_dict(usage_info.user, usage_info.course_key, block_key)
-                for selected_block in state_dict.get('selected', []):
-                    # Add all selected entries for this user for this
-                    # library module to the selected list.
-                    block_type, block_id = selected_block
-                    usage_key = usage_info.course_key.make_usage_key(block_type, block_id)
-                    if usage_key in library_children:
-                        selected.append(selected_block)
+                selected = self._get_selected(usage_info, state_dict, library_children)
 
                 # Update selected
                 previous_count = len(selected)
@@ -100,7 +155,7 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
                 selected = block_keys['selected']
 
                 # Save back any changes
-                if any(block_keys[changed] for changed in ('invalid', 'overlimit', 'added')):
+                if self._selection_changed(block_keys):
                     state_dict['selected'] = list(selected)
                     StudentModule.save_state(
                         student=usage_info.user,
@@ -5,6 +5,8 @@ from __future__ import absolute_import
 
 import json
 
+import six
+
 from courseware.models import StudentFieldOverride
 from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
 
@@ -80,6 +82,19 @@ class OverrideDataTransformer(BlockStructureTransformer):
         # collect basic xblock fields
         block_structure.request_xblock_fields(*REQUESTED_FIELDS)
 
+    def get_transform_inputs(self, usage_info, block_structure):
+        """
+        The user's override data for the blocks.
+        """
+        query = _get_override_query(usage_info.course_key, list(block_structure), self.user.id)
+        return (
+            self.user.id,
+            tuple(sorted(
+                (six.text_type(location), field, value)
+                for location, field, value in query.values_list('location', 'field', 'value')
+            )),
+        )
+
     def transform(self, usage_info, block_structure):
         """
         loads override data into blocks
@@ -3,7 +3,12 @@ Start Date Transformer implementation.
 """
 from __future__ import absolute_import
 
-from lms.djangoapps.courseware.access_utils import check_start_date
+from datetime import datetime
+
+from pytz import UTC
+
+from lms.djangoapps.courseware.access_utils import adjust_start_date, check_start_date, in_preview_mode
+from lms.djangoapps.courseware.masquerade import get_course_masquerade, is_masquerading_as_student
 from openedx.core.djangoapps.content.block_structure.transformer import (
     BlockStructureTransformer,
     FilteringTransformerMixin
@@ -69,6 +74,35 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             func_merge_ancestors=max,
         )
 
+    def get_transform_inputs(self, usage_info, block_structure):
+        """
+        Blocks are removed until their start date, adjusted for beta
+        testers, has passed.  Since start dates only ever pass, the
+        earliest upcoming start date identifies which blocks are removed.
+        """
+        if usage_info.has_staff_access:
+            return (True,)
+
+        user, course_key = usage_info.user, usage_info.course_key
+        now = datetime.now(UTC)
+        upcoming_starts = []
+        for block_key in block_structure:
+            start = self._get_merged_start_date(block_structure, block_key)
+            if not start:
+                continue
+            days_early_for_beta = block_structure.get_xblock_field(block_key, 'days_early_for_beta')
+            effective_start = adjust_start_date(user, days_early_for_beta, start, course_key)
+            if effective_start >= now:
+                upcoming_starts.append(effective_start)
+
+        return (
+            False,
+            is_masquerading_as_student(user, course_key),
+            bool(get_course_masquerade(user, course_key)),
+            in_preview_mode(),
+            min(upcoming_starts) if upcoming_starts else None,
+        )
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Start Date check.
         if usage_info.has_staff_access:
@@ -6,11 +6,12 @@ from __future__ import absolute_import
 
 from six.moves import range
 
-from openedx.core.djangoapps.content.block_structure.api import clear_course_from_cache
+from openedx.core.djangoapps.content.block_structure.api import clear_course_from_cache, get_course_in_cache
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from student.tests.factories import CourseEnrollmentFactory
 
 from ...api import get_course_blocks
+from ...usage_info import CourseUsageInfo
 from ..library_content import ContentLibraryTransformer
 from .helpers import CourseStructureTestCase
 
@@ -168,3 +169,17 @@ class ContentLibraryTransformerTestCase(CourseStructureTestCase):
                 ),
                 u"Expected 'selected' equality failed in iteration {}.".format(i)
             )
+
+    def test_transform_inputs(self):
+        """
+        Test that transforms which select children for the user are not
+        cached, since the selection they save changes their inputs.
+        """
+        block_structure = get_course_in_cache(self.course.id)
+        usage_info = CourseUsageInfo(self.course.id, self.user)
+        self.assertIsNone(ContentLibraryTransformer().get_transform_inputs(usage_info, block_structure))
+
+        get_course_blocks(self.user, self.course.location, self.transformers)
+        transform_inputs = ContentLibraryTransformer().get_transform_inputs(usage_info, block_structure)
+        self.assertEqual(transform_inputs[0], self.user.id)
+        self.assertEqual(len(transform_inputs[1]), 1)
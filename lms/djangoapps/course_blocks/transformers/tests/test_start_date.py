@@ -8,12 +8,15 @@ from datetime import timedelta
 import ddt
 import six
 from django.utils.timezone import now
+from freezegun import freeze_time
 from mock import patch
 
 from courseware.tests.factories import BetaTesterFactory
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 
+from ...usage_info import CourseUsageInfo
 from ..start_date import DEFAULT_START_DATE, StartDateTransformer
-from .helpers import BlockParentsMapTestCase, update_block
+from .helpers import BlockParentsMapTestCase, publish_course, update_block
 
 
 @ddt.ddt
@@ -121,3 +124,30 @@ class StartDateTransformerTestCase(BlockParentsMapTestCase):
             blocks_with_differing_student_access,
             self.transformers,
         )
+
+    @patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test_transform_inputs(self):
+        for idx, start_date_type in [(0, self.StartDateType.released), (1, self.StartDateType.future)]:
+            block = self.get_block(idx)
+            block.start = self.StartDateType.start(start_date_type)
+            update_block(block)
+        publish_course(self.course)
+        block_structure = get_course_in_cache(self.course.id)
+
+        def get_transform_inputs(user):
+            """
+            Returns the transformer's inputs for the given user.
+            """
+            return self.TRANSFORMER_CLASS_TO_TEST().get_transform_inputs(
+                CourseUsageInfo(self.course.id, user), block_structure,
+            )
+
+        # the beta tester's early access has started
+        student_inputs = get_transform_inputs(self.student)
+        self.assertEqual(student_inputs[-1], self.StartDateType.NEXT_MONTH)
+        self.assertIsNone(get_transform_inputs(self.beta_user)[-1])
+        self.assertEqual(get_transform_inputs(self.staff), (True,))
+
+        # the inputs change once the start date passes
+        with freeze_time(self.StartDateType.NEXT_MONTH + timedelta(days=1)):
+            self.assertNotEqual(get_transform_inputs(self.student), student_inputs)
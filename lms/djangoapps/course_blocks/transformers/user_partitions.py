@@ -78,6 +78,22 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
             merged_group_access = _MergedGroupAccess(user_partitions, xblock, merged_parent_access_list)
             block_structure.set_transformer_block_field(block_key, cls, 'merged_group_access', merged_group_access)
 
+    def get_transform_inputs(self, usage_info, block_structure):
+        """
+        Blocks are removed according to the user's group in each
+        partition, and access denial messages may be user-specific.
+        """
+        user_partitions = block_structure.get_transformer_data(self, 'user_partitions')
+        if not user_partitions:
+            return ()
+
+        user_groups = get_user_partition_groups(usage_info.course_key, user_partitions, usage_info.user, 'id')
+        return (
+            usage_info.user.id,
+            usage_info.has_staff_access,
+            tuple(sorted((partition_id, group.id) for partition_id, group in six.iteritems(user_groups))),
+        )
+
     def transform_block_filters(self, usage_info, block_structure):
         user = usage_info.user
         result_list = SplitTestTransformer().transform_block_filters(usage_info, block_structure)
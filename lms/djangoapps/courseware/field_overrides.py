@@ -22,7 +22,9 @@ from contextlib import contextmanager
 
 import six
 from django.conf import settings
-from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
+from django.core.cache import cache
+from django.db import transaction
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, RequestCache
 from xblock.field_data import FieldData
 
 from xmodule.modulestore.inheritance import InheritanceMixin
@@ -30,6 +32,12 @@ from xmodule.modulestore.inheritance import InheritanceMixin
 NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = u'courseware.modulestore_field_overrides.enabled_providers.{course_id}'
+OVERRIDE_SNAPSHOTS_CACHE_NAMESPACE = u'courseware.field_overrides.snapshots'
+OVERRIDE_SNAPSHOT_KEY = u'courseware.field_overrides.snapshot.{provider}.{user_id}.{course_id}'
+INHERITED_OVERRIDES_KEY = u'courseware.field_overrides.inherited.{field_data}.{user_id}.{course_id}'
+
+# Incremented whenever snapshots are discarded, so the plans built out of them are too.
+_snapshots_generation = 0
 
 
 def resolve_dotted(name):
@@ -51,6 +59,47 @@ def resolve_dotted(name):
     return target
 
 
+def _provider_path(provider_class):
+    """
+    Returns the dotted name of the given provider class.
+    """
+    return u'{}.{}'.format(provider_class.__module__, provider_class.__name__)
+
+
+def _snapshot_key(provider_class, user_id, course_key):
+    """
+    Returns the key under which the snapshot of the overrides of `provider_class`
+    for the user with the given id, in the given course, is cached.
+    """
+    return OVERRIDE_SNAPSHOT_KEY.format(
+        provider=_provider_path(provider_class),
+        user_id=user_id,
+        course_id=six.text_type(course_key),
+    )
+
+
+def clear_override_snapshots(provider_class, course_key, user_id=None):
+    """
+    Discards the snapshots of the overrides of `provider_class`, once the
+    overrides of the user with the given id, in the given course, changed.
+
+    All the snapshots of the request are discarded, as well as the snapshot of
+    the user in the course cached across requests, if any, both right away and
+    once the current transaction is committed.  The shared
+    snapshots of providers setting `snapshots_are_shared` are discarded with a
+    `user_id` of None.
+    """
+    global _snapshots_generation  # pylint: disable=global-statement
+    _snapshots_generation += 1
+    RequestCache(OVERRIDE_SNAPSHOTS_CACHE_NAMESPACE).clear()
+    if getattr(settings, 'FIELD_OVERRIDE_SNAPSHOT_CACHE_TIMEOUT', None):
+        snapshot_key = _snapshot_key(provider_class, user_id, course_key)
+        cache.delete(snapshot_key)
+        # Other requests may cache the overrides again until the change is
+        # committed, so discard the snapshot once more then.
+        transaction.on_commit(lambda: cache.delete(snapshot_key))
+
+
 def _lineage(block):
     """
     Returns an iterator over all ancestors of the given block, starting with
@@ -62,6 +111,17 @@ def _lineage(block):
         parent = parent.get_parent()
 
 
+def _from_json(block, name, value):
+    """
+    Returns the value of the field named `name` of `block` from its JSON
+    value, or the JSON value itself if `block` has no such field.
+    """
+    try:
+        return block.fields[name].from_json(value)
+    except KeyError:
+        return value
+
+
 class _OverridesDisabled(threading.local):
     """
     A thread local used to manage state of overrides being disabled or not.
@@ -94,6 +154,33 @@ def overrides_disabled():
     return bool(_OVERRIDES_DISABLED.disabled)
 
 
+class OverrideSnapshot(object):
+    """
+    All the overrides of a provider for a user in a course, loaded at once.
+
+    `values` maps (location, field name) pairs to the JSON values of the
+    overrides, and `all_blocks` maps the names of the fields overridden on
+    every block to their JSON values.
+    """
+    def __init__(self, values, all_blocks=None):
+        self.values = values
+        self.all_blocks = all_blocks or {}
+        self.field_names = frozenset(name for __, name in values).union(self.all_blocks)
+
+    def __len__(self):
+        return len(self.values) + len(self.all_blocks)
+
+    def get(self, location, name, default=NOTSET):
+        """
+        Returns the JSON value of the override of the field named `name` at
+        `location`, or `default` if the field is not overridden.
+        """
+        value = self.values.get((location, name), NOTSET)
+        if value is NOTSET:
+            value = self.all_blocks.get(name, default)
+        return value
+
+
 class FieldOverrideProvider(six.with_metaclass(ABCMeta, object)):
     """
     Abstract class which defines the interface that a `FieldOverrideProvider`
@@ -104,12 +191,38 @@ class FieldOverrideProvider(six.with_metaclass(ABCMeta, object)):
     A `FieldOverrideProvider` implementation is only responsible for looking up
     field overrides. To set overrides, there will be a domain specific API for
     the concrete override implementation being used.
+
+    Providers whose overrides are stored, rather than computed, should also
+    implement `get_snapshot`, so their overrides are loaded once per user and
+    course.  Providers which only override a few fields should list them in
+    `overridden_fields`, and providers whose snapshots are the same for all the
+    users of a course should set `snapshots_are_shared`.
     """
+    # The names of the fields this provider may override, or None if any.
+    overridden_fields = None
+    # Whether the snapshots of this provider are shared by all the users of a
+    # course, and so cached, and discarded, once per course.
+    snapshots_are_shared = False
 
     def __init__(self, user, fallback_field_data):
         self.user = user
         self.fallback_field_data = fallback_field_data
 
+    def get_snapshot(self, course_key):
+        """
+        Returns all the overrides of this provider for its user in the given
+        course, as an :class:`OverrideSnapshot`, or None if the overrides can
+        only be looked up block by block with `get`, which is the default.
+        """
+        return None
+
+    def get_snapshot_location(self, block):
+        """
+        Returns the location under which the overrides of `block` are found in
+        the snapshots of this provider.
+        """
+        return block.location
+
     @abstractmethod
     def get(self, block, name, default):  # pragma no cover
         """
@@ -147,6 +260,10 @@ class OverrideFieldData(FieldData):
     is important for this setting.  Override providers will tried in the order
     configured in the setting.  The first provider to find an override 'wins'
     for a particular field lookup.
+
+    The overrides of the providers implementing `get_snapshot` are loaded once
+    per user and course, and cached for the request, or across requests when
+    the Django setting `FIELD_OVERRIDE_SNAPSHOT_CACHE_TIMEOUT` is set.
     """
     provider_classes = None
 
@@ -171,7 +288,7 @@ class OverrideFieldData(FieldData):
             # to check for instance.providers after the instance is built. This
             # would allow for the case where we have registered providers but
             # none are enabled for the provided course
-            return cls(user, wrapped, enabled_providers)
+            return cls(user, wrapped, enabled_providers, course_key=getattr(course, 'id', None))
 
         return wrapped
 
@@ -199,9 +316,66 @@ class OverrideFieldData(FieldData):
 
         return enabled_providers
 
-    def __init__(self, user, fallback, providers):
+    def __init__(self, user, fallback, providers, course_key=None):
         self.fallback = fallback
         self.providers = tuple(provider(user, fallback) for provider in providers)
+        self.user_id = getattr(user, 'id', None)
+        self.course_key = course_key
+        self._plan = None
+        self._plan_generation = None
+
+    def _get_snapshot(self, provider):
+        """
+        Returns the snapshot of the overrides of `provider` in the course, or
+        None if the provider does not support snapshots.
+        """
+        user_id = None if provider.snapshots_are_shared else self.user_id
+        cache_key = _snapshot_key(provider.__class__, user_id, self.course_key)
+        snapshots = RequestCache(OVERRIDE_SNAPSHOTS_CACHE_NAMESPACE).data
+        snapshot = snapshots.get(cache_key, NOTSET)
+        if snapshot is NOTSET:
+            timeout = getattr(settings, 'FIELD_OVERRIDE_SNAPSHOT_CACHE_TIMEOUT', None)
+            snapshot = cache.get(cache_key) if timeout else None
+            if snapshot is None:
+                snapshot = provider.get_snapshot(self.course_key)
+                if snapshot is not None and timeout:
+                    cache.set(cache_key, snapshot, timeout)
+            snapshots[cache_key] = snapshot
+        return snapshot
+
+    def _get_plan(self):
+        """
+        Returns the plan followed to resolve overrides: the steps, in order of
+        precedence, as (provider, snapshot, field names) tuples, along with
+        the names of all the fields which may be overridden.
+
+        The snapshot is None for providers looking up their overrides block
+        by block, and the field names are None for providers which may
+        override any field.  Providers with empty snapshots are left out.
+        """
+        if self._plan is None or self._plan_generation != _snapshots_generation:
+            self._plan_generation = _snapshots_generation
+            steps = []
+            all_field_names = set()
+            for provider in self.providers:
+                snapshot = self._get_snapshot(provider) if self.course_key is not None else None
+                if snapshot is not None:
+                    if not snapshot:
+                        continue
+                    field_names = snapshot.field_names
+                elif provider.overridden_fields is not None:
+                    field_names = frozenset(provider.overridden_fields)
+                else:
+                    field_names = None
+
+                steps.append((provider, snapshot, field_names))
+                if all_field_names is not None:
+                    if field_names is None:
+                        all_field_names = None
+                    else:
+                        all_field_names.update(field_names)
+            self._plan = (tuple(steps), all_field_names)
+        return self._plan
 
     def get_override(self, block, name):
         """
@@ -209,12 +383,74 @@ class OverrideFieldData(FieldData):
         Returns the overridden value or `NOTSET` if no override is found.
         """
         if not overrides_disabled():
-            for provider in self.providers:
-                value = provider.get(block, name, NOTSET)
+            steps, all_field_names = self._get_plan()
+            if all_field_names is not None and name not in all_field_names:
+                return NOTSET
+
+            for provider, snapshot, field_names in steps:
+                if field_names is not None and name not in field_names:
+                    continue
+                if snapshot is None:
+                    value = provider.get(block, name, NOTSET)
+                else:
+                    value = snapshot.get(provider.get_snapshot_location(block), name)
+                    if value is not NOTSET:
+                        value = _from_json(block, name, value)
                 if value is not NOTSET:
                     return value
         return NOTSET
 
+    def _get_inherited_override(self, block, name):
+        """
+        Returns the override of the field identified by `name` that `block`
+        inherits from its closest ancestor with an override, or `NOTSET`.
+
+        When the field is only overridden by snapshots, the overrides resolved
+        for the ancestors are cached for the request, so that each ancestor is
+        only looked up once per field.
+        """
+        if overrides_disabled():
+            return NOTSET
+
+        steps, all_field_names = self._get_plan()
+        if all_field_names is not None and name not in all_field_names:
+            return NOTSET
+
+        if self.course_key is None or any(
+                snapshot is None and (field_names is None or name in field_names)
+                for __, snapshot, field_names in steps
+        ):
+            for ancestor in _lineage(block):
+                value = self.get_override(ancestor, name)
+                if value is not NOTSET:
+                    return value
+            return NOTSET
+
+        resolved = RequestCache(OVERRIDE_SNAPSHOTS_CACHE_NAMESPACE).data.setdefault(
+            INHERITED_OVERRIDES_KEY.format(
+                field_data=self.__class__.__name__,
+                user_id=self.user_id,
+                course_id=six.text_type(self.course_key),
+            ),
+            {},
+        )
+        # Each ancestor resolves to its own override, or else to the override
+        # resolved for its parent.
+        pending = []
+        value = NOTSET
+        for ancestor in _lineage(block):
+            key = (ancestor.location, name)
+            if key in resolved:
+                value = resolved[key]
+                break
+            pending.append(key)
+            value = self.get_override(ancestor, name)
+            if value is not NOTSET:
+                break
+        for key in pending:
+            resolved[key] = value
+        return value
+
     def get(self, block, name):
         value = self.get_override(block, name)
         if value is not NOTSET:
@@ -236,11 +472,9 @@ class OverrideFieldData(FieldData):
             # If this is an inheritable field and an override is set above,
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
-            inheritable = list(InheritanceMixin.fields.keys())  # pylint: disable=no-member
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if name in InheritanceMixin.fields:  # pylint: disable=no-member
+                if self._get_inherited_override(block, name) is not NOTSET:
+                    return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -251,12 +485,10 @@ class OverrideFieldData(FieldData):
         # The `default` method is overloaded by the field storage system to
         # also handle inheritance.
         if self.providers and not overrides_disabled():
-            inheritable = list(InheritanceMixin.fields.keys())  # pylint: disable=no-member
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+            if name in InheritanceMixin.fields:  # pylint: disable=no-member
+                value = self._get_inherited_override(block, name)
+                if value is not NOTSET:
+                    return value
         return self.fallback.default(block, name)
 
 
@@ -282,7 +514,7 @@ class OverrideModulestoreFieldData(OverrideFieldData):
 
         enabled_providers = cls._providers_for_block(block)
         if enabled_providers:
-            return cls(field_data, enabled_providers)
+            return cls(field_data, enabled_providers, course_key=block.location.course_key)
 
         return field_data
 
@@ -310,5 +542,5 @@ class OverrideModulestoreFieldData(OverrideFieldData):
 
         return enabled_providers
 
-    def __init__(self, fallback, providers):
-        super(OverrideModulestoreFieldData, self).__init__(None, fallback, providers)
+    def __init__(self, fallback, providers, course_key=None):  # pylint: disable=arguments-differ
+        super(OverrideModulestoreFieldData, self).__init__(None, fallback, providers, course_key=course_key)
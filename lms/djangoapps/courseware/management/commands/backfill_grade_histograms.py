@@ -0,0 +1,46 @@
+"""
+Management command to count the StudentModules of courses into grade buckets.
+"""
+from __future__ import absolute_import
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from courseware.models import StudentModuleGradeBucket
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Count the StudentModules of courses into the grade buckets of their blocks.
+    """
+    help = """
+    Replaces the grade buckets of the blocks of the given courses, out of
+    which the grade histograms shown to staff are read, with buckets counted
+    out of the StudentModules of the courses. Run it before enabling the
+    courseware.use_grade_histogram_buckets waffle flag for a course.
+
+    example:
+        manage.py ... backfill_grade_histograms course-v1:edX+DemoX+Demo_Course
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'course_ids',
+            nargs='+',
+            help='course ids of the courses whose grade buckets are backfilled'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course_keys = [CourseKey.from_string(course_id) for course_id in options['course_ids']]
+        except InvalidKeyError as error:
+            raise CommandError(u'Invalid course id: {}'.format(error))
+
+        for course_key in course_keys:
+            num_buckets = StudentModuleGradeBucket.backfill(course_key)
+            log.info(u'Backfilled %d grade buckets of course %s', num_buckets, course_key)
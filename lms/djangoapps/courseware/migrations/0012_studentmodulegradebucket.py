@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.25 on 2019-10-21 14:02
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import opaque_keys.edx.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courseware', '0011_csm_id_bigint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentModuleGradeBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_id', opaque_keys.edx.django.models.CourseKeyField(db_index=True, max_length=255)),
+                ('module_state_key', opaque_keys.edx.django.models.UsageKeyField(db_column='module_id', max_length=255)),
+                ('graded', models.BooleanField(default=True)),
+                ('grade', models.FloatField(default=0)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentmodulegradebucket',
+            unique_together=set([('module_state_key', 'graded', 'grade')]),
+        ),
+    ]
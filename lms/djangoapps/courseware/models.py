@@ -21,8 +21,11 @@ import six
 from config_models.models import ConfigurationModel
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.django.models import BlockTypeKeyField, CourseKeyField, UsageKeyField
@@ -160,6 +163,56 @@ class StudentModule(models.Model):
     def __unicode__(self):
         return six.text_type(repr(self))
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(StudentModule, cls).from_db(db, field_names, values)
+        # Keep the score the module was loaded with, to tell whether it may be
+        # counted in the grade buckets of its block when it is saved.
+        instance._loaded_score = (  # pylint: disable=protected-access
+            instance.__dict__.get('grade', _UNKNOWN_GRADE),
+            instance.__dict__.get('max_grade', _UNKNOWN_GRADE),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        """
+        Saves the module, and counts it in the grade buckets of its block.
+
+        Only the modules of scorable blocks, which have a max_grade, are
+        counted.  When the score of a counted module is updated, the score it
+        replaces is read from the database under a lock, so that concurrent
+        updates of the module can't make the buckets drift.  When its score
+        didn't change since it was loaded, the other fields are saved without
+        it, so that a concurrent update of the score isn't overwritten.
+        """
+        update_fields = kwargs.get('update_fields')
+        loaded_score = getattr(self, '_loaded_score', (_UNKNOWN_GRADE, _UNKNOWN_GRADE))
+        if (
+            update_fields is None and not self._state.adding and not kwargs.get('force_insert') and
+            loaded_score == (self.grade, self.max_grade)
+        ):
+            kwargs['update_fields'] = update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('grade', 'max_grade')
+            ]
+        if update_fields is not None and not {'grade', 'max_grade'}.intersection(update_fields):
+            super(StudentModule, self).save(*args, **kwargs)
+            return
+        if self._state.adding:
+            super(StudentModule, self).save(*args, **kwargs)
+            _update_grade_buckets(self, None)
+        elif self.max_grade is None and loaded_score[1] is None:
+            # The module was not counted, and still isn't.
+            super(StudentModule, self).save(*args, **kwargs)
+        else:
+            with transaction.atomic(savepoint=False):
+                saved_score = StudentModule.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'grade', 'max_grade',
+                ).first()
+                super(StudentModule, self).save(*args, **kwargs)
+                _update_grade_buckets(self, saved_score)
+        self._loaded_score = (self.grade, self.max_grade)
+
     @classmethod
     def get_state_by_params(cls, course_id, module_state_keys, student_id=None):
         """
@@ -185,6 +238,156 @@ class StudentModule(models.Model):
             )
 
 
+class StudentModuleGradeBucket(models.Model):
+    """
+    The number of StudentModules of a block with a given grade, maintained as
+    StudentModules are saved and deleted, so that the grade histogram of a
+    block is read out of a few rows rather than computed out of all of its
+    StudentModules.
+
+    .. no_pii:
+    """
+    CACHE_KEY = u'courseware.grade_histogram.{}'
+    CACHE_TIMEOUT = 60
+
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('module_state_key', 'graded', 'grade'),)
+
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = UsageKeyField(max_length=255, db_column='module_id')
+
+    # Whether the StudentModules have a grade, the grade being 0 when they don't,
+    # so that ungraded StudentModules are counted in a single bucket.
+    graded = models.BooleanField(default=True)
+    grade = models.FloatField(default=0)
+    count = models.IntegerField(default=0)
+
+    @classmethod
+    def add(cls, course_id, module_state_key, grade, delta):
+        """
+        Adds `delta` to the number of StudentModules of the block with the given grade.
+        """
+        bucket = cls.objects.filter(module_state_key=module_state_key, graded=grade is not None, grade=grade or 0)
+        if bucket.update(count=F('count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    course_id=course_id,
+                    module_state_key=module_state_key,
+                    graded=grade is not None,
+                    grade=grade or 0,
+                    count=delta,
+                )
+        except IntegrityError:
+            # The bucket was created concurrently.
+            bucket.update(count=F('count') + delta)
+
+    @classmethod
+    def get_histogram(cls, module_state_key):
+        """
+        Returns the grade histogram of the block, as (grade, number of
+        StudentModules) pairs sorted by grade, or an empty list if some
+        StudentModules of the block have no grade.  Only the StudentModules
+        with a max_grade are counted.
+
+        A bucket with a negative count means the buckets of the block are out
+        of sync with its StudentModules: an error is logged, and an empty
+        histogram is returned until the course is backfilled.
+
+        Histograms are cached for CACHE_TIMEOUT seconds.
+        """
+        cache_key = cls.CACHE_KEY.format(module_state_key)
+        histogram = cache.get(cache_key)
+        if histogram is None:
+            histogram = []
+            buckets = cls.objects.filter(module_state_key=module_state_key).exclude(count=0).order_by('grade')
+            for graded, grade, count in buckets.values_list('graded', 'grade', 'count'):
+                if count < 0:
+                    log.error(u'The grade buckets of %s are out of sync; backfill its course.', module_state_key)
+                    histogram = []
+                    break
+                if not graded:
+                    histogram = []
+                    break
+                histogram.append((grade, count))
+            cache.set(cache_key, histogram, cls.CACHE_TIMEOUT)
+        return histogram
+
+    @classmethod
+    def backfill(cls, course_id):
+        """
+        Replaces the buckets of the blocks of the course with buckets counted
+        out of the StudentModules of the course.
+
+        Grades changed while the StudentModules are counted may be missed, so
+        the course should be backfilled before its histograms are read.  It
+        can also be backfilled again at any time, to reconcile buckets which
+        got out of sync.
+        """
+        counts = StudentModule.objects.filter(course_id=course_id, max_grade__isnull=False).values_list(
+            'module_state_key', 'grade',
+        ).annotate(count=Count('id')).order_by()
+        buckets = [
+            cls(
+                course_id=course_id,
+                module_state_key=module_state_key,
+                graded=grade is not None,
+                grade=grade or 0,
+                count=count,
+            )
+            for module_state_key, grade, count in counts
+        ]
+        with transaction.atomic():
+            old_buckets = cls.objects.filter(course_id=course_id)
+            module_state_keys = set(old_buckets.values_list('module_state_key', flat=True))
+            old_buckets.delete()
+            cls.objects.bulk_create(buckets, batch_size=1000)
+        module_state_keys.update(bucket.module_state_key for bucket in buckets)
+        cache.delete_many([cls.CACHE_KEY.format(module_state_key) for module_state_key in module_state_keys])
+        return len(buckets)
+
+
+# The grade of StudentModules loaded without it, or which are not counted in
+# the grade buckets of their block.
+_UNKNOWN_GRADE = object()
+
+
+def _add_to_grade_bucket(course_id, module_state_key, grade, delta):
+    """
+    Adds `delta` to the grade bucket of the block once the current transaction
+    is committed, so that the buckets, shared by all the learners, are only
+    locked for a short transaction of their own.
+    """
+    transaction.on_commit(lambda: StudentModuleGradeBucket.add(course_id, module_state_key, grade, delta))
+
+
+def _update_grade_buckets(module, saved_score):
+    """
+    Moves the module from the bucket of its saved (grade, max_grade) score,
+    None if it was just created, to the bucket of its current grade.
+    """
+    counted_grade = saved_score[0] if saved_score and saved_score[1] is not None else _UNKNOWN_GRADE
+    grade = module.grade if module.max_grade is not None else _UNKNOWN_GRADE
+    if counted_grade == grade:
+        return
+    if counted_grade is not _UNKNOWN_GRADE:
+        _add_to_grade_bucket(module.course_id, module.module_state_key, counted_grade, -1)
+    if grade is not _UNKNOWN_GRADE:
+        _add_to_grade_bucket(module.course_id, module.module_state_key, grade, 1)
+
+
+@receiver(post_delete, sender=StudentModule)
+def update_grade_buckets_on_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the deleted StudentModule from the bucket of its grade, if it was counted.
+    """
+    grade, max_grade = getattr(instance, '_loaded_score', (instance.grade, instance.max_grade))
+    if max_grade is not None and max_grade is not _UNKNOWN_GRADE and grade is not _UNKNOWN_GRADE:
+        _add_to_grade_bucket(instance.course_id, instance.module_state_key, grade, -1)
+
+
 class BaseStudentModuleHistory(models.Model):
     """
     Abstract class containing most fields used by any class storing Student Module History
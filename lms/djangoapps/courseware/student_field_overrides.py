@@ -9,7 +9,7 @@ import json
 from courseware.models import StudentFieldOverride
 from openedx.core.lib.xblock_utils import is_xblock_aside
 
-from .field_overrides import FieldOverrideProvider
+from .field_overrides import FieldOverrideProvider, OverrideSnapshot, clear_override_snapshots
 
 
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
@@ -21,6 +21,25 @@ class IndividualStudentOverrideProvider(FieldOverrideProvider):
     def get(self, block, name, default):
         return get_override_for_user(self.user, block, name, default)
 
+    def get_snapshot(self, course_key):
+        """
+        Loads all the overrides of the user in the course with one query.
+        """
+        query = StudentFieldOverride.objects.filter(
+            course_id=course_key,
+            student_id=self.user.id,
+        ).values_list('location', 'field', 'value')
+        values = {}
+        for location, field, value in query:
+            if location.run is None:
+                # pylint: disable=unexpected-keyword-arg,no-value-for-parameter
+                location = location.replace(course_key=course_key)
+            values[(location, field)] = json.loads(value)
+        return OverrideSnapshot(values)
+
+    def get_snapshot_location(self, block):
+        return _get_override_location(block)
+
     @classmethod
     def enabled_for(cls, course):
         """This simple override provider is always enabled"""
@@ -42,23 +61,28 @@ def get_override_for_user(user, block, name, default=None):
     return overrides.get(name, default)
 
 
-def _get_overrides_for_user(user, block):
+def _get_override_location(block):
     """
-    Gets all of the individual student overrides for given user and block.
-    Returns a dictionary of field override values keyed by field name.
+    Returns the location the overrides of `block` are stored under, which is
+    the location of the block an aside applies to, for asides.
     """
     if (
         hasattr(block, "scope_ids") and
         hasattr(block.scope_ids, "usage_id") and
         is_xblock_aside(block.scope_ids.usage_id)
     ):
-        location = block.scope_ids.usage_id.usage_key
-    else:
-        location = block.location
+        return block.scope_ids.usage_id.usage_key
+    return block.location
+
 
+def _get_overrides_for_user(user, block):
+    """
+    Gets all of the individual student overrides for given user and block.
+    Returns a dictionary of field override values keyed by field name.
+    """
     query = StudentFieldOverride.objects.filter(
         course_id=block.runtime.course_id,
-        location=location,
+        location=_get_override_location(block),
         student_id=user.id,
     )
     overrides = {}
@@ -83,6 +107,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    clear_override_snapshots(IndividualStudentOverrideProvider, block.runtime.course_id, user.id)
 
 
 def clear_override_for_user(user, block, name):
@@ -100,3 +125,5 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    else:
+        clear_override_snapshots(IndividualStudentOverrideProvider, block.runtime.course_id, user.id)
@@ -4,21 +4,27 @@ Tests for `field_overrides` module.
 # pylint: disable=missing-docstring
 from __future__ import absolute_import
 
+import datetime
 import unittest
 
+import pytz
 from django.test.utils import override_settings
+from edx_django_utils.cache import RequestCache
+from mock import patch
 from xblock.field_data import DictFieldData
 
-from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
-from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase, SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
 from ..field_overrides import (
+    NOTSET,
     FieldOverrideProvider,
     OverrideFieldData,
     OverrideModulestoreFieldData,
     disable_overrides,
     resolve_dotted
 )
+from ..student_field_overrides import clear_override_for_user, override_field_for_user
 from ..testutils import FieldOverrideTestMixin
 
 TESTUSER = "testuser"
@@ -148,6 +154,86 @@ class OverrideModulestoreFieldDataTests(FieldOverrideTestMixin, OverrideFieldDat
         self.assertIsInstance(data, DictFieldData)
 
 
+@override_settings(FIELD_OVERRIDE_PROVIDERS=(
+    'courseware.student_field_overrides.IndividualStudentOverrideProvider',))
+class OverrideSnapshotTests(ModuleStoreTestCase):
+    """
+    Tests for the snapshots of the overrides of providers.
+    """
+    DUE = datetime.datetime(2030, 1, 1, tzinfo=pytz.UTC)
+
+    def setUp(self):
+        super(OverrideSnapshotTests, self).setUp()
+        OverrideFieldData.provider_classes = None
+        self.addCleanup(setattr, OverrideFieldData, 'provider_classes', None)
+        self.addCleanup(RequestCache.clear_all_namespaces)
+
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.sequential = ItemFactory.create(parent=self.chapter, category='sequential')
+        override_field_for_user(self.user, self.chapter, 'due', self.DUE)
+        RequestCache.clear_all_namespaces()
+
+    def make_one(self):
+        """
+        Returns field data with the overrides of the user.
+        """
+        return OverrideFieldData.wrap(self.user, self.course, DictFieldData({}))
+
+    def test_overrides_loaded_once(self):
+        data = self.make_one()
+        with self.assertNumQueries(1):
+            self.assertEqual(data.get_override(self.chapter, 'due'), self.DUE)
+            self.assertIs(data.get_override(self.sequential, 'due'), NOTSET)
+            self.assertIs(data.get_override(self.chapter, 'start'), NOTSET)
+            self.assertEqual(data.default(self.sequential, 'due'), self.DUE)
+            self.assertFalse(data.has(self.sequential, 'due'))
+            self.assertEqual(self.make_one().get_override(self.chapter, 'due'), self.DUE)
+
+    def test_overrides_disabled(self):
+        data = self.make_one()
+        with disable_overrides():
+            self.assertIs(data.get_override(self.chapter, 'due'), NOTSET)
+            with self.assertRaises(KeyError):
+                data.default(self.sequential, 'due')
+
+    def test_snapshot_cleared_on_change(self):
+        data = self.make_one()
+        self.assertEqual(data.default(self.sequential, 'due'), self.DUE)
+        clear_override_for_user(self.user, self.chapter, 'due')
+        self.assertIs(data.get_override(self.chapter, 'due'), NOTSET)
+        with self.assertRaises(KeyError):
+            data.default(self.sequential, 'due')
+
+    @override_settings(
+        FIELD_OVERRIDE_SNAPSHOT_CACHE_TIMEOUT=60,
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'field_override_snapshots',
+            }
+        },
+    )
+    def test_snapshot_cached_across_requests(self):
+        self.assertEqual(self.make_one().get_override(self.chapter, 'due'), self.DUE)
+        RequestCache.clear_all_namespaces()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.make_one().get_override(self.chapter, 'due'), self.DUE)
+
+        with patch('courseware.field_overrides.transaction.on_commit') as mock_on_commit:
+            clear_override_for_user(self.user, self.chapter, 'due')
+            # A request reading the overrides before the change is committed caches them again.
+            RequestCache.clear_all_namespaces()
+            self.make_one().get_override(self.chapter, 'due')
+
+        # Committing the change discards that snapshot too.
+        for call_args in mock_on_commit.call_args_list:
+            call_args[0][0]()
+        RequestCache.clear_all_namespaces()
+        with self.assertNumQueries(1):
+            self.assertIs(self.make_one().get_override(self.chapter, 'due'), NOTSET)
+
+
 class ResolveDottedTests(unittest.TestCase):
     """
     Tests for `resolve_dotted`.
@@ -0,0 +1,151 @@
+"""
+Tests for the grade buckets out of which the grade histograms of blocks are read.
+"""
+from __future__ import absolute_import
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from mock import patch
+
+from courseware.models import StudentModule, StudentModuleGradeBucket
+from courseware.tests.factories import StudentModuleFactory, course_id, location
+from courseware.toggles import USE_GRADE_HISTOGRAM_BUCKETS
+from openedx.core.djangoapps.waffle_utils.testutils import override_waffle_flag
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.xblock_utils import grade_histogram
+
+
+class StudentModuleGradeBucketTest(CacheIsolationTestCase):
+    """
+    Tests for StudentModuleGradeBucket.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(StudentModuleGradeBucketTest, self).setUp()
+        self.usage_key = location('problem')
+        # TestCases never commit, so run the updates of the buckets right away.
+        patcher = patch('courseware.models.transaction.on_commit', side_effect=lambda func: func())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_module(self, grade, max_grade=1):
+        """
+        Returns a new StudentModule of the problem with the given grade.
+        """
+        return StudentModuleFactory(
+            course_id=course_id, module_state_key=self.usage_key, grade=grade, max_grade=max_grade,
+        )
+
+    def assert_buckets(self, expected):
+        """
+        Asserts the non-empty buckets of the problem are the expected (graded, grade, count) triples.
+        """
+        buckets = StudentModuleGradeBucket.objects.filter(module_state_key=self.usage_key).exclude(count=0)
+        self.assertEqual(sorted(buckets.values_list('graded', 'grade', 'count')), sorted(expected))
+
+    def test_buckets_follow_grades(self):
+        first = self.create_module(1)
+        self.create_module(1)
+        third = self.create_module(None)
+        self.assert_buckets([(True, 1, 2), (False, 0, 1)])
+
+        third.grade = 0.5
+        third.save()
+        self.assert_buckets([(True, 0.5, 1), (True, 1, 2)])
+
+        first = StudentModule.objects.get(id=first.id)
+        first.grade = 0.5
+        first.save()
+        self.assert_buckets([(True, 0.5, 2), (True, 1, 1)])
+
+        # Saving the module again doesn't count it twice.
+        first.save()
+        self.assert_buckets([(True, 0.5, 2), (True, 1, 1)])
+
+        StudentModule.objects.get(id=first.id).delete()
+        self.assert_buckets([(True, 0.5, 1), (True, 1, 1)])
+
+    def test_modules_without_max_grade_not_counted(self):
+        module = self.create_module(None, max_grade=None)
+        module.state = '{}'
+        module.save()
+        self.assertFalse(StudentModuleGradeBucket.objects.exists())
+
+        module.grade = 1
+        module.max_grade = 2
+        module.save()
+        self.assert_buckets([(True, 1, 1)])
+
+    def test_concurrent_updates(self):
+        module = self.create_module(0)
+        first = StudentModule.objects.get(id=module.id)
+        second = StudentModule.objects.get(id=module.id)
+        first.grade = 0.5
+        first.save()
+        # The second update replaces the grade saved by the first one, not the one it was loaded with.
+        second.grade = 1
+        second.save()
+        self.assert_buckets([(True, 1, 1)])
+
+    def test_state_saved_without_score(self):
+        module = self.create_module(0)
+        stale = StudentModule.objects.get(id=module.id)
+        module.grade = 1
+        module.save()
+        # Saving the state of a module whose score didn't change neither locks it nor overwrites its score.
+        stale.state = '{"position": 2}'
+        with patch('django.db.models.QuerySet.select_for_update') as mock_select_for_update:
+            stale.save()
+        self.assertFalse(mock_select_for_update.called)
+        module = StudentModule.objects.get(id=module.id)
+        self.assertEqual((module.state, module.grade), ('{"position": 2}', 1))
+        self.assert_buckets([(True, 1, 1)])
+
+    def test_out_of_sync_histogram(self):
+        self.create_module(1)
+        StudentModuleGradeBucket.objects.update(count=-1)
+        self.assertEqual(StudentModuleGradeBucket.get_histogram(self.usage_key), [])
+
+    def test_get_histogram(self):
+        for grade in (1, 0.5, 1):
+            self.create_module(grade)
+        self.assertEqual(StudentModuleGradeBucket.get_histogram(self.usage_key), [(0.5, 1), (1, 2)])
+        self.assertEqual(StudentModuleGradeBucket.get_histogram(location('other_problem')), [])
+
+        # Histograms are cached.
+        self.create_module(0)
+        with self.assertNumQueries(0):
+            self.assertEqual(StudentModuleGradeBucket.get_histogram(self.usage_key), [(0.5, 1), (1, 2)])
+
+    def test_histogram_with_ungraded_modules(self):
+        self.create_module(1)
+        self.create_module(None)
+        self.assertEqual(StudentModuleGradeBucket.get_histogram(self.usage_key), [])
+
+    def test_grade_histogram(self):
+        for grade in (1, 0.5):
+            self.create_module(grade)
+        # The buckets are out of sync until the course is backfilled.
+        StudentModuleGradeBucket.objects.all().delete()
+
+        self.assertEqual(sorted(grade_histogram(self.usage_key)), [(0.5, 1), (1, 1)])
+        with override_waffle_flag(USE_GRADE_HISTOGRAM_BUCKETS, active=True):
+            self.assertEqual(grade_histogram(self.usage_key), [])
+            call_command('backfill_grade_histograms', str(course_id))
+            self.assertEqual(grade_histogram(self.usage_key), [(0.5, 1), (1, 1)])
+
+    def test_backfill(self):
+        for grade in (1, 1, None, 0):
+            self.create_module(grade)
+        StudentModuleGradeBucket.objects.filter(grade=1).update(count=5)
+        self.assertEqual(StudentModuleGradeBucket.get_histogram(self.usage_key), [])
+
+        self.assertEqual(StudentModuleGradeBucket.backfill(course_id), 3)
+        self.assert_buckets([(True, 0, 1), (True, 1, 2), (False, 0, 1)])
+        StudentModule.objects.filter(grade=None).delete()
+        self.assertEqual(StudentModuleGradeBucket.get_histogram(self.usage_key), [(0, 1), (1, 2)])
+
+    def test_backfill_invalid_course(self):
+        with self.assertRaises(CommandError):
+            call_command('backfill_grade_histograms', 'not a course id')
@@ -0,0 +1,25 @@
+"""
+Toggles for courseware.
+"""
+from __future__ import absolute_import
+
+from openedx.core.djangoapps.waffle_utils import CourseWaffleFlag, WaffleFlagNamespace
+
+# Namespace for courseware waffle flags.
+WAFFLE_FLAG_NAMESPACE = WaffleFlagNamespace(name='courseware')
+
+# Waffle flag to read the grade histograms shown to staff out of grade buckets.
+# .. toggle_name: courseware.use_grade_histogram_buckets
+# .. toggle_type: waffle_flag
+# .. toggle_default: False
+# .. toggle_description: Reads the grade histograms of problems, shown to staff in their debug info, out of the
+#   StudentModuleGradeBucket rows maintained as StudentModules are saved, instead of grouping all the
+#   StudentModules of the problem by grade on each render.
+# .. toggle_category: courseware
+# .. toggle_use_cases: incremental_release
+# .. toggle_creation_date: 2019-10-21
+# .. toggle_expiration_date: 2020-06-30
+# .. toggle_warnings: Run the backfill_grade_histograms management command for the course before enabling the flag.
+# .. toggle_tickets: None
+# .. toggle_status: supported
+USE_GRADE_HISTOGRAM_BUCKETS = CourseWaffleFlag(WAFFLE_FLAG_NAMESPACE, 'use_grade_histogram_buckets')
@@ -279,7 +279,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
                 try:
                     with transaction.atomic():
                         # Updating the object - force_update guarantees no INSERT will occur.
-                        student_module.save(force_update=True)
+                        student_module.save(force_update=True, update_fields=['state', 'modified'])
                 except IntegrityError:
                     # The UPDATE above failed. Log information - but ignore the error.
                     # See https://openedx.atlassian.net/browse/TNL-5365
@@ -339,7 +339,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
                 student_module.state = json.dumps(current_state)
 
             # We just read this object, so we know that we can do an update
-            student_module.save(force_update=True)
+            student_module.save(force_update=True, update_fields=['state', 'modified'])
 
         # Event for the entire delete_many call.
         finish_time = time()
@@ -537,12 +537,15 @@ def create_user_profile_context(request, course_key, user_id):
     else:
         profiled_user = cc.User(id=user_id, course_id=course_key)
 
-    threads, page, num_pages = profiled_user.active_threads(query_params)
+    # The requesting user is retrieved along with the threads, rather than after them.
+    (threads, page, num_pages), user_info = cc.perform_concurrently([
+        lambda: profiled_user.active_threads(query_params),
+        lambda: cc.User.from_django_user(request.user).to_dict(),
+    ])
     query_params['page'] = page
     query_params['num_pages'] = num_pages
 
     with function_trace("get_metadata_for_threads"):
-        user_info = cc.User.from_django_user(request.user).to_dict()
         annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
 
     is_staff = has_permission(request.user, 'openclose_thread', course.id)
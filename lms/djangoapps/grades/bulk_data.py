@@ -0,0 +1,151 @@
+"""
+Code used to load the grading data of a batch of users at once
+"""
+
+from __future__ import absolute_import
+
+import logging
+from collections import defaultdict
+
+import six
+from django.db import IntegrityError
+from lazy import lazy
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
+
+from courseware.model_data import ScoresClient
+from student.models import AnonymousUserId, anonymous_id_for_user
+
+from .config import should_persist_grades
+from .models_api import prefetch_course_and_subsection_grades, prefetch_grade_overrides_and_visible_blocks_for_users
+from .scores import possibly_scored
+
+log = logging.getLogger(__name__)
+
+
+class BulkCourseGradeData(object):
+    """
+    The scores and persisted grades of a batch of users in a course.
+
+    Rather than querying them user by user, as the grades of each user are
+    computed, they are all loaded with a handful of set-based queries, and
+    then shared by the grade computations of the batch.  Persisted grades and
+    overrides are loaded up front into the request caches read by the grades
+    models, while the scores are only loaded once a grade of the batch is
+    computed, so reading persisted grades doesn't query them.
+    """
+    def __init__(self, course_data, users, force_update=False):
+        """
+        Arguments:
+            course_data (CourseData): The course, whose collected structure
+                is used to determine the scorable blocks.
+            users (list): The users of the batch.
+            force_update (bool): Whether the grades of the users are about
+                to be recomputed rather than read.
+        """
+        self.course_key = course_data.course_key
+        self.users = users
+        self._scorable_locations = [
+            block_key for block_key in course_data.collected_structure if possibly_scored(block_key)
+        ]
+        if should_persist_grades(self.course_key):
+            if force_update:
+                prefetch_grade_overrides_and_visible_blocks_for_users(self.course_key, users)
+            else:
+                prefetch_course_and_subsection_grades(self.course_key, users)
+
+    def csm_scores(self, user):
+        """
+        Returns the ScoresClient of the given user, or None if the scores of
+        the batch couldn't be loaded.
+        """
+        if self._csm_scores is None:
+            return None
+        return self._csm_scores[user.id]
+
+    def submissions_scores(self, user):
+        """
+        Returns the scores of the given user stored by the Submissions API,
+        as returned by submissions.api.get_scores, or None if the scores of
+        the batch couldn't be loaded.
+        """
+        if self._submissions_scores is None:
+            return None
+        return self._submissions_scores.get(user.id, {})
+
+    @lazy
+    def _csm_scores(self):
+        """
+        The ScoresClients of the users, keyed by user id.
+        """
+        try:
+            return ScoresClient.create_for_users(
+                self.course_key, [user.id for user in self.users], self._scorable_locations,
+            )
+        except Exception:  # pylint: disable=broad-except
+            # Fall back to loading the scores of each user separately.
+            log.exception(u'Grades: could not load the scores of %d students', len(self.users))
+            return None
+
+    @lazy
+    def _submissions_scores(self):
+        """
+        The scores of the users stored by the Submissions API, keyed by user id.
+        """
+        if not self._scorable_locations:
+            return {}
+        try:
+            anonymous_user_ids = _get_anonymous_user_ids(self.course_key, self.users)
+            scores = _get_submissions_scores(self.course_key, list(six.itervalues(anonymous_user_ids)))
+        except Exception:  # pylint: disable=broad-except
+            # Fall back to loading the scores of each user separately.
+            log.exception(u'Grades: could not load the submissions scores of %d students', len(self.users))
+            return None
+        return {
+            user_id: scores[anonymous_user_id]
+            for user_id, anonymous_user_id in six.iteritems(anonymous_user_ids)
+            if anonymous_user_id in scores
+        }
+
+
+def _get_anonymous_user_ids(course_key, users):
+    """
+    Returns the anonymous ids of the given users in the course, keyed by user
+    id, saving the ones that aren't saved yet as anonymous_id_for_user does.
+    """
+    saved_ids = set(
+        AnonymousUserId.objects.filter(user__in=users, course_id=course_key).values_list(
+            'anonymous_user_id', flat=True,
+        )
+    )
+    anonymous_user_ids = {}
+    for user in users:
+        anonymous_user_id = anonymous_id_for_user(user, course_key, save=False)
+        if anonymous_user_id not in saved_ids:
+            try:
+                AnonymousUserId.objects.get_or_create(
+                    user=user, course_id=course_key, anonymous_user_id=anonymous_user_id,
+                )
+            except IntegrityError:
+                # Another thread has already created this entry.
+                pass
+        anonymous_user_ids[user.id] = anonymous_user_id
+    return anonymous_user_ids
+
+
+def _get_submissions_scores(course_key, anonymous_user_ids):
+    """
+    Returns the scores of the given students stored by the Submissions API,
+    keyed by student id and item id.  This is the set-based equivalent of
+    submissions.api.get_scores, which has no bulk counterpart.
+    """
+    scores = defaultdict(dict)
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=six.text_type(course_key),
+        student_item__student_id__in=anonymous_user_ids,
+    ).select_related('latest', 'latest__submission', 'student_item')
+    for summary in score_summaries:
+        if not summary.latest.is_hidden():
+            student_item = summary.student_item
+            scores[student_item.student_id][student_item.item_id] = UnannotatedScoreSerializer(summary.latest).data
+    return scores
@@ -4,7 +4,9 @@ Course Grade Factory Class
 from __future__ import absolute_import
 
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
+from time import time
 
 import six
 from six import text_type
@@ -15,6 +17,7 @@ from openedx.core.djangoapps.signals.signals import (
     COURSE_GRADE_NOW_PASSED
 )
 
+from .bulk_data import BulkCourseGradeData
 from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
@@ -23,6 +26,9 @@ from .models_api import prefetch_grade_overrides_and_visible_blocks
 
 log = getLogger(__name__)
 
+# Number of users whose grading data bulk_iter loads at once.
+BULK_ITER_BATCH_SIZE = 100
+
 
 class CourseGradeFactory(object):
     """
@@ -38,6 +44,7 @@ class CourseGradeFactory(object):
             course_structure=None,
             course_key=None,
             create_if_needed=True,
+            bulk_data=None,
     ):
         """
         Returns the CourseGrade for the given user in the course.
@@ -48,15 +55,18 @@ class CourseGradeFactory(object):
 
         At least one of course, collected_block_structure, course_structure,
         or course_key should be provided.
+
+        bulk_data is the BulkCourseGradeData of a batch including the user,
+        if any.
         """
         course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
         try:
-            return self._read(user, course_data)
+            return self._read(user, course_data, bulk_data=bulk_data)
         except PersistentCourseGrade.DoesNotExist:
             if assume_zero_if_absent(course_data.course_key):
                 return self._create_zero(user, course_data)
             elif create_if_needed:
-                return self._update(user, course_data)
+                return self._update(user, course_data, bulk_data=bulk_data)
             else:
                 return None
 
@@ -68,6 +78,7 @@ class CourseGradeFactory(object):
             course_structure=None,
             course_key=None,
             force_update_subsections=False,
+            bulk_data=None,
     ):
         """
         Computes, updates, and returns the CourseGrade for the given
@@ -75,12 +86,16 @@ class CourseGradeFactory(object):
 
         At least one of course, collected_block_structure, course_structure,
         or course_key should be provided.
+
+        bulk_data is the BulkCourseGradeData of a batch including the user,
+        if any.
         """
         course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
         return self._update(
             user,
             course_data,
-            force_update_subsections=force_update_subsections
+            force_update_subsections=force_update_subsections,
+            bulk_data=bulk_data,
         )
 
     def iter(
@@ -112,7 +127,47 @@ class CourseGradeFactory(object):
         for user in users:
             yield self._iter_grade_result(user, course_data, force_update)
 
-    def _iter_grade_result(self, user, course_data, force_update):
+    def bulk_iter(
+            self,
+            users,
+            course=None,
+            collected_block_structure=None,
+            course_key=None,
+            force_update=False,
+            batch_size=BULK_ITER_BATCH_SIZE,
+    ):
+        """
+        Same as iter, except that the scores and persisted grades of the
+        students are loaded batch_size students at a time, with a handful
+        of queries per batch rather than per student.
+        """
+        course_data = CourseData(
+            user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
+        )
+        users = iter(users)
+        while True:
+            batch = list(islice(users, batch_size))
+            if not batch:
+                return
+
+            start_time = time()
+            try:
+                bulk_data = BulkCourseGradeData(course_data, batch, force_update)
+            except Exception:  # pylint: disable=broad-except
+                # Fall back to loading the data of each student separately.
+                log.exception(u'Grades: BulkIter, could not load grading data of %d students', len(batch))
+                bulk_data = None
+            load_time = time() - start_time
+
+            results = [self._iter_grade_result(user, course_data, force_update, bulk_data) for user in batch]
+            log.info(
+                u'Grades: BulkIter, %s, %d students, load: %.3fs, total: %.3fs',
+                course_data.course_key, len(batch), load_time, time() - start_time,
+            )
+            for result in results:
+                yield result
+
+    def _iter_grade_result(self, user, course_data, force_update, bulk_data=None):
         try:
             kwargs = {
                 'user': user,
@@ -122,6 +177,8 @@ class CourseGradeFactory(object):
             }
             if force_update:
                 kwargs['force_update_subsections'] = True
+            if bulk_data is not None:
+                kwargs['bulk_data'] = bulk_data
 
             method = CourseGradeFactory().update if force_update else CourseGradeFactory().read
             course_grade = method(**kwargs)
@@ -146,7 +203,7 @@ class CourseGradeFactory(object):
         return ZeroCourseGrade(user, course_data)
 
     @staticmethod
-    def _read(user, course_data):
+    def _read(user, course_data, bulk_data=None):
         """
         Returns a CourseGrade object based on stored grade information
         for the given user and course.
@@ -162,11 +219,12 @@ class CourseGradeFactory(object):
             course_data,
             persistent_grade.percent_grade,
             persistent_grade.letter_grade,
-            persistent_grade.letter_grade != u''
+            persistent_grade.letter_grade != u'',
+            bulk_data=bulk_data,
         )
 
     @staticmethod
-    def _update(user, course_data, force_update_subsections=False):
+    def _update(user, course_data, force_update_subsections=False, bulk_data=None):
         """
         Computes, saves, and returns a CourseGrade object for the
         given user and course.
@@ -175,13 +233,14 @@ class CourseGradeFactory(object):
         COURSE_GRADE_NOW_FAILED if learner is now failing course
         """
         should_persist = should_persist_grades(course_data.course_key)
-        if should_persist and force_update_subsections:
+        if should_persist and force_update_subsections and bulk_data is None:
             prefetch_grade_overrides_and_visible_blocks(user, course_data.course_key)
 
         course_grade = CourseGrade(
             user,
             course_data,
-            force_update_subsections=force_update_subsections
+            force_update_subsections=force_update_subsections,
+            bulk_data=bulk_data,
         )
         course_grade = course_grade.update()
 
@@ -177,6 +177,21 @@ class VisibleBlocks(models.Model):
             prefetched = cls._initialize_cache(user_id, course_key)
         return prefetched
 
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches visible blocks for the given users and course, with a
+        single query, and stores them in the cache.
+        """
+        prefetched = {cls._cache_key(user.id, course_key): {} for user in users}
+        grades_with_blocks = PersistentSubsectionGrade.objects.select_related('visible_blocks').filter(
+            user_id__in=[user.id for user in users],
+            course_id=course_key,
+        )
+        for grade in grades_with_blocks:
+            prefetched[cls._cache_key(grade.user_id, course_key)][grade.visible_blocks.hashed] = grade.visible_blocks
+        get_cache(cls._CACHE_NAMESPACE).update(prefetched)
+
     @classmethod
     def cached_get_or_create(cls, user_id, blocks):
         """
@@ -695,6 +710,21 @@ class PersistentSubsectionGradeOverride(models.Model):
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def prefetch_for_users(cls, course_key, users):
+        """
+        Prefetches the overrides of the given users in the given course,
+        with a single query.
+        """
+        prefetched = {(user.id, str(course_key)): {} for user in users}
+        overrides = cls.objects.select_related('grade').filter(
+            grade__user_id__in=[user.id for user in users],
+            grade__course_id=course_key,
+        )
+        for override in overrides:
+            prefetched[(override.grade.user_id, str(course_key))][override.grade.usage_key] = override
+        get_cache(cls._CACHE_NAMESPACE).update(prefetched)
+
     @classmethod
     def get_override(cls, user_id, usage_key):
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
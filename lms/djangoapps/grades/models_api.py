@@ -17,6 +17,11 @@ def prefetch_grade_overrides_and_visible_blocks(user, course_key):
     _VisibleBlocks.bulk_read(user.id, course_key)
 
 
+def prefetch_grade_overrides_and_visible_blocks_for_users(course_key, users):
+    _PersistentSubsectionGradeOverride.prefetch_for_users(course_key, users)
+    _VisibleBlocks.prefetch(course_key, users)
+
+
 def prefetch_course_grades(course_key, users):
     _PersistentCourseGrade.prefetch(course_key, users)
 
@@ -27,9 +27,10 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
-    def __init__(self, student, course=None, course_structure=None, course_data=None):
+    def __init__(self, student, course=None, course_structure=None, course_data=None, bulk_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
+        self.bulk_data = bulk_data
 
         self._cached_subsection_grades = None
         self._unsaved_subsection_grades = OrderedDict()
@@ -110,6 +111,10 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self.bulk_data is not None:
+            scores = self.bulk_data.csm_scores(self.student)
+            if scores is not None:
+                return scores
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -119,6 +124,10 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self.bulk_data is not None:
+            scores = self.bulk_data.submissions_scores(self.student)
+            if scores is not None:
+                return scores
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
@@ -187,6 +187,22 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         self.assertEqual(mock_update.called, force_update)
 
+    @ddt.data(True, False)
+    def test_bulk_iter(self, force_update):
+        with patch(
+            'lms.djangoapps.grades.subsection_grade_factory.ScoresClient.create_for_locations'
+        ) as mock_create_for_locations:
+            with mock_get_score(1, 2):
+                results = list(CourseGradeFactory().bulk_iter(
+                    users=[self.request.user], course=self.course, force_update=force_update,
+                ))
+        # The scores of the user were loaded in bulk rather than by the user's
+        # subsection grade factory.
+        self.assertFalse(mock_create_for_locations.called)
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0].error)
+        self.assertEqual(results[0].course_grade.percent, 0.5)
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -297,6 +313,38 @@ class TestGradeIteration(SharedModuleStoreTestCase):
             self.assertIsNone(course_grade.letter_grade)
             self.assertEqual(course_grade.percent, 0.0)
 
+    def test_bulk_iter_read_persisted_grades(self):
+        """
+        Reading the persisted grades of a batch doesn't load its scores.
+        """
+        with mock_get_score(1, 2):
+            CourseGradeFactory().update(self.request.user, self.course, force_update_subsections=True)
+        with patch('lms.djangoapps.grades.bulk_data.ScoresClient.create_for_users') as mock_create_for_users:
+            with patch('lms.djangoapps.grades.bulk_data._get_anonymous_user_ids') as mock_get_anonymous_user_ids:
+                results = list(CourseGradeFactory().bulk_iter(users=[self.request.user], course=self.course))
+        self.assertFalse(mock_create_for_users.called)
+        self.assertFalse(mock_get_anonymous_user_ids.called)
+        self.assertEqual(results[0].course_grade.percent, 0.5)
+
+    def test_bulk_iter_batches(self):
+        grade_results = list(CourseGradeFactory().bulk_iter(self.students, self.course, batch_size=2))
+        self.assertEqual([result.student for result in grade_results], self.students)
+        for result in grade_results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.course_grade.percent, 0.0)
+
+    @patch('lms.djangoapps.grades.course_grade_factory.BulkCourseGradeData', side_effect=Exception)
+    def test_bulk_iter_load_failure(self, mock_bulk_data):
+        """
+        If the data of a batch can't be loaded in bulk, its students are still
+        graded one by one.
+        """
+        grade_results = list(CourseGradeFactory().bulk_iter(self.students, self.course, batch_size=2))
+        self.assertEqual(mock_bulk_data.call_count, 3)
+        self.assertEqual(len(grade_results), 5)
+        for result in grade_results:
+            self.assertIsNone(result.error)
+
     @patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.read')
     def test_grading_exception(self, mock_course_grade):
         """Test that we correctly capture exception messages that bubble up from
@@ -604,7 +604,7 @@ class FreezeGradingAfterCourseEndTest(HasCourseWithProblemsMixin, ModuleStoreTes
                         freeze_flag_value,
                         end_date_adjustment,
                         mock_log,
-                        factory.iter,
+                        factory.bulk_iter,
                         'compute_grades_for_course'
                     )
 
@@ -25,6 +25,8 @@ from courseware.models import StudentModule
 from lms.djangoapps.certificates.models import CertificateStatuses, GeneratedCertificate
 from lms.djangoapps.grades.api import context as grades_context
 from lms.djangoapps.verify_student.services import IDVerificationService
+from openedx.core.djangoapps.course_groups.cohorts import get_cohort_ids
+from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.djangolib.markup import HTML, Text
 from shoppingcart.models import (
@@ -234,12 +236,19 @@ def enrolled_students_features(course_key, features):
         courseenrollment__is_active=1,
     ).order_by('username').select_related('profile')
 
-    if include_cohort_column:
-        students = students.prefetch_related('course_groups')
-
     if include_team_column:
         students = students.prefetch_related('teams')
 
+    if include_cohort_column:
+        cohort_names = dict(
+            CourseUserGroup.objects.filter(
+                course_id=course_key, group_type=CourseUserGroup.COHORT,
+            ).values_list('id', 'name')
+        )
+        # Read the students once, both for their cohorts and their features.
+        students = list(students)
+        cohort_ids = get_cohort_ids(students, course_key)
+
     def extract_attr(student, feature):
         """Evaluate a student attribute that is ready for JSON serialization"""
         attr = getattr(student, feature)
@@ -277,13 +286,7 @@ def enrolled_students_features(course_key, features):
                 student_dict[meta_feature] = meta_dict.get(meta_key)
 
         if include_cohort_column:
-            # Note that we use student.course_groups.all() here instead of
-            # student.course_groups.filter(). The latter creates a fresh query,
-            # therefore negating the performance gain from prefetch_related().
-            student_dict['cohort'] = next(
-                (cohort.name for cohort in student.course_groups.all() if cohort.course_id == course_key),
-                "[unassigned]"
-            )
+            student_dict['cohort'] = cohort_names.get(cohort_ids[student.id], "[unassigned]")
 
         if include_team_column:
             student_dict['team'] = next(
@@ -36,6 +36,7 @@ from lms.djangoapps.instructor_analytics.basic import (
     sale_order_record_features,
     sale_record_features
 )
+from openedx.core.djangoapps.course_groups.cohorts import is_course_cohorted
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
 from shoppingcart.models import (
     Coupon,
@@ -235,11 +236,12 @@ class TestAnalyticsBasic(ModuleStoreTestCase):
         self.client.login(username=instructor.username, password='test')
 
         query_features = ('username', 'cohort')
-        # There should be a constant of 2 SQL queries when calling
-        # enrolled_students_features.  The first query comes from the call to
-        # User.objects.filter(...), and the second comes from
-        # prefetch_related('course_groups').
-        with self.assertNumQueries(2):
+        # Load the cohort settings of the course, which are cached for the request.
+        self.assertTrue(is_course_cohorted(course.id))
+        # There should be a constant of 3 SQL queries when calling
+        # enrolled_students_features: one for the cohorts of the course, one for
+        # User.objects.filter(...), and one for the cohort ids of the students.
+        with self.assertNumQueries(3):
             userreports = enrolled_students_features(course.id, query_features)
         self.assertEqual(len([r for r in userreports if r['username'] in cohorted_usernames]), len(cohorted_students))
         self.assertEqual(len([r for r in userreports if r['username'] == non_cohorted_student.username]), 1)
@@ -250,6 +252,11 @@ class TestAnalyticsBasic(ModuleStoreTestCase):
             else:
                 self.assertEqual(report['cohort'], '[unassigned]')
 
+        # The students are read once when their teams are requested too, which takes one more query.
+        with self.assertNumQueries(4):
+            userreports = enrolled_students_features(course.id, query_features + ('team',))
+        self.assertEqual(len(userreports), len(cohorted_students) + 1)
+
     def test_available_features(self):
         self.assertEqual(len(AVAILABLE_FEATURES), len(STUDENT_FEATURES + PROFILE_FEATURES))
         self.assertEqual(set(AVAILABLE_FEATURES), set(STUDENT_FEATURES + PROFILE_FEATURES))
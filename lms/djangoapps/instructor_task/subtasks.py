@@ -489,6 +489,23 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
         _release_subtask_lock(current_task_id)
 
 
+def checkpoint_subtask_status(entry_id, current_task_id, subtask_status):
+    """
+    Record the progress of a subtask that is still running in the parent InstructorTask object.
+
+    The subtask is recorded as in PROGRESS, so its counts are not yet added to the parent's,
+    and the lock on the subtask is kept, unlike with update_subtask_status().  Failing to
+    record the progress is logged, but doesn't interrupt the subtask.
+    """
+    progress_status = SubtaskStatus.from_dict(subtask_status.to_dict())
+    progress_status.state = PROGRESS
+    try:
+        _update_subtask_status(entry_id, current_task_id, progress_status)
+    except (DatabaseError, ValueError):
+        TASK_LOG.exception(u"Failed to record progress %s for subtask %s of instructor task %d",
+                           progress_status, current_task_id, entry_id)
+
+
 @transaction.atomic
 def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     """
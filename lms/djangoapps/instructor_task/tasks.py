@@ -48,6 +48,7 @@ from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     delete_problem_module_state,
     override_score_module_state,
     perform_module_state_update,
+    prepare_rescore_module_states,
     rescore_problem_module_state,
     reset_attempts_module_state
 )
@@ -78,8 +79,9 @@ def rescore_problem(entry_id, xmodule_instance_args):
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
     update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+    prepare_fcn = partial(prepare_rescore_module_states, xmodule_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, prepare_fcn=prepare_fcn)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
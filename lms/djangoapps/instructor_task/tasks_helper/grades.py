@@ -27,7 +27,6 @@ from lms.djangoapps.instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
 from lms.djangoapps.grades.api import CourseGradeFactory
 from lms.djangoapps.grades.api import context as grades_context
-from lms.djangoapps.grades.api import prefetch_course_and_subsection_grades
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -193,7 +192,6 @@ class _CourseGradeBulkContext(object):
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        prefetch_course_and_subsection_grades(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
@@ -257,7 +255,13 @@ class CourseGradeReport(object):
         """
         for users in self._batch_users(context):
             users = [u for u in users if u is not None]
-            yield self._rows_for_users(context, users)
+            start_time = time()
+            rows = self._rows_for_users(context, users)
+            TASK_LOG.info(
+                u'%s, Task type: %s, Computed rows of %d users in %.3f seconds',
+                context.task_info_string, context.action_name, len(users), time() - start_time,
+            )
+            yield rows
 
     def _compile(self, context, batched_rows):
         """
@@ -480,11 +484,13 @@ class CourseGradeReport(object):
             bulk_context = _CourseGradeBulkContext(context, users)
 
             success_rows, error_rows = [], []
-            for user, course_grade, error in CourseGradeFactory().iter(
+            # The grading data of the users is loaded by bulk_iter.
+            for user, course_grade, error in CourseGradeFactory().bulk_iter(
                 users,
                 course=context.course,
                 collected_block_structure=context.course_structure,
                 course_key=context.course_id,
+                batch_size=self.USER_BATCH_SIZE,
             ):
                 if not course_grade:
                     # An empty gradeset means we failed to grade a student.
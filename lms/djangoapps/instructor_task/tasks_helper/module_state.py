@@ -5,6 +5,7 @@ from __future__ import absolute_import
 
 import json
 import logging
+from collections import defaultdict
 from time import time
 
 import six
@@ -16,7 +17,7 @@ from xblock.scorable import Score
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
-from courseware.models import StudentModule
+from courseware.models import StudentModule, chunks
 from courseware.module_render import get_module_for_descriptor_internal
 from lms.djangoapps.grades.api import events as grades_events
 from student.models import get_user_by_username_or_email
@@ -31,8 +32,12 @@ from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED,
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# Number of StudentModules prepared together by a perform_module_state_update `prepare_fcn`.
+MODULE_STATE_CHUNK_SIZE = 500
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+
+def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name,
+                                prepare_fcn=None):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -44,6 +49,10 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If `prepare_fcn` is provided, it is called on chunks of the StudentModules before `update_fcn`
+    is called on each of them, so that work can be shared between them.  It is passed three arguments:
+    a dict of module_descriptors by usage key string, the list of StudentModules, and the task_input.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -89,22 +98,26 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[six.text_type(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        update_status = update_fcn(module_descriptor, module_to_update, task_input)
-        if update_status == UPDATE_STATUS_SUCCEEDED:
-            # If the update_fcn returns true, then it performed some kind of work.
-            # Logging of failures is left to the update_fcn itself.
-            task_progress.succeeded += 1
-        elif update_status == UPDATE_STATUS_FAILED:
-            task_progress.failed += 1
-        elif update_status == UPDATE_STATUS_SKIPPED:
-            task_progress.skipped += 1
-        else:
-            raise UpdateProblemModuleStateError(u"Unexpected update_status returned: {}".format(update_status))
+    for modules_chunk in chunks(modules_to_update, MODULE_STATE_CHUNK_SIZE):
+        if prepare_fcn is not None:
+            prepare_fcn(problems, modules_chunk, task_input)
+
+        for module_to_update in modules_chunk:
+            task_progress.attempted += 1
+            module_descriptor = problems[six.text_type(module_to_update.module_state_key)]
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            update_status = update_fcn(module_descriptor, module_to_update, task_input)
+            if update_status == UPDATE_STATUS_SUCCEEDED:
+                # If the update_fcn returns true, then it performed some kind of work.
+                # Logging of failures is left to the update_fcn itself.
+                task_progress.succeeded += 1
+            elif update_status == UPDATE_STATUS_FAILED:
+                task_progress.failed += 1
+            elif update_status == UPDATE_STATUS_SKIPPED:
+                task_progress.skipped += 1
+            else:
+                raise UpdateProblemModuleStateError(u"Unexpected update_status returned: {}".format(update_status))
 
     return task_progress.update_task_state()
 
@@ -196,6 +209,48 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
         return UPDATE_STATUS_SUCCEEDED
 
 
+def prepare_rescore_module_states(xmodule_instance_args, problems, student_modules, _task_input):
+    """
+    Evaluates the answers saved in `student_modules` in batches, before they are rescored one by one.
+
+    The StudentModules are grouped by problem and seed.  For each group, the problem is instantiated
+    once, and the check functions it runs in the sandbox are evaluated for the answers of the whole
+    group in as few sandbox executions as possible.  The results are cached, so that
+    rescore_problem_module_state then finds them instead of running the check functions again.
+    """
+    groups = defaultdict(list)
+    for student_module in student_modules:
+        state = json.loads(student_module.state) if student_module.state else {}
+        if state.get('student_answers') and state.get('seed') is not None:
+            group_key = (six.text_type(student_module.module_state_key), state['seed'])
+            groups[group_key].append((student_module, state['student_answers']))
+
+    for (usage_key, seed), group in six.iteritems(groups):
+        if len(group) < 2:
+            continue
+        student_module = group[0][0]
+        course_id = student_module.course_id
+        try:
+            with modulestore().bulk_operations(course_id):
+                instance = _get_module_instance_for_task(
+                    course_id,
+                    student_module.student,
+                    problems[usage_key],
+                    xmodule_instance_args,
+                    grade_bucket_type='rescore',
+                    course=get_course_by_id(course_id),
+                )
+                if instance is not None and hasattr(instance, 'prefill_check_function_cache'):
+                    instance.prefill_check_function_cache([student_answers for __, student_answers in group])
+        except Exception:  # pylint: disable=broad-except
+            # The problems will be reported when rescoring each StudentModule.
+            TASK_LOG.warning(
+                u"error preparing rescore for course %(course)s, problem %(loc)s and seed %(seed)s",
+                dict(course=course_id, loc=usage_key, seed=seed),
+                exc_info=True,
+            )
+
+
 @outer_atomic
 def override_score_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
     '''
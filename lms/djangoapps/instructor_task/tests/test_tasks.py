@@ -490,6 +490,36 @@ class TestRescoreInstructorTask(TestInstructorTasks):
             action_name='rescored'
         )
 
+    def test_rescoring_prefills_check_functions(self):
+        """
+        Tests rescoring evaluates the answers of students sharing a seed together.
+        """
+        mock_instance = MagicMock()
+        mock_instance.has_submitted_answer.return_value = True
+
+        num_students = 3
+        student_answers = {'1_2_1': 'Option 1'}
+        input_state = json.dumps({'done': True, 'seed': 1, 'student_answers': student_answers})
+        self._create_students_with_state(num_students, input_state)
+        task_entry = self._create_input_entry()
+        with patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_module_for_descriptor_internal'
+        ) as mock_get_module:
+            mock_get_module.return_value = mock_instance
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        mock_instance.prefill_check_function_cache.assert_called_once_with([student_answers] * num_students)
+        self.assertEqual(mock_instance.rescore.call_count, num_students)
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=num_students,
+            skipped=0,
+            failed=0,
+            action_name='rescored'
+        )
+
 
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
     """Tests instructor task that resets problem attempts."""
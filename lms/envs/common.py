@@ -549,6 +549,19 @@ CACHES = {
     },
 }
 
+# Maximum total size, in bytes, of the course structures kept in each process'
+# local cache, in front of the shared 'course_structure_cache'. Structures are
+# immutable, so this cache never needs invalidating. 0 disables the local cache.
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_BYTES = 0
+
+# Directory of the local disk cache of course assets served by the contentserver.
+# Files are named after the digest of their content and never modified, so the
+# directory can safely be pruned by access time. When set, the 'course_assets'
+# cache only keeps the metadata of assets. None disables the disk cache.
+COURSE_ASSETS_DISK_CACHE_DIR = None
+# Largest asset, in bytes, kept in the disk cache; larger ones are streamed from the contentstore.
+COURSE_ASSETS_DISK_CACHE_MAX_FILE_SIZE = 100 * 1024 * 1024
+
 ############################ OpenID Provider  ##################################
 OPENID_PROVIDER_TRUSTED_ROOTS = ['cs50.net', '*.cs50.net']
 
@@ -1081,6 +1094,16 @@ CODE_JAIL = {
         'REALTIME': 3,
         'PROXY': 0,
     },
+
+    # Pool of pre-warmed sandbox workers used instead of starting a new
+    # sandbox for every execution.  A size of 0 disables the pool.
+    'worker_pool': {
+        'size': 0,
+        # Number of executions after which a worker is replaced.
+        'max_jobs': 500,
+        # Memory use of a worker (in bytes) above which it is replaced.
+        'max_memory': 268435456,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1093,6 +1116,16 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Caching of the results of sandboxed code execution, on top of the cache given
+# by the caller (usually the default cache).
+SAFE_EXEC_CACHE = {
+    # Maximum total size (in bytes) of the results kept in each process, in
+    # front of the shared cache.  0 disables the local cache.
+    'local_max_size': 0,
+    # Results larger than this (in bytes) aren't cached.  None means no limit.
+    'max_result_size': None,
+}
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1485,6 +1518,7 @@ MIDDLEWARE_CLASSES = [
 
     'lms.djangoapps.discussion.django_comment_client.utils.ViewNameMiddleware',
     'codejail.django_integration.ConfigureCodeJailMiddleware',
+    'openedx.core.djangoapps.util.safe_exec_config.ConfigureSafeExecMiddleware',
 
     # catches any uncaught RateLimitExceptions and returns a 403 instead of a 500
     'ratelimitbackend.middleware.RateLimitMiddleware',
@@ -2131,8 +2165,22 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Timeout, in seconds, of cached transformed block structures, when
+    # the block_structure.cache_transformed waffle switch is enabled.
+    TRANSFORMED_CACHE_TIMEOUT=300,
 )
 
+################################ Course Overviews ###################################
+
+# Number of seconds that each process caches the CourseOverviews it reads,
+# or 0 to read them from the database each time they are read, even within
+# a request.
+COURSE_OVERVIEW_CACHE_TIMEOUT = 0
+
+# Maximum number of CourseOverviews cached by each process.
+COURSE_OVERVIEW_CACHE_SIZE = 1000
+
 ################################ Bulk Email ###################################
 
 # Suffix used to construct 'from' email address for bulk emails.
@@ -2177,6 +2225,19 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Maximum number of individual mail messages sent per second by each worker,
+# or None for no limit.
+BULK_EMAIL_MAX_SENDS_PER_SECOND = None
+
+# Number of seconds that a connection to the email backend is kept open
+# between bulk email tasks of a worker, so that the next one reuses it.
+# 0 closes the connection at the end of each task.
+BULK_EMAIL_CONNECTION_MAX_IDLE = 0
+
+# Interval in seconds between the records of the progress of a running bulk
+# email task.
+BULK_EMAIL_CHECKPOINT_INTERVAL = 60
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -3285,6 +3346,12 @@ CREDENTIALS_PUBLIC_SERVICE_URL = None
 
 COMMENTS_SERVICE_URL = 'http://localhost:18080'
 COMMENTS_SERVICE_KEY = 'password'
+# Whether requests to the comments service reuse the connections of a pool, kept alive between requests.
+COMMENTS_SERVICE_USE_SESSION = True
+# Maximum number of connections to the comments service kept by each process.
+COMMENTS_SERVICE_POOL_SIZE = 10
+# Maximum number of independent requests to the comments service made concurrently by each process.
+COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS = 4
 
 # Reverification checkpoint name pattern
 CHECKPOINT_PATTERN = r'(?P<checkpoint_name>[^/]+)'
@@ -3299,6 +3366,10 @@ FIELD_OVERRIDE_PROVIDERS = ()
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ('openedx.features.content_type_gating.field_override.ContentTypeGatingFieldOverride',)  # pylint: disable=line-too-long
 
+# The number of seconds the snapshots of the overrides of a user in a course
+# are cached across requests. They are only cached for the request when unset.
+FIELD_OVERRIDE_SNAPSHOT_CACHE_TIMEOUT = None
+
 # PROFILE IMAGE CONFIG
 # WARNING: Certain django storage backends do not support atomic
 # file overwrites (including the default, OverwriteStorage) - instead
@@ -134,6 +134,8 @@ MOCK_STAFF_GRADING = True
 MOCK_PEER_GRADING = True
 
 COMMENTS_SERVICE_URL = 'http://localhost:4567'
+# Tests mock requests.request to stub the comments service.
+COMMENTS_SERVICE_USE_SESSION = False
 
 DJFS = {
     'type': 'osfs',
@@ -7,16 +7,19 @@ Module with family of classes for block structures.
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
     _BlockData - Data structure for a single block's data.
+    _AncestorIndex - Data structure for precomputed ancestor and
+        descendant lookups.
 """
 from __future__ import absolute_import
 
 from copy import deepcopy
 from functools import partial
 from logging import getLogger
+from uuid import uuid4
 
 import six
 
-from openedx.core.lib.graph_traversals import traverse_post_order, traverse_topologically
+from openedx.core.lib.graph_traversals import traverse_post_order, traverse_pre_order, traverse_topologically
 
 from .exceptions import TransformerException
 
@@ -26,6 +29,12 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# The name under which data about the collect phase itself is stored in
+# a block structure's transformer data, and the key for the token
+# identifying the collected data.
+COLLECTION_DATA_NAME = '_collection'
+COLLECTED_VERSION_KEY = 'collected_version'
+
 
 class _BlockRelations(object):
     """
@@ -43,6 +52,141 @@ class _BlockRelations(object):
         self.children = []
 
 
+class _AncestorIndex(object):
+    """
+    Data structure to encapsulate a precomputed index of the ancestors
+    and descendants of the blocks reachable from a structure's root.
+
+    The index holds a depth-first pre-order of the blocks, the interval
+    of that order spanned by each block's subtree, and a flattened table
+    of each block's ancestors.  The subtree intervals are only used when
+    the structure is a tree; for DAGs, descendants are found using the
+    ancestor table.
+    """
+    def __init__(self):
+
+        # List of usage keys of the blocks in depth-first pre-order,
+        # with a block having multiple parents listed only once.  Removed
+        # blocks may remain in this list until the index is compacted.
+        # list [UsageKey]
+        self.order = []
+
+        # Map of a block's usage key to the half-open interval of
+        # positions in self.order spanned by its subtree.
+        # dict {UsageKey: (int, int)}
+        self.intervals = {}
+
+        # Map of a block's usage key to the usage keys of all of its
+        # ancestors.  A block is indexed iff it is present in this map.
+        # dict {UsageKey: frozenset(UsageKey)}
+        self.ancestors = {}
+
+        # Whether the indexed structure is a tree (as opposed to a DAG).
+        self.is_tree = True
+
+    def __contains__(self, usage_key):
+        return usage_key in self.ancestors
+
+    @classmethod
+    def build(cls, block_structure):
+        """
+        Returns a new index of the blocks of the given block structure
+        that are reachable from its root.
+        """
+        index = cls()
+        root_key = block_structure.root_block_usage_key
+        index.ancestors[root_key] = frozenset()
+        index.order.append(root_key)
+        start_positions = {root_key: 0}
+
+        # Iterative depth-first traversal, recording each subtree's
+        # interval once all of its descendants have been visited.
+        stack = [(root_key, iter(block_structure.get_children(root_key)))]
+        while stack:
+            block_key, children = stack[-1]
+            for child_key in children:
+                if child_key in index.ancestors:
+                    index.is_tree = False
+                    continue
+                index.ancestors[child_key] = index.ancestors[block_key] | {block_key}
+                start_positions[child_key] = len(index.order)
+                index.order.append(child_key)
+                stack.append((child_key, iter(block_structure.get_children(child_key))))
+                break
+            else:
+                stack.pop()
+                index.intervals[block_key] = (start_positions[block_key], len(index.order))
+
+        if not index.is_tree:
+            # Ancestors along every path to a block with multiple parents
+            # are accumulated from all of its parents, in topological order.
+            for block_key in block_structure.topological_traversal():
+                ancestors = set()
+                for parent_key in block_structure.get_parents(block_key):
+                    ancestors.add(parent_key)
+                    ancestors.update(index.ancestors[parent_key])
+                index.ancestors[block_key] = frozenset(ancestors)
+        return index
+
+    def copy(self):
+        """
+        Returns a copy of this index.  Since the index's values are
+        immutable, its containers are copied shallowly.
+        """
+        index = _AncestorIndex()
+        index.order = list(self.order)
+        index.intervals = dict(self.intervals)
+        index.ancestors = dict(self.ancestors)
+        index.is_tree = self.is_tree
+        return index
+
+    def get_descendants(self, usage_key):
+        """
+        Returns the usage keys of the indexed descendants of the given
+        block, in depth-first pre-order.
+        """
+        if self.is_tree:
+            start, end = self.intervals[usage_key]
+            candidates = self.order[start + 1:end]
+            return [block_key for block_key in candidates if block_key in self.ancestors]
+        return [
+            block_key for block_key in self.order
+            if usage_key in self.ancestors.get(block_key, ())
+        ]
+
+    def remove_ancestors(self, usage_key, removed_ancestors):
+        """
+        Removes the given ancestors from the ancestors of the given
+        block's descendants.
+        """
+        for descendant_key in self.get_descendants(usage_key):
+            self.ancestors[descendant_key] = self.ancestors[descendant_key] - removed_ancestors
+
+    def discard(self, usage_key):
+        """
+        Removes the given block from the index.  Its entry in self.order
+        remains until the index is compacted.
+        """
+        self.ancestors.pop(usage_key, None)
+        self.intervals.pop(usage_key, None)
+
+    def compact(self):
+        """
+        Removes the entries of discarded blocks from self.order, updating
+        the subtree intervals accordingly.
+        """
+        # Number of retained blocks before each position in the old order.
+        retained_before = [0]
+        for block_key in self.order:
+            retained_before.append(retained_before[-1] + (block_key in self.ancestors))
+
+        self.order = [block_key for block_key in self.order if block_key in self.ancestors]
+        self.intervals = {
+            block_key: (retained_before[start], retained_before[end])
+            for block_key, (start, end) in six.iteritems(self.intervals)
+        }
+
+
 class BlockStructure(object):
     """
     Base class for a block structure.  BlockStructures are constructed
@@ -68,6 +212,11 @@ class BlockStructure(object):
         # Add the root block.
         self._add_block(self._block_relations, root_block_usage_key)
 
+        # Optional precomputed index of the ancestors and descendants of
+        # the structure's blocks, built by build_ancestor_index.
+        # _AncestorIndex or None
+        self._ancestor_index = None
+
     def __iter__(self):
         """
         The default iterator for a block structure is get_block_keys()
@@ -125,6 +274,14 @@ class BlockStructure(object):
         self.root_block_usage_key = usage_key
         self._block_relations[usage_key].parents = []
 
+        index = self._ancestor_index
+        if index is not None:
+            if index.is_tree and usage_key in index:
+                index.remove_ancestors(usage_key, index.ancestors[usage_key])
+                index.ancestors[usage_key] = frozenset()
+            else:
+                self._ancestor_index = None
+
     def __contains__(self, usage_key):
         """
         Returns whether a block with the given usage_key is in this
@@ -150,6 +307,96 @@ class BlockStructure(object):
         """
         return six.iterkeys(self._block_relations)
 
+    #--- Block structure ancestry methods ---#
+
+    def build_ancestor_index(self):
+        """
+        Builds and stores a precomputed index of the ancestors and
+        descendants of the blocks in this structure, which is then used
+        by the ancestry methods below.
+
+        The index is kept up to date as blocks are removed and the
+        structure is pruned.  Any other change to the structure's
+        relations discards the index, after which the ancestry methods
+        fall back to traversing the structure.
+        """
+        self._ancestor_index = _AncestorIndex.build(self)
+
+    def has_ancestor_index(self):
+        """
+        Returns whether this structure carries an ancestor index.
+        """
+        return self._ancestor_index is not None
+
+    def get_ancestors(self, usage_key):
+        """
+        Returns the usage keys of all ancestors of the block identified by
+        the given usage_key.
+
+        Returns:
+            frozenset(UsageKey)
+        """
+        index = self._ancestor_index
+        if index is not None and usage_key in index:
+            return index.ancestors[usage_key]
+
+        ancestors = set()
+        keys_to_visit = list(self.get_parents(usage_key))
+        while keys_to_visit:
+            block_key = keys_to_visit.pop()
+            if block_key not in ancestors:
+                ancestors.add(block_key)
+                keys_to_visit.extend(self.get_parents(block_key))
+        return frozenset(ancestors)
+
+    def is_descendant(self, usage_key, ancestor_key):
+        """
+        Returns whether the block identified by usage_key is a descendant
+        of the block identified by ancestor_key.
+        """
+        return ancestor_key in self.get_ancestors(usage_key)
+
+    def get_descendants(self, usage_key):
+        """
+        Returns the usage keys of all descendants of the block identified
+        by the given usage_key, in depth-first pre-order.
+
+        Returns:
+            list [UsageKey]
+        """
+        index = self._ancestor_index
+        if index is not None and usage_key in index:
+            return index.get_descendants(usage_key)
+
+        descendants = traverse_pre_order(start_node=usage_key, get_children=self.get_children)
+        next(descendants)
+        return list(descendants)
+
+    def get_lowest_common_ancestor(self, usage_keys, block_type=None):
+        """
+        Returns the usage key of the deepest block that is an ancestor of
+        (or is) each of the given blocks, or None if there is none.
+
+        Arguments:
+            usage_keys (list [UsageKey]) - The blocks whose common
+                ancestor is requested.
+
+            block_type (string) - If given, only ancestors of this block
+                type are considered, e.g. 'chapter'.
+        """
+        common_ancestors = None
+        for usage_key in usage_keys:
+            ancestors_or_self = self.get_ancestors(usage_key) | {usage_key}
+            common_ancestors = ancestors_or_self if common_ancestors is None else common_ancestors & ancestors_or_self
+
+        candidates = [
+            block_key for block_key in common_ancestors or ()
+            if block_type is None or block_key.block_type == block_type
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda block_key: len(self.get_ancestors(block_key)))
+
     #--- Block structure traversal methods ---#
 
     def topological_traversal(
@@ -232,6 +479,15 @@ class BlockStructure(object):
         # Replace this structure's relations with the newly pruned one.
         self._block_relations = pruned_block_relations
 
+        # Unreachable blocks are never ancestors of reachable ones, so
+        # only their own entries are to be removed from the index.
+        index = self._ancestor_index
+        if index is not None:
+            for block_key in list(index.ancestors):
+                if block_key not in pruned_block_relations:
+                    index.discard(block_key)
+            index.compact()
+
     def _add_relation(self, parent_key, child_key):
         """
         Adds a parent to child relationship in this block structure.
@@ -241,6 +497,7 @@ class BlockStructure(object):
             child_key (UsageKey) - Usage key of the child block.
         """
         self._add_to_relations(self._block_relations, parent_key, child_key)
+        self._ancestor_index = None
 
     @staticmethod
     def _add_to_relations(block_relations, parent_key, child_key):
@@ -428,6 +685,7 @@ class BlockStructureBlockData(BlockStructure):
             deepcopy(self._block_relations),
             deepcopy(self.transformer_data),
             deepcopy(self._block_data_map),
+            self._ancestor_index.copy() if self._ancestor_index is not None else None,
         )
 
     def iteritems(self):
@@ -632,6 +890,10 @@ class BlockStructureBlockData(BlockStructure):
         for parent in parents:
             self._block_relations[parent].children.remove(usage_key)
 
+        # Update the ancestor index, while the block's descendants can
+        # still be found through it.
+        self._remove_from_ancestor_index(usage_key, keep_descendants)
+
         # Remove block.
         self._block_relations.pop(usage_key, None)
         self._block_data_map.pop(usage_key, None)
@@ -640,7 +902,7 @@ class BlockStructureBlockData(BlockStructure):
         if keep_descendants:
             for child in children:
                 for parent in parents:
-                    self._add_relation(parent, child)
+                    self._add_to_relations(self._block_relations, parent, child)
 
     def create_universal_filter(self):
         """
@@ -733,6 +995,46 @@ class BlockStructureBlockData(BlockStructure):
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
+    def _remove_from_ancestor_index(self, usage_key, keep_descendants):
+        """
+        Updates the ancestor index for the removal of the given block.
+
+        If descendants are kept, the block is no longer an ancestor of
+        its descendants.  Otherwise, its descendants are detached from
+        the structure along with it and are removed from the index,
+        which then only covers the blocks still reachable from the root.
+        """
+        index = self._ancestor_index
+        if index is None or usage_key not in index:
+            return
+
+        if not index.is_tree:
+            # Descendants of a removed block may remain reachable
+            # through other parents, so the index is discarded.
+            self._ancestor_index = None
+            return
+
+        if keep_descendants:
+            index.remove_ancestors(usage_key, frozenset([usage_key]))
+        else:
+            for descendant_key in index.get_descendants(usage_key):
+                index.discard(descendant_key)
+        index.discard(usage_key)
+
+    def get_collected_version(self):
+        """
+        Returns the token identifying the collect phase that produced
+        this structure's data, or None if the data was collected before
+        such tokens were recorded.
+        """
+        return self.get_transformer_data(COLLECTION_DATA_NAME, COLLECTED_VERSION_KEY)
+
+    def _set_collected_version(self):
+        """
+        Records a new token identifying this structure's collected data.
+        """
+        self.set_transformer_data(COLLECTION_DATA_NAME, COLLECTED_VERSION_KEY, uuid4().hex)
+
     def _get_transformer_data_version(self, transformer):
         """
         Returns the version number stored for the given transformer.
@@ -86,7 +86,7 @@ class BlockStructureFactory(object):
         return block_structure_store.get(root_block_usage_key)
 
     @classmethod
-    def create_new(cls, root_block_usage_key, block_relations, transformer_data, block_data_map):
+    def create_new(cls, root_block_usage_key, block_relations, transformer_data, block_data_map, ancestor_index=None):
         """
         Returns a new block structure for given the arguments.
         """
@@ -94,4 +94,5 @@ class BlockStructureFactory(object):
         block_structure._block_relations = block_relations  # pylint: disable=protected-access
         block_structure.transformer_data = transformer_data
         block_structure._block_data_map = block_data_map  # pylint: disable=protected-access
+        block_structure._ancestor_index = ancestor_index  # pylint: disable=protected-access
         return block_structure
@@ -0,0 +1,144 @@
+"""
+Command to compare the compact and zpickle BlockStructure serialization formats.
+"""
+from __future__ import absolute_import, division
+
+import timeit
+from uuid import uuid4
+
+import six
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.locator import CourseLocator
+from six.moves import range
+
+from openedx.core.djangoapps.content.block_structure import serialization
+from openedx.core.djangoapps.content.block_structure.block_structure import BlockStructureBlockData
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+# Synthetic transformer names and collected fields, mimicking the data
+# collected by the course_blocks transformers.
+_TRANSFORMER_FIELDS = {
+    'start_date': ('merged_start_date',),
+    'visibility': ('merged_visible_to_staff_only',),
+    'user_partitions': ('merged_group_access',),
+}
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization --settings=devstack
+        $ ./manage.py lms benchmark_block_structure_serialization --num_blocks 1000 5000 --iterations 5
+    """
+    help = u'Compares load time and byte size of BlockStructure serialization formats on synthetic courses.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--num_blocks',
+            help=u'Approximate number of blocks in each synthetic course.',
+            nargs='+',
+            type=int,
+            default=[1000, 3000, 10000],
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times each load is timed; the best time is reported.',
+            type=int,
+            default=3,
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(u'{:>8} {:>8} {:>12} {:>12} {:>12} {:>12}'.format(
+            u'blocks', u'format', u'bytes', u'dump (ms)', u'load (ms)', u'load ratio',
+        ))
+        for num_blocks in options['num_blocks']:
+            block_structure = create_synthetic_block_structure(num_blocks)
+            pickle_stats = _measure(
+                lambda: zpickle((
+                    block_structure._block_relations,  # pylint: disable=protected-access
+                    block_structure.transformer_data,
+                    block_structure._block_data_map,  # pylint: disable=protected-access
+                )),
+                zunpickle,
+                options['iterations'],
+            )
+            compact_stats = _measure(
+                lambda: serialization.serialize(block_structure),
+                lambda data: serialization.deserialize(data, block_structure.root_block_usage_key),
+                options['iterations'],
+            )
+            for format_name, stats in ((u'zpickle', pickle_stats), (u'compact', compact_stats)):
+                self.stdout.write(u'{:>8} {:>8} {:>12} {:>12.1f} {:>12.1f} {:>12.2f}'.format(
+                    len(block_structure),
+                    format_name,
+                    stats['bytes'],
+                    stats['dump'] * 1000,
+                    stats['load'] * 1000,
+                    stats['load'] / pickle_stats['load'],
+                ))
+
+
+def _measure(dump, load, iterations):
+    """
+    Returns the serialized size and best dump and load times of the
+    given serialization functions.
+    """
+    serialized_data = dump()
+    return {
+        'bytes': len(serialized_data),
+        'dump': min(timeit.repeat(dump, number=1, repeat=iterations)),
+        'load': min(timeit.repeat(lambda: load(serialized_data), number=1, repeat=iterations)),
+    }
+
+
+def create_synthetic_block_structure(num_blocks):
+    """
+    Returns a collected BlockStructure with approximately num_blocks
+    blocks, shaped like a course of chapters, sequentials, verticals and
+    problems.
+    """
+    course_key = CourseLocator(u'org', u'synthetic', six.text_type(uuid4()))
+    root_key = course_key.make_usage_key(u'course', u'course')
+    block_structure = BlockStructureBlockData(root_key)
+
+    # Each chapter holds 10 sequentials of 4 verticals of 5 problems.
+    blocks_per_chapter = 1 + 10 * (1 + 4 * (1 + 5))
+    for chapter in range(max(1, num_blocks // blocks_per_chapter)):
+        chapter_key = _add_child(block_structure, root_key, u'chapter', [chapter])
+        for sequential in range(10):
+            sequential_key = _add_child(block_structure, chapter_key, u'sequential', [chapter, sequential])
+            for vertical in range(4):
+                vertical_key = _add_child(
+                    block_structure, sequential_key, u'vertical', [chapter, sequential, vertical],
+                )
+                for problem in range(5):
+                    _add_child(block_structure, vertical_key, u'problem', [chapter, sequential, vertical, problem])
+
+    for block_key in block_structure:
+        block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+        block_data.display_name = u'Block {}'.format(block_key.block_id)
+        block_data.graded = block_key.block_type == u'sequential'
+        block_data.format = u'Homework' if block_data.graded else None
+        block_data.due = None
+        block_data.weight = 1.0 if block_key.block_type == u'problem' else None
+        for transformer_name, field_names in six.iteritems(_TRANSFORMER_FIELDS):
+            for field_name in field_names:
+                block_structure.set_transformer_block_field(block_key, transformer_name, field_name, None)
+
+    for transformer_name in _TRANSFORMER_FIELDS:
+        block_structure.set_transformer_data(transformer_name, u'_version', 1)
+    return block_structure
+
+
+def _add_child(block_structure, parent_key, block_type, position):
+    """
+    Adds a new block of the given type under parent_key and returns its key.
+    """
+    child_key = parent_key.course_key.make_usage_key(
+        block_type, u'{}_{}'.format(block_type, u'_'.join(six.text_type(index) for index in position)),
+    )
+    block_structure._add_relation(parent_key, child_key)  # pylint: disable=protected-access
+    return child_key
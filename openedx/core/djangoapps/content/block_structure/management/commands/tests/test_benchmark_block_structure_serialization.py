@@ -0,0 +1,26 @@
+"""
+Tests for benchmark_block_structure_serialization management command.
+"""
+from __future__ import absolute_import
+
+from django.core.management import call_command
+from django.test import TestCase
+from six import StringIO
+
+from ..benchmark_block_structure_serialization import create_synthetic_block_structure
+
+
+class TestBenchmarkBlockStructureSerialization(TestCase):
+    """
+    Tests benchmark_block_structure_serialization management command.
+    """
+    def test_synthetic_block_structure(self):
+        block_structure = create_synthetic_block_structure(num_blocks=500)
+        self.assertEqual(len(block_structure), 1 + 251)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('benchmark_block_structure_serialization', '--num_blocks', '300', '--iterations', '1', stdout=out)
+        output = out.getvalue()
+        self.assertIn(u'zpickle', output)
+        self.assertIn(u'compact', output)
@@ -45,7 +45,10 @@ class BlockStructureManager(object):
         and modulestore, as needed.
 
         Details: Similar to the get_collected method, except the transformers'
-        transform methods are also called.
+        transform methods are also called.  When the CACHE_TRANSFORMED switch
+        is enabled and all transformers declare their transform inputs, the
+        transformed block structure is cached and reused for as long as
+        the collected data and the transformers' inputs are unchanged.
 
         Arguments:
             transformers (BlockStructureTransformers) - Collection of
@@ -64,20 +67,33 @@ class BlockStructureManager(object):
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        collected = collected_block_structure or self.get_collected()
+        if starting_block_usage_key and starting_block_usage_key not in collected:
+            raise UsageKeyNotInBlockStructure(
+                u"The requested usage_key '{0}' is not found in the block_structure with root '{1}'",
+                six.text_type(starting_block_usage_key),
+                six.text_type(self.root_block_usage_key),
+            )
+
+        transformed_key = self._get_transformed_key(transformers, starting_block_usage_key, collected)
+        if transformed_key:
+            block_structure = self.store.get_transformed(
+                transformed_key,
+                starting_block_usage_key or self.root_block_usage_key,
+            )
+            if block_structure is not None:
+                return block_structure
 
+        block_structure = collected.copy() if collected_block_structure else collected
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
             # requested location.  The rest of the structure will be pruned
             # as part of the transformation.
-            if starting_block_usage_key not in block_structure:
-                raise UsageKeyNotInBlockStructure(
-                    u"The requested usage_key '{0}' is not found in the block_structure with root '{1}'",
-                    six.text_type(starting_block_usage_key),
-                    six.text_type(self.root_block_usage_key),
-                )
             block_structure.set_root_block(starting_block_usage_key)
         transformers.transform(block_structure)
+
+        if transformed_key:
+            self.store.add_transformed(transformed_key, block_structure)
         return block_structure
 
     def get_collected(self):
@@ -132,6 +148,35 @@ class BlockStructureManager(object):
             self.store.add(block_structure)
             return block_structure
 
+    def _get_transformed_key(self, transformers, starting_block_usage_key, collected_block_structure):
+        """
+        Returns the key under which the result of transforming the given
+        collected block structure is cached, or None if the result is
+        not to be cached.
+
+        The key comprises the version of the collected data, the
+        starting block, and the hash of the inputs declared by the
+        transformers, so that it changes whenever the collected data is
+        updated or any transformer's inputs change.
+        """
+        if not config.waffle().is_enabled(config.CACHE_TRANSFORMED):
+            return None
+
+        collected_version = collected_block_structure.get_collected_version()
+        if collected_version is None:
+            return None
+
+        transform_inputs_hash = transformers.get_transform_inputs_hash(collected_block_structure)
+        if transform_inputs_hash is None:
+            return None
+
+        return u'{root}.{start}.{collected_version}.{transform_inputs_hash}'.format(
+            root=six.text_type(self.root_block_usage_key),
+            start=six.text_type(starting_block_usage_key or self.root_block_usage_key),
+            collected_version=collected_version,
+            transform_inputs_hash=transform_inputs_hash,
+        )
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
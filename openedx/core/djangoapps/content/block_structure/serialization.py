@@ -0,0 +1,508 @@
+"""
+Compact, version-tagged serialization of BlockStructure data.
+
+The original storage format for block structures is a zlib-compressed
+pickle of the structure's internal dicts, keyed by full UsageKey
+objects.  Unpickling that format for large courses is dominated by the
+reconstruction of thousands of generic Python objects.
+
+The compact format implemented here instead:
+    * interns usage keys into an integer table, storing each key as a
+      (course key index, block type index, block id) triple,
+    * stores parent/child relations as packed integer adjacency arrays
+      (compressed sparse rows), and
+    * stores collected xBlock fields and per-block transformer fields in
+      columnar form, i.e. one (block indices, values) pair per field, and
+    * stores the structure's ancestor index, if any, as packed arrays of
+      key indices (format version 2 onwards).
+
+Serialized data is prefixed with a short header carrying the format
+version, so that data written in the original zpickle format can still
+be detected and loaded.
+"""
+from __future__ import absolute_import
+
+import pickle
+import struct
+import zlib
+from array import array
+
+import six
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _AncestorIndex, _BlockRelations
+from .exceptions import BlockStructureException
+from .factory import BlockStructureFactory
+
+# The current version of the compact serialization format.  Increment
+# this value whenever the layout of the serialized payload changes.
+FORMAT_VERSION = 2
+
+# Older format versions that can still be read.
+_READABLE_VERSIONS = frozenset([1, FORMAT_VERSION])
+
+# Header prepended to compact payloads: a magic marker followed by the
+# format version.  A zlib stream (as used by zpickle) never starts with
+# this marker, which is what allows both formats to coexist in storage.
+_MAGIC = b'BSC'
+_HEADER = struct.Struct('>3sB')
+
+# Typecode for packed integer arrays.
+_INT_TYPECODE = 'I'
+
+
+class BlockStructureSerializationError(BlockStructureException):
+    """
+    Exception class for errors while decoding compact block structures.
+    """
+    pass
+
+
+def is_compact(serialized_data):
+    """
+    Returns whether the given serialized data was written in the compact
+    format, as opposed to the original zpickle format.
+    """
+    return serialized_data[:len(_MAGIC)] == _MAGIC
+
+
+def serialize(block_structure):
+    """
+    Returns the compact serialization of the given block structure.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The block structure
+            whose relations, transformer data and block data are to be
+            serialized.
+    """
+    # pylint: disable=protected-access
+    block_relations = block_structure._block_relations
+    block_data_map = block_structure._block_data_map
+
+    key_table = _KeyTable()
+    for usage_key in block_relations:
+        key_table.intern(usage_key)
+    for usage_key in block_data_map:
+        key_table.intern(usage_key)
+
+    # The ancestor index is dumped first since it may intern keys, which
+    # must happen before the key table itself is dumped.
+    ancestor_index = _dump_ancestor_index(block_structure._ancestor_index, key_table)
+    payload = (
+        key_table.dump(),
+        _dump_relations(block_relations, key_table),
+        _dump_transformer_data(block_structure.transformer_data),
+        _dump_block_data(block_data_map, key_table),
+        ancestor_index,
+    )
+    return _HEADER.pack(_MAGIC, FORMAT_VERSION) + zlib.compress(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL))
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Returns a new block structure starting at root_block_usage_key,
+    decoded from the given compact serialization.
+
+    Raises:
+        BlockStructureSerializationError if the data is not in a
+        supported compact format version.
+    """
+    magic, version = _HEADER.unpack(serialized_data[:_HEADER.size])
+    if magic != _MAGIC or version not in _READABLE_VERSIONS:
+        raise BlockStructureSerializationError(
+            u'Unsupported compact block structure format version {}.'.format(version)
+        )
+
+    payload = pickle.loads(zlib.decompress(serialized_data[_HEADER.size:]))
+    if version == 1:
+        payload += (None,)
+    key_table_data, relations_data, transformer_data, block_data, ancestor_index = payload
+
+    keys = _KeyTable.load(key_table_data)
+    return BlockStructureFactory.create_new(
+        root_block_usage_key,
+        _load_relations(relations_data, keys),
+        _load_transformer_data(transformer_data),
+        _load_block_data(block_data, keys),
+        _load_ancestor_index(ancestor_index, keys),
+    )
+
+
+class _KeyTable(object):
+    """
+    Interns usage keys into a table of consecutive integer indices.
+
+    Keys that can be rebuilt from their course key, block type and block
+    id are stored as interned triples.  Any other keys are stored as is.
+    """
+    def __init__(self):
+        # Map of a usage key to its index in the table.
+        # dict {UsageKey: int}
+        self.index_of = {}
+
+        self._course_keys = _Interner()
+        self._block_types = _Interner()
+        self._key_course_indices = []
+        self._key_type_indices = []
+        self._key_block_ids = []
+
+        # Map of a key's index to the key, for keys that cannot be
+        # rebuilt from their parts.
+        # dict {int: UsageKey}
+        self._raw_keys = {}
+
+    def intern(self, usage_key):
+        """
+        Adds the given usage_key to the table, if not already present,
+        and returns its index.
+        """
+        index = self.index_of.get(usage_key)
+        if index is not None:
+            return index
+
+        index = len(self.index_of)
+        self.index_of[usage_key] = index
+
+        parts = _key_parts(usage_key)
+        if parts is None:
+            self._raw_keys[index] = usage_key
+            self._key_course_indices.append(0)
+            self._key_type_indices.append(0)
+            self._key_block_ids.append(None)
+        else:
+            course_key, block_type, block_id = parts
+            self._key_course_indices.append(self._course_keys.intern(course_key))
+            self._key_type_indices.append(self._block_types.intern(block_type))
+            self._key_block_ids.append(block_id)
+        return index
+
+    def dump(self):
+        """
+        Returns a picklable representation of the table.
+        """
+        return (
+            self._course_keys.values,
+            self._block_types.values,
+            _pack(self._key_course_indices),
+            _pack(self._key_type_indices),
+            self._key_block_ids,
+            self._raw_keys,
+        )
+
+    @staticmethod
+    def load(key_table_data):
+        """
+        Returns the list of usage keys, in index order, for the given
+        output of dump.
+        """
+        course_keys, block_types, key_course_indices, key_type_indices, block_ids, raw_keys = key_table_data
+        keys = [
+            course_keys[course_index].make_usage_key(block_types[type_index], block_id)
+            if block_id is not None else None
+            for course_index, type_index, block_id in six.moves.zip(
+                _unpack(key_course_indices),
+                _unpack(key_type_indices),
+                block_ids,
+            )
+        ]
+        for index, usage_key in six.iteritems(raw_keys):
+            keys[index] = usage_key
+        return keys
+
+
+class _Interner(object):
+    """
+    Assigns consecutive integer indices to distinct hashable values.
+    """
+    def __init__(self):
+        self.values = []
+        self._index_of = {}
+
+    def intern(self, value):
+        """
+        Returns the index of the given value, adding it if needed.
+        """
+        index = self._index_of.get(value)
+        if index is None:
+            index = len(self.values)
+            self._index_of[value] = index
+            self.values.append(value)
+        return index
+
+
+def _key_parts(usage_key):
+    """
+    Returns the (course_key, block_type, block_id) parts of the given
+    usage_key, or None if the key cannot be faithfully rebuilt from them.
+    """
+    try:
+        parts = (usage_key.course_key, usage_key.block_type, usage_key.block_id)
+        rebuilt = parts[0].make_usage_key(parts[1], parts[2])
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return parts if rebuilt == usage_key and parts[2] is not None else None
+
+
+def _pack(values):
+    """
+    Returns the given list of non-negative integers as packed bytes.
+    """
+    packed = array(_INT_TYPECODE, values)
+    return packed.tobytes() if six.PY3 else packed.tostring()  # pylint: disable=no-member
+
+
+def _unpack(packed_bytes):
+    """
+    Returns an array of integers for the given output of _pack.
+    """
+    unpacked = array(_INT_TYPECODE)
+    if six.PY3:
+        unpacked.frombytes(packed_bytes)
+    else:
+        unpacked.fromstring(packed_bytes)  # pylint: disable=no-member
+    return unpacked
+
+
+def _dump_relations(block_relations, key_table):
+    """
+    Returns the given block relations as packed adjacency arrays.
+
+    Both children and parents are stored, as per-block counts followed
+    by the flattened relations, so that the order of each block's
+    relations is preserved.  Counts are stored rather than offsets since
+    they compress far better.
+    """
+    children_counts, children = [], []
+    parents_counts, parents = [], []
+    index_of = key_table.index_of
+    for relations in six.itervalues(block_relations):
+        children_counts.append(len(relations.children))
+        children.extend(index_of[child] for child in relations.children)
+        parents_counts.append(len(relations.parents))
+        parents.extend(index_of[parent] for parent in relations.parents)
+    return _pack(children_counts), _pack(children), _pack(parents_counts), _pack(parents)
+
+
+def _load_relations(relations_data, keys):
+    """
+    Returns the block relations map for the given output of
+    _dump_relations.
+    """
+    children_counts, children, parents_counts, parents = (_unpack(packed) for packed in relations_data)
+    children = [keys[child] for child in children]
+    parents = [keys[parent] for parent in parents]
+
+    block_relations = {}
+    children_offset = parents_offset = 0
+    for index, (num_children, num_parents) in enumerate(six.moves.zip(children_counts, parents_counts)):
+        relations = _BlockRelations()
+        relations.children = children[children_offset:children_offset + num_children]
+        relations.parents = parents[parents_offset:parents_offset + num_parents]
+        children_offset += num_children
+        parents_offset += num_parents
+        block_relations[keys[index]] = relations
+    return block_relations
+
+
+def _dump_transformer_data(transformer_data):
+    """
+    Returns the structure-wide transformer data as a plain dict.
+    """
+    return {
+        transformer_name: data.fields
+        for transformer_name, data in six.iteritems(transformer_data)
+    }
+
+
+def _load_transformer_data(transformer_data):
+    """
+    Returns a TransformerDataMap for the given output of
+    _dump_transformer_data.
+    """
+    transformer_data_map = TransformerDataMap()
+    for transformer_name, fields in six.iteritems(transformer_data):
+        transformer_data_map[transformer_name] = _new_field_data(TransformerData, fields=fields)
+    return transformer_data_map
+
+
+def _dump_block_data(block_data_map, key_table):
+    """
+    Returns the block data map in columnar form:
+
+        (
+            packed indices of blocks with BlockData,
+            {field_name: (packed block indices, [values])},
+            {transformer_name: (
+                packed indices of blocks with data for the transformer,
+                {field_name: (packed block indices, [values])},
+            )},
+        )
+
+    Packed indices are replaced with None whenever a field is set on
+    every block of its enclosing list, which is the common case.
+    """
+    index_of = key_table.index_of
+    block_indices = []
+    xblock_columns = {}
+    transformer_blocks = {}
+    transformer_columns = {}
+
+    for usage_key, block_data in six.iteritems(block_data_map):
+        block_index = index_of[usage_key]
+        block_indices.append(block_index)
+        _add_to_columns(xblock_columns, block_index, block_data.fields)
+
+        for transformer_name, data in six.iteritems(block_data.transformer_data):
+            transformer_blocks.setdefault(transformer_name, []).append(block_index)
+            _add_to_columns(transformer_columns.setdefault(transformer_name, {}), block_index, data.fields)
+
+    return (
+        _pack_indices(block_indices, list(six.moves.range(len(key_table.index_of)))),
+        _pack_columns(xblock_columns, block_indices),
+        {
+            transformer_name: (
+                _pack_indices(indices, block_indices),
+                _pack_columns(transformer_columns[transformer_name], indices),
+            )
+            for transformer_name, indices in six.iteritems(transformer_blocks)
+        },
+    )
+
+
+def _load_block_data(block_data, keys):
+    """
+    Returns the block data map for the given output of _dump_block_data.
+    """
+    block_indices, xblock_columns, transformer_columns = block_data
+
+    block_indices = _unpack_indices(block_indices, six.moves.range(len(keys)))
+    blocks_by_index = {}
+    for block_index in block_indices:
+        blocks_by_index[block_index] = _new_field_data(
+            BlockData,
+            fields={},
+            location=keys[block_index],
+            transformer_data=TransformerDataMap(),
+        )
+
+    _fill_from_columns(xblock_columns, block_indices, lambda block_index: blocks_by_index[block_index].fields)
+
+    for transformer_name, (indices, columns) in six.iteritems(transformer_columns):
+        indices = _unpack_indices(indices, block_indices)
+        transformer_fields = {}
+        for block_index in indices:
+            data = _new_field_data(TransformerData, fields={})
+            blocks_by_index[block_index].transformer_data[transformer_name] = data
+            transformer_fields[block_index] = data.fields
+        _fill_from_columns(columns, indices, transformer_fields.__getitem__)
+
+    return {
+        keys[block_index]: block_data
+        for block_index, block_data in six.iteritems(blocks_by_index)
+    }
+
+
+def _add_to_columns(columns, block_index, fields):
+    """
+    Appends the given block's fields to the given columns.
+    """
+    for field_name, value in six.iteritems(fields):
+        indices, values = columns.setdefault(field_name, ([], []))
+        indices.append(block_index)
+        values.append(value)
+
+
+def _pack_columns(columns, dense_indices):
+    """
+    Returns the given columns with their block indices packed.
+    """
+    return {
+        field_name: (_pack_indices(indices, dense_indices), values)
+        for field_name, (indices, values) in six.iteritems(columns)
+    }
+
+
+def _fill_from_columns(columns, dense_indices, get_fields):
+    """
+    Sets the values in the given packed columns on the fields dicts
+    returned by get_fields for each block index.
+    """
+    for field_name, (indices, values) in six.iteritems(columns):
+        for block_index, value in six.moves.zip(_unpack_indices(indices, dense_indices), values):
+            get_fields(block_index)[field_name] = value
+
+
+def _pack_indices(indices, dense_indices):
+    """
+    Returns the given block indices packed, or None if they equal
+    dense_indices.
+    """
+    return None if indices == dense_indices else _pack(indices)
+
+
+def _unpack_indices(packed_indices, dense_indices):
+    """
+    Returns the block indices for the given output of _pack_indices.
+    """
+    return dense_indices if packed_indices is None else _unpack(packed_indices)
+
+
+def _dump_ancestor_index(ancestor_index, key_table):
+    """
+    Returns the given ancestor index as packed arrays, or None if there
+    is no index:
+
+        (
+            is_tree,
+            packed indices of the blocks in pre-order,
+            packed (start, end) subtree intervals, in pre-order,
+            packed per-block counts of ancestors, in pre-order,
+            packed flattened ancestor indices,
+        )
+    """
+    if ancestor_index is None:
+        return None
+
+    ancestor_index = ancestor_index.copy()
+    ancestor_index.compact()
+    order, intervals, ancestors_counts, ancestors = [], [], [], []
+    for usage_key in ancestor_index.order:
+        order.append(key_table.intern(usage_key))
+        intervals.extend(ancestor_index.intervals[usage_key])
+        block_ancestors = ancestor_index.ancestors[usage_key]
+        ancestors_counts.append(len(block_ancestors))
+        ancestors.extend(key_table.intern(ancestor_key) for ancestor_key in block_ancestors)
+    return ancestor_index.is_tree, _pack(order), _pack(intervals), _pack(ancestors_counts), _pack(ancestors)
+
+
+def _load_ancestor_index(ancestor_index_data, keys):
+    """
+    Returns the ancestor index for the given output of
+    _dump_ancestor_index.
+    """
+    if ancestor_index_data is None:
+        return None
+
+    is_tree, order, intervals, ancestors_counts, ancestors = ancestor_index_data
+    intervals = _unpack(intervals)
+    ancestors = [keys[ancestor] for ancestor in _unpack(ancestors)]
+
+    ancestor_index = _AncestorIndex()
+    ancestor_index.is_tree = is_tree
+    ancestor_index.order = [keys[block_index] for block_index in _unpack(order)]
+    ancestors_counts = _unpack(ancestors_counts)
+    ancestors_offset = 0
+    for position, (usage_key, num_ancestors) in enumerate(six.moves.zip(ancestor_index.order, ancestors_counts)):
+        ancestor_index.intervals[usage_key] = (intervals[2 * position], intervals[2 * position + 1])
+        ancestor_index.ancestors[usage_key] = frozenset(ancestors[ancestors_offset:ancestors_offset + num_ancestors])
+        ancestors_offset += num_ancestors
+    return ancestor_index
+
+
+def _new_field_data(field_data_cls, **attrs):
+    """
+    Returns a new instance of the given FieldData subclass with the given
+    attributes, bypassing the class' attribute hooks for speed.
+    """
+    instance = field_data_cls.__new__(field_data_cls)
+    instance.__dict__.update(attrs)
+    return instance
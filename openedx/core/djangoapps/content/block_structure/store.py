@@ -4,13 +4,15 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 from __future__ import absolute_import
 
+import hashlib
 from logging import getLogger
 
 import six
+from django.conf import settings
 
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
-from . import config
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -129,6 +131,42 @@ class BlockStructureStore(object):
 
         return False
 
+    def add_transformed(self, transformed_key, block_structure):
+        """
+        Caches the given transformed block structure for the given key.
+        Transformed structures are only cached, never stored.
+
+        Arguments:
+            transformed_key (string) - A key identifying the collected
+                structure, starting block and transform inputs from
+                which the block structure was transformed.
+
+            block_structure (BlockStructureBlockData) - The transformed
+                block structure.
+        """
+        serialized_data = serialization.serialize(block_structure)
+        self._cache.set(
+            self._encode_transformed_cache_key(transformed_key),
+            serialized_data,
+            timeout=settings.BLOCK_STRUCTURES_SETTINGS.get('TRANSFORMED_CACHE_TIMEOUT', 300),
+        )
+
+    def get_transformed(self, transformed_key, root_block_usage_key):
+        """
+        Returns the transformed block structure cached for the given
+        key, or None if not found.
+
+        Arguments:
+            transformed_key (string) - The key given to add_transformed.
+
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the transformed block structure.
+        """
+        serialized_data = self._cache.get(self._encode_transformed_cache_key(transformed_key))
+        if serialized_data is None:
+            return None
+        return serialization.deserialize(serialized_data, root_block_usage_key)
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -193,25 +231,36 @@ class BlockStructureStore(object):
     def _serialize(self, block_structure):
         """
         Serializes the data for the given block_structure.
+
+        The compact serialization format is used when enabled;
+        otherwise the structure's data is zpickled as is.
         """
+        if config.waffle().is_enabled(config.COMPACT_SERIALIZATION):
+            return serialization.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
             block_structure._block_data_map,
         )
+        if block_structure._ancestor_index is not None:
+            data_to_cache += (block_structure._ancestor_index,)
         return zpickle(data_to_cache)
 
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Data in either the compact or the original zpickle format is
+        supported, so that previously stored structures remain readable.
         """
-        block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
-        return BlockStructureFactory.create_new(
-            root_block_usage_key,
-            block_relations,
-            transformer_data,
-            block_data_map,
-        )
+        if serialization.is_compact(serialized_data):
+            return serialization.deserialize(serialized_data, root_block_usage_key)
+
+        # Structures stored before the ancestor index was introduced, or
+        # collected without it, are 3-tuples.
+        unpickled_data = zunpickle(serialized_data)
+        return BlockStructureFactory.create_new(root_block_usage_key, *unpickled_data)
 
     @staticmethod
     def _encode_root_cache_key(bs_model):
@@ -228,6 +277,16 @@ class BlockStructureStore(object):
                 root_usage_key=six.text_type(bs_model.data_usage_key),
             )
 
+    @staticmethod
+    def _encode_transformed_cache_key(transformed_key):
+        """
+        Returns the cache key to use for the given transformed key.
+        """
+        return u"v{version}.transformed.{key_hash}".format(
+            version=six.text_type(BlockStructureBlockData.VERSION),
+            key_hash=hashlib.sha1(transformed_key.encode('utf-8')).hexdigest(),
+        )
+
     @staticmethod
     def _version_data_of_block(root_block):
         """
@@ -312,3 +312,129 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         self.assertEquals(_get_value(block_structure), 'edit1')
         self.assertEquals(_get_value(new_copy), 'edit2')
+
+
+@ddt.ddt
+class TestAncestorIndex(TestCase, ChildrenMapTestMixin):
+    """
+    Tests for the ancestry methods of BlockStructure, with and without a
+    precomputed ancestor index.
+    """
+    ALL_CHILDREN_MAPS = [
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    ]
+
+    def assert_ancestry(self, block_structure, children_map, missing_blocks=None):
+        """
+        Verifies the ancestry methods of the given block structure
+        against the given children_map.
+        """
+        missing_blocks = missing_blocks or []
+        for block in range(len(children_map)):
+            if block in missing_blocks:
+                continue
+            expected_descendants = set(traverse_post_order(block, get_children=lambda node: children_map[node]))
+            expected_descendants.discard(block)
+            self.assertSetEqual(set(block_structure.get_descendants(block)), expected_descendants)
+            for descendant in expected_descendants:
+                self.assertIn(block, block_structure.get_ancestors(descendant))
+                self.assertTrue(block_structure.is_descendant(descendant, block))
+            self.assertFalse(block_structure.is_descendant(block, block))
+
+    @ddt.data(*ALL_CHILDREN_MAPS)
+    def test_ancestry(self, children_map):
+        block_structure = self.create_block_structure(children_map)
+        self.assertFalse(block_structure.has_ancestor_index())
+        self.assert_ancestry(block_structure, children_map)
+
+        block_structure.build_ancestor_index()
+        self.assertTrue(block_structure.has_ancestor_index())
+        self.assert_ancestry(block_structure, children_map)
+
+    @ddt.data(True, False)
+    def test_descendants_pre_order(self, build_index):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        if build_index:
+            block_structure.build_ancestor_index()
+        self.assertEqual(block_structure.get_descendants(0), [1, 3, 4, 2])
+        self.assertEqual(block_structure.get_descendants(1), [3, 4])
+        self.assertEqual(block_structure.get_descendants(2), [])
+
+    @ddt.data(
+        *itertools.product(
+            [True, False],
+            list(range(1, 7)),
+            ALL_CHILDREN_MAPS,
+        )
+    )
+    @ddt.unpack
+    def test_remove_block(self, keep_descendants, block_to_remove, children_map):
+        if block_to_remove >= len(children_map):
+            return
+
+        block_structure = self.create_block_structure(children_map)
+        block_structure.build_ancestor_index()
+        block_structure.remove_block(block_to_remove, keep_descendants)
+        block_structure._prune_unreachable()
+
+        # Compare against a structure without an index, reduced the same way.
+        expected_structure = self.create_block_structure(children_map)
+        expected_structure.remove_block(block_to_remove, keep_descendants)
+        expected_structure._prune_unreachable()
+        expected_children_map = [
+            expected_structure.get_children(block) if block in expected_structure else []
+            for block in range(len(children_map))
+        ]
+        missing_blocks = [block for block in range(len(children_map)) if block not in expected_structure]
+
+        self.assert_ancestry(block_structure, expected_children_map, missing_blocks)
+        for block in expected_structure:
+            self.assertEqual(block_structure.get_ancestors(block), expected_structure.get_ancestors(block))
+
+    def test_index_kept_for_tree_removals(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.build_ancestor_index()
+        block_structure.remove_block(1, keep_descendants=True)
+        block_structure.remove_block(2, keep_descendants=False)
+        self.assertTrue(block_structure.has_ancestor_index())
+        self.assertEqual(block_structure.get_descendants(0), [3, 4])
+        self.assertEqual(block_structure.get_ancestors(3), frozenset([0]))
+
+    def test_index_discarded_on_new_relation(self):
+        block_structure = self.create_block_structure(self.LINEAR_CHILDREN_MAP)
+        block_structure.build_ancestor_index()
+        block_structure._add_relation(0, 3)
+        self.assertFalse(block_structure.has_ancestor_index())
+        self.assertEqual(block_structure.get_ancestors(3), frozenset([0, 1, 2]))
+
+    @ddt.data(True, False)
+    def test_set_root_block(self, build_index):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        if build_index:
+            block_structure.build_ancestor_index()
+        block_structure.set_root_block(1)
+        self.assertEqual(block_structure.get_descendants(1), [3, 4])
+        self.assertEqual(block_structure.get_ancestors(3), frozenset([1]))
+
+    def test_copy(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.build_ancestor_index()
+        new_copy = block_structure.copy()
+        self.assertTrue(new_copy.has_ancestor_index())
+
+        # verify edits to the original's index do not affect the copy
+        block_structure.remove_block(1, keep_descendants=False)
+        self.assertEqual(new_copy.get_descendants(0), [1, 3, 4, 2])
+        self.assertEqual(new_copy.get_ancestors(4), frozenset([0, 1]))
+
+    @ddt.data(True, False)
+    def test_lowest_common_ancestor(self, build_index):
+        block_structure = self.create_block_structure(self.DAG_CHILDREN_MAP)
+        if build_index:
+            block_structure.build_ancestor_index()
+        self.assertEqual(block_structure.get_lowest_common_ancestor([5, 6]), 3)
+        self.assertEqual(block_structure.get_lowest_common_ancestor([3, 4]), 2)
+        self.assertEqual(block_structure.get_lowest_common_ancestor([1, 4]), 0)
+        self.assertEqual(block_structure.get_lowest_common_ancestor([3]), 3)
@@ -6,9 +6,10 @@ from __future__ import absolute_import
 import ddt
 import six
 from django.test import TestCase
+from six.moves import range
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import CACHE_TRANSFORMED, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
 from ..exceptions import BlockStructureNotFound, UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -30,6 +31,7 @@ class TestTransformer1(MockTransformer):
     collect_data_key = 't1.collect'
     transform_data_key = 't1.transform'
     collect_call_count = 0
+    transform_call_count = 0
 
     @classmethod
     def collect(cls, block_structure):
@@ -44,6 +46,7 @@ class TestTransformer1(MockTransformer):
         Transforms the block structure.
         """
         self._set_block_values(block_structure, self.transform_data_key)
+        TestTransformer1.transform_call_count += 1
 
     @classmethod
     def assert_collected(cls, block_structure):
@@ -94,6 +97,14 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + six.text_type(block_key)
 
 
+class TestCacheableTransformer1(TestTransformer1):
+    """
+    Test Transformer class that declares its transform inputs.
+    """
+    def get_transform_inputs(self, usage_info, block_structure):
+        return (usage_info,)
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -104,6 +115,7 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         super(TestBlockStructureManager, self).setUp()
 
         TestTransformer1.collect_call_count = 0
+        TestTransformer1.transform_call_count = 0
         self.registered_transformers = [TestTransformer1()]
         with mock_registered_transformers(self.registered_transformers):
             self.transformers = BlockStructureTransformers(self.registered_transformers)
@@ -171,6 +183,39 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             with self.assertRaises(UsageKeyNotInBlockStructure):
                 self.bs_manager.get_transformed(self.transformers, starting_block_usage_key=100)
 
+    @ddt.data(True, False)
+    def test_get_transformed_cached(self, declares_inputs):
+        transformer = TestCacheableTransformer1() if declares_inputs else TestTransformer1()
+        with mock_registered_transformers([transformer]):
+            transformers = BlockStructureTransformers([transformer], usage_info=u'user1')
+            with waffle().override(CACHE_TRANSFORMED, active=True):
+                for _ in range(2):
+                    block_structure = self.bs_manager.get_transformed(
+                        transformers,
+                        starting_block_usage_key=self.block_key_factory(1),
+                    )
+                    self.assert_block_structure(block_structure, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+                    TestTransformer1.assert_transformed(block_structure)
+                self.assertEquals(TestTransformer1.transform_call_count, 1 if declares_inputs else 2)
+
+                # a change in the transform inputs invalidates the cached structure
+                transformers.usage_info = u'user2'
+                self.bs_manager.get_transformed(transformers, starting_block_usage_key=self.block_key_factory(1))
+                self.assertEquals(TestTransformer1.transform_call_count, 2 if declares_inputs else 3)
+
+                # as does a change in the collected data
+                self.bs_manager.clear()
+                self.bs_manager.get_transformed(transformers, starting_block_usage_key=self.block_key_factory(1))
+                self.assertEquals(TestTransformer1.transform_call_count, 3 if declares_inputs else 4)
+
+    def test_get_transformed_not_cached_when_disabled(self):
+        transformer = TestCacheableTransformer1()
+        with mock_registered_transformers([transformer]):
+            transformers = BlockStructureTransformers([transformer], usage_info=u'user1')
+            self.bs_manager.get_transformed(transformers)
+            self.bs_manager.get_transformed(transformers)
+        self.assertEquals(TestTransformer1.transform_call_count, 2)
+
     def test_get_collected_cached(self):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
@@ -0,0 +1,130 @@
+"""
+Tests for block_structure/serialization.py
+"""
+from __future__ import absolute_import
+
+import ddt
+from django.test import TestCase
+
+from openedx.core.lib.cache_utils import zpickle
+
+from ..serialization import BlockStructureSerializationError, deserialize, is_compact, serialize
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+@ddt.ddt
+class TestCompactSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the compact BlockStructure serialization format.
+    """
+    def _create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        xBlock fields and transformer data set on its blocks.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        for block_key in block_structure:
+            block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+            block_data.display_name = u'name {}'.format(block_key.block_id)
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', block_key.block_id)
+        return block_structure
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self._create_collected_block_structure(children_map)
+
+        serialized_data = serialize(block_structure)
+        self.assertTrue(is_compact(serialized_data))
+        new_block_structure = deserialize(serialized_data, block_structure.root_block_usage_key)
+
+        self.assert_block_structure(new_block_structure, children_map)
+        self.assertEqual(list(new_block_structure), list(block_structure))
+        self.assertEqual(new_block_structure._get_transformer_data_version(MockTransformer), 1)  # pylint: disable=protected-access
+        for block_key in block_structure:
+            self.assertEqual(new_block_structure.get_children(block_key), block_structure.get_children(block_key))
+            self.assertEqual(new_block_structure.get_parents(block_key), block_structure.get_parents(block_key))
+            self.assertEqual(new_block_structure[block_key].location, block_key)
+            self.assertEqual(
+                new_block_structure.get_xblock_field(block_key, 'display_name'),
+                u'name {}'.format(block_key.block_id),
+            )
+            self.assertEqual(
+                new_block_structure.get_transformer_block_field(block_key, MockTransformer, 'test'),
+                block_key.block_id,
+            )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip_ancestor_index(self, children_map):
+        block_structure = self._create_collected_block_structure(children_map)
+        block_structure.build_ancestor_index()
+
+        new_block_structure = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        self.assertTrue(new_block_structure.has_ancestor_index())
+        for block_key in block_structure:
+            self.assertEqual(new_block_structure.get_ancestors(block_key), block_structure.get_ancestors(block_key))
+            self.assertEqual(
+                new_block_structure.get_descendants(block_key),
+                block_structure.get_descendants(block_key),
+            )
+
+    def test_round_trip_reduced_ancestor_index(self):
+        block_structure = self._create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.build_ancestor_index()
+        block_structure.remove_block(self.block_key_factory(1), keep_descendants=True)
+        block_structure.remove_block(self.block_key_factory(2), keep_descendants=False)
+
+        new_block_structure = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        self.assertTrue(new_block_structure.has_ancestor_index())
+        self.assertEqual(
+            new_block_structure.get_descendants(self.block_key_factory(0)),
+            [self.block_key_factory(3), self.block_key_factory(4)],
+        )
+        self.assertEqual(
+            new_block_structure.get_ancestors(self.block_key_factory(4)),
+            frozenset([self.block_key_factory(0)]),
+        )
+
+    def test_without_ancestor_index(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        new_block_structure = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        self.assertFalse(new_block_structure.has_ancestor_index())
+
+    def test_partial_block_data(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.set_transformer_block_field(self.block_key_factory(1), MockTransformer, 'test', 1)
+
+        new_block_structure = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        self.assertEqual(
+            new_block_structure.get_transformer_block_field(self.block_key_factory(1), MockTransformer, 'test'), 1
+        )
+        with self.assertRaises(KeyError):
+            new_block_structure[self.block_key_factory(2)]  # pylint: disable=pointless-statement
+
+    def test_zpickle_not_compact(self):
+        self.assertFalse(is_compact(zpickle(({}, {}, {}))))
+
+    def test_unsupported_version(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = serialize(block_structure)
+        with self.assertRaises(BlockStructureSerializationError):
+            deserialize(serialized_data[:3] + b'\xff' + serialized_data[4:], block_structure.root_block_usage_key)
+
+
+class TestCompactSerializationRawKeys(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the compact serialization of structures whose keys are not
+    usage keys and are therefore stored as is.
+    """
+    def test_round_trip(self):
+        block_structure = self.create_block_structure(self.DAG_CHILDREN_MAP)
+        new_block_structure = deserialize(serialize(block_structure), block_structure.root_block_usage_key)
+        self.assert_block_structure(new_block_structure, self.DAG_CHILDREN_MAP)
+        self.assertEqual(new_block_structure.get_parents(3), [1, 2])
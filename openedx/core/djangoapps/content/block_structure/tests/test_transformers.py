@@ -71,6 +71,22 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.transformers.transform(block_structure=MagicMock())
             self.assertTrue(mock_transform_call.called)
 
+    def test_get_transform_inputs_hash(self):
+        self.add_mock_transformer()
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+
+        # transformers do not declare their inputs by default
+        self.assertIsNone(self.transformers.get_transform_inputs_hash(block_structure))
+
+        with patch.object(MockTransformer, 'get_transform_inputs', return_value=(u'input',)), \
+                patch.object(MockFilteringTransformer, 'get_transform_inputs', return_value=()) as mock_inputs_call:
+            inputs_hash = self.transformers.get_transform_inputs_hash(block_structure)
+            self.assertIsNotNone(inputs_hash)
+            self.assertEquals(self.transformers.get_transform_inputs_hash(block_structure), inputs_hash)
+
+            mock_inputs_call.return_value = (u'other input',)
+            self.assertNotEquals(self.transformers.get_transform_inputs_hash(block_structure), inputs_hash)
+
     def test_verify_versions(self):
         block_structure = self.create_block_structure(
             self.SIMPLE_CHILDREN_MAP,
@@ -157,6 +157,32 @@ class BlockStructureTransformer(object):
         """
         raise NotImplementedError
 
+    def get_transform_inputs(self, usage_info, block_structure):
+        """
+        Returns a fingerprint of all inputs, other than the collected
+        data in the block_structure, that the output of this
+        transformer's transform method depends upon for the given
+        usage_info.  For example, the user's staff access, cohort or
+        enrollment mode.
+
+        The fingerprint is used to cache transformed block structures,
+        so it must change whenever the transform output would change,
+        and its repr must be deterministic.  Tuples of strings, numbers,
+        booleans and datetimes are recommended.
+
+        Transformers that cannot declare their inputs return None, which
+        opts any transformation that they are part of out of caching.
+        This is the default.
+
+        Arguments:
+            usage_info (any negotiated type) - The usage-specific object
+                that would be passed to the transform method.
+
+            block_structure (BlockStructureBlockData) - The collected,
+                not yet transformed, block structure.
+        """
+        return None
+
 
 class FilteringTransformerMixin(BlockStructureTransformer):
     """
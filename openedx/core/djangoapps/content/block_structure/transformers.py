@@ -4,8 +4,10 @@ Module for a collection of BlockStructureTransformers.
 from __future__ import absolute_import
 
 import functools
+import hashlib
 from logging import getLogger
 
+from . import config
 from .exceptions import TransformerDataIncompatible, TransformerException
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
@@ -82,6 +84,10 @@ class BlockStructureTransformers(object):
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+        block_structure._set_collected_version()  # pylint: disable=protected-access
+
+        if config.waffle().is_enabled(config.ANCESTOR_INDEX):
+            block_structure.build_ancestor_index()
 
     @classmethod
     def verify_versions(cls, block_structure):
@@ -119,6 +125,24 @@ class BlockStructureTransformers(object):
         # Prune the block structure to remove any unreachable blocks.
         block_structure._prune_unreachable()  # pylint: disable=protected-access
 
+    def get_transform_inputs_hash(self, block_structure):
+        """
+        Returns a hash of the transform inputs declared by each
+        transformer in the collection for the current usage_info, or
+        None if any transformer does not declare its inputs.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - The collected,
+                not yet transformed, block structure.
+        """
+        inputs_hash = hashlib.sha1()
+        for transformer in self._transformers['supports_filter'] + self._transformers['no_filter']:
+            transform_inputs = transformer.get_transform_inputs(self.usage_info, block_structure)
+            if transform_inputs is None:
+                return None
+            inputs_hash.update(repr((transformer.name(), transform_inputs)).encode('utf-8'))
+        return inputs_hash.hexdigest()
+
     def _transform_with_filters(self, block_structure):
         """
         Transforms the given block_structure using the transform_block_filters
@@ -0,0 +1,173 @@
+"""
+Caching of CourseOverviews in front of the database.
+
+CourseOverviews are read many times per request, and by every process, but
+only change when their course is published.  Unless
+settings.COURSE_OVERVIEW_CACHE_TIMEOUT is 0, which disables both, they are
+cached at two levels:
+
+    * the request cache, so that a request reads each overview once.  All the
+      reads of an overview within a request return the same instance, which
+      callers must therefore not modify;
+
+    * a least recently used cache in each process, whose entries expire after
+      settings.COURSE_OVERVIEW_CACHE_TIMEOUT seconds.
+
+Entries of the process caches are stamped with the generation of their
+course, a token kept in the shared Django cache and replaced whenever the
+overview of the course is saved or deleted, so that every process sees the
+change on its next read.  The overviews are kept pickled in the process
+caches, so that requests don't share the same instances.
+"""
+from __future__ import absolute_import
+
+import time
+from uuid import uuid4
+
+import six
+from crum import get_current_request
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from edx_django_utils.cache import RequestCache
+from six.moves import cPickle as pickle
+
+from openedx.core.lib.cache_utils import LRUCache
+
+REQUEST_CACHE_NAMESPACE = 'course_overviews.cache'
+GENERATION_CACHE_KEY_PREFIX = 'course_overviews.generation.'
+
+# Default maximum number of overviews kept by each process.
+DEFAULT_CACHE_SIZE = 1000
+
+
+class CourseOverviewCache(object):
+    """
+    The request and process caches of CourseOverviews.
+    """
+    def __init__(self):
+        self._entries = LRUCache(DEFAULT_CACHE_SIZE)
+
+    def get_many(self, course_ids):
+        """
+        Returns the overviews of the given courses that are cached, keyed by
+        course id, and the current generations of the others, to be passed to
+        set_many along with their overviews once they are read.
+        """
+        request_cache = _get_request_cache()
+        overviews = {}
+        missing_ids = []
+        for course_id in course_ids:
+            if request_cache is not None and course_id in request_cache:
+                overviews[course_id] = request_cache[course_id]
+            else:
+                missing_ids.append(course_id)
+
+        generations = {}
+        if missing_ids and _get_timeout():
+            generations = _get_generations(missing_ids)
+            now = time.time()
+            for course_id in missing_ids:
+                entry = self._entries.get(course_id)
+                if entry is None:
+                    continue
+                generation, expires_at, pickled_overview = entry
+                if generation != generations[course_id] or expires_at < now:
+                    self._entries.pop(course_id)
+                    continue
+                overviews[course_id] = pickled_overview
+
+            for course_id in missing_ids:
+                if course_id in overviews:
+                    overviews[course_id] = pickle.loads(overviews[course_id])
+                    if request_cache is not None:
+                        request_cache[course_id] = overviews[course_id]
+
+        return overviews, generations
+
+    def set_many(self, overviews, generations):
+        """
+        Caches the given overviews, read after their generations were returned
+        by get_many.
+        """
+        request_cache = _get_request_cache()
+        timeout = _get_timeout()
+        if not timeout:
+            return
+        expires_at = time.time() + timeout
+        max_size = getattr(settings, 'COURSE_OVERVIEW_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+        if max_size != self._entries.max_size:
+            self._entries.resize(max_size)
+        for overview in overviews:
+            if request_cache is not None:
+                request_cache[overview.id] = overview
+            if generations.get(overview.id) is not None:
+                entry = (generations[overview.id], expires_at, pickle.dumps(overview, pickle.HIGHEST_PROTOCOL))
+                self._entries.set(overview.id, entry)
+
+    def invalidate(self, course_id):
+        """
+        Removes the overview of the given course from the caches of all the
+        processes, immediately and again once the current transaction is
+        committed, so that no process caches the overview it replaces.
+        """
+        request_cache = _get_request_cache()
+        if request_cache is not None:
+            request_cache.pop(course_id, None)
+        self._entries.pop(course_id)
+        _set_new_generation(course_id)
+        transaction.on_commit(lambda: _set_new_generation(course_id))
+
+    def clear(self):
+        """
+        Removes all the overviews cached by this process.
+        """
+        self._entries.clear()
+        RequestCache(REQUEST_CACHE_NAMESPACE).clear()
+
+
+def _get_timeout():
+    """
+    Returns the number of seconds that overviews are cached by each process,
+    0 if they are not cached at all.
+    """
+    return getattr(settings, 'COURSE_OVERVIEW_CACHE_TIMEOUT', 0)
+
+
+def _get_request_cache():
+    """
+    Returns the dict of the overviews cached for the current request, or None
+    if caching is disabled or outside of requests, where they would be kept for
+    the life of the process.
+    """
+    if not _get_timeout() or get_current_request() is None:
+        return None
+    return RequestCache(REQUEST_CACHE_NAMESPACE).data
+
+
+def _generation_cache_key(course_id):
+    return GENERATION_CACHE_KEY_PREFIX + six.text_type(course_id)
+
+
+def _get_generations(course_ids):
+    """
+    Returns the generations of the given courses, keyed by course id, setting
+    the ones that are missing from the shared cache.  Courses whose generation
+    was missing get None, so that their entries are not trusted.
+    """
+    cache_keys = {_generation_cache_key(course_id): course_id for course_id in course_ids}
+    cached_generations = cache.get_many(list(cache_keys))
+    generations = {}
+    for cache_key, course_id in six.iteritems(cache_keys):
+        generations[course_id] = cached_generations.get(cache_key)
+        if generations[course_id] is None:
+            cache.add(cache_key, uuid4().hex, None)
+    return generations
+
+
+def _set_new_generation(course_id):
+    cache.set(_generation_cache_key(course_id), uuid4().hex, None)
+
+
+# The caches of CourseOverview.
+COURSE_OVERVIEW_CACHE = CourseOverviewCache()
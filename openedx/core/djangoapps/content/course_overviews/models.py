@@ -30,6 +30,8 @@ from xmodule.course_module import DEFAULT_START_DATE, CourseDescriptor
 from xmodule.error_module import ErrorDescriptor
 from xmodule.modulestore.django import modulestore
 
+from .cache import COURSE_OVERVIEW_CACHE
+
 log = logging.getLogger(__name__)
 
 
@@ -293,6 +295,10 @@ class CourseOverview(TimeStampedModel):
             - IOError if some other error occurs while trying to load the
                 course from the module store.
         """
+        cached_overviews, generations = cls._get_cached([course_id])
+        if course_id in cached_overviews:
+            return cached_overviews[course_id]
+
         try:
             course_overview = cls.objects.select_related('image_set').get(id=course_id)
             if course_overview.version < cls.VERSION:
@@ -308,7 +314,42 @@ class CourseOverview(TimeStampedModel):
         if course_overview and not hasattr(course_overview, 'image_set'):
             CourseOverviewImageSet.create(course_overview)
 
-        return course_overview or cls.load_from_module_store(course_id)
+        course_overview = course_overview or cls.load_from_module_store(course_id)
+        COURSE_OVERVIEW_CACHE.set_many([course_overview], generations)
+        return course_overview
+
+    @classmethod
+    def get_many(cls, course_ids):
+        """
+        Return a dict mapping course_ids to CourseOverviews, generating the
+        missing ones and replacing the outdated ones as get_from_id does.
+
+        The overviews that are not cached are read from the database with a
+        single query, which makes this the method to use for lists of courses
+        like the ones of the student dashboard.  Courses that are not found,
+        or fail to load from the module store, are left out of the dict.
+        """
+        course_ids = list(course_ids)
+        course_overviews, generations = cls._get_cached(course_ids)
+        missing_ids = [course_id for course_id in course_ids if course_id not in course_overviews]
+        if missing_ids:
+            read_overviews = list(cls.objects.select_related('image_set').filter(
+                id__in=missing_ids,
+                version__gte=cls.VERSION
+            ))
+            for course_overview in read_overviews:
+                if not hasattr(course_overview, 'image_set'):
+                    CourseOverviewImageSet.create(course_overview)
+                course_overviews[course_overview.id] = course_overview
+            COURSE_OVERVIEW_CACHE.set_many(read_overviews, generations)
+
+        for course_id in course_ids:
+            if course_id not in course_overviews:
+                try:
+                    course_overviews[course_id] = cls.get_from_id(course_id)
+                except (cls.DoesNotExist, IOError):
+                    pass
+        return course_overviews
 
     @classmethod
     def get_from_ids_if_exists(cls, course_ids):
@@ -322,14 +363,33 @@ class CourseOverview(TimeStampedModel):
         Callers should assume that this list is incomplete and fall back to
         get_from_id if they need to guarantee CourseOverview generation.
         """
-        return {
-            overview.id: overview
-            for overview
-            in cls.objects.select_related('image_set').filter(
-                id__in=course_ids,
+        course_ids = list(course_ids)
+        course_overviews, generations = cls._get_cached(course_ids)
+        missing_ids = [course_id for course_id in course_ids if course_id not in course_overviews]
+        if missing_ids:
+            read_overviews = list(cls.objects.select_related('image_set').filter(
+                id__in=missing_ids,
                 version__gte=cls.VERSION
+            ))
+            course_overviews.update((overview.id, overview) for overview in read_overviews)
+            COURSE_OVERVIEW_CACHE.set_many(
+                [overview for overview in read_overviews if hasattr(overview, 'image_set')], generations
             )
-        }
+        return course_overviews
+
+    @classmethod
+    def _get_cached(cls, course_ids):
+        """
+        Return the cached CourseOverviews of the given courses that are up to
+        date, keyed by course id, and the generations of the others, as
+        COURSE_OVERVIEW_CACHE.get_many does.
+        """
+        course_overviews, generations = COURSE_OVERVIEW_CACHE.get_many(course_ids)
+        return {
+            course_id: overview
+            for course_id, overview in six.iteritems(course_overviews)
+            if overview.version >= cls.VERSION
+        }, generations
 
     @classmethod
     def get_from_id_if_exists(cls, course_id):
@@ -344,15 +404,7 @@ class CourseOverview(TimeStampedModel):
         Callers should assume that this list is incomplete and fall back to
         get_from_id if they need to guarantee CourseOverview generation.
         """
-        try:
-            course_overview = cls.objects.select_related('image_set').get(
-                id=course_id,
-                version__gte=cls.VERSION
-            )
-        except cls.DoesNotExist:
-            course_overview = None
-
-        return course_overview
+        return cls.get_from_ids_if_exists([course_id]).get(course_id)
 
     def clean_id(self, padding_char='='):
         """
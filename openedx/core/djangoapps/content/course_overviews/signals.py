@@ -5,12 +5,14 @@ from __future__ import absolute_import
 
 import logging
 
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import Signal
 from django.dispatch.dispatcher import receiver
 
 from xmodule.modulestore.django import SignalHandler
 
-from .models import CourseOverview
+from .cache import COURSE_OVERVIEW_CACHE
+from .models import CourseOverview, CourseOverviewImageSet
 
 LOG = logging.getLogger(__name__)
 
@@ -43,6 +45,26 @@ def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=
     CourseAboutSearchIndexer.remove_deleted_items(course_key)
 
 
+@receiver(post_save, sender=CourseOverview)
+@receiver(post_delete, sender=CourseOverview)
+def _invalidate_cached_course_overview(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes a CourseOverview that has been saved or deleted from the caches
+    of all the processes.
+    """
+    COURSE_OVERVIEW_CACHE.invalidate(instance.id)
+
+
+@receiver(post_save, sender=CourseOverviewImageSet)
+@receiver(post_delete, sender=CourseOverviewImageSet)
+def _invalidate_cached_course_overview_images(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the CourseOverview whose images have been saved or deleted from
+    the caches of all the processes.
+    """
+    COURSE_OVERVIEW_CACHE.invalidate(instance.course_overview_id)
+
+
 def _check_for_course_changes(previous_course_overview, updated_course_overview):
     if previous_course_overview:
         _check_for_course_date_changes(previous_course_overview, updated_course_overview)
@@ -0,0 +1,112 @@
+"""
+Tests for the caching of CourseOverviews.
+"""
+from __future__ import absolute_import
+
+import six
+from crum import set_current_request
+from django.core.cache import cache
+from django.test.utils import override_settings
+from edx_django_utils.cache import RequestCache
+from opaque_keys.edx.locator import CourseLocator
+
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase, get_mock_request
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+from ..cache import COURSE_OVERVIEW_CACHE, GENERATION_CACHE_KEY_PREFIX, REQUEST_CACHE_NAMESPACE
+from ..models import CourseOverview
+
+
+class CourseOverviewCacheTestCase(ModuleStoreTestCase, CacheIsolationTestCase):
+    """
+    Tests for the request and process caches of CourseOverviews.
+    """
+    ENABLED_CACHES = ['default']
+    ENABLED_SIGNALS = ['course_published']
+
+    def setUp(self):
+        super(CourseOverviewCacheTestCase, self).setUp()
+        self.course_ids = [CourseFactory.create(emit_signals=True).id for __ in range(3)]
+        COURSE_OVERVIEW_CACHE.clear()
+        self.addCleanup(COURSE_OVERVIEW_CACHE.clear)
+
+    def _start_request(self):
+        """
+        Starts a new request, with an empty request cache.
+        """
+        RequestCache(REQUEST_CACHE_NAMESPACE).clear()
+        get_mock_request()
+        self.addCleanup(set_current_request, None)
+
+    @override_settings(COURSE_OVERVIEW_CACHE_TIMEOUT=60)
+    def test_request_cache(self):
+        self._start_request()
+        course_overview = CourseOverview.get_from_id(self.course_ids[0])
+        with self.assertNumQueries(0):
+            self.assertIs(CourseOverview.get_from_id(self.course_ids[0]), course_overview)
+
+    def test_disabled(self):
+        self._start_request()
+        course_overview = CourseOverview.get_from_id(self.course_ids[0])
+        with self.assertNumQueries(1):
+            self.assertIsNot(CourseOverview.get_from_id(self.course_ids[0]), course_overview)
+
+    @override_settings(COURSE_OVERVIEW_CACHE_TIMEOUT=60)
+    def test_no_request_cache_outside_requests(self):
+        CourseOverview.get_from_id(self.course_ids[0])
+        with self.assertNumQueries(1):
+            CourseOverview.get_from_id(self.course_ids[0])
+
+    @override_settings(COURSE_OVERVIEW_CACHE_TIMEOUT=60)
+    def test_process_cache(self):
+        self._start_request()
+        course_overviews = CourseOverview.get_many(self.course_ids)
+
+        self._start_request()
+        with self.assertNumQueries(0):
+            cached_overviews = CourseOverview.get_many(self.course_ids)
+        self.assertEqual(set(cached_overviews), set(self.course_ids))
+        for course_id in self.course_ids:
+            # Requests don't share the cached instances.
+            self.assertIsNot(cached_overviews[course_id], course_overviews[course_id])
+            self.assertEqual(cached_overviews[course_id].display_name, course_overviews[course_id].display_name)
+
+    @override_settings(COURSE_OVERVIEW_CACHE_TIMEOUT=60)
+    def test_invalidated_on_save(self):
+        self._start_request()
+        course_overview = CourseOverview.get_from_id(self.course_ids[0])
+        course_overview.display_name = u'Updated Name'
+        course_overview.save()
+
+        self._start_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(CourseOverview.get_from_id(self.course_ids[0]).display_name, u'Updated Name')
+
+    @override_settings(COURSE_OVERVIEW_CACHE_TIMEOUT=60)
+    def test_invalidated_by_other_processes(self):
+        self._start_request()
+        CourseOverview.get_from_id(self.course_ids[0])
+
+        # Another process saved the overview, and replaced its generation.
+        CourseOverview.objects.filter(id=self.course_ids[0]).update(display_name=u'Updated Name')
+        cache.set(GENERATION_CACHE_KEY_PREFIX + six.text_type(self.course_ids[0]), 'other')
+
+        self._start_request()
+        self.assertEqual(CourseOverview.get_from_id(self.course_ids[0]).display_name, u'Updated Name')
+
+    @override_settings(COURSE_OVERVIEW_CACHE_TIMEOUT=60)
+    def test_get_many_queries(self):
+        self._start_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(len(CourseOverview.get_many(self.course_ids)), len(self.course_ids))
+        with self.assertNumQueries(0):
+            CourseOverview.get_many(self.course_ids)
+
+    def test_get_many_missing_overviews(self):
+        course_without_overview = CourseFactory.create(emit_signals=False)
+        missing_course_id = CourseLocator('org', 'missing', 'run')
+        course_overviews = CourseOverview.get_many(
+            self.course_ids + [course_without_overview.id, missing_course_id]
+        )
+        self.assertEqual(set(course_overviews), set(self.course_ids + [course_without_overview.id]))
@@ -3,13 +3,29 @@ Helper functions for caching course assets.
 """
 from __future__ import absolute_import
 
-import six
+import errno
+import hashlib
+import logging
+import os
+import re
+import time
 
+import six
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContent
+
+log = logging.getLogger(__name__)
+
+# Content digests are the md5 hex digests of the content, computed by GridFS.
+CONTENT_DIGEST_RE = re.compile(r'^[0-9a-f]{32}$')
+
+# Seconds after which a fill of the disk cache which stopped writing is considered
+# abandoned, by a process which died, and can be taken over by another request.
+DISK_CACHE_FILL_TIMEOUT = 10 * 60
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -26,6 +42,18 @@ def set_cached_content(content):
     CONTENT_CACHE.set(six.text_type(content.location).encode("utf-8"), content, version=STATIC_CONTENT_VERSION)
 
 
+def set_cached_content_metadata(content):
+    """
+    Stores the metadata of the given piece of content in the cache, but not its data.
+    """
+    set_cached_content(StaticContent(
+        content.location, content.name, content.content_type, None,
+        last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+        import_path=content.import_path, length=content.length, locked=content.locked,
+        content_digest=content.content_digest,
+    ))
+
+
 def get_cached_content(location):
     """
     Retrieves the given piece of content by its location if cached.
@@ -52,3 +80,162 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+
+
+def is_disk_cache_enabled():
+    """
+    Returns whether the local disk cache of content data is configured.
+    """
+    return bool(getattr(settings, 'COURSE_ASSETS_DISK_CACHE_DIR', None))
+
+
+def can_disk_cache_content(content):
+    """
+    Returns whether the data of the given piece of content can be kept in
+    the local disk cache.
+    """
+    return (
+        is_disk_cache_enabled() and
+        CONTENT_DIGEST_RE.match(content.content_digest or '') is not None and
+        content.length is not None and
+        content.length <= settings.COURSE_ASSETS_DISK_CACHE_MAX_FILE_SIZE
+    )
+
+
+def _disk_cache_path(content_digest):
+    """
+    Returns the path of the file holding the data with the given digest.
+    """
+    return os.path.join(settings.COURSE_ASSETS_DISK_CACHE_DIR, content_digest[:2], content_digest)
+
+
+def open_disk_cached_content(content):
+    """
+    Opens the file of the disk cache holding the data of the given piece of
+    content, or returns None if it is not cached, or if it can't be read, for
+    instance because it was pruned.
+    """
+    try:
+        return open(_disk_cache_path(content.content_digest), 'rb')
+    except (IOError, OSError) as error:
+        if error.errno != errno.ENOENT:
+            log.warning(u'Cannot read the disk cached content %s: %s', content.location, error)
+        return None
+
+
+def start_disk_cache_fill(content):
+    """
+    Starts writing the data of the given piece of content to the disk cache,
+    and returns the DiskCacheFill to write it with.  Returns None if another
+    request is already writing it, so that only one of them does.
+    """
+    path = _disk_cache_path(content.content_digest)
+    directory = os.path.dirname(path)
+    # The temporary file is named after the digest, so that creating it exclusively locks the fill.
+    temp_path = os.path.join(directory, '.tmp-' + content.content_digest)
+    try:
+        try:
+            os.makedirs(directory)
+        except OSError as error:
+            if error.errno != errno.EEXIST:
+                raise
+        for __ in range(2):
+            try:
+                temp_fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except OSError as error:
+                if error.errno != errno.EEXIST or not _is_abandoned_fill(temp_path):
+                    raise
+                # The process writing it died, take it over.
+                _remove_file(temp_path)
+            else:
+                return DiskCacheFill(content, path, temp_path, os.fdopen(temp_fd, 'wb'))
+    except (IOError, OSError) as error:
+        if error.errno != errno.EEXIST:
+            log.warning(u'Cannot cache content %s on disk: %s', content.location, error)
+    return None
+
+
+def _is_abandoned_fill(temp_path):
+    """
+    Returns whether the given temporary file of the disk cache has not been
+    written to for longer than DISK_CACHE_FILL_TIMEOUT.
+    """
+    try:
+        return time.time() - os.path.getmtime(temp_path) > DISK_CACHE_FILL_TIMEOUT
+    except OSError:
+        # It is already gone.
+        return True
+
+
+def _remove_file(path):
+    """
+    Removes the given file, if it still exists.
+    """
+    try:
+        os.remove(path)
+    except OSError as error:
+        if error.errno != errno.ENOENT:
+            raise
+
+
+class DiskCacheFill(object):
+    """
+    Writes the data of a piece of content to the disk cache, chunk by chunk,
+    while it is being streamed from the contentstore.
+
+    The data is written to a temporary file, which is renamed once complete
+    and checked against the digest of the content, so that it appears
+    atomically to other processes.  Failing to write it is logged and doesn't
+    interrupt the stream.
+    """
+    def __init__(self, content, path, temp_path, temp_file):
+        self.content = content
+        self.path = path
+        self.temp_path = temp_path
+        self.temp_file = temp_file
+        self.md5 = hashlib.md5()
+
+    def write(self, chunk):
+        """
+        Writes the next chunk of the data.
+        """
+        if self.temp_file is None:
+            return
+        try:
+            self.md5.update(chunk)
+            self.temp_file.write(chunk)
+        except (IOError, OSError) as error:
+            log.warning(u'Cannot cache content %s on disk: %s', self.content.location, error)
+            self.abort()
+
+    def commit(self):
+        """
+        Moves the written data into the disk cache, and returns the path of
+        its file, or None if it could not be cached.
+        """
+        if self.temp_file is None:
+            return None
+        try:
+            self.temp_file.close()
+            if self.md5.hexdigest() == self.content.content_digest:
+                os.rename(self.temp_path, self.path)
+                self.temp_file = None
+                return self.path
+            log.warning(u'Not caching content %s on disk: its data does not match its digest', self.content.location)
+        except (IOError, OSError) as error:
+            log.warning(u'Cannot cache content %s on disk: %s', self.content.location, error)
+        self.abort()
+        return None
+
+    def abort(self):
+        """
+        Discards the data written so far, unless it was already committed.
+        """
+        if self.temp_file is None:
+            return
+        try:
+            self.temp_file.close()
+            _remove_file(self.temp_path)
+        except (IOError, OSError) as error:
+            log.warning(u'Cannot clean up the disk cache of content %s: %s', self.content.location, error)
+        self.temp_file = None
@@ -12,19 +12,30 @@ try:
     import newrelic.agent
 except ImportError:
     newrelic = None  # pylint: disable=invalid-name
+from uuid import uuid4
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect, StreamingHttpResponse)
 from six import text_type
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import (
+    STREAM_DATA_CHUNK_SIZE, StaticContent, StaticContentStream, XASSET_LOCATION_TAG
+)
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    can_disk_cache_content,
+    get_cached_content,
+    is_disk_cache_enabled,
+    open_disk_cached_content,
+    set_cached_content,
+    set_cached_content_metadata,
+    start_disk_cache_fill
+)
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -35,6 +46,10 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = u"%a, %d %b %Y %H:%M:%S GMT"
 
+# Maximum number of ranges of a Range header sent back as a multipart message,
+# rather than sending back the full content.
+MAX_BYTE_RANGES = 20
+
 
 class StaticContentServer(object):
     """
@@ -118,18 +133,16 @@ class StaticContentServer(object):
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
 
-            # *** File streaming within a byte range ***
+            # *** File streaming within byte ranges ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
-            # Request -> Range attribute structure: "Range: bytes=first-[last]"
+            # Request -> Range attribute structure: "Range: bytes=first-[last][, first-[last]...]"
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
-            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
+            # Several ranges are sent back as a multipart/byteranges message.
+            # https://tools.ietf.org/html/rfc7233
+            data_source = self.get_data_source(loc, content)
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -143,37 +156,38 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, text_type(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif len(ranges) > MAX_BYTE_RANGES:
+                        # Sending back many small parts costs more than the full content.
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, text_type(loc)
+                            u"Too many ranges in Range header: %s for content: %s", header_value, text_type(loc)
                         )
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
-                            response['Content-Range'] = b'bytes {first}-{last}/{length}'.format(
-                                first=first, last=last, length=content.length
-                            )
-                            response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
-                        else:
+                        ranges = [(first, last) for first, last in ranges if 0 <= first <= last < content.length]
+                        if not ranges:
                             log.warning(
                                 u"Cannot satisfy ranges in Range header: %s for content: %s",
                                 header_value, text_type(loc)
                             )
+                            data_source.close()
                             return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
+                        if len(ranges) == 1:
+                            first, last = ranges[0]
+                            response = StreamingHttpResponse(data_source.stream_ranges_and_close([ranges[0]]))
+                            response['Content-Range'] = u'bytes {first}-{last}/{length}'.format(
+                                first=first, last=last, length=content.length
+                            )
+                            response['Content-Length'] = str(last - first + 1)
+                        else:
+                            response = MultipartByteRangesResponse(data_source, ranges, content)
+                        response.status_code = 206  # Partial Content
+
+                        if newrelic:
+                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
+
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = data_source.full_response()
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -182,7 +196,8 @@ class StaticContentServer(object):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
+            if not isinstance(response, MultipartByteRangesResponse):
+                response['Content-Type'] = content.content_type
             response['X-Frame-Options'] = 'ALLOW'
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
@@ -287,15 +302,209 @@ class StaticContentServer(object):
             except (ItemNotFoundError, NotFoundError):
                 raise
 
+            if is_disk_cache_enabled():
+                # The data is kept in the disk cache instead, see get_data_source.
+                set_cached_content_metadata(content)
             # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
             # because it's the default for memcached and also we don't want to do too much
             # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            elif content.length is not None and content.length < 1048576:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
 
         return content
 
+    def get_data_source(self, location, content):
+        """
+        Returns the ContentDataSource to read the data of the given content
+        from: the disk cache, the content itself if its data is in memory, or
+        else a stream of the contentstore.
+        """
+        if can_disk_cache_content(content):
+            data_file = open_disk_cached_content(content)
+            if data_file is not None:
+                if isinstance(content, StaticContentStream):
+                    content.close()
+                return FileDataSource(data_file)
+            if not isinstance(content, StaticContentStream):
+                content = AssetManager.find(location, as_stream=True)
+            # Only one request fills the disk cache with a given piece of content, the
+            # others stream it from the contentstore meanwhile.
+            disk_cache_fill = start_disk_cache_fill(content)
+            if disk_cache_fill is not None:
+                return DiskCachingStreamDataSource(content, disk_cache_fill)
+
+        if isinstance(content, StaticContentStream):
+            return StreamDataSource(content)
+        if content.data is None:
+            # Only the metadata of the content was cached.
+            return StreamDataSource(AssetManager.find(location, as_stream=True))
+        return InMemoryDataSource(content)
+
+
+class ContentDataSource(object):
+    """
+    Reads the data of a piece of content, to build responses.
+    """
+    def full_response(self):
+        """
+        Returns a response with the full data.
+        """
+        return StreamingHttpResponse(self.stream_ranges_and_close([(0, None)]))
+
+    def stream_range(self, first, last):
+        """
+        Yields the data between bytes first and last (included), or up to
+        the end if last is None.
+        """
+        raise NotImplementedError
+
+    def stream_ranges_and_close(self, ranges, separators=None):
+        """
+        Yields the data of each of the given ranges, preceded by the matching
+        separator if any, and the last separator, closing the source once
+        done, even if the response is not fully sent.
+        """
+        try:
+            for index, (first, last) in enumerate(ranges):
+                if separators:
+                    yield separators[index]
+                for chunk in self.stream_range(first, last):
+                    yield chunk
+            if separators:
+                yield separators[-1]
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Releases the resources used to read the data.
+        """
+        pass
+
+
+class InMemoryDataSource(ContentDataSource):
+    """
+    Reads data held in memory.
+    """
+    def __init__(self, content):
+        self.content = content
+
+    def full_response(self):
+        return HttpResponse(self.content.stream_data())
+
+    def stream_range(self, first, last):
+        yield self.content.data[first:None if last is None else last + 1]
+
+
+class StreamDataSource(ContentDataSource):
+    """
+    Reads data from a StaticContentStream, chunk by chunk.
+    """
+    def __init__(self, content):
+        self.content = content
+
+    def stream_range(self, first, last):
+        if last is None:
+            return self.content.stream_data()
+        return self.content.stream_data_in_range(first, last)
+
+    def close(self):
+        self.content.close()
+
+
+class DiskCachingStreamDataSource(StreamDataSource):
+    """
+    Reads data from a StaticContentStream, chunk by chunk, and writes it to
+    the disk cache on the way when all of it is read.
+    """
+    def __init__(self, content, disk_cache_fill):
+        super(DiskCachingStreamDataSource, self).__init__(content)
+        self.disk_cache_fill = disk_cache_fill
+
+    def stream_range(self, first, last):
+        if self.disk_cache_fill is None or first != 0 or (last is not None and last < self.content.length - 1):
+            # Partial ranges are streamed as is, the disk cache is filled by a request for all the data.
+            for chunk in super(DiskCachingStreamDataSource, self).stream_range(first, last):
+                yield chunk
+            return
+
+        disk_cache_fill, self.disk_cache_fill = self.disk_cache_fill, None
+        completed = False
+        try:
+            for chunk in self.content.stream_data():
+                disk_cache_fill.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            if completed:
+                disk_cache_fill.commit()
+            else:
+                # The response was not fully sent.
+                disk_cache_fill.abort()
+
+    def close(self):
+        if self.disk_cache_fill is not None:
+            self.disk_cache_fill.abort()
+            self.disk_cache_fill = None
+        super(DiskCachingStreamDataSource, self).close()
+
+
+class FileDataSource(ContentDataSource):
+    """
+    Reads data from an open file of the disk cache.
+
+    The file is opened upfront, so that it can still be read if it is pruned
+    from the disk cache meanwhile.
+    """
+    def __init__(self, data_file):
+        self.data_file = data_file
+
+    def full_response(self):
+        # The WSGI server can send the file with sendfile, if it supports it.
+        return FileResponse(self.data_file)
+
+    def stream_range(self, first, last):
+        self.data_file.seek(first)
+        remaining = None if last is None else last - first + 1
+        while remaining is None or remaining > 0:
+            chunk_size = STREAM_DATA_CHUNK_SIZE if remaining is None else min(remaining, STREAM_DATA_CHUNK_SIZE)
+            chunk = self.data_file.read(chunk_size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+    def close(self):
+        self.data_file.close()
+
+
+class MultipartByteRangesResponse(StreamingHttpResponse):
+    """
+    A multipart/byteranges response, streaming several ranges of the data of
+    a piece of content.
+    """
+    def __init__(self, data_source, ranges, content):
+        boundary = uuid4().hex
+        # The separator before each part holds its headers, the last one closes the message.
+        separators = [
+            u'{crlf}--{boundary}\r\nContent-Type: {content_type}\r\nContent-Range: bytes {first}-{last}/{length}'
+            u'\r\n\r\n'.format(
+                crlf=u'\r\n' if index else u'', boundary=boundary, content_type=content.content_type,
+                first=first, last=last, length=content.length,
+            ).encode('utf-8')
+            for index, (first, last) in enumerate(ranges)
+        ]
+        separators.append(u'\r\n--{boundary}--\r\n'.format(boundary=boundary).encode('utf-8'))
+        super(MultipartByteRangesResponse, self).__init__(
+            data_source.stream_ranges_and_close(ranges, separators),
+            content_type=u'multipart/byteranges; boundary={}'.format(boundary),
+        )
+        self['Content-Length'] = str(
+            sum(len(separator) for separator in separators) + sum(last - first + 1 for first, last in ranges)
+        )
+
 
 def parse_range_header(header_value, content_length):
     """
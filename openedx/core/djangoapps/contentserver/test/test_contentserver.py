@@ -8,7 +8,10 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
 import six
+import tempfile
 import unittest
 from uuid import uuid4
 
@@ -30,7 +33,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
-from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
+from ..middleware import parse_range_header, HTTP_DATE_FORMAT, MAX_BYTE_RANGES, StaticContentServer
 
 log = logging.getLogger(__name__)
 
@@ -245,13 +248,38 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE=b'bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = resp['Content-Type'].split('boundary=')[1]
+
+        data = self.contentstore.find(self.unlocked_asset).data
+        body = b''.join(resp.streaming_content)
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        parts = body.split(b'--' + boundary.encode('utf-8'))
+        self.assertEqual(parts[0], b'')
+        self.assertEqual(parts[-1], b'--\r\n')
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, part_data = part.split(b'\r\n\r\n', 1)
+            self.assertIn(b'Content-Range: bytes {}-{}/{}'.format(first, last, self.length_unlocked), headers)
+            self.assertEqual(part_data, data[first:last + 1] + b'\r\n')
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that too many ranges in request outputs the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE=b'bytes=' + b', '.join(
+            b'{0}-{0}'.format(index) for index in range(MAX_BYTE_RANGES + 1)
+        ))
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
@@ -288,6 +316,99 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_disk_cache(self):
+        """
+        Test that the data of assets is served from the disk cache when it is enabled,
+        while only their metadata is cached.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        content = self.contentstore.find(self.unlocked_asset)
+        middleware_path = 'openedx.core.djangoapps.contentserver.middleware'
+        with override_settings(COURSE_ASSETS_DISK_CACHE_DIR=cache_dir), \
+                patch(middleware_path + '.set_cached_content') as mock_set_cached_content, \
+                patch(middleware_path + '.set_cached_content_metadata') as mock_set_cached_content_metadata:
+            for __ in range(2):
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(b''.join(resp.streaming_content), content.data)
+
+            self.assertFalse(mock_set_cached_content.called)
+            self.assertTrue(mock_set_cached_content_metadata.called)
+            digest = content.content_digest
+            with open(os.path.join(cache_dir, digest[:2], digest), 'rb') as cached_file:
+                self.assertEqual(cached_file.read(), content.data)
+
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=1-4')
+            self.assertEqual(resp.status_code, 206)
+            self.assertEqual(b''.join(resp.streaming_content), content.data[1:5])
+
+    def test_disk_cache_filled_by_full_range(self):
+        """
+        Test that a request for a partial range of an asset missing from the disk
+        cache is streamed without caching it, while a range of all its data does.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        content = self.contentstore.find(self.unlocked_asset)
+        digest = content.content_digest
+        cached_path = os.path.join(cache_dir, digest[:2], digest)
+        with override_settings(COURSE_ASSETS_DISK_CACHE_DIR=cache_dir):
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=1-4')
+            self.assertEqual(resp.status_code, 206)
+            self.assertEqual(b''.join(resp.streaming_content), content.data[1:5])
+            self.assertFalse(os.path.exists(cached_path))
+            self.assertEqual(os.listdir(os.path.join(cache_dir, digest[:2])), [])
+
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-')
+            self.assertEqual(resp.status_code, 206)
+            self.assertEqual(b''.join(resp.streaming_content), content.data)
+            with open(cached_path, 'rb') as cached_file:
+                self.assertEqual(cached_file.read(), content.data)
+
+    def test_disk_cache_filled_once(self):
+        """
+        Test that an asset which another request is writing to the disk cache is
+        streamed from the contentstore meanwhile, until that fill is abandoned.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        content = self.contentstore.find(self.unlocked_asset)
+        digest = content.content_digest
+        cached_path = os.path.join(cache_dir, digest[:2], digest)
+        temp_path = os.path.join(cache_dir, digest[:2], '.tmp-' + digest)
+        os.makedirs(os.path.dirname(temp_path))
+        open(temp_path, 'wb').close()
+        with override_settings(COURSE_ASSETS_DISK_CACHE_DIR=cache_dir):
+            resp = self.client.get(self.url_unlocked)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(b''.join(resp.streaming_content), content.data)
+            self.assertFalse(os.path.exists(cached_path))
+
+            with patch('openedx.core.djangoapps.contentserver.caching.DISK_CACHE_FILL_TIMEOUT', -1):
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(b''.join(resp.streaming_content), content.data)
+            self.assertFalse(os.path.exists(temp_path))
+            with open(cached_path, 'rb') as cached_file:
+                self.assertEqual(cached_file.read(), content.data)
+
+    def test_disk_cache_unreadable(self):
+        """
+        Test that an asset whose disk cached file cannot be opened, for instance
+        because it was pruned, is streamed from the contentstore.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        content = self.contentstore.find(self.unlocked_asset)
+        with override_settings(COURSE_ASSETS_DISK_CACHE_DIR=cache_dir):
+            resp = self.client.get(self.url_unlocked)
+            self.assertEqual(b''.join(resp.streaming_content), content.data)
+            with patch('openedx.core.djangoapps.contentserver.caching.open', create=True, side_effect=IOError):
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(b''.join(resp.streaming_content), content.data)
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
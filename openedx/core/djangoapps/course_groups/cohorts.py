@@ -5,6 +5,7 @@ forums, and to the cohort admin views.
 
 from __future__ import absolute_import
 
+import hashlib
 import logging
 import random
 
@@ -12,13 +13,14 @@ import six
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.db.models.signals import m2m_changed, post_save
 from django.dispatch import receiver
 from django.http import Http404
 from django.utils.translation import ugettext as _
 from edx_django_utils.cache import RequestCache
 from eventtracking import tracker
+from six.moves import range
 
 from courseware import courses
 from openedx.core.lib.cache_utils import request_cached
@@ -198,6 +200,167 @@ def bulk_cache_cohorts(course_key, users):
         cache[_cohort_cache_key(user.id, course_key)] = None
 
 
+# Number of users whose cohorts are read or assigned by each query of get_cohort_ids and bulk_assign_cohorts.
+BULK_COHORTS_BATCH_SIZE = 1000
+
+
+def get_cohort_ids(users, course_key):
+    """
+    Returns the ids of the cohorts the given users are assigned to in the
+    course, keyed by user id, with None for the users who don't have a cohort
+    or if the course isn't cohorted.
+
+    This is the bulk equivalent of get_cohort_id, reading the cohorts with a
+    query per BULK_COHORTS_BATCH_SIZE users, except that users are not
+    assigned a cohort.
+
+    Raises:
+       Http404 if the course doesn't exist.
+    """
+    user_ids = [user.id for user in users]
+    cohort_ids = dict.fromkeys(user_ids)
+    if not is_course_cohorted(course_key):
+        return cohort_ids
+    for batch_user_ids in _batches(user_ids):
+        cohort_ids.update(
+            CohortMembership.objects.filter(
+                course_id=course_key, user_id__in=batch_user_ids,
+            ).values_list('user_id', 'course_user_group_id')
+        )
+    return cohort_ids
+
+
+def bulk_assign_cohorts(course_key, users):
+    """
+    Assigns the given users who don't have a cohort in the course yet to a
+    cohort, as get_cohort does, but with a handful of set-based queries per
+    BULK_COHORTS_BATCH_SIZE users rather than with several queries and a row
+    lock per user.
+
+    Users pre-registered in a cohort with their email address are assigned to
+    it.  The others are assigned to one of the random cohorts of the course,
+    which is chosen by hashing their id rather than at random, so that running
+    the assignment again for the same cohorts gives the same result.
+
+    Returns the cohorts of the given users, keyed by user id, which are also
+    cached for get_cohort(..., use_cached=True).  Returns an empty dict if the
+    course isn't cohorted.
+
+    Raises:
+       Http404 if the course doesn't exist.
+    """
+    if not is_course_cohorted(course_key):
+        return {}
+
+    cohorts_by_user_id = {}
+    random_cohorts = []
+    for batch_users in _batches(list(users)):
+        cohorts_by_user_id.update(_bulk_assign_cohorts(course_key, batch_users, random_cohorts))
+
+    cache = RequestCache(COHORT_CACHE_NAMESPACE).data
+    for user_id, cohort in six.iteritems(cohorts_by_user_id):
+        cache[_cohort_cache_key(user_id, course_key)] = cohort
+    return cohorts_by_user_id
+
+
+def _bulk_assign_cohorts(course_key, users, random_cohorts):
+    """
+    Assigns the users of a batch who don't have a cohort in the course yet to
+    a cohort, and returns the cohorts of all the users of the batch, keyed by
+    user id.  `random_cohorts` is the list of the random cohorts of the course,
+    filled in when the first user is assigned to one of them.
+    """
+    cohorts_by_user_id = {
+        membership.user_id: membership.course_user_group
+        for membership in CohortMembership.objects.filter(
+            course_id=course_key, user_id__in=[user.id for user in users],
+        ).select_related('course_user_group')
+    }
+    unassigned_users = [user for user in users if user.id not in cohorts_by_user_id]
+    if not unassigned_users:
+        return cohorts_by_user_id
+
+    preassignments = {
+        assignment.email: assignment
+        for assignment in UnregisteredLearnerCohortAssignments.objects.filter(
+            course_id=course_key, email__in=[user.email for user in unassigned_users],
+        ).select_related('course_user_group')
+    }
+    new_cohorts_by_user_id = {}
+    used_preassignment_ids = []
+    for user in unassigned_users:
+        assignment = preassignments.get(user.email)
+        if assignment is not None:
+            new_cohorts_by_user_id[user.id] = assignment.course_user_group
+            used_preassignment_ids.append(assignment.id)
+        else:
+            if not random_cohorts:
+                random_cohorts.extend(sorted(_get_random_cohorts(course_key), key=lambda cohort: cohort.id))
+            new_cohorts_by_user_id[user.id] = _hash_random_cohort(random_cohorts, course_key, user.id)
+
+    try:
+        with transaction.atomic():
+            CohortMembership.objects.bulk_create([
+                CohortMembership(course_user_group=cohort, user_id=user_id, course_id=course_key)
+                for user_id, cohort in six.iteritems(new_cohorts_by_user_id)
+            ])
+            CourseUserGroup.users.through.objects.bulk_create([
+                CourseUserGroup.users.through(courseusergroup_id=cohort.id, user_id=user_id)
+                for user_id, cohort in six.iteritems(new_cohorts_by_user_id)
+            ])
+            UnregisteredLearnerCohortAssignments.objects.filter(id__in=used_preassignment_ids).delete()
+    except IntegrityError as integrity_error:
+        # Some of the users were assigned a cohort concurrently, so assign the
+        # users of the batch one by one instead, as get_cohort handles that.
+        log.info(
+            u"HANDLING_INTEGRITY_ERROR: IntegrityError encountered when assigning cohorts in course '%s': %s",
+            course_key, six.text_type(integrity_error)
+        )
+        for user in unassigned_users:
+            cohorts_by_user_id[user.id] = get_cohort(user, course_key)
+        return cohorts_by_user_id
+
+    for user in unassigned_users:
+        cohort = new_cohorts_by_user_id[user.id]
+        log.info(u"Saving CohortMembership for user '%s' in '%s'", user.id, course_key)
+        tracker.emit(
+            "edx.cohort.user_add_requested",
+            {
+                "user_id": user.id,
+                "cohort_id": cohort.id,
+                "cohort_name": cohort.name,
+                "previous_cohort_id": None,
+                "previous_cohort_name": None,
+            }
+        )
+        # Bulk inserts don't send m2m_changed, so emit the event _cohort_membership_changed would.
+        tracker.emit(
+            "edx.cohort.user_added",
+            {"cohort_id": cohort.id, "cohort_name": cohort.name, "user_id": user.id}
+        )
+        COHORT_MEMBERSHIP_UPDATED.send(sender=None, user=user, course_key=course_key)
+
+    cohorts_by_user_id.update(new_cohorts_by_user_id)
+    return cohorts_by_user_id
+
+
+def _hash_random_cohort(random_cohorts, course_key, user_id):
+    """
+    Returns the cohort of the list of random cohorts that the user is
+    assigned to, chosen by hashing the course key and the user id.
+    """
+    digest = hashlib.md5(u'{}.{}'.format(course_key, user_id).encode('utf-8')).hexdigest()
+    return random_cohorts[int(digest, 16) % len(random_cohorts)]
+
+
+def _batches(items):
+    """
+    Yields the consecutive slices of BULK_COHORTS_BATCH_SIZE items of the list.
+    """
+    for start in range(0, len(items), BULK_COHORTS_BATCH_SIZE):
+        yield items[start:start + BULK_COHORTS_BATCH_SIZE]
+
+
 def get_cohort(user, course_key, assign=True, use_cached=False):
     """
     Returns the user's cohort for the specified course.
@@ -281,17 +444,25 @@ def get_random_cohort(course_key):
     If there are multiple cohorts of type RANDOM in the course, one of them will be randomly selected.
     If there are no existing cohorts of type RANDOM in the course, one will be created.
     """
+    return local_random().choice(_get_random_cohorts(course_key))
+
+
+def _get_random_cohorts(course_key):
+    """
+    Returns the list of the cohorts of type RANDOM in the course, creating the
+    default cohort if there are none.
+    """
     course = courses.get_course(course_key)
     cohorts = get_course_cohorts(course, assignment_type=CourseCohort.RANDOM)
-    if cohorts:
-        cohort = local_random().choice(cohorts)
-    else:
-        cohort = CourseCohort.create(
-            cohort_name=DEFAULT_COHORT_NAME,
-            course_id=course_key,
-            assignment_type=CourseCohort.RANDOM
-        ).course_user_group
-    return cohort
+    if not cohorts:
+        cohorts = [
+            CourseCohort.create(
+                cohort_name=DEFAULT_COHORT_NAME,
+                course_id=course_key,
+                assignment_type=CourseCohort.RANDOM
+            ).course_user_group
+        ]
+    return cohorts
 
 
 def migrate_cohort_settings(course):
@@ -0,0 +1,85 @@
+"""
+Management command to assign cohorts to the learners of a course who don't have one yet.
+"""
+from __future__ import absolute_import
+
+import logging
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from openedx.core.djangoapps.course_groups.cohorts import (
+    BULK_COHORTS_BATCH_SIZE,
+    bulk_assign_cohorts,
+    is_course_cohorted
+)
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Assign cohorts to the active learners of cohorted courses who don't have one yet.
+    """
+    help = """
+    Assigns the active learners of the given cohorted courses who don't have a
+    cohort yet to their pre-registered cohort or to a random cohort, as they
+    would be assigned when they first visit the course, but in batches.
+
+    example:
+        manage.py ... backfill_cohorts course-v1:edX+DemoX+Demo_Course --batch-size 500
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'course_ids',
+            nargs='+',
+            help='course ids of the courses whose learners are assigned cohorts'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BULK_COHORTS_BATCH_SIZE,
+            help='number of learners assigned cohorts at a time'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course_keys = [CourseKey.from_string(course_id) for course_id in options['course_ids']]
+        except InvalidKeyError as error:
+            raise CommandError(u'Invalid course id: {}'.format(error))
+
+        for course_key in course_keys:
+            try:
+                is_cohorted = is_course_cohorted(course_key)
+            except Http404:
+                raise CommandError(u'Course {} does not exist'.format(course_key))
+            if not is_cohorted:
+                log.info(u'Course %s is not cohorted, skipping it', course_key)
+                continue
+            self._backfill_course(course_key, options['batch_size'])
+
+    def _backfill_course(self, course_key, batch_size):
+        """
+        Assigns cohorts to the active learners of the course without one, in batches of increasing user ids.
+        """
+        users = User.objects.filter(
+            courseenrollment__course_id=course_key,
+            courseenrollment__is_active=True,
+        ).exclude(
+            cohortmembership__course_id=course_key,
+        ).order_by('id')
+
+        num_assigned = 0
+        last_user_id = 0
+        while True:
+            batch_users = list(users.filter(id__gt=last_user_id)[:batch_size])
+            if not batch_users:
+                break
+            bulk_assign_cohorts(course_key, batch_users)
+            num_assigned += len(batch_users)
+            last_user_id = batch_users[-1].id
+            log.info(u'Assigned cohorts to %d learners of course %s', num_assigned, course_key)
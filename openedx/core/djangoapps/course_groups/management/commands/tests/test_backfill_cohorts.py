@@ -0,0 +1,55 @@
+"""
+Tests for the backfill_cohorts management command.
+"""
+from __future__ import absolute_import
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from six.moves import range
+
+from openedx.core.djangoapps.course_groups import cohorts
+from openedx.core.djangoapps.course_groups.models import CohortMembership
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
+from student.tests.factories import CourseEnrollmentFactory
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+
+class TestBackfillCohorts(ModuleStoreTestCase):
+    """
+    Tests for the backfill_cohorts management command.
+    """
+    def setUp(self):
+        super(TestBackfillCohorts, self).setUp()
+        self.course_key = CourseFactory.create().id
+        self.enrollments = [CourseEnrollmentFactory(course_id=self.course_key) for __ in range(5)]
+        self.enrollments[-1].update_enrollment(is_active=False)
+
+    def test_backfill(self):
+        course = modulestore().get_course(self.course_key)
+        config_course_cohorts(course, is_cohorted=True, auto_cohorts=["AutoGroup"])
+        manual_cohort = CohortFactory(course_id=self.course_key, users=[self.enrollments[0].user])
+
+        call_command('backfill_cohorts', str(self.course_key), '--batch-size', '2')
+
+        self.assertEqual(
+            cohorts.get_cohort_ids([enrollment.user for enrollment in self.enrollments], self.course_key),
+            {
+                self.enrollments[0].user.id: manual_cohort.id,
+                self.enrollments[1].user.id: cohorts.get_cohort_by_name(self.course_key, "AutoGroup").id,
+                self.enrollments[2].user.id: cohorts.get_cohort_by_name(self.course_key, "AutoGroup").id,
+                self.enrollments[3].user.id: cohorts.get_cohort_by_name(self.course_key, "AutoGroup").id,
+                self.enrollments[4].user.id: None,
+            }
+        )
+
+    def test_course_not_cohorted(self):
+        call_command('backfill_cohorts', str(self.course_key))
+        self.assertFalse(CohortMembership.objects.filter(course_id=self.course_key).exists())
+
+    def test_invalid_course(self):
+        with self.assertRaises(CommandError):
+            call_command('backfill_cohorts', 'not/a/course/id')
+        with self.assertRaises(CommandError):
+            call_command('backfill_cohorts', 'course-v1:org+missing+run')
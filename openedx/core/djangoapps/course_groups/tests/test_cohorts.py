@@ -20,10 +20,16 @@ from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MIXED_MODULESTORE, ModuleStoreTestCase
-from xmodule.modulestore.tests.factories import ToyCourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ToyCourseFactory
 
 from .. import cohorts
-from ..models import CourseCohort, CourseUserGroup, CourseUserGroupPartitionGroup, UnregisteredLearnerCohortAssignments
+from ..models import (
+    CohortMembership,
+    CourseCohort,
+    CourseUserGroup,
+    CourseUserGroupPartitionGroup,
+    UnregisteredLearnerCohortAssignments
+)
 from ..tests.helpers import CohortFactory, CourseCohortFactory, config_course_cohorts, config_course_cohorts_legacy
 
 
@@ -511,6 +517,116 @@ class TestCohorts(ModuleStoreTestCase):
             self.assertGreater(num_users, 1)
             self.assertLess(num_users, 50)
 
+    def test_get_cohort_ids(self):
+        """
+        Make sure cohorts.get_cohort_ids() returns the cohort ids of all the users without assigning them.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        users = [UserFactory() for __ in range(3)]
+        cohort = CohortFactory(course_id=course.id, name="TestCohort", users=users[:2])
+        self.assertEqual(cohorts.get_cohort_ids(users, course.id), dict.fromkeys([user.id for user in users]))
+
+        config_course_cohorts(course, is_cohorted=True, auto_cohorts=["AutoGroup"])
+        with self.assertNumQueries(1):
+            cohort_ids = cohorts.get_cohort_ids(users, course.id)
+        self.assertEqual(cohort_ids, {users[0].id: cohort.id, users[1].id: cohort.id, users[2].id: None})
+        self.assertIsNone(cohorts.get_cohort(users[2], course.id, assign=False))
+
+    @patch("openedx.core.djangoapps.course_groups.cohorts.tracker", autospec=True)
+    @patch("openedx.core.djangoapps.course_groups.cohorts.COHORT_MEMBERSHIP_UPDATED", autospec=True)
+    def test_bulk_assign_cohorts(self, mock_signal, mock_tracker):
+        """
+        Make sure cohorts.bulk_assign_cohorts() assigns the users as get_cohort() would, in bulk.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        groups = ["group_{0}".format(n) for n in range(3)]
+        config_course_cohorts(course, is_cohorted=True, auto_cohorts=groups)
+        manual_cohort = self._create_cohort(course.id, "ManualCohort", CourseCohort.MANUAL)
+
+        assigned_user = UserFactory()
+        cohorts.add_user_to_cohort(manual_cohort, assigned_user)
+        cohorts.add_user_to_cohort(manual_cohort, "preassigned@example.com")
+        preassigned_user = UserFactory(email="preassigned@example.com")
+        random_users = [UserFactory() for __ in range(30)]
+        mock_signal.reset_mock()
+        mock_tracker.reset_mock()
+
+        with patch.object(cohorts, 'BULK_COHORTS_BATCH_SIZE', 10):
+            assigned_cohorts = cohorts.bulk_assign_cohorts(
+                course.id, [assigned_user, preassigned_user] + random_users
+            )
+
+        self.assertEqual(assigned_cohorts[assigned_user.id], manual_cohort)
+        self.assertEqual(assigned_cohorts[preassigned_user.id], manual_cohort)
+        self.assertFalse(UnregisteredLearnerCohortAssignments.objects.filter(course_id=course.id).exists())
+        self.assertEqual(
+            set(assigned_cohorts[user.id].name for user in random_users),
+            set(groups),
+        )
+        for user in [assigned_user, preassigned_user] + random_users:
+            self.assertEqual(cohorts.get_cohort(user, course.id).id, assigned_cohorts[user.id].id)
+            self.assertIn(user, assigned_cohorts[user.id].users.all())
+        self.assertEqual(mock_signal.send.call_count, 1 + len(random_users))
+        mock_tracker.emit.assert_any_call(
+            "edx.cohort.user_added",
+            {"cohort_id": manual_cohort.id, "cohort_name": manual_cohort.name, "user_id": preassigned_user.id},
+        )
+
+        # Users are spread differently in other courses, but the same way each time.
+        other_course = CourseFactory.create().id
+        config_course_cohorts(modulestore().get_course(other_course), is_cohorted=True, auto_cohorts=groups)
+        other_assigned_cohorts = cohorts.bulk_assign_cohorts(other_course, random_users)
+        self.assertNotEqual(
+            [other_assigned_cohorts[user.id].name for user in random_users],
+            [assigned_cohorts[user.id].name for user in random_users],
+        )
+        CohortMembership.objects.filter(course_id=other_course).delete()
+        self.assertEqual(
+            cohorts.bulk_assign_cohorts(other_course, random_users),
+            other_assigned_cohorts,
+        )
+
+    def test_bulk_assign_cohorts_default_cohort(self):
+        """
+        Make sure cohorts.bulk_assign_cohorts() creates the default cohort if there are no random cohorts.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        users = [UserFactory() for __ in range(3)]
+        self.assertEqual(cohorts.bulk_assign_cohorts(course.id, users), {})
+        self.assertIsNone(cohorts.get_cohort(users[0], course.id))
+
+        config_course_cohorts(course, is_cohorted=True)
+        assigned_cohorts = cohorts.bulk_assign_cohorts(course.id, users)
+        default_cohort = cohorts.get_cohort_by_name(course.id, cohorts.DEFAULT_COHORT_NAME)
+        self.assertEqual(assigned_cohorts, dict.fromkeys([user.id for user in users], default_cohort))
+        with self.assertNumQueries(0):
+            self.assertEqual(cohorts.get_cohort(users[0], course.id, use_cached=True), default_cohort)
+
+    def test_bulk_assign_cohorts_concurrent_assignment(self):
+        """
+        Make sure cohorts.bulk_assign_cohorts() keeps the cohorts of users assigned concurrently.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        config_course_cohorts(course, is_cohorted=True, auto_cohorts=["AutoGroup"])
+        manual_cohort = self._create_cohort(course.id, "ManualCohort", CourseCohort.MANUAL)
+        users = [UserFactory() for __ in range(3)]
+
+        def assign_concurrently(*args, **kwargs):  # pylint: disable=unused-argument
+            """
+            Assigns the first user after its membership was read, and before the memberships are inserted.
+            """
+            if not CohortMembership.objects.filter(user=users[0], course_id=course.id).exists():
+                cohorts.add_user_to_cohort(manual_cohort, users[0])
+
+        with before_after.before(
+            'openedx.core.djangoapps.course_groups.cohorts._hash_random_cohort',
+            assign_concurrently,
+        ):
+            assigned_cohorts = cohorts.bulk_assign_cohorts(course.id, users)
+
+        self.assertEqual(assigned_cohorts[users[0].id], manual_cohort)
+        self.assertEqual([assigned_cohorts[user.id].name for user in users[1:]], ["AutoGroup", "AutoGroup"])
+
     def test_get_course_cohorts_noop(self):
         """
         Tests get_course_cohorts returns an empty list when no cohorts exist.
@@ -1,3 +1,9 @@
 # pylint: disable=missing-docstring,wildcard-import
 from .comment_client import *
-from .utils import CommentClient500Error, CommentClientError, CommentClientMaintenanceError, CommentClientRequestError
+from .utils import (
+    CommentClient500Error,
+    CommentClientError,
+    CommentClientMaintenanceError,
+    CommentClientRequestError,
+    perform_concurrently
+)
@@ -0,0 +1,150 @@
+"""
+Tests for the requests made to the comments service, against a local stub of the service.
+"""
+from __future__ import absolute_import
+
+import json
+import threading
+import time
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from edx_django_utils.cache import RequestCache
+from mock import patch
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+
+from openedx.core.djangoapps.django_comment_common.comment_client import utils
+from openedx.core.djangoapps.django_comment_common.models import ForumsConfig
+
+
+class StubCommentsServer(ThreadingMixIn, HTTPServer):
+    """
+    A comments service answering each GET with its path, after a delay.
+    """
+    daemon_threads = True
+
+    def __init__(self, delay=0):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubCommentsServiceHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.paths = []
+        self.client_addresses = set()
+        self.num_in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self.server_address[1])
+
+
+class StubCommentsServiceHandler(BaseHTTPRequestHandler):
+    """
+    Handles the requests of StubCommentsServer, keeping connections alive.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        path = self.path.split('?')[0]
+        with server.lock:
+            server.paths.append(path)
+            server.client_addresses.add(self.client_address)
+            server.num_in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.num_in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.num_in_flight -= 1
+
+        status_code = 404 if path.startswith('/missing') else 200
+        body = json.dumps({'path': path}).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@override_settings(COMMENTS_SERVICE_USE_SESSION=True, COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS=4)
+class PerformRequestTestCase(TestCase):
+    """
+    Tests for perform_request and perform_concurrently.
+    """
+    def setUp(self):
+        super(PerformRequestTestCase, self).setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+        RequestCache(utils.TIMINGS_CACHE_NAMESPACE).clear()
+
+        for name in ('_session', '_executor'):
+            patcher = patch.object(utils, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def start_server(self, delay=0):
+        """
+        Starts a stub comments service, answering after the given delay.
+        """
+        server = StubCommentsServer(delay)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def get(self, server, path):
+        """
+        Returns a function making a GET to the given path of the server.
+        """
+        return lambda: utils.perform_request('get', server.url + path, {'key': 'value'}, metric_action='test.get')
+
+    def test_connections_kept_alive(self):
+        server = self.start_server()
+        for path in ('/a', '/b', '/a'):
+            self.assertEqual(self.get(server, path)(), {'path': path})
+        self.assertEqual(server.paths, ['/a', '/b', '/a'])
+        self.assertEqual(len(server.client_addresses), 1)
+
+    @override_settings(COMMENTS_SERVICE_USE_SESSION=False)
+    def test_connections_not_kept_alive(self):
+        server = self.start_server()
+        for path in ('/a', '/b'):
+            self.get(server, path)()
+        self.assertEqual(len(server.client_addresses), 2)
+
+    def test_perform_concurrently(self):
+        server = self.start_server(delay=0.2)
+        results = utils.perform_concurrently([self.get(server, path) for path in ('/a', '/b', '/c')])
+        self.assertEqual(results, [{'path': '/a'}, {'path': '/b'}, {'path': '/c'}])
+        self.assertEqual(server.max_in_flight, 3)
+
+    @override_settings(COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS=1)
+    def test_perform_one_after_the_other(self):
+        server = self.start_server(delay=0.05)
+        results = utils.perform_concurrently([self.get(server, path) for path in ('/a', '/b')])
+        self.assertEqual(results, [{'path': '/a'}, {'path': '/b'}])
+        self.assertEqual(server.max_in_flight, 1)
+
+    def test_identical_gets_coalesced(self):
+        server = self.start_server(delay=0.1)
+        results = utils.perform_concurrently([self.get(server, path) for path in ('/a', '/b', '/a')])
+        self.assertEqual(results, [{'path': '/a'}, {'path': '/b'}, {'path': '/a'}])
+        self.assertIsNot(results[0], results[2])
+        self.assertEqual(sorted(server.paths), ['/a', '/b'])
+
+    def test_errors_raised_after_all_calls(self):
+        server = self.start_server()
+        with self.assertRaises(utils.CommentClientRequestError):
+            utils.perform_concurrently([self.get(server, path) for path in ('/a', '/missing', '/b')])
+        self.assertEqual(sorted(server.paths), ['/a', '/b', '/missing'])
+
+    @patch.object(utils, 'set_custom_metric')
+    def test_timings(self, mock_set_custom_metric):
+        server = self.start_server()
+        utils.perform_concurrently([self.get(server, path) for path in ('/a', '/b')])
+        mock_set_custom_metric.assert_any_call(u'comments_service.test.get.count', 2)
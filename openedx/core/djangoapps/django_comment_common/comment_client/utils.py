@@ -2,17 +2,41 @@
 """" Common utilities for comment client wrapper """
 from __future__ import absolute_import
 
+import copy
+import json
 import logging
+import threading
+import time
 from uuid import uuid4
 
 import requests
 import six
-from django.utils.translation import get_language
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+from django.utils.translation import get_language, override
+from edx_django_utils.cache import RequestCache
+from edx_django_utils.monitoring import set_custom_metric
+from requests.adapters import HTTPAdapter
 
 from .settings import SERVICE_HOST as COMMENTS_SERVICE
 
 log = logging.getLogger(__name__)
 
+TIMINGS_CACHE_NAMESPACE = u'comment_client.timings'
+
+# Default maximum number of connections kept open to the comments service by each process.
+DEFAULT_POOL_SIZE = 10
+
+# Default maximum number of requests that perform_concurrently makes at the same time.
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+# The state of the batch of concurrent calls that the current thread is running, if any.
+_batch_state = threading.local()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in six.iteritems(dic) if v is not None])
@@ -33,13 +57,23 @@ def extract(dic, keys):
 
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
-    # To avoid dependency conflict
-    from openedx.core.djangoapps.django_comment_common.models import ForumsConfig
-    config = ForumsConfig.current()
+    batch = getattr(_batch_state, 'batch', None)
+    config = batch.config if batch else _get_forums_config()
 
     if not config.enabled:
         raise CommentClientMaintenanceError('service disabled')
 
+    if batch and method.lower() == 'get':
+        # Identical GETs made by the calls of a batch are only sent once.
+        request_key = json.dumps([url, data_or_params, raw, get_language()], sort_keys=True, default=six.text_type)
+        return batch.coalesce(request_key, lambda: _perform_request(
+            config, method, url, data_or_params, raw, metric_action, metric_tags,
+        ))
+    return _perform_request(config, method, url, data_or_params, raw, metric_action, metric_tags)
+
+
+def _perform_request(config, method, url, data_or_params, raw, metric_action, metric_tags):
+
     if metric_tags is None:
         metric_tags = []
 
@@ -63,7 +97,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = data_or_params.copy()
         params.update(request_id_dict)
-    response = requests.request(
+    start_time = time.time()
+    response = _send_request(
         method,
         url,
         data=data,
@@ -71,6 +106,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         headers=headers,
         timeout=config.connection_timeout
     )
+    _record_timing(metric_action or method, time.time() - start_time)
 
     metric_tags.append(u'status_code:{}'.format(response.status_code))
     if response.status_code > 200:
@@ -101,6 +137,179 @@ def perform_request(method, url, data_or_params=None, raw=False,
             return data
 
 
+def _get_forums_config():
+    # To avoid dependency conflict
+    from openedx.core.djangoapps.django_comment_common.models import ForumsConfig
+    return ForumsConfig.current()
+
+
+def _send_request(method, url, **kwargs):
+    """
+    Sends the request through the pooled session, whose connections are kept
+    alive between requests, or through a new connection if pooling is
+    disabled with settings.COMMENTS_SERVICE_USE_SESSION.
+    """
+    if not getattr(settings, 'COMMENTS_SERVICE_USE_SESSION', True):
+        return requests.request(method, url, **kwargs)
+    return _get_session().request(method, url, **kwargs)
+
+
+def _get_session():
+    """
+    Returns the session shared by the threads of the process.
+    """
+    global _session  # pylint: disable=global-statement
+    with _lock:
+        if _session is None:
+            pool_size = getattr(settings, 'COMMENTS_SERVICE_POOL_SIZE', DEFAULT_POOL_SIZE)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def _get_executor():
+    """
+    Returns the pool of threads that perform_concurrently runs calls from.
+    """
+    global _executor  # pylint: disable=global-statement
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_get_max_concurrent_requests())
+        return _executor
+
+
+def _get_max_concurrent_requests():
+    return getattr(settings, 'COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS', DEFAULT_MAX_CONCURRENT_REQUESTS)
+
+
+def _record_timing(action, duration):
+    """
+    Adds the duration of a request to the total time spent in requests of the
+    same action, reported as custom metrics of the current request.  Timings
+    of the calls of a batch are reported once the batch completes, from the
+    thread which ran it.
+    """
+    batch = getattr(_batch_state, 'batch', None)
+    if batch:
+        batch.add_timing(action, duration)
+        return
+    timings = RequestCache(TIMINGS_CACHE_NAMESPACE).data
+    count, total = timings.get(action, (0, 0))
+    timings[action] = (count + 1, total + duration)
+    set_custom_metric(u'comments_service.{}.count'.format(action), count + 1)
+    set_custom_metric(u'comments_service.{}.duration_ms'.format(action), int((total + duration) * 1000))
+    log.debug(u'Comments service request %s took %.3fs', action, duration)
+
+
+class _Batch(object):
+    """
+    The state shared by the calls of a batch run by perform_concurrently.
+    """
+    def __init__(self, config, language):
+        self.config = config
+        self.language = language
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._timings = []
+
+    def run(self, call):
+        """
+        Runs the call in the current thread, as part of the batch.
+        """
+        _batch_state.batch = self
+        try:
+            with override(self.language):
+                return call()
+        finally:
+            _batch_state.batch = None
+
+    def coalesce(self, request_key, perform):
+        """
+        Returns the response of the request with the given key, performing it
+        only if no other call of the batch has, and waiting for it otherwise.
+        """
+        with self._lock:
+            response = self._responses.get(request_key)
+            is_first = response is None
+            if is_first:
+                response = self._responses[request_key] = _Response()
+        if is_first:
+            response.perform(perform)
+        return response.get()
+
+    def add_timing(self, action, duration):
+        with self._lock:
+            self._timings.append((action, duration))
+
+    def record_timings(self):
+        """
+        Reports the timings of the requests of the batch from the current thread.
+        """
+        for action, duration in self._timings:
+            _record_timing(action, duration)
+
+
+class _Response(object):
+    """
+    The result of a request shared by the calls of a batch, once performed.
+    """
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def perform(self, perform):
+        try:
+            self._result = perform()
+        except Exception as error:
+            self._error = error
+        finally:
+            self._done.set()
+
+    def get(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        # Callers update the objects built from responses, so they each get their own copy.
+        return copy.deepcopy(self._result)
+
+
+def perform_concurrently(calls):
+    """
+    Runs the given functions, which make independent requests to the comments
+    service, concurrently from a pool of threads, and returns the list of their
+    results, in order.  If calls raise exceptions, the one raised by the first
+    of them is raised once all the calls have completed.
+
+    Identical GETs made by the calls are sent once, and share their response.
+
+    The calls only share the language and the forums configuration of the
+    current thread, so they shouldn't read the database or depend on the
+    current request otherwise.  They run one after the other if
+    settings.COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS is 1, or if the current
+    thread is itself running a call of a batch.
+    """
+    if getattr(_batch_state, 'batch', None) is not None:
+        return [call() for call in calls]
+
+    config = _get_forums_config()
+    if not config.enabled:
+        raise CommentClientMaintenanceError('service disabled')
+
+    batch = _Batch(config, get_language())
+    try:
+        if _get_max_concurrent_requests() <= 1 or len(calls) <= 1:
+            return [batch.run(call) for call in calls]
+        futures = [_get_executor().submit(batch.run, call) for call in calls]
+        wait(futures)
+        return [future.result() for future in futures]
+    finally:
+        batch.record_timings()
+
+
 class CommentClientError(Exception):
     pass
 
@@ -20,3 +20,6 @@ COURSE_UPDATE_WAFFLE_FLAG = CourseWaffleFlag(
 )
 
 DEBUG_MESSAGE_WAFFLE_FLAG = WaffleFlag(WAFFLE_FLAG_NAMESPACE, u'enable_debugging')
+
+# Stream the schedules of each bin in chunks, and send their messages in batches, with a task per batch.
+BATCH_SEND_WAFFLE_FLAG = WaffleFlag(WAFFLE_FLAG_NAMESPACE, u'send_in_batches')
@@ -23,7 +23,7 @@ def course_has_highlights(course_key):
     inaccessible content.
     """
     try:
-        course = _get_course_with_highlights(course_key)
+        course = get_course_with_highlights(course_key)
 
     except CourseUpdateDoesNotExist:
         return False
@@ -43,16 +43,21 @@ def course_has_highlights(course_key):
         return highlights_are_available
 
 
-def get_week_highlights(user, course_key, week_num):
+def get_week_highlights(user, course_key, week_num, course_descriptor=None):
     """
     Get highlights (list of unicode strings) for a given week.
     week_num starts at 1.
 
+    course_descriptor, if given, is the descriptor returned by
+    get_course_with_highlights for the course, so that callers getting the
+    highlights of many users load it once.
+
     Raises:
         CourseUpdateDoesNotExist: if highlights do not exist for
             the requested week_num.
     """
-    course_descriptor = _get_course_with_highlights(course_key)
+    if course_descriptor is None:
+        course_descriptor = get_course_with_highlights(course_key)
     course_module = _get_course_module(course_descriptor, user)
     sections_with_highlights = _get_sections_with_highlights(course_module)
     highlights = _get_highlights_for_week(
@@ -63,8 +68,13 @@ def get_week_highlights(user, course_key, week_num):
     return highlights
 
 
-def _get_course_with_highlights(course_key):
-    # pylint: disable=missing-docstring
+def get_course_with_highlights(course_key):
+    """
+    Returns the descriptor of the course, loaded to get its highlights.
+
+    Raises:
+        CourseUpdateDoesNotExist: if the course doesn't send highlights.
+    """
     if not COURSE_UPDATE_WAFFLE_FLAG.is_enabled(course_key):
         raise CourseUpdateDoesNotExist(
             u"%s Course Update Messages waffle flag is disabled.",
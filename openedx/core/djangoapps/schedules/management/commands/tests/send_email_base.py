@@ -15,6 +15,8 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.db.models import Max
 from edx_ace.channel import ChannelMap, ChannelType
+from edx_ace.message import Message
+from edx_ace.recipient import Recipient
 from edx_ace.test_utils import StubPolicy, patch_policies
 from edx_ace.utils.date import serialize
 from freezegun import freeze_time
@@ -27,11 +29,12 @@ from course_modes.tests.factories import CourseModeFactory
 from courseware.models import DynamicUpgradeDeadlineConfiguration
 from lms.djangoapps.commerce.models import CommerceConfiguration
 from openedx.core.djangoapps.schedules import resolvers, tasks
+from openedx.core.djangoapps.schedules.config import BATCH_SEND_WAFFLE_FLAG
 from openedx.core.djangoapps.schedules.resolvers import _get_datetime_beginning_of_day
 from openedx.core.djangoapps.schedules.tests.factories import ScheduleConfigFactory, ScheduleFactory
 from openedx.core.djangoapps.site_configuration.tests.factories import SiteConfigurationFactory, SiteFactory
 from openedx.core.djangoapps.theming.tests.test_util import with_comprehensive_theme
-from openedx.core.djangoapps.waffle_utils.testutils import WAFFLE_TABLES
+from openedx.core.djangoapps.waffle_utils.testutils import WAFFLE_TABLES, override_waffle_flag
 from openedx.core.djangolib.testing.utils import FilteredQueryCountMixin
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
@@ -235,6 +238,47 @@ class ScheduleSendEmailTestMixin(FilteredQueryCountMixin):
             self.assertEqual(mock_schedule_send.apply_async.call_count, schedule_count)
             self.assertFalse(mock_ace.send.called)
 
+    @patch.object(tasks, 'ace')
+    @patch.object(resolvers, 'get_course_with_highlights')
+    def test_send_in_batches(self, mock_get_course, mock_ace):
+        current_day, offset, target_day, upgrade_deadline = self._get_dates()
+        first_user_id = self._next_user_id()
+        num_users = 5
+        for user_index in range(num_users):
+            user = UserFactory.create(id=first_user_id + user_index * self.task.num_bins)
+            self._schedule_factory(enrollment__user=user)
+
+        with override_waffle_flag(BATCH_SEND_WAFFLE_FLAG, True), \
+                patch.object(self.resolver, 'chunk_size', 2), \
+                patch.object(self.resolver, 'messages_per_send_task', 2), \
+                patch.object(self.task, 'async_send_task') as mock_schedule_send, \
+                patch.object(self.task, 'async_send_batch_task') as mock_schedule_send_batch:
+            self.task().apply(kwargs=dict(
+                site_id=self.site_config.site.id, target_day_str=serialize(target_day), day_offset=offset,
+                bin_num=self._calculate_bin_for_user(User.objects.get(id=first_user_id)),
+            ))
+
+        self.assertFalse(mock_schedule_send.apply_async.called)
+        batches = [call_args[0][0][1] for call_args in mock_schedule_send_batch.apply_async.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        recipients = [Message.from_string(msg_str).recipient.username for batch in batches for msg_str in batch]
+        self.assertEqual(len(set(recipients)), num_users)
+        self.assertFalse(mock_ace.send.called)
+
+    @patch.object(tasks, 'ace')
+    def test_deliver_batch(self, mock_ace):
+        users = [UserFactory.create() for __ in range(3)]
+        msg_type = self.task().make_message_type(self.expected_offsets[0])
+        msg_strs = [
+            str(msg_type.personalize(Recipient(user.username, user.email), 'en', {})) for user in users
+        ]
+        users[1].delete()
+        self.task.async_send_batch_task(self.site_config.site.id, msg_strs)
+        self.assertEqual(
+            [call_args[0][0].recipient.username for call_args in mock_ace.send.call_args_list],
+            [users[0].username, users[2].username],
+        )
+
     def test_no_course_overview(self):
         current_day, offset, target_day, upgrade_deadline = self._get_dates()
         # Don't use CourseEnrollmentFactory since it creates a course overview
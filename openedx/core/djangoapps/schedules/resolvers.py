@@ -16,7 +16,7 @@ from edx_django_utils.monitoring import function_trace, set_custom_metric
 
 from courseware.date_summary import verified_upgrade_deadline_link, verified_upgrade_link_is_valid
 from openedx.core.djangoapps.ace_common.template_context import get_base_template_context
-from openedx.core.djangoapps.schedules.content_highlights import get_week_highlights
+from openedx.core.djangoapps.schedules.content_highlights import get_course_with_highlights, get_week_highlights
 from openedx.core.djangoapps.schedules.exceptions import CourseUpdateDoesNotExist
 from openedx.core.djangoapps.schedules.models import Schedule, ScheduleExperience
 from openedx.core.djangoapps.schedules.utils import PrefixedDebugLoggerMixin
@@ -31,6 +31,12 @@ RECURRING_NUDGE_NUM_BINS = DEFAULT_NUM_BINS
 UPGRADE_REMINDER_NUM_BINS = DEFAULT_NUM_BINS
 COURSE_UPDATE_NUM_BINS = DEFAULT_NUM_BINS
 
+# Number of schedules read by each query when streaming the schedules of a bin.
+SCHEDULES_CHUNK_SIZE = 1000
+
+# Number of messages sent by each batched send task.
+MESSAGES_PER_SEND_TASK = 100
+
 
 @attr.s
 class BinnedSchedulesBaseResolver(PrefixedDebugLoggerMixin, RecipientResolver):
@@ -52,6 +58,9 @@ class BinnedSchedulesBaseResolver(PrefixedDebugLoggerMixin, RecipientResolver):
                         org_list or strictly include (False) them (default: False)
         override_recipient_email -- string email address that should receive all emails instead of the normal
                                     recipient. (default: None)
+        async_send_batch_task -- celery task function that sends a list of messages. If given, the schedules are
+                                 streamed in chunks, and each enqueued task sends up to messages_per_send_task
+                                 messages, instead of one. (default: None)
 
     Static attributes:
         schedule_date_field -- the name of the model field that represents the date that offsets should be computed
@@ -61,6 +70,8 @@ class BinnedSchedulesBaseResolver(PrefixedDebugLoggerMixin, RecipientResolver):
         experience_filter -- a queryset filter used to select only the users who should be getting this message as part
                              of their experience. This defaults to users without a specified experience type and those
                              in the "recurring nudges and upgrade reminder" experience.
+        chunk_size -- the int number of schedules read by each query when streaming schedules
+        messages_per_send_task -- the int maximum number of messages sent by each batched send task
     """
     async_send_task = attr.ib()
     site = attr.ib()
@@ -68,29 +79,128 @@ class BinnedSchedulesBaseResolver(PrefixedDebugLoggerMixin, RecipientResolver):
     day_offset = attr.ib()
     bin_num = attr.ib()
     override_recipient_email = attr.ib(default=None)
+    async_send_batch_task = attr.ib(default=None)
 
     schedule_date_field = None
     num_bins = DEFAULT_NUM_BINS
     experience_filter = (Q(experience__experience_type=ScheduleExperience.EXPERIENCES.default)
                          | Q(experience__isnull=True))
+    chunk_size = SCHEDULES_CHUNK_SIZE
+    messages_per_send_task = MESSAGES_PER_SEND_TASK
 
     def __attrs_post_init__(self):
         # TODO: in the next refactor of this task, pass in current_datetime instead of reproducing it here
         self.current_datetime = self.target_datetime - datetime.timedelta(days=self.day_offset)
+        self._course_contexts = {}
+
+    @property
+    def streams_schedules(self):
+        """
+        Whether the schedules are streamed in chunks, and the messages sent in batches.
+        """
+        return self.async_send_batch_task is not None
 
     def send(self, msg_type):
+        if self.streams_schedules:
+            self._send_in_batches(msg_type)
+            return
+
         for (user, language, context) in self.schedules_for_bin():
-            msg = msg_type.personalize(
-                Recipient(
-                    user.username,
-                    self.override_recipient_email or user.email,
-                ),
-                language,
-                context,
-            )
+            msg = self._personalize(msg_type, user, language, context)
             with function_trace('enqueue_send_task'):
                 self.async_send_task.apply_async((self.site.id, str(msg)), retry=False)
 
+    def _send_in_batches(self, msg_type):
+        """
+        Enqueues a task for each batch of up to messages_per_send_task messages.
+        """
+        num_messages = 0
+        num_send_tasks = 0
+        batch = []
+        for (user, language, context) in self.schedules_for_bin():
+            batch.append(str(self._personalize(msg_type, user, language, context)))
+            num_messages += 1
+            if len(batch) >= self.messages_per_send_task:
+                self._enqueue_batch(batch)
+                num_send_tasks += 1
+                batch = []
+        if batch:
+            self._enqueue_batch(batch)
+            num_send_tasks += 1
+
+        LOG.info(u'Bin %d: enqueued %d messages in %d send tasks', self.bin_num, num_messages, num_send_tasks)
+        set_custom_metric('num_messages', num_messages)
+        set_custom_metric('num_send_tasks', num_send_tasks)
+
+    def _enqueue_batch(self, msg_strs):
+        """
+        Enqueues a task sending the given serialized messages.
+        """
+        with function_trace('enqueue_send_batch_task'):
+            self.async_send_batch_task.apply_async((self.site.id, msg_strs), retry=False)
+
+    def _personalize(self, msg_type, user, language, context):
+        """
+        Returns the message of the given type for the user.
+        """
+        return msg_type.personalize(
+            Recipient(
+                user.username,
+                self.override_recipient_email or user.email,
+            ),
+            language,
+            context,
+        )
+
+    def get_schedules(self, order_by='enrollment__user__id'):
+        """
+        Returns an iterable of the Schedules with the target_date, related to Users whose id matches the bin_num, and
+        filtered by org_list, read all at once or streamed in chunks.
+
+        Arguments:
+        order_by -- string for field to sort the resulting Schedules by
+        """
+        if self.streams_schedules:
+            return self.iter_schedules_in_chunks(order_by)
+        return self.get_schedules_with_target_date_by_bin_and_orgs(order_by)
+
+    def iter_schedules_in_chunks(self, order_by='enrollment__user__id'):
+        """
+        Yields the Schedules with the target_date, related to Users whose id matches the bin_num, and filtered by
+        org_list, reading them in chunks of chunk_size Schedules.
+
+        Each chunk is read with a query resuming after the last Schedule of the previous chunk, in the order of
+        (order_by, id), rather than at an offset.
+
+        Arguments:
+        order_by -- string for field to sort the resulting Schedules by
+        """
+        schedules = self._get_schedules_query_set().order_by(order_by, 'id')
+        num_schedules = 0
+        num_chunks = 0
+        last_schedule = None
+        while True:
+            chunk_schedules = schedules
+            if last_schedule is not None:
+                last_value = _get_field_value(last_schedule, order_by)
+                chunk_schedules = chunk_schedules.filter(
+                    Q(**{order_by + '__gt': last_value}) | Q(**{order_by: last_value, 'id__gt': last_schedule.id})
+                )
+            with function_trace('schedule_chunk_evaluation'):
+                chunk = list(chunk_schedules[:self.chunk_size])
+            if chunk:
+                num_chunks += 1
+                num_schedules += len(chunk)
+                last_schedule = chunk[-1]
+                for schedule in chunk:
+                    yield schedule
+            if len(chunk) < self.chunk_size:
+                break
+
+        LOG.info(u'Bin %d: read %d schedules in %d chunks', self.bin_num, num_schedules, num_chunks)
+        set_custom_metric('num_schedules', num_schedules)
+        set_custom_metric('num_schedule_chunks', num_chunks)
+
     def get_schedules_with_target_date_by_bin_and_orgs(
         self, order_by='enrollment__user__id'
     ):
@@ -100,6 +210,26 @@ class BinnedSchedulesBaseResolver(PrefixedDebugLoggerMixin, RecipientResolver):
         Arguments:
         order_by -- string for field to sort the resulting Schedules by
         """
+        schedules = self._get_schedules_query_set().order_by(order_by)
+
+        LOG.info(u'Query = %r', schedules.query.sql_with_params())
+
+        with function_trace('schedule_query_set_evaluation'):
+            # This will run the query and cache all of the results in memory.
+            num_schedules = len(schedules)
+
+        LOG.info(u'Number of schedules = %d', num_schedules)
+
+        # This should give us a sense of the volume of data being processed by each task.
+        set_custom_metric('num_schedules', num_schedules)
+
+        return schedules
+
+    def _get_schedules_query_set(self):
+        """
+        Returns the unordered QuerySet of the Schedules with the target_date, related to Users whose id matches the
+        bin_num, and filtered by org_list.
+        """
         target_day = _get_datetime_beginning_of_day(self.target_datetime)
         schedule_day_equals_target_day_filter = {
             'courseenrollment__schedule__{}__gte'.format(self.schedule_date_field): target_day,
@@ -130,24 +260,13 @@ class BinnedSchedulesBaseResolver(PrefixedDebugLoggerMixin, RecipientResolver):
             enrollment__is_active=True,
             active=True,
             **schedule_day_equals_target_day_filter
-        ).order_by(order_by)
+        )
 
         schedules = self.filter_by_org(schedules)
 
         if "read_replica" in settings.DATABASES:
             schedules = schedules.using("read_replica")
 
-        LOG.info(u'Query = %r', schedules.query.sql_with_params())
-
-        with function_trace('schedule_query_set_evaluation'):
-            # This will run the query and cache all of the results in memory.
-            num_schedules = len(schedules)
-
-        LOG.info(u'Number of schedules = %d', num_schedules)
-
-        # This should give us a sense of the volume of data being processed by each task.
-        set_custom_metric('num_schedules', num_schedules)
-
         return schedules
 
     def filter_by_org(self, schedules):
@@ -180,7 +299,7 @@ class BinnedSchedulesBaseResolver(PrefixedDebugLoggerMixin, RecipientResolver):
         return schedules.filter(enrollment__course__org__in=org_list)
 
     def schedules_for_bin(self):
-        schedules = self.get_schedules_with_target_date_by_bin_and_orgs()
+        schedules = self.get_schedules()
         template_context = get_base_template_context(self.site)
 
         for (user, user_schedules) in groupby(schedules, lambda s: s.enrollment.user):
@@ -221,6 +340,20 @@ class BinnedSchedulesBaseResolver(PrefixedDebugLoggerMixin, RecipientResolver):
         """
         return {}
 
+    def get_course_context(self, course):
+        """
+        Returns the context shared by the messages about the given course, computed once per course.
+
+        Arguments:
+            course -- the CourseOverview of the course
+        """
+        if course.id not in self._course_contexts:
+            self._course_contexts[course.id] = {
+                'course_name': course.display_name,
+                'course_url': _get_trackable_course_home_url(course.id),
+            }
+        return self._course_contexts[course.id]
+
 
 class InvalidContextError(Exception):
     pass
@@ -244,10 +377,7 @@ class RecurringNudgeResolver(BinnedSchedulesBaseResolver):
 
     def get_template_context(self, user, user_schedules):
         first_schedule = user_schedules[0]
-        context = {
-            'course_name': first_schedule.enrollment.course.display_name,
-            'course_url': _get_trackable_course_home_url(first_schedule.enrollment.course_id),
-        }
+        context = dict(self.get_course_context(first_schedule.enrollment.course))
 
         # Information for including upsell messaging in template.
         context.update(_get_upsell_information_for_schedule(user, first_schedule))
@@ -285,9 +415,10 @@ class UpgradeReminderResolver(BinnedSchedulesBaseResolver):
                 first_valid_upsell_context = upsell_context
             course_id_str = str(schedule.enrollment.course_id)
             course_id_strs.append(course_id_str)
+            course_context = self.get_course_context(schedule.enrollment.course)
             course_links.append({
-                'url': _get_trackable_course_home_url(schedule.enrollment.course_id),
-                'name': schedule.enrollment.course.display_name
+                'url': course_context['course_url'],
+                'name': course_context['course_name'],
             })
 
         if first_schedule is None:
@@ -339,10 +470,14 @@ class CourseUpdateResolver(BinnedSchedulesBaseResolver):
     num_bins = COURSE_UPDATE_NUM_BINS
     experience_filter = Q(experience__experience_type=ScheduleExperience.EXPERIENCES.course_updates)
 
+    def __attrs_post_init__(self):
+        super(CourseUpdateResolver, self).__attrs_post_init__()
+        self._courses_with_highlights = {}
+
     def schedules_for_bin(self):
         week_num = abs(self.day_offset) / 7
-        schedules = self.get_schedules_with_target_date_by_bin_and_orgs(
-            order_by='enrollment__course',
+        schedules = self.get_schedules(
+            order_by='enrollment__course_id',
         )
 
         template_context = get_base_template_context(self.site)
@@ -351,7 +486,13 @@ class CourseUpdateResolver(BinnedSchedulesBaseResolver):
             user = enrollment.user
 
             try:
-                week_highlights = get_week_highlights(user, enrollment.course_id, week_num)
+                if self.streams_schedules:
+                    week_highlights = get_week_highlights(
+                        user, enrollment.course_id, week_num,
+                        course_descriptor=self._get_course_with_highlights(enrollment.course_id),
+                    )
+                else:
+                    week_highlights = get_week_highlights(user, enrollment.course_id, week_num)
             except CourseUpdateDoesNotExist:
                 LOG.warning(
                     u'Weekly highlights for user {} in week {} of course {} does not exist or is disabled'.format(
@@ -360,10 +501,8 @@ class CourseUpdateResolver(BinnedSchedulesBaseResolver):
                 )
                 # continue to the next schedule, don't yield an email for this one
             else:
+                template_context.update(self.get_course_context(enrollment.course))
                 template_context.update({
-                    'course_name': schedule.enrollment.course.display_name,
-                    'course_url': _get_trackable_course_home_url(enrollment.course_id),
-
                     'week_num': week_num,
                     'week_highlights': week_highlights,
 
@@ -374,6 +513,31 @@ class CourseUpdateResolver(BinnedSchedulesBaseResolver):
 
                 yield (user, schedule.enrollment.course.closest_released_language, template_context)
 
+    def _get_course_with_highlights(self, course_id):
+        """
+        Returns the course descriptor used to get the highlights of the course, loaded once per course, or raises
+        CourseUpdateDoesNotExist if the course has no highlights to send.
+        """
+        if course_id not in self._courses_with_highlights:
+            try:
+                self._courses_with_highlights[course_id] = get_course_with_highlights(course_id)
+            except CourseUpdateDoesNotExist as error:
+                self._courses_with_highlights[course_id] = error
+        course_or_error = self._courses_with_highlights[course_id]
+        if isinstance(course_or_error, CourseUpdateDoesNotExist):
+            raise course_or_error
+        return course_or_error
+
+
+def _get_field_value(instance, field_path):
+    """
+    Returns the value of the field at the given lookup path (e.g. 'enrollment__user__id') of the model instance.
+    """
+    value = instance
+    for field_name in field_path.split('__'):
+        value = getattr(value, field_name)
+    return value
+
 
 def _get_trackable_course_home_url(course_id):
     """
@@ -21,6 +21,7 @@ from eventtracking import tracker
 from opaque_keys.edx.keys import CourseKey
 
 from openedx.core.djangoapps.schedules import message_types, resolvers
+from openedx.core.djangoapps.schedules.config import BATCH_SEND_WAFFLE_FLAG
 from openedx.core.djangoapps.schedules.models import Schedule, ScheduleConfig
 from openedx.core.lib.celery.task_utils import emulate_http_request
 from track import segment
@@ -69,6 +70,7 @@ class ScheduleMessageBaseTask(LoggedTask):
     log_prefix = None
     resolver = None  # define in subclass
     async_send_task = None  # define in subclass
+    async_send_batch_task = None  # define in subclass
 
     @classmethod
     def log_debug(cls, message, *args, **kwargs):
@@ -121,6 +123,7 @@ class ScheduleMessageBaseTask(LoggedTask):
         with emulate_http_request(site=site):
             msg_type = self.make_message_type(day_offset)
             _annotate_for_monitoring(msg_type, site, bin_num, target_day_str, day_offset)
+            async_send_batch_task = self.async_send_batch_task if BATCH_SEND_WAFFLE_FLAG.is_enabled() else None
             return self.resolver(
                 self.async_send_task,
                 site,
@@ -128,6 +131,7 @@ class ScheduleMessageBaseTask(LoggedTask):
                 day_offset,
                 bin_num,
                 override_recipient_email=override_recipient_email,
+                async_send_batch_task=async_send_batch_task,
             ).send(msg_type)
 
     def make_message_type(self, day_offset):
@@ -164,12 +168,43 @@ def _course_update_schedule_send(site_id, msg_str):
     )
 
 
+@task(base=LoggedTask, ignore_result=True, routing_key=ROUTING_KEY)
+def _recurring_nudge_schedule_send_batch(site_id, msg_strs):
+    _schedule_send_batch(
+        msg_strs,
+        site_id,
+        'deliver_recurring_nudge',
+        RECURRING_NUDGE_LOG_PREFIX,
+    )
+
+
+@task(base=LoggedTask, ignore_result=True, routing_key=ROUTING_KEY)
+def _upgrade_reminder_schedule_send_batch(site_id, msg_strs):
+    _schedule_send_batch(
+        msg_strs,
+        site_id,
+        'deliver_upgrade_reminder',
+        UPGRADE_REMINDER_LOG_PREFIX,
+    )
+
+
+@task(base=LoggedTask, ignore_result=True, routing_key=ROUTING_KEY)
+def _course_update_schedule_send_batch(site_id, msg_strs):
+    _schedule_send_batch(
+        msg_strs,
+        site_id,
+        'deliver_course_update',
+        COURSE_UPDATE_LOG_PREFIX,
+    )
+
+
 class ScheduleRecurringNudge(ScheduleMessageBaseTask):
     num_bins = resolvers.RECURRING_NUDGE_NUM_BINS
     enqueue_config_var = 'enqueue_recurring_nudge'
     log_prefix = RECURRING_NUDGE_LOG_PREFIX
     resolver = resolvers.RecurringNudgeResolver
     async_send_task = _recurring_nudge_schedule_send
+    async_send_batch_task = _recurring_nudge_schedule_send_batch
 
     def make_message_type(self, day_offset):
         return message_types.RecurringNudge(abs(day_offset))
@@ -181,6 +216,7 @@ class ScheduleUpgradeReminder(ScheduleMessageBaseTask):
     log_prefix = UPGRADE_REMINDER_LOG_PREFIX
     resolver = resolvers.UpgradeReminderResolver
     async_send_task = _upgrade_reminder_schedule_send
+    async_send_batch_task = _upgrade_reminder_schedule_send_batch
 
     def make_message_type(self, day_offset):
         return message_types.UpgradeReminder()
@@ -192,6 +228,7 @@ class ScheduleCourseUpdate(ScheduleMessageBaseTask):
     log_prefix = COURSE_UPDATE_LOG_PREFIX
     resolver = resolvers.CourseUpdateResolver
     async_send_task = _course_update_schedule_send
+    async_send_batch_task = _course_update_schedule_send_batch
 
     def make_message_type(self, day_offset):
         return message_types.CourseUpdate()
@@ -203,11 +240,48 @@ def _schedule_send(msg_str, site_id, delivery_config_var, log_prefix):
         msg = Message.from_string(msg_str)
 
         user = User.objects.get(username=msg.recipient.username)
-        with emulate_http_request(site=site, user=user):
-            _annonate_send_task_for_monitoring(msg)
-            LOG.debug(u'%s: Sending message = %s', log_prefix, msg_str)
-            ace.send(msg)
-            _track_message_sent(site, user, msg)
+        _send_message(site, user, msg, log_prefix)
+
+
+def _schedule_send_batch(msg_strs, site_id, delivery_config_var, log_prefix):
+    """
+    Sends each of the given serialized messages, reading the site, its configuration and the recipients once for
+    the whole batch. A message that fails to send is logged, and doesn't prevent the rest of the batch from being sent.
+    """
+    site = Site.objects.select_related('configuration').get(pk=site_id)
+    if not _is_delivery_enabled(site, delivery_config_var, log_prefix):
+        return
+
+    msgs = [Message.from_string(msg_str) for msg_str in msg_strs]
+    users_by_username = {
+        user.username: user
+        for user in User.objects.filter(username__in={msg.recipient.username for msg in msgs})
+    }
+    num_failed = 0
+    for msg in msgs:
+        user = users_by_username.get(msg.recipient.username)
+        if user is None:
+            LOG.warning(
+                u'%s: Recipient %s of message %s no longer exists', log_prefix, msg.recipient.username, msg.uuid,
+            )
+            num_failed += 1
+            continue
+        try:
+            _send_message(site, user, msg, log_prefix)
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception(u'%s: Failed to send message %s', log_prefix, msg.uuid)
+            num_failed += 1
+
+    set_custom_metric('num_messages', len(msgs))
+    set_custom_metric('num_failed_messages', num_failed)
+
+
+def _send_message(site, user, msg, log_prefix):
+    with emulate_http_request(site=site, user=user):
+        _annonate_send_task_for_monitoring(msg)
+        LOG.debug(u'%s: Sending message = %s', log_prefix, msg)
+        ace.send(msg)
+        _track_message_sent(site, user, msg)
 
 
 def _track_message_sent(site, user, msg):
@@ -0,0 +1,60 @@
+"""
+Django integration for Capa's sandboxed code execution.
+
+The pool of pre-warmed sandbox workers is configured by the "worker_pool" key
+of the CODE_JAIL setting:
+
+    CODE_JAIL = {
+        ...
+        'worker_pool': {
+            # Number of sandboxed Python processes kept running.  0 disables the pool.
+            'size': 4,
+            # Number of executions after which a worker is replaced.
+            'max_jobs': 500,
+            # Memory use (in bytes), of a worker or of one of its jobs, above which the worker is replaced.
+            'max_memory': 268435456,
+        },
+    }
+
+The caching of execution results is configured by the SAFE_EXEC_CACHE setting:
+
+    SAFE_EXEC_CACHE = {
+        # Maximum total size (in bytes) of the results kept in each process, in
+        # front of the shared cache.  0 disables the local cache.
+        'local_max_size': 16777216,
+        # Results larger than this (in bytes) aren't cached.  None means no limit.
+        'max_result_size': 1048576,
+    }
+"""
+from __future__ import absolute_import
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+from capa.safe_exec import result_cache, worker_pool
+from capa.safe_exec.safe_exec import ASSUMED_IMPORTS
+
+
+class ConfigureSafeExecMiddleware(MiddlewareMixin):
+    """
+    Middleware to configure the sandbox worker pool and result cache on startup.
+
+    Must come after codejail's ConfigureCodeJailMiddleware, which
+    configures the sandbox the workers run in.
+    """
+    def __init__(self, *args, **kwargs):
+        pool_settings = settings.CODE_JAIL.get('worker_pool', {})
+        worker_pool.configure(
+            size=pool_settings.get('size', 0),
+            warm_imports=[module_name for __, module_name in ASSUMED_IMPORTS],
+            max_jobs=pool_settings.get('max_jobs'),
+            max_memory=pool_settings.get('max_memory'),
+        )
+        cache_settings = getattr(settings, 'SAFE_EXEC_CACHE', {})
+        result_cache.configure(
+            local_max_size=cache_settings.get('local_max_size', 0),
+            max_result_size=cache_settings.get('max_result_size'),
+        )
+        super(ConfigureSafeExecMiddleware, self).__init__(*args, **kwargs)
+        raise MiddlewareNotUsed
@@ -5,7 +5,9 @@ from __future__ import absolute_import
 import collections
 import functools
 import itertools
+import threading
 import zlib
+
 import wrapt
 
 from django.utils.encoding import force_text
@@ -149,6 +151,113 @@ class process_cached(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class LRUCache(object):
+    """
+    A process-local, thread-safe cache which evicts its least recently used
+    entries once the total size of its entries exceeds its maximum size.
+
+    Entries are sized by the callers, so the cache can be bounded by the number
+    of its entries (the default size of an entry is 1), by bytes, or by any
+    other measure. Cached values are shared by all callers and must not be
+    mutated.
+    """
+    def __init__(self, max_size):
+        """
+        Arguments:
+            max_size (int): The maximum total size of the cached entries.
+                A value of 0 disables caching.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Return the value cached for ``key``, or ``default`` if not found.
+        """
+        with self._lock:
+            try:
+                value, size = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            # Re-insert the entry to mark it as the most recently used.
+            self._entries[key] = (value, size)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, size=1):
+        """
+        Cache ``value`` for ``key``, accounting for it as ``size``.
+
+        Values larger than the cache itself are not cached.
+        """
+        if size > self.max_size:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (value, size)
+            self.size += size
+            self._evict()
+
+    def pop(self, key, default=None):
+        """
+        Remove the entry for ``key`` and return its value, or ``default`` if not found.
+        """
+        with self._lock:
+            try:
+                value, size = self._entries.pop(key)
+            except KeyError:
+                return default
+            self.size -= size
+            return value
+
+    def items(self):
+        """
+        Return a list of the cached (key, value) pairs, from the least to the most recently used.
+        """
+        with self._lock:
+            return [(key, value) for key, (value, _) in iteritems(self._entries)]
+
+    def resize(self, max_size):
+        """
+        Change the maximum size of the cache, evicting entries as needed.
+        """
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self):
+        """
+        Remove all entries from the cache and reset its counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = self.hits = self.misses = self.evictions = 0
+
+    def _evict(self):
+        """
+        Evict the least recently used entries until the cache fits its maximum size.
+        """
+        while self.size > self.max_size and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+
 def zpickle(data):
     """Given any data structure, returns a zlib compressed pickled serialization."""
     return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
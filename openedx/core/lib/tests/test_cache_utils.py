@@ -9,7 +9,7 @@ import ddt
 from mock import Mock
 
 from edx_django_utils.cache import RequestCache
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.lib.cache_utils import LRUCache, request_cached
 import six
 
 
@@ -297,3 +297,62 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         self.assertEqual(result, 2)
         self.assertEqual(to_be_wrapped.call_count, 2)
+
+
+class TestLRUCache(TestCase):
+    """Tests for the process-local LRUCache"""
+
+    def test_get_and_set(self):
+        cache = LRUCache(max_size=100)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', {'_id': 'a'}, 10)
+        self.assertEqual(cache.get('a'), {'_id': 'a'})
+        self.assertEqual((cache.hits, cache.misses, cache.size), (1, 1, 10))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=100)
+        cache.set('a', 'a', 40)
+        cache.set('b', 'b', 40)
+        cache.get('a')
+        cache.set('c', 'c', 40)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'a')
+        self.assertEqual(cache.get('c'), 'c')
+        self.assertEqual((cache.evictions, cache.size), (1, 80))
+
+    def test_skips_oversized_values(self):
+        cache = LRUCache(max_size=100)
+        cache.set('a', 'a', 101)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.size, 0)
+
+    def test_replace_and_resize(self):
+        cache = LRUCache(max_size=100)
+        cache.set('a', 'a', 40)
+        cache.set('a', 'a2', 60)
+        cache.set('b', 'b', 30)
+        self.assertEqual(cache.size, 90)
+
+        cache.resize(50)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get('b'), 'b')
+
+    def test_sized_by_number_of_entries(self):
+        cache = LRUCache(max_size=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key)
+        self.assertEqual([key for key, _ in cache.items()], ['b', 'c'])
+        self.assertEqual(cache.get('a', 'missing'), 'missing')
+
+    def test_pop_and_clear(self):
+        cache = LRUCache(max_size=100)
+        cache.set('a', 'a', 40)
+        self.assertEqual(cache.pop('a'), 'a')
+        self.assertIsNone(cache.pop('a'))
+        self.assertEqual(cache.size, 0)
+
+        cache.set('b', 'b', 40)
+        cache.get('b')
+        cache.clear()
+        self.assertEqual((len(cache), cache.size, cache.hits, cache.misses), (0, 0, 0, 0))
@@ -272,6 +272,23 @@ def replace_static_urls(data_dir, block, view, frag, context, course_id=None, st
     ))
 
 
+def replace_urls(data_dir, course_id, jump_to_id_base_url, block, view, frag, context,  # pylint: disable=unused-argument
+                 static_asset_path=''):
+    """
+    Updates the supplied module with a new get_html function that wraps
+    the old get_html function and substitutes urls as replace_static_urls,
+    replace_course_urls and replace_jump_to_id_urls do, in a single pass
+    over the html.
+    """
+    return wrap_fragment(frag, static_replace.replace_urls(
+        frag.content,
+        data_dir,
+        course_id,
+        static_asset_path=static_asset_path,
+        jump_to_id_base_url=jump_to_id_base_url,
+    ))
+
+
 def grade_histogram(module_id):
     '''
     Print out a histogram of grades on a given problem in staff member debug info.
@@ -279,7 +296,15 @@ def grade_histogram(module_id):
     Warning: If a student has just looked at an xmodule and not attempted
     it, their grade is None. Since there will always be at least one such student
     this function almost always returns [].
+
+    Once the USE_GRADE_HISTOGRAM_BUCKETS flag is enabled for the course, the
+    histogram is read out of the grade buckets of the module instead.
     '''
+    from courseware.models import StudentModuleGradeBucket
+    from courseware.toggles import USE_GRADE_HISTOGRAM_BUCKETS
+    if USE_GRADE_HISTOGRAM_BUCKETS.is_enabled(module_id.course_key):
+        return StudentModuleGradeBucket.get_histogram(module_id)
+
     from django.db import connection
     cursor = connection.cursor()
 
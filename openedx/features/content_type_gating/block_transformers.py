@@ -35,6 +35,11 @@ class ContentTypeGateTransformer(BlockStructureTransformer):
         """
         block_structure.request_xblock_fields('group_access', 'graded', 'has_score', 'weight')
 
+    def get_transform_inputs(self, usage_info, block_structure):
+        return (
+            ContentTypeGatingConfig.enabled_for_enrollment(user=usage_info.user, course_key=usage_info.course_key),
+        )
+
     def transform(self, usage_info, block_structure):
         if not ContentTypeGatingConfig.enabled_for_enrollment(
             user=usage_info.user,